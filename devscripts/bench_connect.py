@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+from __future__ import division, print_function, unicode_literals
+
+# Benchmark opening connections to a host whose first address does not
+# answer, standing in for a broken IPv6 route: serially, as
+# socket.create_connection does, and racing the addresses with Connector.
+# The unanswering address is a local listener with a full accept queue,
+# which makes connections hang on Linux.
+
+import optparse
+import os
+import socket
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from youtube_dl.connect import Connector
+
+
+def listener(backlog):
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    sock.listen(backlog)
+    return sock
+
+
+def serial_connection(addrs, timeout):
+    err = None
+    for af, socktype, proto, _, sa in addrs:
+        sock = socket.socket(af, socktype, proto)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(sa)
+            return sock
+        except socket.error as e:
+            err = e
+            sock.close()
+    raise err
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [OPTIONS]')
+    parser.add_option(
+        '--connections', type=int, default=20,
+        help='Number of connections (default: %default)')
+    parser.add_option(
+        '--timeout', type=float, default=0.5,
+        help='Connection timeout in seconds (default: %default)')
+    opts, args = parser.parse_args()
+
+    server = listener(opts.connections + 1)
+    hole = listener(0)
+    fillers = []
+    for _ in range(3):
+        filler = socket.socket()
+        filler.setblocking(False)
+        filler.connect_ex(hole.getsockname())
+        fillers.append(filler)
+    time.sleep(0.1)
+
+    addrs = [
+        (socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, '', s.getsockname())
+        for s in (hole, server)]
+    connector = Connector(getaddrinfo=lambda host, port, family, type: addrs)
+
+    for name, connect in (
+            ('serial', lambda: serial_connection(addrs, opts.timeout)),
+            ('racing', lambda: connector.create_connection(('host', 80), opts.timeout))):
+        started = time.time()
+        for _ in range(opts.connections):
+            connect().close()
+            server.accept()[0].close()
+        elapsed = time.time() - started
+        print('%s: %.1f ms per connection' % (name, elapsed / opts.connections * 1000))
+
+    stats = connector.stats
+    print('racing: %d attempts for %d connections, %.1f ms at most, %d DNS lookups' % (
+        stats['attempts'], stats['connections'], stats['max_connect_time'] * 1000,
+        connector.dns_cache.misses))
+
+    for sock in fillers + [hole, server]:
+        sock.close()
+
+
+if __name__ == '__main__':
+    main()
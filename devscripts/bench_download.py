@@ -0,0 +1,381 @@
+#!/usr/bin/env python
+from __future__ import division, unicode_literals
+
+# Benchmark the throughput of the native downloaders against a local
+# HTTP server serving synthetic media, so that it can run offline
+
+import base64
+import json
+import multiprocessing
+import optparse
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+try:
+    import socketserver
+except ImportError:  # Python 2
+    import SocketServer as socketserver
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from youtube_dl import YoutubeDL
+from youtube_dl.compat import (
+    compat_http_server,
+    compat_struct_pack,
+)
+from youtube_dl.downloader.dash import DashSegmentsFD
+from youtube_dl.downloader.f4m import F4mFD
+from youtube_dl.downloader.hls import HlsFD, can_decrypt_frag
+from youtube_dl.downloader.http import HttpFD
+from youtube_dl.downloader.ism import IsmFD, box, full_box, u32
+
+
+CASES = ('http', 'hls', 'hls-aes', 'hls-byterange', 'dash', 'ism', 'f4m')
+
+AES_KEY = b'0123456789abcdef'
+AES_IV = b'\0' * 16
+
+# Written in chunks of this size, so that bandwidth limits are smooth
+CHUNK_SIZE = 16 * 1024
+
+
+class MediaFactory(object):
+    """Synthetic media of the benchmark server
+
+    All the media are made of size bytes, split into segment_size
+    segments for the fragmented protocols.
+    """
+
+    def __init__(self, size, segment_size):
+        self.size = size
+        self.segment_size = segment_size
+        block = os.urandom(1024 * 1024)
+        self.data = (block * (size // len(block) + 1))[:size]
+        self._cache = {}
+
+    @property
+    def segment_count(self):
+        return (self.size + self.segment_size - 1) // self.segment_size
+
+    def segment(self, n):
+        return self.data[n * self.segment_size:(n + 1) * self.segment_size]
+
+    def _cached(self, key, func):
+        if key not in self._cache:
+            self._cache[key] = func()
+        return self._cache[key]
+
+    def aes_segment(self, n):
+        def encrypt():
+            from Crypto.Cipher import AES
+            data = self.segment(n)
+            # Pad to a whole number of blocks, hlsnative does not unpad
+            data += b'\0' * (-len(data) % 16)
+            return AES.new(AES_KEY, AES.MODE_CBC, AES_IV).encrypt(data)
+        return self._cached(('aes', n), encrypt)
+
+    def ism_fragment(self, n):
+        def build():
+            traf = (
+                full_box(b'tfhd', 0, 0, u32.pack(1))
+                + full_box(b'trun', 0, 0, u32.pack(0)))
+            moof = full_box(b'mfhd', 0, 0, u32.pack(n + 1)) + box(b'traf', traf)
+            return box(b'moof', moof) + box(b'mdat', self.segment(n))
+        return self._cached(('ism', n), build)
+
+    def f4m_fragment(self, n):
+        return self._cached(('f4m', n), lambda: box(b'mdat', self.segment(n)))
+
+    def hls_playlist(self, encrypted=False, byterange=False):
+        lines = ['#EXTM3U', '#EXT-X-TARGETDURATION:4', '#EXT-X-MEDIA-SEQUENCE:0']
+        if encrypted:
+            lines.append('#EXT-X-KEY:METHOD=AES-128,URI="/key",IV=0x' + '00' * 16)
+        for n in range(self.segment_count):
+            lines.append('#EXTINF:4.0,')
+            if byterange:
+                lines.append('#EXT-X-BYTERANGE:%d@%d' % (
+                    len(self.segment(n)), n * self.segment_size))
+                lines.append('/progressive')
+            else:
+                lines.append('/%s/%d.ts' % ('hls-aes' if encrypted else 'seg', n))
+        lines.append('#EXT-X-ENDLIST')
+        return '\n'.join(lines).encode('utf-8')
+
+    def f4m_manifest(self):
+        asrt = b'\0' * 4 + b'\0' + compat_struct_pack('!III', 1, 1, self.segment_count)
+        afrt = (
+            b'\0' * 4 + compat_struct_pack('!I', 1000) + b'\0'
+            + compat_struct_pack('!IIQI', 1, 1, 0, 4000))
+        abst = (
+            b'\0' * 4 + compat_struct_pack('!IBIQQ', 1, 0, 1000, 0, 0)
+            + b'\0' * 5 + b'\x01' + box(b'asrt', asrt) + b'\x01' + box(b'afrt', afrt))
+        return ((
+            '<manifest xmlns="http://ns.adobe.com/f4m/1.0">'
+            '<media url="f4m/" bitrate="1000" bootstrapInfoId="bootstrap"/>'
+            '<bootstrapInfo id="bootstrap" profile="named">%s</bootstrapInfo>'
+            '</manifest>') % base64.b64encode(box(b'abst', abst)).decode('ascii')).encode('utf-8')
+
+
+class BenchmarkRequestHandler(compat_http_server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def _content(self):
+        media = self.server.media
+        path = self.path.split('?')[0]
+        if path == '/progressive':
+            return media.data, 'video/mp4'
+        if path == '/key':
+            return AES_KEY, 'application/octet-stream'
+        if path in ('/hls.m3u8', '/hls-aes.m3u8', '/hls-byterange.m3u8'):
+            return media.hls_playlist(
+                encrypted=path == '/hls-aes.m3u8',
+                byterange=path == '/hls-byterange.m3u8'), 'application/vnd.apple.mpegurl'
+        if path == '/manifest.f4m':
+            return media.f4m_manifest(), 'application/f4m+xml'
+        mobj = re.match(r'^/(seg|hls-aes|ism)/(\d+)(?:\.\w+)?$', path)
+        if mobj and int(mobj.group(2)) < media.segment_count:
+            n = int(mobj.group(2))
+            return {
+                'seg': media.segment,
+                'hls-aes': media.aes_segment,
+                'ism': media.ism_fragment,
+            }[mobj.group(1)](n), 'video/mp4'
+        mobj = re.match(r'^/f4m/Seg1-Frag(\d+)$', path)
+        if mobj and 0 < int(mobj.group(1)) <= media.segment_count:
+            return media.f4m_fragment(int(mobj.group(1)) - 1), 'video/x-flv'
+        return None, None
+
+    def do_GET(self):
+        with self.server.requests.get_lock():
+            self.server.requests.value += 1
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        content, content_type = self._content()
+        if content is None:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        mobj = re.match(r'bytes=(\d+)-(\d*)$', self.headers.get('Range') or '')
+        if mobj:
+            start = int(mobj.group(1))
+            end = int(mobj.group(2)) + 1 if mobj.group(2) else len(content)
+            end = min(end, len(content))
+            self.send_response(206)
+            self.send_header('Content-Range', 'bytes %d-%d/%d' % (start, end - 1, len(content)))
+        else:
+            start, end = 0, len(content)
+            self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(end - start))
+        self.end_headers()
+
+        bandwidth = self.server.bandwidth
+        began = time.time()
+        for pos in range(start, end, CHUNK_SIZE):
+            self.wfile.write(content[pos:min(pos + CHUNK_SIZE, end)])
+            if bandwidth:
+                delay = began + (pos + CHUNK_SIZE - start) / bandwidth - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+
+
+class BenchmarkServer(socketserver.ThreadingMixIn, compat_http_server.HTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, media, latency, bandwidth, requests):
+        compat_http_server.HTTPServer.__init__(
+            self, ('127.0.0.1', 0), BenchmarkRequestHandler)
+        self.media = media
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.requests = requests
+
+
+def serve(opts, requests, port_queue):
+    media = MediaFactory(opts['size'], opts['segment_size'])
+    server = BenchmarkServer(media, opts['latency'], opts['bandwidth'], requests)
+    port_queue.put(server.server_address[1])
+    server.serve_forever()
+
+
+def build_download(case, base_url, opts):
+    """Return the downloader class and info dict of a benchmark case"""
+    segment_count = (opts['size'] + opts['segment_size'] - 1) // opts['segment_size']
+    if case == 'http':
+        return HttpFD, {'url': base_url + '/progressive'}
+    if case.startswith('hls'):
+        return HlsFD, {'url': '%s/%s.m3u8' % (base_url, case)}
+    if case == 'dash':
+        return DashSegmentsFD, {
+            'fragment_base_url': base_url + '/seg/',
+            'fragments': [{'path': '%d.m4s' % n} for n in range(segment_count)],
+        }
+    if case == 'ism':
+        return IsmFD, {
+            'fragments': [{'url': '%s/ism/%d' % (base_url, n)} for n in range(segment_count)],
+            '_download_params': {
+                'track_id': 1,
+                'fourcc': 'AACL',
+                'duration': segment_count * 40000000,
+                'sampling_rate': 44100,
+            },
+        }
+    if case == 'f4m':
+        return F4mFD, {'url': base_url + '/manifest.f4m'}
+    raise ValueError('Unknown benchmark case %s' % case)
+
+
+def cpu_time():
+    if resource is None:
+        return getattr(time, 'process_time', getattr(time, 'clock', time.time))()
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+def peak_rss():
+    """Return the peak resident set size of the process in bytes"""
+    if resource is None:
+        return None
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in bytes on macOS, in kilobytes elsewhere
+    return maxrss if sys.platform == 'darwin' else maxrss * 1024
+
+
+def run_case(case, base_url, opts, result_queue):
+    """Download a benchmark case, run in a process of its own so that its
+    CPU time and peak memory usage can be measured"""
+    fd_class, info_dict = build_download(case, base_url, opts)
+    info_dict.update({
+        'id': case,
+        'ext': 'mp4',
+        'http_headers': {},
+    })
+    tmpdir = tempfile.mkdtemp(prefix='youtube-dl-bench-')
+    filename = os.path.join(tmpdir, 'bench.mp4')
+    try:
+        ydl = YoutubeDL({
+            'quiet': True,
+            'noprogress': True,
+            'http_chunk_size': opts['http_chunk_size'],
+        })
+        fd = fd_class(ydl, ydl.params)
+        start_cpu = cpu_time()
+        start = time.time()
+        success = fd.download(filename, info_dict)
+        elapsed = time.time() - start
+        result_queue.put({
+            'case': case,
+            'success': bool(success),
+            'bytes': os.path.getsize(filename) if success else 0,
+            'elapsed': elapsed,
+            'cpu': cpu_time() - start_cpu,
+            'peak_rss': peak_rss(),
+        })
+    except Exception as e:
+        result_queue.put({'case': case, 'success': False, 'error': repr(e)})
+    finally:
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def run_benchmarks(cases, opts):
+    """Run the benchmark cases, return a list of result dicts"""
+    requests = multiprocessing.Value('i', 0)
+    port_queue = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(opts, requests, port_queue))
+    server.daemon = True
+    server.start()
+    try:
+        base_url = 'http://127.0.0.1:%d' % port_queue.get(timeout=60)
+        results = []
+        for case in cases:
+            if case == 'hls-aes' and not can_decrypt_frag:
+                results.append({'case': case, 'success': False, 'error': 'pycrypto is not installed'})
+                continue
+            with requests.get_lock():
+                requests.value = 0
+            result_queue = multiprocessing.Queue()
+            worker = multiprocessing.Process(
+                target=run_case, args=(case, base_url, opts, result_queue))
+            worker.start()
+            result = result_queue.get()
+            worker.join()
+            result['requests'] = requests.value
+            if result['success']:
+                elapsed = result['elapsed'] or 1e-9
+                result['mb_per_s'] = result['bytes'] / elapsed / 1024 / 1024
+                result['requests_per_s'] = result['requests'] / elapsed
+            results.append(result)
+        return results
+    finally:
+        server.terminate()
+        server.join()
+
+
+def format_results(results):
+    lines = ['%-14s %9s %9s %9s %9s %9s %10s' % (
+        'case', 'MiB', 'seconds', 'MiB/s', 'req/s', 'CPU s', 'peak RSS')]
+    for r in results:
+        if not r['success']:
+            lines.append('%-14s failed: %s' % (r['case'], r.get('error', 'download failed')))
+            continue
+        lines.append('%-14s %9.2f %9.3f %9.2f %9.1f %9.3f %10s' % (
+            r['case'], r['bytes'] / 1024 / 1024, r['elapsed'], r['mb_per_s'],
+            r['requests_per_s'], r['cpu'],
+            '%.1f MiB' % (r['peak_rss'] / 1024 / 1024) if r['peak_rss'] else '-'))
+    return '\n'.join(lines)
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [OPTIONS] [CASE...]')
+    parser.add_option(
+        '--size', type=float, default=64,
+        help='Size of the media in MiB (default: %default)')
+    parser.add_option(
+        '--segment-size', type=float, default=512,
+        help='Size of the segments in KiB (default: %default)')
+    parser.add_option(
+        '--latency', type=float, default=0,
+        help='Delay before each response in milliseconds (default: %default)')
+    parser.add_option(
+        '--bandwidth', type=float, default=0,
+        help='Bandwidth of each connection in MiB/s, 0 for unlimited (default: %default)')
+    parser.add_option(
+        '--http-chunk-size', type=int, default=None,
+        help='http_chunk_size of the downloaders in bytes')
+    parser.add_option(
+        '--json', action='store_true',
+        help='Print the results as JSON')
+    opts, args = parser.parse_args()
+    for case in args:
+        if case not in CASES:
+            parser.error('unknown case %s, choose from %s' % (case, ', '.join(CASES)))
+
+    results = run_benchmarks(args or CASES, {
+        'size': int(opts.size * 1024 * 1024),
+        'segment_size': int(opts.segment_size * 1024),
+        'latency': opts.latency / 1000,
+        'bandwidth': opts.bandwidth * 1024 * 1024,
+        'http_chunk_size': opts.http_chunk_size,
+    })
+    print(json.dumps(results, indent=2) if opts.json else format_results(results))
+    if not all(r['success'] for r in results if r['case'] != 'hls-aes' or can_decrypt_frag):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
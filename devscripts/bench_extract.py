@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+from __future__ import division, print_function, unicode_literals
+
+# Benchmark extract_info for extractor test cases without network: record
+# the HTTP exchanges of each case once with --record, then replay them
+
+import optparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+from test.helper import get_params, gettestcases
+from youtube_dl import YoutubeDL
+from youtube_dl.utils import DownloadError
+
+try:
+    process_time = time.process_time
+except AttributeError:  # Python 2
+    process_time = time.clock
+
+
+def named_testcases():
+    """ Yield (name, test case) with the names test_download.py uses """
+    seen = set()
+    for test_case in gettestcases():
+        name = test_case['name']
+        i = 1
+        while name in seen:
+            name = '%s_%d' % (test_case['name'], i)
+            i += 1
+        seen.add(name)
+        yield name, test_case
+
+
+def run_case(test_case, archive, record, trace_allocations):
+    params = get_params(test_case.get('params', {}))
+    params.update({
+        'quiet': True,
+        'skip_download': True,
+        'record_network' if record else 'replay_network': archive,
+    })
+    ydl = YoutubeDL(params)
+    ydl.add_default_info_extractors()
+    if trace_allocations:
+        tracemalloc.start()
+    start, start_cpu = time.time(), process_time()
+    try:
+        ydl.extract_info(test_case['url'], download=False)
+        error = None
+    except DownloadError as err:
+        error = err
+    result = {
+        'time': time.time() - start,
+        'cpu': process_time() - start_cpu,
+        'requests': ydl._network_archive.requests,
+        'misses': getattr(ydl._network_archive, 'misses', 0),
+        'error': error,
+    }
+    if trace_allocations:
+        snapshot = tracemalloc.take_snapshot()
+        result['peak'] = tracemalloc.get_traced_memory()[1]
+        result['blocks'] = sum(stat.count for stat in snapshot.statistics('filename'))
+        tracemalloc.stop()
+    return result
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [OPTIONS] TESTNAME...')
+    parser.add_option(
+        '--archive-dir', default='network-archives',
+        help='Directory of the network archives (default: %default)')
+    parser.add_option(
+        '--record', action='store_true', default=False,
+        help='Record the network archives of the test cases from the live sites')
+    parser.add_option(
+        '--number', type=int, default=5,
+        help='Number of replays (default: %default)')
+    parser.add_option(
+        '--allocations', action='store_true', default=False,
+        help='Also report memory allocations (Python 3 only, slower)')
+    opts, args = parser.parse_args()
+    if not args:
+        parser.error('no test case given, e.g. Vimeo or Vimeo_1')
+    if opts.allocations and tracemalloc is None:
+        parser.error('tracing allocations requires Python 3')
+
+    testcases = dict(named_testcases())
+    if not os.path.isdir(opts.archive_dir):
+        os.makedirs(opts.archive_dir)
+    for name in args:
+        test_case = testcases.get(name)
+        if test_case is None:
+            print('%s: no such test case' % name)
+            continue
+        archive = os.path.join(opts.archive_dir, name + '.zip')
+        if opts.record:
+            result = run_case(test_case, archive, True, False)
+            print('%s: recorded %d requests in %.2f s%s' % (
+                name, result['requests'], result['time'],
+                ' (failed: %s)' % result['error'] if result['error'] else ''))
+            continue
+        if not os.path.exists(archive):
+            print('%s: not recorded, run with --record first' % name)
+            continue
+        results = [
+            run_case(test_case, archive, False, opts.allocations)
+            for _ in range(opts.number)]
+        best = min(results, key=lambda r: r['cpu'])
+        line = '%s: %d requests (%d not recorded), %.1f ms CPU, %.1f ms wall' % (
+            name, best['requests'], best['misses'], best['cpu'] * 1000, best['time'] * 1000)
+        if opts.allocations:
+            line += ', %d memory blocks live, %.1f KiB peak' % (
+                best['blocks'], best['peak'] / 1024)
+        if best['error']:
+            line += ' (failed: %s)' % best['error']
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
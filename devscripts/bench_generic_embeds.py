@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+from __future__ import division, print_function, unicode_literals
+
+# Benchmark the embed detection of the generic extractor over a corpus of
+# saved pages, served by a local HTTP server standing in for the sites, with
+# and without skipping the detectors whose triggers are not in the page
+
+import optparse
+import os
+import random
+import sys
+import threading
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from youtube_dl import YoutubeDL
+from youtube_dl.compat import compat_http_server
+from youtube_dl.extractor import GenericIE
+from youtube_dl.utils import ExtractorError
+
+SYNTHETIC_EMBEDS = {
+    'none': '',
+    'vimeo': '<iframe src="https://player.vimeo.com/video/76979871" width="640"></iframe>',
+    'youtube': '<iframe src="https://www.youtube.com/embed/BaW_jenozKc" width="560"></iframe>',
+    'wistia': '<div class="wistia_embed wistia_async_807fafadvk"></div>',
+    'html5': '<video src="/media/clip.mp4"></video>',
+}
+
+
+def synthetic_page(embed, size):
+    """ A page of about size bytes of markup with embed at the end """
+    random.seed(size)
+    words = 'the video of a player and news with content for share page more'.split()
+    paragraphs = []
+    length = 0
+    while length < size:
+        paragraph = '<div class="article"><p>%s</p><a href="/news/%d.html">more</a></div>\n' % (
+            ' '.join(random.choice(words) for _ in range(40)), len(paragraphs))
+        paragraphs.append(paragraph)
+        length += len(paragraph)
+    return '<html><head><title>Synthetic page</title></head><body>%s%s</body></html>' % (
+        ''.join(paragraphs), embed)
+
+
+class UnfilteredGenericIE(GenericIE):
+    def _find_embeds(self, webpage):
+        return set(self._EMBED_TRIGGERS)
+
+
+class CorpusRequestHandler(compat_http_server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_HEAD(self):
+        self.send_response(200 if self.path[1:] in self.server.pages else 404)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.end_headers()
+
+    def do_GET(self):
+        body = self.server.pages.get(self.path[1:])
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def extract(ie_class, url):
+    ie = ie_class(YoutubeDL({'quiet': True, 'no_warnings': True}))
+    try:
+        info = ie.extract(url)
+    except ExtractorError as e:
+        return 'error: %s' % e
+    if info.get('_type') == 'playlist':
+        info['entries'] = list(info['entries'])
+    return info
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [OPTIONS] [PAGE|DIRECTORY...]')
+    parser.add_option(
+        '--size', type=int, default=300,
+        help='Size of the synthetic pages in KiB, when no page is given (default: %default)')
+    parser.add_option(
+        '--number', type=int, default=5,
+        help='Number of runs (default: %default)')
+    opts, args = parser.parse_args()
+
+    pages = {}
+    for arg in args:
+        filenames = (
+            [os.path.join(arg, f) for f in sorted(os.listdir(arg))] if os.path.isdir(arg)
+            else [arg])
+        for filename in filenames:
+            with open(filename, 'rb') as f:
+                pages[os.path.basename(filename)] = f.read()
+    if not args:
+        for name, embed in SYNTHETIC_EMBEDS.items():
+            pages[name] = synthetic_page(embed, opts.size * 1024).encode('utf-8')
+
+    httpd = compat_http_server.HTTPServer(('127.0.0.1', 0), CorpusRequestHandler)
+    httpd.pages = pages
+    thread = threading.Thread(target=httpd.serve_forever)
+    thread.daemon = True
+    thread.start()
+
+    totals = [0, 0]
+    try:
+        for name in sorted(pages):
+            url = 'http://127.0.0.1:%d/%s' % (httpd.server_address[1], name)
+            times = [
+                min(timeit.repeat(lambda: extract(ie_class, url), number=1, repeat=opts.number))
+                for ie_class in (GenericIE, UnfilteredGenericIE)]
+            same = extract(GenericIE, url) == extract(UnfilteredGenericIE, url)
+            print('%s (%d KiB): %.1f ms prefiltered, %.1f ms unfiltered%s' % (
+                name, len(pages[name]) // 1024, times[0] * 1000, times[1] * 1000,
+                '' if same else ' (RESULTS DIFFER)'))
+            totals = [t + d for t, d in zip(totals, times)]
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+    print('total: %.1f ms prefiltered, %.1f ms unfiltered' % (totals[0] * 1000, totals[1] * 1000))
+
+
+if __name__ == '__main__':
+    main()
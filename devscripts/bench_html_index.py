@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+from __future__ import division, unicode_literals
+
+# Benchmark the metadata phase of a typical extractor on a large webpage,
+# with and without the webpage index
+
+import optparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from youtube_dl import YoutubeDL
+from youtube_dl import utils
+from youtube_dl.extractor.common import InfoExtractor
+from youtube_dl.utils import (
+    get_element_by_class,
+    get_element_by_id,
+)
+
+
+def synthetic_webpage(size):
+    """Return a webpage of about size characters with the usual metadata"""
+    rng = random.Random(0)
+    head = '''<!DOCTYPE html>
+<html><head>
+<meta charset="utf-8">
+<title>Synthetic video - Example</title>
+<meta property="og:title" content="Synthetic video">
+<meta property="og:description" content="A video &amp; its description">
+<meta property="og:image" content="https://example.com/thumb.jpg">
+<meta property="og:url" content="https://example.com/video/1">
+<meta name="twitter:player" content="https://example.com/embed/1">
+<meta itemprop="duration" content="PT1M30S">
+<meta name="keywords" content="video, test">
+<!-- analytics -->
+<script type="application/ld+json">{"@context": "https://schema.org", "@type": "VideoObject",
+ "name": "Synthetic video", "uploadDate": "2020-01-01", "duration": "PT1M30S"}</script>
+</head><body>
+'''
+    parts = [head]
+    length = len(head)
+    n = 0
+    while length < size:
+        n += 1
+        part = (
+            '<div class="item item-%d" data-id="%d"><a href="/video/%d" title="Video %d">'
+            '<img src="/thumb/%d.jpg" alt="thumbnail"></a><span class="duration">%d:%02d</span>'
+            '<p class="desc">%s</p></div>\n') % (
+            n, n, n, n, n, rng.randint(0, 59), rng.randint(0, 59),
+            ' '.join(rng.choice(('lorem', 'ipsum', 'dolor', 'sit', 'amet')) for _ in range(20)))
+        parts.append(part)
+        length += len(part)
+    parts.append('''<form id="login"><input type="hidden" name="token" value="abc">
+<input type="submit" name="go" value="Go"></form>
+<h1 id="video-title" class="title main-title">Synthetic video</h1>
+<script>var player = {"id": 1};</script>
+</body></html>''')
+    return ''.join(parts)
+
+
+def metadata_phase(ie, webpage):
+    return {
+        'title': ie._og_search_title(webpage),
+        'description': ie._og_search_description(webpage),
+        'thumbnail': ie._og_search_thumbnail(webpage),
+        'url': ie._og_search_url(webpage),
+        'duration': ie._html_search_meta('duration', webpage),
+        'keywords': ie._html_search_meta('keywords', webpage),
+        'uploader': ie._html_search_meta(('author', 'uploader'), webpage, default=None),
+        'player': ie._twitter_search_player(webpage),
+        'age_limit': ie._rta_search(webpage),
+        'family_friendly': ie._family_friendly_search(webpage),
+        'json_ld': ie._search_json_ld(webpage, '1', default={}),
+        'hidden_inputs': ie._hidden_inputs(webpage),
+        'heading': get_element_by_id('video-title', webpage),
+        'main_title': get_element_by_class('main-title', webpage),
+        'missing': get_element_by_class('no-such-class', webpage),
+    }
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [OPTIONS]')
+    parser.add_option(
+        '--size', type=float, default=500,
+        help='Size of the webpage in KiB (default: %default)')
+    parser.add_option(
+        '--number', type=int, default=5,
+        help='Number of runs (default: %default)')
+    opts, args = parser.parse_args()
+
+    ie = InfoExtractor(YoutubeDL({'quiet': True}))
+    size = int(opts.size * 1024)
+    min_size = utils._HTML_INDEX_MIN_SIZE
+
+    def run(indexed):
+        utils._HTML_INDEX_MIN_SIZE = min_size if indexed else float('inf')
+        # A new webpage each time, so that the index is built in each run
+        webpages = [synthetic_webpage(size) for _ in range(opts.number)]
+        results = []
+        best = min(timeit.repeat(
+            lambda: results.append(metadata_phase(ie, webpages.pop())), number=1, repeat=opts.number))
+        return best, results[0]
+
+    plain_time, plain_results = run(False)
+    indexed_time, indexed_results = run(True)
+    assert plain_results == indexed_results, (plain_results, indexed_results)
+    print('%d KiB webpage, metadata phase: %.2f ms without index, %.2f ms with index' % (
+        opts.size, plain_time * 1000, indexed_time * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+from __future__ import unicode_literals
+
+# Benchmark the ISM box parsing and PIFF header writing on synthetic
+# Smooth Streaming fragments
+
+import io
+import optparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from youtube_dl.downloader.ism import (
+    _build_piff_header,
+    box,
+    find_box,
+    full_box,
+    piff_header,
+    u32,
+)
+
+
+PARAMS = {
+    'track_id': 1,
+    'fourcc': 'H264',
+    'duration': 50000000,
+    'width': 1280,
+    'height': 720,
+    'codec_private_data': '00000001674d401f0000000168ee3c80',
+}
+
+
+def rescanning_extract_box_data(data, box_sequence):
+    # Copy of the former implementation, which copies every enclosing box
+    data_reader = io.BytesIO(data)
+    while True:
+        box_size = u32.unpack(data_reader.read(4))[0]
+        box_type = data_reader.read(4)
+        if box_type == box_sequence[0]:
+            box_data = data_reader.read(box_size - 8)
+            if len(box_sequence) == 1:
+                return box_data
+            return rescanning_extract_box_data(box_data, box_sequence[1:])
+        data_reader.seek(box_size - 8, 1)
+
+
+def synthetic_fragment(mdat_size, samples=250):
+    trun = u32.pack(samples) + u32.pack(0) + u32.pack(mdat_size // samples) * samples
+    traf = (
+        full_box(b'tfhd', 0, 0, u32.pack(1))
+        + full_box(b'trun', 0, 0x201, trun)
+        + box(b'uuid', b'\0' * 36))
+    moof = full_box(b'mfhd', 0, 0, u32.pack(1)) + box(b'traf', traf)
+    return box(b'moof', moof) + box(b'mdat', b'\0' * mdat_size)
+
+
+def bench(name, stmt, number):
+    best = min(timeit.repeat(stmt, number=number, repeat=5))
+    print('%-38s %10.2f us' % (name, best / number * 1e6))
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [OPTIONS]')
+    parser.add_option(
+        '--fragment-size', type=int, default=4,
+        help='Size of the synthetic fragments in MiB (default: %default)')
+    parser.add_option(
+        '--number', type=int, default=200,
+        help='Number of runs per measurement (default: %default)')
+    opts, args = parser.parse_args()
+
+    frag = synthetic_fragment(opts.fragment_size * 1024 * 1024)
+    path = [b'moof', b'traf', b'tfhd']
+    assert rescanning_extract_box_data(frag, path) == frag[slice(*find_box(frag, path))]
+
+    print('%d MiB fragment, %d runs' % (opts.fragment_size, opts.number))
+    bench('extract_box_data (rescanning)', lambda: rescanning_extract_box_data(frag, path), opts.number)
+    bench('extract_box_data (rescanning, mdat)', lambda: rescanning_extract_box_data(frag, [b'mdat']), opts.number)
+    bench('find_box', lambda: find_box(frag, path), opts.number)
+    bench('find_box (mdat)', lambda: find_box(frag, [b'mdat']), opts.number)
+    bench('PIFF header (built)', lambda: _build_piff_header(PARAMS), opts.number)
+    bench('PIFF header (template)', lambda: piff_header(PARAMS), opts.number)
+
+
+if __name__ == '__main__':
+    main()
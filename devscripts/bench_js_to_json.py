@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+from __future__ import division, unicode_literals
+
+# Benchmark js_to_json on large synthetic JS object literals, such as the
+# player and page data embedded in web pages
+
+import json
+import optparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from youtube_dl.utils import js_to_json
+
+
+def js_value(rng, depth):
+    kind = rng.randint(0, 9 if depth < 4 else 5)
+    if kind == 0:
+        return str(rng.randint(0, 100000))
+    if kind == 1:
+        return rng.choice(('true', 'false', 'null', 'undefined', '!0', '!1', 'void 0'))
+    if kind == 2:
+        return "'%s'" % rng.choice(('single', 'it\\\'s', 'caf\\xe9', 'a "quoted" word'))
+    if kind == 3:
+        return '"https:\\/\\/example.com\\/video\\/%d.mp4?token=%x"' % (
+            rng.randint(0, 1000), rng.getrandbits(64))
+    if kind == 4:
+        return '0x%X' % rng.randint(0, 0xffffff)
+    if kind == 5:
+        return '%d.%d' % (rng.randint(0, 1000), rng.randint(0, 99))
+    if kind <= 7:
+        return '[%s,]' % ','.join(js_value(rng, depth + 1) for _ in range(rng.randint(0, 5)))
+    return js_object(rng, depth + 1)
+
+
+def js_object(rng, depth=0, size=None):
+    keys = size or rng.randint(1, 8)
+    return '{%s}' % ', '.join(
+        '%s: %s' % (
+            rng.choice(('key%d' % i, '"key%d"' % i, "'key%d'" % i)),
+            js_value(rng, depth))
+        for i in range(keys))
+
+
+def synthetic_code(size):
+    """Return a JS object literal of about size characters"""
+    rng = random.Random(0)
+    entries = []
+    length = 0
+    while length < size:
+        entry = js_object(rng, size=8)
+        entries.append(entry)
+        length += len(entry) + 1
+    return '{items: [%s], /* page data */ count: %d}' % (',\n'.join(entries), len(entries))
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [OPTIONS]')
+    parser.add_option(
+        '--size', type=float, default=1,
+        help='Size of the JS code in MiB (default: %default)')
+    parser.add_option(
+        '--number', type=int, default=5,
+        help='Number of runs (default: %default)')
+    opts, args = parser.parse_args()
+
+    code = synthetic_code(int(opts.size * 1024 * 1024))
+    # The output must be valid JSON
+    json.loads(js_to_json(code))
+
+    best = min(timeit.repeat(lambda: js_to_json(code), number=1, repeat=opts.number))
+    print('%.2f MiB of JS code: %.3f s, %.2f MiB/s' % (
+        len(code) / 1024 / 1024, best, len(code) / best / 1024 / 1024))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+from __future__ import division, print_function, unicode_literals
+
+# Benchmark parsing long synthetic DASH and ISM manifests into formats, and
+# the memory the formats take. DASH manifests are also parsed from their
+# bytes, both as a whole tree and as a stream.
+
+import io
+import optparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import tracemalloc
+except ImportError:  # Python 2
+    tracemalloc = None
+
+from youtube_dl import YoutubeDL
+from youtube_dl.compat import compat_etree_fromstring
+from youtube_dl.extractor.common import InfoExtractor
+
+MANIFEST_KINDS = ('time', 'number', 'list', 'ism')
+
+
+def _repeated_segments(count, run=3):
+    """ S elements for count segments of alternating durations """
+    # Encoders alternate segment durations to stay on audio frame
+    # boundaries, which keeps runs short in real manifests
+    s_elements = [
+        '<S d="%d" r="%d"/>' % (2002 if i % 2 else 2000, run - 1) for i in range(count // run)]
+    if count % run:
+        s_elements.append('<S d="2000" r="%d"/>' % (count % run - 1))
+    return ''.join(s_elements)
+
+
+def synthetic_mpd(kind, segments, representations, periods=1, run=3):
+    if kind == 'list':
+        segment_info = (
+            '<SegmentList timescale="1000"><Initialization sourceURL="init-$RepresentationID$.mp4"/>'
+            '<SegmentTimeline>%s</SegmentTimeline>%s</SegmentList>' % (
+                _repeated_segments(segments, run),
+                ''.join('<SegmentURL media="seg-%d.m4s"/>' % i for i in range(segments))))
+    elif kind == 'number':
+        segment_info = (
+            '<SegmentTemplate timescale="1000" duration="2000" startNumber="1"'
+            ' initialization="$RepresentationID$/init.mp4" media="$RepresentationID$/$Number$.m4s"/>')
+    else:
+        segment_info = (
+            '<SegmentTemplate timescale="1000" initialization="$RepresentationID$/init.mp4"'
+            ' media="$RepresentationID$/$Time$.m4s"><SegmentTimeline><S t="0" d="2000" r="0"/>%s'
+            '</SegmentTimeline></SegmentTemplate>' % _repeated_segments(segments - 1, run))
+    period = '<Period><AdaptationSet mimeType="video/mp4">%s%s</AdaptationSet></Period>' % (
+        segment_info, ''.join(
+            '<Representation id="v%d" bandwidth="%d" width="1280" height="720" codecs="avc1.4d401f"/>'
+            % (i, 1000000 + i) for i in range(representations)))
+    return (
+        '<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="static"'
+        ' mediaPresentationDuration="PT%dS">%s</MPD>' % (segments * 2, period * periods))
+
+
+def synthetic_ism(segments, representations):
+    return (
+        '<SmoothStreamingMedia MajorVersion="2" MinorVersion="0" Duration="%d">'
+        '<StreamIndex Type="video" Name="video" Url="QualityLevels({bitrate})/Fragments(video={start time})">%s%s'
+        '</StreamIndex></SmoothStreamingMedia>' % (
+            segments * 20000000, ''.join(
+                '<QualityLevel Bitrate="%d" FourCC="AVC1" MaxWidth="1280" MaxHeight="720"/>'
+                % (1000000 + i) for i in range(representations)),
+            '<c t="0" d="20000000"/>' + '<c d="20000000"/>' * (segments - 1)))
+
+
+def parse_formats(ie, kind, doc):
+    if kind == 'ism':
+        return ie._parse_ism_formats(doc, 'http://example.com/Manifest')
+    return ie._parse_mpd_formats(doc, mpd_url='http://example.com/manifest.mpd')
+
+
+def parse_mpd_bytes(ie, mpd_bytes, stream):
+    if stream:
+        return ie._parse_mpd_formats_stream(
+            io.BytesIO(mpd_bytes), mpd_url='http://example.com/manifest.mpd')
+    # As _download_xml does
+    doc = compat_etree_fromstring(mpd_bytes.decode('utf-8').encode('utf-8'))
+    return ie._parse_mpd_formats(doc, mpd_url='http://example.com/manifest.mpd')
+
+
+def measure(func, number):
+    """ Return the best time of func and its peak memory in bytes """
+    best = min(timeit.repeat(func, number=1, repeat=number))
+    if not tracemalloc:
+        return best, None
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [OPTIONS]')
+    parser.add_option(
+        '--kind', default='time', type='choice', choices=MANIFEST_KINDS,
+        help='Manifest kind: SegmentTimeline with $Time$, $Number$ template, '
+             'SegmentList or ISM (one of %s, default: %%default)' % ', '.join(MANIFEST_KINDS))
+    parser.add_option(
+        '--hours', type=float, default=3,
+        help='Duration of the media in hours, in 2 s segments (default: %default)')
+    parser.add_option(
+        '--representations', type=int, default=8,
+        help='Number of representations (default: %default)')
+    parser.add_option(
+        '--periods', type=int, default=1,
+        help='Number of periods of DASH manifests, each with all the segments (default: %default)')
+    parser.add_option(
+        '--run', type=int, default=3,
+        help='Segments per S element of DASH timelines (default: %default)')
+    parser.add_option(
+        '--number', type=int, default=3,
+        help='Number of runs (default: %default)')
+    opts, args = parser.parse_args()
+
+    segments = int(opts.hours * 1800)
+    manifest = (
+        synthetic_ism(segments, opts.representations) if opts.kind == 'ism'
+        else synthetic_mpd(opts.kind, segments, opts.representations, opts.periods, opts.run))
+    doc = compat_etree_fromstring(manifest.encode('utf-8'))
+    ie = InfoExtractor(YoutubeDL({'quiet': True}))
+
+    best = min(timeit.repeat(lambda: parse_formats(ie, opts.kind, doc), number=1, repeat=opts.number))
+    line = '%s: %d formats of %d fragments, parsed in %.1f ms' % (
+        opts.kind, len(parse_formats(ie, opts.kind, doc)), segments, best * 1000)
+    if tracemalloc:
+        tracemalloc.start()
+        formats = parse_formats(ie, opts.kind, doc)
+        size, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        line += ', %.1f MiB held (%.1f MiB peak)' % (size / 2 ** 20, peak / 2 ** 20)
+        # Iterating is what the downloaders do
+        best = min(timeit.repeat(
+            lambda: [sum(1 for _ in f['fragments']) for f in formats], number=1, repeat=opts.number))
+        line += ', iterated in %.1f ms' % (best * 1000)
+    print(line)
+
+    if opts.kind != 'ism':
+        mpd_bytes = manifest.encode('utf-8')
+        for stream in (False, True):
+            best, peak = measure(lambda: parse_mpd_bytes(ie, mpd_bytes, stream), opts.number)
+            line = '%s from %.1f MiB of XML: %.1f ms' % (
+                'stream' if stream else 'tree', len(mpd_bytes) / 2 ** 20, best * 1000)
+            if peak is not None:
+                line += ', %.1f MiB peak' % (peak / 2 ** 20)
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
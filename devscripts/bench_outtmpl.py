@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+from __future__ import division, unicode_literals
+
+# Benchmark YoutubeDL.prepare_filename on synthetic info dicts of the size
+# extractors return, calling it several times per video as process_info does
+
+import optparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from youtube_dl import YoutubeDL
+from youtube_dl.utils import DEFAULT_OUTTMPL
+
+
+def synthetic_info_dict(rng, index):
+    info = {
+        'id': '%011x' % rng.getrandbits(44),
+        'title': 'Video %d: some "title" with / slashes & ünïcödé' % index,
+        'description': 'A long description. ' * 50,
+        'uploader': 'Uploader %d' % rng.randint(0, 100),
+        'uploader_id': 'uploader%d' % rng.randint(0, 100),
+        'upload_date': '2020%02d%02d' % (rng.randint(1, 12), rng.randint(1, 28)),
+        'duration': rng.randint(10, 3600),
+        'view_count': rng.randint(0, 10 ** 6),
+        'like_count': rng.randint(0, 10 ** 4),
+        'webpage_url': 'https://example.com/watch?v=%d' % index,
+        'extractor': 'Example',
+        'extractor_key': 'Example',
+        'ext': 'mp4',
+        'format_id': '137+140',
+        'width': 1920,
+        'height': 1080,
+        'fps': 30,
+        'playlist': 'Some playlist',
+        'playlist_index': index % 500 + 1,
+        'n_entries': 500,
+        'tags': ['tag%d' % i for i in range(10)],
+        'formats': [{'format_id': '%d' % i, 'url': 'https://example.com/%d' % i} for i in range(20)],
+    }
+    for key in ('categories', 'chapters', 'series', 'season', 'episode', 'artist', 'album'):
+        info[key] = None if rng.random() < 0.5 else '%s %d' % (key, index)
+    return info
+
+
+def main():
+    parser = optparse.OptionParser(usage='%prog [OPTIONS]')
+    parser.add_option(
+        '--count', type=int, default=100000,
+        help='Number of info dicts (default: %default)')
+    parser.add_option(
+        '--calls', type=int, default=3,
+        help='Calls to prepare_filename per info dict (default: %default)')
+    parser.add_option(
+        '--outtmpl', default=DEFAULT_OUTTMPL,
+        help='Output template (default: %default)')
+    parser.add_option(
+        '--number', type=int, default=1,
+        help='Number of runs (default: %default)')
+    opts, args = parser.parse_args()
+
+    rng = random.Random(0)
+    infos = [synthetic_info_dict(rng, i) for i in range(opts.count)]
+    ydl = YoutubeDL({'outtmpl': opts.outtmpl, 'quiet': True})
+    ydl._num_downloads = 0
+
+    def run():
+        for info in infos:
+            for _ in range(opts.calls):
+                ydl.prepare_filename(info)
+
+    best = min(timeit.repeat(run, number=1, repeat=opts.number))
+    calls = opts.count * opts.calls
+    print('%d calls with %r: %.3f s, %.1f us per call' % (
+        calls, opts.outtmpl, best, best / calls * 1e6))
+
+
+if __name__ == '__main__':
+    main()
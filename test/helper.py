@@ -103,6 +103,37 @@ class FakeLogger(object):
         pass
 
 
+class FakeClock(object):
+    """ A clock that only goes on when told to or when slept on """
+
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+# Stand-in for ffmpeg concatenating its inputs into its output, opening
+# them all first as ffmpeg does
+FAKE_FFMPEG = '''#!%s
+import sys
+args = sys.argv[1:]
+if args == ['-version']:
+    print('ffmpeg version 4.4')
+    sys.exit()
+inputs = [open(args[i + 1][len('file:'):], 'rb') for i, a in enumerate(args) if a == '-i']
+with open(args[-1][len('file:'):], 'wb') as outf:
+    for inf in inputs:
+        outf.write(inf.read())
+        inf.close()
+''' % sys.executable
+
+
 def gettestcases(include_onlymatching=False):
     for ie in youtube_dl.extractor.gen_extractors():
         for tc in ie.get_testcases(include_onlymatching):
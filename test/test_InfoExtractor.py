@@ -3,6 +3,7 @@
 from __future__ import unicode_literals
 
 # Allow direct execution
+import io
 import os
 import sys
 import unittest
@@ -49,6 +50,19 @@ class InfoExtractorTestRequestHandler(compat_http_server.BaseHTTPRequestHandler)
             self.send_header('Content-Type', 'text/html; charset=utf-8')
             self.end_headers()
             self.wfile.write(TEAPOT_RESPONSE_BODY.encode())
+        elif self.path.startswith('/mpd/'):
+            with open('./test/testdata/mpd/%s' % self.path[len('/mpd/'):], 'rb') as f:
+                body = f.read()
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/dash+xml')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif self.path == '/broken.mpd':
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/dash+xml')
+            self.end_headers()
+            self.wfile.write(b'<MPD><Period></MPD>')
         else:
             assert False
 
@@ -118,6 +132,26 @@ class TestInfoExtractor(unittest.TestCase):
         self.assertRaises(RegexNotFoundError, ie._html_search_meta, 'z', html, None, fatal=True)
         self.assertRaises(RegexNotFoundError, ie._html_search_meta, ('z', 'x'), html, None, fatal=True)
 
+    def test_indexed_metadata_helpers(self):
+        ie = self.ie
+        html = '''
+            <meta property="og:title" content="Foo">
+            <META name="description" content="Bar">
+            <input type="hidden" name="a" value="1">
+            <script type="application/ld+json">{"@context": "http://schema.org", "@type": "VideoObject", "name": "Baz"}</script>
+        ''' + '<div class="pad">%s</div>' % ('x' * 32 * 1024) + '''
+            <input type="hidden" name="b" value="2">
+            <meta property="og:description" content="Late">
+        '''
+        self.assertEqual(ie._og_search_title(html), 'Foo')
+        self.assertEqual(ie._og_search_description(html), 'Late')
+        self.assertEqual(ie._html_search_meta('description', html), 'Bar')
+        self.assertEqual(ie._hidden_inputs(html), {'a': '1', 'b': '2'})
+        self.assertEqual(ie._search_json_ld(html, None), {'title': 'Baz'})
+        # Results are memoized per page; callers must not be able to alter them
+        ie._hidden_inputs(html)['c'] = '3'
+        self.assertEqual(ie._hidden_inputs(html), {'a': '1', 'b': '2'})
+
     def test_search_nextjs_data(self):
         html = '''
 <!DOCTYPE html>
@@ -1129,11 +1163,16 @@ jwplayer("mediaplayer").setup({"abouttext":"Visit Indie DB","aboutlink":"http:\/
         for mpd_file, mpd_url, mpd_base_url, expected_formats in _TEST_CASES:
             with open('./test/testdata/mpd/%s.mpd' % mpd_file,
                       mode='r', encoding='utf-8') as f:
+                mpd_bytes = f.read().encode('utf-8')
                 formats = self.ie._parse_mpd_formats(
-                    compat_etree_fromstring(f.read().encode('utf-8')),
+                    compat_etree_fromstring(mpd_bytes),
                     mpd_base_url=mpd_base_url, mpd_url=mpd_url)
                 self.ie._sort_formats(formats)
                 expect_value(self, formats, expected_formats, None)
+                stream_formats = self.ie._parse_mpd_formats_stream(
+                    io.BytesIO(mpd_bytes), mpd_base_url=mpd_base_url, mpd_url=mpd_url)
+                self.ie._sort_formats(stream_formats)
+                self.assertEqual(stream_formats, formats)
 
     def test_parse_f4m_formats(self):
         _TEST_CASES = [
@@ -1230,6 +1269,26 @@ jwplayer("mediaplayer").setup({"abouttext":"Visit Indie DB","aboutlink":"http:\/
             expected_status=TEAPOT_RESPONSE_STATUS)
         self.assertEqual(content, TEAPOT_RESPONSE_BODY)
 
+    def test_extract_mpd_formats(self):
+        httpd = compat_http_server.HTTPServer(
+            ('127.0.0.1', 0), InfoExtractorTestRequestHandler)
+        port = http_server_port(httpd)
+        server_thread = threading.Thread(target=httpd.serve_forever)
+        server_thread.daemon = True
+        server_thread.start()
+
+        mpd_url = 'http://127.0.0.1:%d/mpd/urls_only.mpd' % port
+        with open('./test/testdata/mpd/urls_only.mpd', 'rb') as f:
+            expected = self.ie._parse_mpd_formats(
+                compat_etree_fromstring(f.read()), 'dash',
+                'http://127.0.0.1:%d/mpd/' % port, mpd_url)
+        self.assertEqual(self.ie._extract_mpd_formats(mpd_url, None, 'dash'), expected)
+
+        broken_url = 'http://127.0.0.1:%d/broken.mpd' % port
+        self.assertRaises(ExtractorError, self.ie._extract_mpd_formats, broken_url, None)
+        self.ie._downloader.expect_warning(r'.*Failed to parse XML')
+        self.assertEqual(self.ie._extract_mpd_formats(broken_url, None, fatal=False), [])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -10,7 +10,11 @@ import unittest
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import copy
+import io
 import json
+import socket
+import threading
+import time
 
 from test.helper import (
     FakeYDL,
@@ -27,11 +31,15 @@ from youtube_dl.compat import (
     compat_urllib_error,
 )
 
+from youtube_dl.connect import get_connector
 from youtube_dl.extractor import YoutubeIE
 from youtube_dl.extractor.common import InfoExtractor
 from youtube_dl.postprocessor.common import PostProcessor
 from youtube_dl.utils import (
+    DownloadError,
     ExtractorError,
+    MaxDownloadsReached,
+    PostProcessingError,
     match_filter_func,
     traverse_obj,
 )
@@ -686,6 +694,26 @@ class TestYoutubeDL(unittest.TestCase):
         self.assertEqual(fname('Hello %(title1)s'), 'Hello $PATH')
         self.assertEqual(fname('Hello %(title2)s'), 'Hello %PATH%')
 
+    def test_prepare_filename_reuse(self):
+        ydl = YoutubeDL({'outtmpl': '%(playlist_index)s-%(title)s-%(height)d.%(ext)s'})
+        info = {'title': 'a/b', 'ext': 'mp4', 'height': 1080, 'playlist_index': 3, 'n_entries': 10}
+        self.assertEqual(ydl.prepare_filename(info), '03-a_b-1080.mp4')
+        self.assertEqual(ydl.prepare_filename(info), '03-a_b-1080.mp4')
+        info['ext'] = 'webm'
+        self.assertEqual(ydl.prepare_filename(info), '03-a_b-1080.webm')
+        info['height'] = True
+        self.assertEqual(ydl.prepare_filename(info), '03-a_b-1.webm')
+        del info['height']
+        self.assertEqual(ydl.prepare_filename(info), '03-a_b-NA.webm')
+        info['n_entries'] = 100
+        self.assertEqual(ydl.prepare_filename(info), '003-a_b-NA.webm')
+        # Changed parameters are taken into account
+        ydl.params['restrictfilenames'] = True
+        info['title'] = 'ä b'
+        self.assertEqual(ydl.prepare_filename(info), '003-a_b-NA.webm')
+        ydl.params['outtmpl'] = '%(title)s.%(ext)s'
+        self.assertEqual(ydl.prepare_filename(info), 'a_b.webm')
+
     def test_format_note(self):
         ydl = YoutubeDL()
         self.assertEqual(ydl._format_note({}), '')
@@ -734,6 +762,108 @@ class TestYoutubeDL(unittest.TestCase):
         self.assertTrue(os.path.exists(filename), '%s doesn\'t exist' % filename)
         os.unlink(filename)
 
+    def test_background_post_processing(self):
+        archive = 'post-processor-archive.txt'
+
+        class SlowPP(PostProcessor):
+            def run(self, info):
+                time.sleep(info['delay'])
+                if info['id'] == 'fail':
+                    raise PostProcessingError('failed')
+                return [], info
+
+        def run_pps(videos, max_downloads=False):
+            try_rm(archive)
+            ydl = YoutubeDL({
+                'max_pp_workers': 2,
+                'download_archive': archive,
+                'quiet': True,
+            })
+            ydl._err_file = io.StringIO()
+            ydl.add_post_processor(SlowPP())
+            try:
+                with ydl._background_post_processing():
+                    self.assertIsNotNone(ydl._pp_pool)
+                    for video_id, delay in videos:
+                        ydl._run_post_processing('%s.mp4' % video_id, {
+                            'id': video_id,
+                            'extractor_key': 'TestEx',
+                            'delay': delay,
+                        })
+                    if max_downloads:
+                        raise MaxDownloadsReached()
+            finally:
+                self.assertIsNone(ydl._pp_pool)
+            with open(archive, encoding='utf-8') as f:
+                return f.read().split()[1::2]
+
+        try:
+            # Archive is written in download order
+            self.assertEqual(run_pps([('a', 0.3), ('b', 0), ('c', 0.1)]), ['a', 'b', 'c'])
+            # Videos downloaded after a failure are not post-processed, but
+            # the running ones are finished and recorded
+            with self.assertRaises(DownloadError):
+                run_pps([('a', 0.3), ('fail', 0), ('b', 0), ('c', 0)])
+            with open(archive, encoding='utf-8') as f:
+                self.assertEqual(f.read(), 'testex a\ntestex b\n')
+            # Post-processing errors do not hide that --max-downloads was reached
+            with self.assertRaises(MaxDownloadsReached):
+                run_pps([('a', 0), ('fail', 0.1)], max_downloads=True)
+        finally:
+            try_rm(archive)
+
+    def test_background_sidecar_writes(self):
+        class SidecarYDL(YoutubeDL):
+            def __init__(self, *args, **kwargs):
+                super(SidecarYDL, self).__init__(*args, **kwargs)
+                self.lock = threading.Lock()
+                self.active = self.max_active = 0
+
+            def _write_subtitle(self, *args):
+                with self.lock:
+                    self.active += 1
+                    self.max_active = max(self.max_active, self.active)
+                time.sleep(0.1)
+                with self.lock:
+                    self.active -= 1
+                return super(SidecarYDL, self)._write_subtitle(*args)
+
+        langs = ('en', 'fr', 'de')
+        files = ['sidecar.info.json'] + ['sidecar.%s.vtt' % lang for lang in langs]
+
+        def write_sidecars(params):
+            ydl = SidecarYDL(dict({
+                'outtmpl': '%(id)s.%(ext)s',
+                'skip_download': True,
+                'writesubtitles': True,
+                'writeinfojson': True,
+                'quiet': True,
+            }, **params))
+            with ydl._background_sidecar_writes():
+                ydl.process_info({
+                    'id': 'sidecar',
+                    'title': 'sidecar',
+                    'url': 'http://localhost/sidecar.mp4',
+                    'ext': 'mp4',
+                    'extractor_key': 'Generic',
+                    'requested_subtitles': dict(
+                        (lang, {'ext': 'vtt', 'data': 'WEBVTT %s' % lang}) for lang in langs),
+                })
+            self.assertIsNone(ydl._sidecar_pool)
+            for fn in files:
+                self.assertTrue(os.path.exists(fn), fn)
+            with open('sidecar.fr.vtt', encoding='utf-8') as f:
+                self.assertEqual(f.read(), 'WEBVTT fr')
+            return ydl.max_active
+
+        try:
+            self.assertEqual(write_sidecars({}), 1)
+            self.assertEqual(write_sidecars({'max_sidecar_workers': 3}), 3)
+            self.assertEqual(write_sidecars({'max_sidecar_workers': 3, 'sleep_interval': 1}), 1)
+        finally:
+            for fn in files:
+                try_rm(fn)
+
     def test_match_filter(self):
         class FilterYDL(YDL):
             def __init__(self, *args, **kwargs):
@@ -901,6 +1031,44 @@ class TestYoutubeDL(unittest.TestCase):
         self.assertEqual(result[1]['playlist_index'], 2)
         # @}
 
+    def test_match_filter_playlist_entries(self):
+        entries = [{
+            '_type': 'url',
+            'id': compat_str(i),
+            'title': compat_str(i),
+            'url': 'http://example.com/%d' % i,
+            'duration': 10 * i,
+        } for i in range(1, 5)]
+        playlist = {
+            '_type': 'playlist',
+            'id': 'test',
+            'entries': entries,
+            'extractor': 'test:playlist',
+            'extractor_key': 'test:playlist',
+            'webpage_url': 'http://example.com',
+        }
+
+        class FlatYDL(YDL):
+            def extract_info(self, url, *args, **kwargs):
+                self.extracted.append(url)
+
+        def get_extracted(filter_str):
+            ydl = FlatYDL({'match_filter': match_filter_func(filter_str)})
+            ydl.extracted = []
+            ydl.process_ie_result(copy.deepcopy(playlist))
+            return ydl.extracted
+
+        # Entries failing on the fields they carry are not extracted
+        self.assertEqual(
+            get_extracted('duration > 15 & playlist_index != 4'),
+            ['http://example.com/2', 'http://example.com/3'])
+        self.assertEqual(
+            get_extracted('duration < 15 | playlist_index = 4'),
+            ['http://example.com/1', 'http://example.com/4'])
+        # Fields that are not known yet do not reject anything
+        self.assertEqual(len(get_extracted('like_count > 100')), 4)
+        self.assertEqual(len(get_extracted('duration > 15 | like_count > 100')), 4)
+
     def test_urlopen_no_file_protocol(self):
         # see https://github.com/ytdl-org/youtube-dl/issues/8227
         ydl = YDL()
@@ -1167,6 +1335,25 @@ class TestYoutubeDLCookies(unittest.TestCase):
 
         try_rm(TEST_FILE)
 
+    def test_print_debug_footer(self):
+        params = {'verbose': True, 'dns_cache_ttl': 1234}
+        get_connector(params).stats.update({
+            'connections': 4,
+            'attempts': 6,
+            'failures': 1,
+            'connect_time': 0.5,
+            'max_connect_time': 0.25,
+            'families': {socket.AF_INET: 3, socket.AF_INET6: 1},
+        })
+        ydl = YoutubeDL(params, auto_init=False)
+        output = []
+        ydl._write_string = lambda s, out=None: output.append(s)
+        with ydl:
+            pass
+        self.assertEqual(output, [
+            '[debug] Connections: 4 opened in 6 attempts, 1 failed; '
+            'connect time 0.125s average, 0.250s max; IPv4 3, IPv6 1\n'])
+
     def test_add_headers_cookie(self):
         def check_for_cookie_header(result):
             return traverse_obj(result, ((None, ('formats', 0)), 'http_headers', 'Cookie'), casesense=False, get_all=False)
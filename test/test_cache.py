@@ -9,11 +9,17 @@ import sys
 import unittest
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import multiprocessing
 import shutil
+import threading
+import time
 
-from test.helper import FakeYDL
+from test.helper import FakeYDL, http_server_port
+from youtube_dl import YoutubeDL
 from youtube_dl.cache import Cache
-from youtube_dl.utils import version_tuple
+from youtube_dl.compat import compat_http_server
+from youtube_dl.extractor.common import InfoExtractor
+from youtube_dl.utils import sanitized_Request, version_tuple
 from youtube_dl.version import __version__
 
 
@@ -26,6 +32,23 @@ def _mkdir(d):
         os.mkdir(d)
 
 
+def _store_entries(cachedir, i):
+    c = Cache(FakeYDL({'cachedir': cachedir}))
+    for j in range(20):
+        c.store('test_cache', 'k%d-%d' % (i, j), [i, j])
+
+
+def _load_or_store(cachedir, calls_fn):
+    def func():
+        with open(calls_fn, 'a') as f:
+            f.write('x')
+        time.sleep(0.5)
+        return {'x': 1}
+
+    c = Cache(FakeYDL({'cachedir': cachedir}))
+    assert c.load_or_store('test_cache', 'k', func) == {'x': 1}
+
+
 class TestCache(unittest.TestCase):
     def setUp(self):
         TEST_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -39,32 +62,258 @@ class TestCache(unittest.TestCase):
             shutil.rmtree(self.test_dir)
 
     def test_cache(self):
-        ydl = FakeYDL({
-            'cachedir': self.test_dir,
-        })
-        c = Cache(ydl)
-        obj = {'x': 1, 'y': ['ä', '\\a', True]}
-        self.assertEqual(c.load('test_cache', 'k.'), None)
-        c.store('test_cache', 'k.', obj)
-        self.assertEqual(c.load('test_cache', 'k2'), None)
-        self.assertFalse(_is_empty(self.test_dir))
-        self.assertEqual(c.load('test_cache', 'k.'), obj)
-        self.assertEqual(c.load('test_cache', 'y'), None)
-        self.assertEqual(c.load('test_cache2', 'k.'), None)
-        c.remove()
-        self.assertFalse(os.path.exists(self.test_dir))
-        self.assertEqual(c.load('test_cache', 'k.'), None)
+        for backend in ('sqlite', 'files'):
+            ydl = FakeYDL({
+                'cachedir': self.test_dir,
+                'cache_backend': backend,
+            })
+            c = Cache(ydl)
+            obj = {'x': 1, 'y': ['ä', '\\a', True]}
+            self.assertEqual(c.load('test_cache', 'k.'), None)
+            c.store('test_cache', 'k.', obj)
+            self.assertEqual(c.load('test_cache', 'k2'), None)
+            self.assertFalse(_is_empty(self.test_dir))
+            self.assertEqual(c.load('test_cache', 'k.'), obj)
+            self.assertEqual(c.load('test_cache', 'y'), None)
+            self.assertEqual(c.load('test_cache2', 'k.'), None)
+            # Entries are also found by new instances, e.g. in other processes
+            self.assertEqual(Cache(ydl).load('test_cache', 'k.'), obj)
+            c.remove()
+            self.assertFalse(os.path.exists(self.test_dir))
+            self.assertEqual(c.load('test_cache', 'k.'), None)
 
     def test_cache_validation(self):
-        ydl = FakeYDL({
-            'cachedir': self.test_dir,
-        })
+        for backend in ('sqlite', 'files'):
+            ydl = FakeYDL({
+                'cachedir': self.test_dir,
+                'cache_backend': backend,
+            })
+            c = Cache(ydl)
+            obj = {'x': 1, 'y': ['ä', '\\a', True]}
+            c.store('test_cache', 'k.', obj)
+            self.assertEqual(c.load('test_cache', 'k.', min_ver='1970.01.01'), obj)
+            new_version = '.'.join(('%d' % ((v + 1) if i == 0 else v, )) for i, v in enumerate(version_tuple(__version__)))
+            self.assertIs(c.load('test_cache', 'k.', min_ver=new_version), None)
+
+    def test_cache_front(self):
+        c = Cache(FakeYDL({'cachedir': self.test_dir}))
+        obj = {'x': [1]}
+        c.store('test_cache', 'k', obj)
+        # Stored data is copied, loaded data is shared
+        obj['x'].append(2)
+        loaded = c.load('test_cache', 'k')
+        self.assertEqual(loaded, {'x': [1]})
+        self.assertIs(c.load('test_cache', 'k'), loaded)
+        self.assertEqual(Cache(c._ydl).load('test_cache', 'k'), {'x': [1]})
+
+    def test_cache_ttl(self):
+        for backend in ('sqlite', 'files'):
+            ydl = FakeYDL({
+                'cachedir': os.path.join(self.test_dir, backend),
+                'cache_backend': backend,
+            })
+            Cache(ydl).store('test_cache', 'fresh', 1, ttl=60)
+            Cache(ydl).store('test_cache', 'stale', 2, ttl=-1)
+            self.assertEqual(Cache(ydl).load('test_cache', 'fresh'), 1)
+            self.assertEqual(Cache(ydl).load('test_cache', 'stale', default=3), 3)
+            # Also when loaded again from the front
+            c = Cache(ydl)
+            c.store('test_cache', 'expiring', 4, ttl=60)
+            self.assertEqual(c.load('test_cache', 'expiring'), 4)
+            c._front[('test_cache', 'expiring', 'json')] = (4, __version__, time.time() - 1)
+            self.assertIsNone(c.load('test_cache', 'expiring'))
+
+    def test_cache_prune_files(self):
+        ydl = FakeYDL({'cachedir': self.test_dir, 'cache_backend': 'files'})
+        c = Cache(ydl)
+        c.store('test_cache', 'fresh', 1, ttl=60)
+        c.store('test_cache', 'stale', 2, ttl=-1)
+        c.store('test_cache', 'kept', 3)
+        # Only pruned once by a process
+        section_dir = os.path.join(self.test_dir, 'test_cache')
+        self.assertEqual(sorted(os.listdir(section_dir)), ['fresh.json', 'kept.json', 'stale.json'])
+        Cache(ydl).store('test_cache', 'other', 4, ttl=60)
+        self.assertEqual(sorted(os.listdir(section_dir)), ['fresh.json', 'kept.json', 'other.json'])
+
+    def test_cache_migration(self):
+        obj = {'x': 1}
+        files = Cache(FakeYDL({'cachedir': self.test_dir, 'cache_backend': 'files'}))
+        files.store('test_cache', 'k', obj)
+        _mkdir(os.path.join(self.test_dir, 'legacy'))
+        with open(os.path.join(self.test_dir, 'legacy', 'k.json'), 'w') as f:
+            f.write('[1, 2]')
+        c = Cache(FakeYDL({'cachedir': self.test_dir, 'cache_backend': 'sqlite'}))
+        self.assertEqual(c.load('test_cache', 'k'), obj)
+        self.assertEqual(c.load('legacy', 'k'), [1, 2])
+        # The import only happens once
+        files.store('test_cache', 'k', {'x': 2})
+        self.assertEqual(Cache(c._ydl).load('test_cache', 'k'), obj)
+
+    def test_cache_eviction(self):
+        ydl = FakeYDL({'cachedir': self.test_dir, 'cache_max_size': 2000})
+        c = Cache(ydl)
+        for i in range(20):
+            c.store('test_cache', 'k%d' % i, 'x' * 100)
+            # Storing an entry again makes it recently used
+            c.store('test_cache', 'k0', 'x' * 100)
         c = Cache(ydl)
-        obj = {'x': 1, 'y': ['ä', '\\a', True]}
-        c.store('test_cache', 'k.', obj)
-        self.assertEqual(c.load('test_cache', 'k.', min_ver='1970.01.01'), obj)
-        new_version = '.'.join(('%d' % ((v + 1) if i == 0 else v, )) for i, v in enumerate(version_tuple(__version__)))
-        self.assertIs(c.load('test_cache', 'k.', min_ver=new_version), None)
+        self.assertEqual(c.load('test_cache', 'k0'), 'x' * 100)
+        self.assertEqual(c.load('test_cache', 'k19'), 'x' * 100)
+        self.assertIsNone(c.load('test_cache', 'k1'))
+
+    def test_cache_concurrent_processes(self):
+        processes = [
+            multiprocessing.Process(target=_store_entries, args=(self.test_dir, i))
+            for i in range(4)]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
+        c = Cache(FakeYDL({'cachedir': self.test_dir}))
+        for i in range(4):
+            for j in range(20):
+                self.assertEqual(c.load('test_cache', 'k%d-%d' % (i, j)), [i, j])
+
+    def test_cache_load_or_store(self):
+        _mkdir(self.test_dir)
+        calls_fn = os.path.join(self.test_dir, 'calls')
+        processes = [
+            multiprocessing.Process(target=_load_or_store, args=(self.test_dir, calls_fn))
+            for i in range(4)]
+        for p in processes:
+            p.start()
+        for p in processes:
+            p.join()
+        self.assertEqual([p.exitcode for p in processes], [0] * 4)
+        # Only the first process computed the entry
+        with open(calls_fn) as f:
+            self.assertEqual(f.read(), 'x')
+        c = Cache(FakeYDL({'cachedir': self.test_dir}))
+        self.assertEqual(c.load_or_store('test_cache', 'k', lambda: None), {'x': 1})
+        self.assertEqual(c.load_or_store('test_cache', 'k2', lambda: None), None)
+        self.assertEqual(c.load('test_cache', 'k2', default=2), 2)
+
+
+class ResponseCacheRequestHandler(compat_http_server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get('If-None-Match')))
+        body, etag = self.server.pages.get(self.path, (b'', None))
+        if etag and self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        if etag:
+            self.send_header('ETag', etag)
+        if self.path == '/cookie':
+            self.send_header('Set-Cookie', 'a=b')
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), 'testdata', 'response_cache_test')
+        self.tearDown()
+        self.httpd = compat_http_server.HTTPServer(
+            ('127.0.0.1', 0), ResponseCacheRequestHandler)
+        self.httpd.requests = []
+        self.httpd.pages = {
+            '/page': (b'<html>page</html>', '"v1"'),
+            '/plain': (b'<html>plain</html>', None),
+            '/cookie': (b'<html>cookie</html>', '"c1"'),
+        }
+        thread = threading.Thread(target=self.httpd.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def tearDown(self):
+        if getattr(self, 'httpd', None):
+            self.httpd.shutdown()
+            self.httpd.server_close()
+        if os.path.exists(self.test_dir):
+            shutil.rmtree(self.test_dir)
+
+    def _url(self, path):
+        return 'http://127.0.0.1:%d%s' % (http_server_port(self.httpd), path)
+
+    def _ydl(self, **params):
+        defaults = {
+            'cachedir': self.test_dir,
+            'response_cache': True,
+            'quiet': True,
+        }
+        defaults.update(params)
+        return YoutubeDL(defaults)
+
+    def _get(self, ydl, path, ttl=0):
+        return ydl.response_cache.urlopen(sanitized_Request(self._url(path)), ttl).read()
+
+    def test_revalidation(self):
+        ydl = self._ydl()
+        self.assertEqual(self._get(ydl, '/page'), b'<html>page</html>')
+        self.assertEqual(self.httpd.requests, [('/page', None)])
+        # A new run revalidates the stored response
+        ydl = self._ydl()
+        self.assertEqual(self._get(ydl, '/page'), b'<html>page</html>')
+        self.assertEqual(self.httpd.requests[-1], ('/page', '"v1"'))
+        self.httpd.pages['/page'] = (b'<html>new page</html>', '"v2"')
+        self.assertEqual(self._get(ydl, '/page'), b'<html>new page</html>')
+        self.assertEqual(self._get(ydl, '/page'), b'<html>new page</html>')
+        self.assertEqual(self.httpd.requests[-1], ('/page', '"v2"'))
+        # Fresh responses are not revalidated
+        self.assertEqual(self._get(ydl, '/page', ttl=60), b'<html>new page</html>')
+        self.assertEqual(len(self.httpd.requests), 4)
+
+    def test_uncacheable(self):
+        ydl = self._ydl()
+        for _ in range(2):
+            self.assertEqual(self._get(ydl, '/cookie'), b'<html>cookie</html>')
+            self.assertEqual(self._get(ydl, '/plain', ttl=60), b'<html>plain</html>')
+        # Responses setting cookies are not stored, while the one without
+        # validators is still used within its TTL
+        self.assertEqual(self.httpd.requests, [
+            ('/cookie', None), ('/plain', None), ('/cookie', None)])
+        ydl = self._ydl(cachedir=False)
+        self.assertFalse(ydl.response_cache.enabled)
+
+    def test_eviction(self):
+        for i in range(10):
+            self.httpd.pages['/%d' % i] = (('%d' % i).encode('ascii') * 100, '"%d"' % i)
+        ydl = self._ydl(response_cache_max_size=450)
+        for i in range(10):
+            self._get(ydl, '/%d' % i)
+        bodies = [
+            f for _, _, files in os.walk(os.path.join(self.test_dir, 'responses', 'bodies'))
+            for f in files]
+        self.assertEqual(len(bodies), 4)
+        self.assertEqual(len(os.listdir(os.path.join(self.test_dir, 'responses', 'entries'))), 4)
+        # The most recent responses are kept
+        del self.httpd.requests[:]
+        self._get(ydl, '/9')
+        self._get(ydl, '/0')
+        self.assertEqual(self.httpd.requests, [('/9', '"9"'), ('/0', None)])
+
+    def test_extractor(self):
+        class TestIE(InfoExtractor):
+            _RESPONSE_CACHE_TTL = 60
+
+        class UncachedIE(InfoExtractor):
+            _RESPONSE_CACHE_TTL = None
+
+        ydl = self._ydl()
+        for _ in range(2):
+            self.assertEqual(
+                TestIE(ydl)._download_webpage(self._url('/page'), None, note=False),
+                '<html>page</html>')
+            UncachedIE(ydl)._download_webpage(self._url('/page'), None, note=False)
+        self.assertEqual(self.httpd.requests, [('/page', None)] * 3)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# coding: utf-8
+from __future__ import unicode_literals
+
+# Allow direct execution
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import socket
+import threading
+import time
+
+from test.helper import (
+    FakeClock,
+    FakeYDL,
+)
+from youtube_dl.compat import compat_struct_unpack
+from youtube_dl.connect import (
+    Connector,
+    DNSCache,
+    get_connector,
+    interleave_families,
+)
+
+V4, V6 = socket.AF_INET, socket.AF_INET6
+
+
+def addrinfo(family, host, port):
+    return (family, socket.SOCK_STREAM, socket.IPPROTO_TCP, '', (host, port))
+
+
+class FakeResolver(object):
+    def __init__(self, addrs):
+        self.addrs = addrs
+        self.calls = 0
+
+    def __call__(self, host, port, family=0, type=0):
+        self.calls += 1
+        if host not in self.addrs:
+            raise socket.gaierror(-2, 'Name or service not known')
+        return [addrinfo(f, h, p or port) for f, h, p in self.addrs[host]]
+
+
+def listener(backlog=5):
+    sock = socket.socket()
+    sock.bind(('127.0.0.1', 0))
+    sock.listen(backlog)
+    return sock
+
+
+def black_hole():
+    """ A listening socket whose full accept queue lets connections hang, or None """
+    sock = listener(0)
+    address = sock.getsockname()
+    fillers = []
+    for _ in range(3):
+        filler = socket.socket()
+        filler.setblocking(False)
+        filler.connect_ex(address)
+        fillers.append(filler)
+    time.sleep(0.1)
+    probe = socket.socket()
+    probe.settimeout(0.2)
+    try:
+        probe.connect(address)
+    except socket.timeout:
+        return sock, fillers
+    except socket.error:
+        pass
+    finally:
+        probe.close()
+    for s in fillers + [sock]:
+        s.close()
+
+
+class TestDNSCache(unittest.TestCase):
+    def test_ttl(self):
+        clock = FakeClock()
+        resolver = FakeResolver({'example.com': [(V4, '192.0.2.1', None)]})
+        cache = DNSCache(60, clock, resolver)
+        addrs = cache.getaddrinfo('example.com', 80)
+        self.assertEqual(addrs, [addrinfo(V4, '192.0.2.1', 80)])
+        self.assertIs(cache.getaddrinfo('example.com', 80), addrs)
+        self.assertEqual(resolver.calls, 1)
+        cache.getaddrinfo('example.com', 443)
+        self.assertEqual(resolver.calls, 2)
+        clock.now += 61
+        self.assertEqual(cache.getaddrinfo('example.com', 80), addrs)
+        self.assertEqual(resolver.calls, 3)
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+        # Failures are not cached
+        for _ in range(2):
+            self.assertRaises(socket.gaierror, cache.getaddrinfo, 'example.org', 80)
+        self.assertEqual(resolver.calls, 5)
+
+
+class TestConnector(unittest.TestCase):
+    def setUp(self):
+        self.server = listener()
+        self.port = self.server.getsockname()[1]
+
+    def tearDown(self):
+        self.server.close()
+
+    def _refused_port(self):
+        sock = listener()
+        port = sock.getsockname()[1]
+        sock.close()
+        return port
+
+    def test_interleave_families(self):
+        addrs = [
+            addrinfo(V6, '::1', 1), addrinfo(V6, '::2', 1), addrinfo(V6, '::3', 1),
+            addrinfo(V4, '1.1.1.1', 1), addrinfo(V4, '1.1.1.2', 1)]
+        self.assertEqual(
+            [a[4][0] for a in interleave_families(addrs)],
+            ['::1', '1.1.1.1', '::2', '1.1.1.2', '::3'])
+        self.assertEqual(
+            [a[4][0] for a in interleave_families(addrs[3:] + addrs[:1])],
+            ['1.1.1.1', '::1', '1.1.1.2'])
+        self.assertEqual(interleave_families([]), [])
+
+    def test_failed_attempt(self):
+        connector = Connector(getaddrinfo=FakeResolver({'host': [
+            (V4, '127.0.0.1', self._refused_port()), (V4, '127.0.0.1', self.port)]}))
+        sock = connector.create_connection(('host', 80), 5)
+        try:
+            self.assertEqual(sock.getpeername(), ('127.0.0.1', self.port))
+            self.assertEqual(sock.gettimeout(), 5)
+        finally:
+            sock.close()
+        self.assertEqual(connector.stats['attempts'], 2)
+        self.assertEqual(connector.stats['connections'], 1)
+        self.assertEqual(connector.stats['families'], {V4: 1})
+
+        connector = Connector(getaddrinfo=FakeResolver({'host': [
+            (V4, '127.0.0.1', self._refused_port())]}))
+        self.assertRaises(socket.error, connector.create_connection, ('host', 80))
+        self.assertEqual(connector.stats['failures'], 1)
+
+    def test_race(self):
+        hole = black_hole()
+        if hole is None:
+            self.skipTest('connections to a full accept queue do not hang here')
+        hole_sock, fillers = hole
+        try:
+            connector = Connector(attempt_delay=0.05, getaddrinfo=FakeResolver({'host': [
+                (V4, '127.0.0.1', hole_sock.getsockname()[1]), (V4, '127.0.0.1', self.port)]}))
+            started = time.time()
+            sock = connector.create_connection(('host', 80), 10)
+            elapsed = time.time() - started
+            try:
+                self.assertEqual(sock.getpeername(), ('127.0.0.1', self.port))
+            finally:
+                sock.close()
+            self.assertLess(elapsed, 1)
+            # Attempts that hang time out
+            connector = Connector(getaddrinfo=FakeResolver({'host': [
+                (V4, '127.0.0.1', hole_sock.getsockname()[1])]}))
+            self.assertRaises(socket.timeout, connector.create_connection, ('host', 80), 0.1)
+        finally:
+            for s in fillers + [hole_sock]:
+                s.close()
+
+    def test_source_address(self):
+        connector = Connector(getaddrinfo=FakeResolver({'host': [
+            (V6, '::1', self.port), (V4, '127.0.0.1', self.port)]}))
+        sock = connector.create_connection(('host', 80), 5, ('127.0.0.1', 0))
+        sock.close()
+        connector = Connector(getaddrinfo=FakeResolver({'host': [(V4, '127.0.0.1', self.port)]}))
+        self.assertRaises(
+            socket.error, connector.create_connection, ('host', 80), 5, ('::', 0))
+
+    def test_get_connector(self):
+        connector = get_connector({})
+        self.assertIs(connector, get_connector({'dns_cache_ttl': 60}))
+        self.assertIsNot(connector, get_connector({'dns_cache_ttl': 0}))
+        self.assertIsNone(get_connector({'dns_cache_ttl': 0}).dns_cache)
+
+
+def _recvall(conn, size):
+    data = b''
+    while len(data) < size:
+        data += conn.recv(size - len(data))
+    return data
+
+
+def socks5_http_server(sock):
+    """ Answer a SOCKS5 CONNECT, then an HTTP request for the host connected to """
+    conn, _ = sock.accept()
+    try:
+        _recvall(conn, compat_struct_unpack('!BB', _recvall(conn, 2))[1])
+        conn.sendall(b'\x05\x00')
+        _, _, _, atype = compat_struct_unpack('!BBBB', _recvall(conn, 4))
+        host = (
+            socket.inet_ntoa(_recvall(conn, 4)) if atype == 1
+            else _recvall(conn, compat_struct_unpack('!B', _recvall(conn, 1))[0]).decode('utf-8'))
+        port = compat_struct_unpack('!H', _recvall(conn, 2))[0]
+        conn.sendall(b'\x05\x00\x00\x01\x00\x00\x00\x00\x00\x00')
+        while not conn.recv(4096).endswith(b'\r\n\r\n'):
+            pass
+        body = ('%s:%d' % (host, port)).encode('utf-8')
+        conn.sendall(('HTTP/1.0 200 OK\r\nContent-Length: %d\r\n\r\n' % len(body)).encode('utf-8') + body)
+    finally:
+        conn.close()
+
+
+class TestSocksConnect(unittest.TestCase):
+    def test_socks5(self):
+        proxy = listener()
+        try:
+            thread = threading.Thread(target=socks5_http_server, args=(proxy,))
+            thread.daemon = True
+            thread.start()
+            ydl = FakeYDL({'proxy': 'socks5://localhost:%d' % proxy.getsockname()[1]})
+            connector = get_connector(ydl.params)
+            connections = connector.stats['connections']
+            self.assertEqual(
+                ydl.urlopen('http://example.com:8080/').read().decode('utf-8'), 'example.com:8080')
+            self.assertEqual(connector.stats['connections'], connections + 1)
+            thread.join(5)
+        finally:
+            proxy.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+
+from __future__ import unicode_literals
+
+# Allow direct execution
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from devscripts.bench_download import (
+    CASES,
+    format_results,
+    run_benchmarks,
+)
+from youtube_dl.downloader.hls import can_decrypt_frag
+
+
+class TestDownloadBenchmark(unittest.TestCase):
+    def test_run_benchmarks(self):
+        size = 256 * 1024
+        cases = [c for c in CASES if c != 'hls-aes' or can_decrypt_frag]
+        results = run_benchmarks(cases, {
+            'size': size,
+            'segment_size': 64 * 1024,
+            'latency': 0,
+            'bandwidth': 0,
+            'http_chunk_size': None,
+        })
+        self.assertEqual([r['case'] for r in results], cases)
+        for r in results:
+            self.assertTrue(r['success'], r)
+            # 4 segments, and the manifest unless it is in the info dict.
+            # Contiguous byte ranges are downloaded with a single request.
+            self.assertEqual(r['requests'], {
+                'http': 1,
+                'hls-byterange': 2,
+                'dash': 4,
+                'ism': 4,
+            }.get(r['case'], 5), r['case'])
+        # ISM and F4M headers are written along the media
+        self.assertEqual(results[cases.index('dash')]['bytes'], size)
+        self.assertTrue(results[cases.index('ism')]['bytes'] > size)
+        self.assertIn('MiB/s', format_results(results))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+# coding: utf-8
+from __future__ import unicode_literals
+
+# Allow direct execution
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import datetime
+import shutil
+import stat
+import tempfile
+import threading
+import time
+
+try:
+    import _thread
+except ImportError:  # Python 2
+    import thread as _thread
+
+from test.helper import (
+    FAKE_FFMPEG,
+    FakeClock,
+    FakeLogger,
+    FakeYDL,
+    http_server_port,
+    try_rm,
+)
+from youtube_dl import YoutubeDL
+from youtube_dl.compat import (
+    compat_etree_fromstring,
+    compat_http_server,
+)
+from youtube_dl.downloader import get_suitable_downloader
+from youtube_dl.downloader.dash import (
+    DashLiveFD,
+    DashLiveManifest,
+    _fill_template,
+)
+from youtube_dl.downloader.streammerge import FFmpegStreamMergeFD
+from youtube_dl.extractor.common import InfoExtractor
+from youtube_dl.utils import encodeFilename
+
+# 2020-01-01T00:00:00Z
+AVAILABILITY_START = 1577836800
+
+
+def xs_datetime(timestamp):
+    return datetime.datetime.utcfromtimestamp(timestamp).strftime('%Y-%m-%dT%H:%M:%S.%fZ')
+
+
+def live_mpd(now, timeline, end=30):
+    """ The manifest of a live stream of 2 second segments, ended at end seconds """
+    elapsed = now - AVAILABILITY_START
+    if elapsed >= end:
+        header = 'type="static" mediaPresentationDuration="PT%dS"' % end
+        first, count = 0, end // 2
+    else:
+        header = (
+            'type="dynamic" minimumUpdatePeriod="PT2S" timeShiftBufferDepth="PT10S" '
+            'availabilityStartTime="%s"' % xs_datetime(AVAILABILITY_START))
+        count = int(elapsed // 2)
+        first = max(count - 5, 0)
+    if timeline:
+        template = (
+            '<SegmentTemplate timescale="1000" initialization="$RepresentationID$/init.mp4" '
+            'media="$RepresentationID$/t$Time$.m4s"><SegmentTimeline>'
+            '<S t="%d" d="2000" r="%d"/></SegmentTimeline></SegmentTemplate>' % (first * 2000, count - first - 1))
+    else:
+        template = (
+            '<SegmentTemplate duration="2" initialization="$RepresentationID$/init.mp4" '
+            'media="$RepresentationID$/n$Number%03d$.m4s"/>')
+    return (
+        '<?xml version="1.0"?>'
+        '<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" profiles="urn:mpeg:dash:profile:isoff-live:2011" %s>'
+        '<Period id="p0" start="PT0S"><AdaptationSet mimeType="video/mp4">%s'
+        '<Representation id="v1" bandwidth="500000" codecs="avc1.4d401e" width="640" height="360"/>'
+        '</AdaptationSet></Period>'
+        '<UTCTiming schemeIdUri="urn:mpeg:dash:utc:direct:2014" value="%s"/>'
+        '</MPD>' % (header, template, xs_datetime(now))).encode('utf-8')
+
+
+class LiveRequestHandler(compat_http_server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        if self.path.endswith('.mpd'):
+            server.manifests += 1
+            body = live_mpd(server.clock(), self.path == '/timeline.mpd')
+            content_type = 'application/dash+xml'
+        else:
+            server.segments.append(self.path)
+            body = ('%s;' % self.path).encode('utf-8')
+            content_type = 'video/mp4'
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestDashLiveManifest(unittest.TestCase):
+    def test_fill_template(self):
+        values = {'RepresentationID': 'a1', 'Number': 7, 'Time': 9000, 'Bandwidth': 128000}
+        self.assertEqual(
+            _fill_template('$RepresentationID$/$Number%05d$-$Time$-$Bandwidth$$$.m4s', values),
+            'a1/00007-9000-128000$.m4s')
+
+    def test_segments(self):
+        # A static manifest of two periods, repeating to the end of each
+        manifest = DashLiveManifest(compat_etree_fromstring((
+            '<MPD xmlns="urn:mpeg:dash:schema:mpd:2011" type="static" mediaPresentationDuration="PT10S">'
+            '<BaseURL>media/</BaseURL>'
+            '<Period id="a" duration="PT4S"><AdaptationSet><SegmentTemplate timescale="10" '
+            'initialization="init-$RepresentationID$.mp4" media="$RepresentationID$-$Time$.m4s">'
+            '<SegmentTimeline><S t="0" d="15" r="-1"/></SegmentTimeline></SegmentTemplate>'
+            '<Representation id="v"/></AdaptationSet></Period>'
+            '<Period id="b"><AdaptationSet><Representation id="v">'
+            '<SegmentTemplate startNumber="3" duration="3" media="v-$Number$.m4s"/>'
+            '</Representation></AdaptationSet></Period></MPD>').encode('utf-8')),
+            'http://example.com/live/manifest.mpd')
+        self.assertFalse(manifest.dynamic)
+        segments, next_available = manifest.segments('v', 0)
+        self.assertEqual([(s['period'], s['time'], s['url']) for s in segments], [
+            ('a', None, 'http://example.com/live/media/init-v.mp4'),
+            ('a', 0, 'http://example.com/live/media/v-0.m4s'),
+            ('a', 15, 'http://example.com/live/media/v-15.m4s'),
+            ('a', 30, 'http://example.com/live/media/v-30.m4s'),
+            ('b', 0, 'http://example.com/live/media/v-3.m4s'),
+            ('b', 3, 'http://example.com/live/media/v-4.m4s'),
+        ])
+        self.assertIsNone(next_available)
+        self.assertEqual(manifest.segments('x', 0), ([], None))
+
+
+class TestDashLiveFD(unittest.TestCase):
+    def setUp(self):
+        self.httpd = compat_http_server.HTTPServer(('127.0.0.1', 0), LiveRequestHandler)
+        # Time of both the downloader and the server
+        self.httpd.clock = FakeClock(AVAILABILITY_START + 20.5)
+        self.httpd.manifests = 0
+        self.httpd.segments = []
+        self.port = http_server_port(self.httpd)
+        thread = threading.Thread(target=self.httpd.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _download(self, path, params={}):
+        clock = self.httpd.clock
+        params = dict(params, logger=FakeLogger(), retry_sleep=0)
+        fd = DashLiveFD(YoutubeDL(params), params)
+        fd._clock = clock
+        fd._sleep = clock.sleep
+        info_dict = {
+            'url': 'http://127.0.0.1:%d%s' % (self.port, path),
+            'dash_representation_id': 'v1',
+        }
+        filename = 'testfile.mp4'
+        try_rm(encodeFilename(filename))
+        try:
+            self.assertTrue(fd.real_download(filename, info_dict))
+            with open(encodeFilename(filename), 'rb') as f:
+                content = f.read().decode('utf-8')
+        finally:
+            try_rm(encodeFilename(filename))
+        # Each segment is downloaded once, and the content is in order
+        self.assertEqual(content, ''.join('%s;' % s for s in self.httpd.segments))
+        return self.httpd.segments
+
+    def test_live_edge(self):
+        self.assertEqual(
+            self._download('/duration.mpd'),
+            ['/v1/init.mp4'] + ['/v1/n%03d.m4s' % n for n in range(10, 16)])
+        # Updated every minimumUpdatePeriod until the stream ended
+        self.assertGreaterEqual(self.httpd.manifests, 5)
+        self.assertLessEqual(self.httpd.manifests, 7)
+
+    def test_live_from_start(self):
+        self.assertEqual(
+            self._download('/duration.mpd', {'live_from_start': True}),
+            ['/v1/init.mp4'] + ['/v1/n%03d.m4s' % n for n in range(6, 16)])
+
+    def test_timeline(self):
+        self.assertEqual(
+            self._download('/timeline.mpd'),
+            ['/v1/init.mp4'] + ['/v1/t%d.m4s' % (n * 2000) for n in range(9, 15)])
+
+    def test_timeline_from_start(self):
+        self.assertEqual(
+            self._download('/timeline.mpd', {'live_from_start': True}),
+            ['/v1/init.mp4'] + ['/v1/t%d.m4s' % (n * 2000) for n in range(5, 15)])
+
+    def test_test_mode(self):
+        self.assertEqual(
+            self._download('/duration.mpd', {'test': True}), ['/v1/init.mp4', '/v1/n010.m4s'])
+        self.assertEqual(self.httpd.clock.slept, [])
+
+
+@unittest.skipUnless(hasattr(os, 'mkfifo'), 'named pipes are required')
+class TestLiveStreamMerge(unittest.TestCase):
+    def setUp(self):
+        self.httpd = compat_http_server.HTTPServer(('127.0.0.1', 0), LiveRequestHandler)
+        # In real time, with 9.5 seconds of the stream to come
+        offset = AVAILABILITY_START + 20.5 - time.time()
+        self.httpd.clock = lambda: time.time() + offset
+        self.httpd.manifests = 0
+        self.httpd.segments = []
+        self.port = http_server_port(self.httpd)
+        thread = threading.Thread(target=self.httpd.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.ffmpeg_dir = tempfile.mkdtemp()
+        ffmpeg = os.path.join(self.ffmpeg_dir, 'ffmpeg')
+        with open(ffmpeg, 'w') as f:
+            f.write(FAKE_FFMPEG)
+        os.chmod(ffmpeg, stat.S_IRWXU)
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        shutil.rmtree(self.ffmpeg_dir)
+
+    def test_interrupted(self):
+        params = {
+            'logger': FakeLogger(),
+            'ffmpeg_location': self.ffmpeg_dir,
+        }
+        filename = 'testfile.mp4'
+        formats = [{
+            'format_id': format_id,
+            'ext': 'mp4',
+            'url': 'http://127.0.0.1:%d/duration.mpd' % self.port,
+            'protocol': 'http_dash_segments_live',
+            'dash_representation_id': 'v1',
+            'is_live': True,
+            '_filename': 'testfile.f%s.mp4' % format_id,
+        } for format_id in ('1', '2')]
+        downloader = FFmpegStreamMergeFD(YoutubeDL(params), params)
+        self.assertTrue(downloader.can_merge(formats))
+
+        def interrupt():
+            # Once both formats have started
+            while len(self.httpd.segments) < 4:
+                time.sleep(0.05)
+            _thread.interrupt_main()
+
+        thread = threading.Thread(target=interrupt)
+        thread.daemon = True
+        thread.start()
+        try_rm(encodeFilename(filename))
+        start = time.time()
+        try:
+            self.assertTrue(downloader.real_download(filename, {
+                'ext': 'mp4',
+                'requested_formats': formats,
+            }))
+            # Before the end of the stream
+            self.assertLess(time.time() - start, 5)
+            with open(encodeFilename(filename), 'rb') as f:
+                content = f.read().decode('utf-8')
+        finally:
+            try_rm(encodeFilename(filename))
+        # Everything downloaded until then is kept
+        self.assertEqual(sorted(content.split(';')[:-1]), sorted(self.httpd.segments))
+        self.assertEqual(content.count('/v1/init.mp4;'), 2)
+
+
+class TestLiveMPDFormats(unittest.TestCase):
+    def test_dynamic_manifest(self):
+        ie = InfoExtractor(FakeYDL())
+        mpd_url = 'http://example.com/live/manifest.mpd'
+        mpd_doc = compat_etree_fromstring(live_mpd(AVAILABILITY_START + 20, False))
+        formats = ie._parse_mpd_formats(mpd_doc, mpd_id='dash', mpd_url=mpd_url, mpd_base_url='http://example.com/live/')
+        self.assertEqual(len(formats), 1)
+        f = formats[0]
+        self.assertEqual(f['format_id'], 'dash-v1')
+        self.assertEqual(f['url'], mpd_url)
+        self.assertEqual(f['protocol'], 'http_dash_segments_live')
+        self.assertEqual(f['dash_representation_id'], 'v1')
+        self.assertEqual(f['height'], 360)
+        self.assertTrue(f['is_live'])
+        self.assertIs(get_suitable_downloader(f), DashLiveFD)
+        # Without the URL of the manifest there is nothing to update
+        self.assertEqual(ie._parse_mpd_formats(mpd_doc, mpd_url=None), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
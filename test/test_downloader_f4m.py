@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+
+from __future__ import unicode_literals
+
+# Allow direct execution
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from youtube_dl.compat import compat_struct_pack
+from youtube_dl.downloader.f4m import (
+    DataTruncatedError,
+    FlvReader,
+    build_fragments_list,
+    read_bootstrap_info,
+)
+
+
+def box(box_type, payload):
+    return compat_struct_pack('!I', 8 + len(payload)) + box_type + payload
+
+
+def bootstrap(segment_runs, fragment_runs, live=False):
+    asrt = b'\0' * 4 + b'\x01' + b'low\0' + compat_struct_pack('!I', len(segment_runs))
+    for run in segment_runs:
+        asrt += compat_struct_pack('!II', *run)
+    afrt = b'\0' * 4 + compat_struct_pack('!I', 1000) + b'\0' + compat_struct_pack('!I', len(fragment_runs))
+    for first, ts, duration in fragment_runs:
+        afrt += compat_struct_pack('!IQI', first, ts, duration)
+        if duration == 0:
+            afrt += b'\x01'
+    abst = (
+        b'\0' * 4 + compat_struct_pack('!IBIQQ', 1, 0x20 if live else 0, 1000, 0, 0)
+        + b'movie\0' + b'\0' + b'\0' + b'\0' + b'\0'
+        + b'\x01' + box(b'asrt', asrt) + b'\x01' + box(b'afrt', afrt))
+    return box(b'abst', abst)
+
+
+class TestF4m(unittest.TestCase):
+    def test_read_bootstrap_info(self):
+        boot_info = read_bootstrap_info(bootstrap([(1, 3)], [(5, 0, 4000), (8, 12000, 0)]))
+        self.assertEqual(boot_info, {
+            'segments': [{'segment_run': [(1, 3)]}],
+            'fragments': [{'fragments': [{
+                'first': 5,
+                'ts': 0,
+                'duration': 4000,
+                'discontinuity_indicator': None,
+            }, {
+                'first': 8,
+                'ts': 12000,
+                'duration': 0,
+                'discontinuity_indicator': 1,
+            }]}],
+            'live': False,
+        })
+        self.assertRaises(
+            DataTruncatedError, read_bootstrap_info, bootstrap([(1, 3)], [(1, 0, 4000)])[:-3])
+
+    def test_read_box_header(self):
+        data = b'xx' + box(b'afra', b'abc') + box(b'mdat', b'FLV tags')
+        reader = FlvReader(data, 2)
+        self.assertEqual(reader.read_box_header(), (b'afra', 10, 13))
+        box_type, start, end = reader.read_box_header()
+        self.assertEqual((box_type, data[start:end]), (b'mdat', b'FLV tags'))
+        self.assertEqual(reader.tell(), len(data))
+        self.assertRaises(DataTruncatedError, FlvReader(data[:-1], 13).read_box_header)
+        self.assertEqual(FlvReader(data, 2).read_box_info(), (11, b'afra', b'abc'))
+
+    def test_build_fragments_list(self):
+        boot_info = read_bootstrap_info(bootstrap([(1, 3), (2, 2)], [(5, 0, 4000)]))
+        self.assertEqual(
+            build_fragments_list(boot_info),
+            [(1, 5), (1, 6), (1, 7), (2, 8), (2, 9)])
+        self.assertEqual(build_fragments_list(boot_info, 6), [(1, 7), (2, 8), (2, 9)])
+        self.assertEqual(build_fragments_list(boot_info, 9), [])
+
+        boot_info = read_bootstrap_info(bootstrap([(1, 3), (2, 1)], [(5, 0, 4000)], live=True))
+        self.assertEqual(build_fragments_list(boot_info), [(1, 7), (2, 8)])
+        self.assertEqual(build_fragments_list(boot_info, 7), [(2, 8)])
+
+        boot_info = read_bootstrap_info(bootstrap([(1, 4294967295)], [(100, 0, 4000)], live=True))
+        self.assertEqual(build_fragments_list(boot_info), [(1, 100), (1, 101)])
+
+
+if __name__ == '__main__':
+    unittest.main()
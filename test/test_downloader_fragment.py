@@ -0,0 +1,200 @@
+#!/usr/bin/env python
+# coding: utf-8
+from __future__ import unicode_literals
+
+# Allow direct execution
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import shutil
+import tempfile
+import threading
+import zlib
+
+from test.helper import (
+    FakeLogger,
+    http_server_port,
+    try_rm,
+)
+from youtube_dl import YoutubeDL
+from youtube_dl.compat import compat_http_server
+from youtube_dl.downloader.dash import DashSegmentsFD
+from youtube_dl.utils import (
+    DownloadError,
+    encodeFilename,
+)
+
+FILENAME = 'testfile.mp4'
+COUNT = 8
+
+
+def fragment_body(index):
+    return ('frag%d;' % index).encode('utf-8') * (100 + index)
+
+
+def journal_line(index, offset, content):
+    return json.dumps({'fragment': {
+        'index': index,
+        'offset': offset,
+        'length': len(content),
+        'crc32': zlib.crc32(content) & 0xffffffff,
+    }}) + '\n'
+
+
+class FragmentRequestHandler(compat_http_server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        index = int(self.path[len('/frag'):])
+        self.server.requested.append(index)
+        if index == self.server.missing:
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = fragment_body(index)
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestFragmentJournal(unittest.TestCase):
+    def setUp(self):
+        self.httpd = compat_http_server.HTTPServer(('127.0.0.1', 0), FragmentRequestHandler)
+        self.httpd.requested = []
+        self.httpd.missing = None
+        self.port = http_server_port(self.httpd)
+        thread = threading.Thread(target=self.httpd.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self._cleanup()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self._cleanup()
+
+    def _cleanup(self):
+        for filename in (FILENAME, FILENAME + '.part', FILENAME + '.ytdl'):
+            try_rm(encodeFilename(filename))
+
+    def _write(self, filename, content):
+        with open(encodeFilename(filename), 'wb') as f:
+            f.write(content if isinstance(content, bytes) else content.encode('utf-8'))
+
+    def _read(self, filename):
+        with open(encodeFilename(filename), 'rb') as f:
+            return f.read()
+
+    def _download(self, filename=FILENAME):
+        params = {
+            'logger': FakeLogger(),
+            'fragment_retries': 0,
+            'skip_unavailable_fragments': False,
+        }
+        fd = DashSegmentsFD(YoutubeDL(params), params)
+        return fd.real_download(filename, {
+            'url': 'http://127.0.0.1:%d/manifest.mpd' % self.port,
+            'fragment_base_url': 'http://127.0.0.1:%d/' % self.port,
+            'fragments': [{'path': 'frag%d' % i} for i in range(1, COUNT + 1)],
+        })
+
+    def _assert_complete(self, requested):
+        self.assertEqual(self.httpd.requested, requested)
+        self.assertEqual(
+            self._read(FILENAME), b''.join(fragment_body(i) for i in range(1, COUNT + 1)))
+        self.assertFalse(os.path.exists(encodeFilename(FILENAME + '.ytdl')))
+
+    def test_journal(self):
+        self.httpd.missing = 5
+        self.assertRaises(DownloadError, self._download)
+        lines = self._read(FILENAME + '.ytdl').decode('utf-8').splitlines()
+        self.assertEqual(json.loads(lines[0]), {'downloader': {}})
+        offset = 0
+        for index, line in enumerate(lines[1:], 1):
+            content = fragment_body(index)
+            self.assertEqual(line + '\n', journal_line(index, offset, content))
+            offset += len(content)
+        self.assertEqual(len(lines), 5)
+
+        self.httpd.missing = None
+        self.httpd.requested = []
+        self.assertTrue(self._download())
+        self._assert_complete(list(range(5, COUNT + 1)))
+
+    def test_resume_verified(self):
+        # The fourth fragment was being appended, the journal being torn
+        content = b''.join(fragment_body(i) for i in range(1, 4))
+        self._write(FILENAME + '.part', content + fragment_body(4)[:50])
+        journal = json.dumps({'downloader': {}}) + '\n'
+        offset = 0
+        for index in range(1, 4):
+            journal += journal_line(index, offset, fragment_body(index))
+            offset += len(fragment_body(index))
+        self._write(FILENAME + '.ytdl', journal + '{"fragment": {"ind')
+        self.assertTrue(self._download())
+        self._assert_complete(list(range(4, COUNT + 1)))
+
+    def test_resume_checksum_mismatch(self):
+        # The third fragment did not make it to disk
+        content = fragment_body(1) + fragment_body(2) + b'\0' * len(fragment_body(3))
+        self._write(FILENAME + '.part', content)
+        journal = json.dumps({'downloader': {}}) + '\n'
+        offset = 0
+        for index in range(1, 4):
+            journal += journal_line(index, offset, fragment_body(index))
+            offset += len(fragment_body(index))
+        self._write(FILENAME + '.ytdl', journal)
+        self.assertTrue(self._download())
+        self._assert_complete(list(range(3, COUNT + 1)))
+
+    def test_resume_older_version(self):
+        self._write(FILENAME + '.part', fragment_body(1) + fragment_body(2))
+        self._write(FILENAME + '.ytdl', json.dumps({'downloader': {'current_fragment': {'index': 2}}}))
+        self.assertTrue(self._download())
+        self._assert_complete(list(range(3, COUNT + 1)))
+
+    def test_stale_part_file(self):
+        # Left by a download whose .ytdl file is gone
+        self._write(FILENAME + '.part', b'stale' * 100)
+        self.assertTrue(self._download())
+        self._assert_complete(list(range(1, COUNT + 1)))
+
+    @unittest.skipUnless(hasattr(os, 'mkfifo'), 'named pipes are not supported')
+    def test_named_pipe(self):
+        # As with --stream-merge
+        pipe_dir = tempfile.mkdtemp()
+        try:
+            pipe = os.path.join(pipe_dir, 'f1.mp4')
+            os.mkfifo(encodeFilename(pipe))
+            received = []
+
+            def read_pipe():
+                with open(encodeFilename(pipe), 'rb') as f:
+                    received.append(f.read())
+
+            reader = threading.Thread(target=read_pipe)
+            reader.daemon = True
+            reader.start()
+            self.assertTrue(self._download(pipe))
+            reader.join(10)
+            self.assertEqual(received, [b''.join(fragment_body(i) for i in range(1, COUNT + 1))])
+            self.assertEqual(os.listdir(pipe_dir), ['f1.mp4'])
+        finally:
+            shutil.rmtree(pipe_dir, ignore_errors=True)
+
+    def test_corrupt(self):
+        self._write(FILENAME + '.part', fragment_body(1))
+        self._write(FILENAME + '.ytdl', 'garbage')
+        self.assertTrue(self._download())
+        self._assert_complete(list(range(1, COUNT + 1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
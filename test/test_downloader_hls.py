@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# coding: utf-8
+from __future__ import unicode_literals
+
+# Allow direct execution
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import re
+import threading
+
+from test.helper import (
+    FakeLogger,
+    http_server_port,
+    try_rm,
+)
+from youtube_dl import YoutubeDL
+from youtube_dl.compat import compat_http_server
+from youtube_dl.downloader.hls import (
+    HlsFD,
+    coalesce_byte_ranges,
+    split_byte_ranges,
+)
+from youtube_dl.utils import encodeFilename
+
+MEDIA = bytes(bytearray(i % 251 for i in range(20000)))
+# Fragment sizes, the first one being the initialization data
+SIZES = [500] + [1500] * 12
+
+
+def byterange_playlist(sizes):
+    lines = ['#EXTM3U', '#EXT-X-TARGETDURATION:2', '#EXT-X-VERSION:4']
+    offset = 0
+    for size in sizes:
+        lines.extend(['#EXTINF:2.0,', '#EXT-X-BYTERANGE:%d@%d' % (size, offset), 'media.mp4'])
+        offset += size
+    lines.append('#EXT-X-ENDLIST')
+    return '\n'.join(lines).encode('utf-8')
+
+
+class ByteRangeRequestHandler(compat_http_server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == '/index.m3u8':
+            body = byterange_playlist(SIZES)
+            self.send_response(200)
+        else:
+            self.server.ranges.append(self.headers.get('Range'))
+            mobj = re.match(r'bytes=(\d+)-(\d+)', self.headers.get('Range') or '')
+            if mobj and not self.server.ignore_range:
+                start, end = int(mobj.group(1)), int(mobj.group(2))
+                if self.server.missing is not None and start <= self.server.missing <= end:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                if self.server.max_range:
+                    end = min(end, start + self.server.max_range - 1)
+                body = MEDIA[start:end + 1]
+                self.send_response(206)
+                self.send_header('Content-Range', 'bytes %d-%d/%d' % (start, end, len(MEDIA)))
+            else:
+                body = MEDIA
+                self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def fragment(index, start, end, url='media.mp4'):
+    return {'index': index, 'url': url, 'byte_range': {'start': start, 'end': end}}
+
+
+class TestByteRangeCoalescing(unittest.TestCase):
+    def test_coalesce_byte_ranges(self):
+        fragments = [
+            fragment(1, 0, 100), fragment(2, 100, 200), fragment(3, 200, 300),
+            # Not contiguous
+            fragment(4, 400, 500), fragment(5, 500, 600),
+            # Another file
+            fragment(6, 600, 700, 'other.mp4'),
+            {'index': 7, 'url': 'other.mp4', 'byte_range': {}},
+        ]
+        self.assertEqual(
+            [[f['index'] for f in group] for group in coalesce_byte_ranges(fragments, 1000)],
+            [[1, 2, 3], [4, 5], [6], [7]])
+        self.assertEqual(
+            [[f['index'] for f in group] for group in coalesce_byte_ranges(fragments, 200)],
+            [[1, 2], [3], [4, 5], [6], [7]])
+        self.assertEqual(len(list(coalesce_byte_ranges(fragments, 0))), 7)
+
+    def test_split_byte_ranges(self):
+        group = [fragment(1, 10, 12), fragment(2, 12, 15)]
+        self.assertEqual(split_byte_ranges(b'abcde', group), [b'ab', b'cde'])
+        # The whole file
+        self.assertEqual(split_byte_ranges(b'0123456789abcdefg', group), [b'ab', b'cde'])
+        self.assertEqual(split_byte_ranges(b'xyz', [{'byte_range': {}}]), [b'xyz'])
+        # Fragments past the end of a short content are left out
+        self.assertEqual(split_byte_ranges(b'abcd', group), [b'ab'])
+        self.assertEqual(split_byte_ranges(b'a', group), [])
+        self.assertEqual(split_byte_ranges(b'a', group[:1]), [b'a'])
+
+
+class TestHlsByteRanges(unittest.TestCase):
+    def setUp(self):
+        self.httpd = compat_http_server.HTTPServer(('127.0.0.1', 0), ByteRangeRequestHandler)
+        self.httpd.ranges = []
+        self.httpd.ignore_range = False
+        self.httpd.max_range = None
+        self.httpd.missing = None
+        self.port = http_server_port(self.httpd)
+        thread = threading.Thread(target=self.httpd.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _download(self, params={}, expected=MEDIA[:sum(SIZES)]):
+        params = dict(params, logger=FakeLogger(), fragment_retries=0)
+        fd = HlsFD(YoutubeDL(params), params)
+        progress = []
+        fd.add_progress_hook(lambda s: progress.append(s.get('fragment_index')))
+        filename = 'testfile.mp4'
+        try_rm(encodeFilename(filename))
+        try:
+            self.assertTrue(fd.real_download(filename, {
+                'url': 'http://127.0.0.1:%d/index.m3u8' % self.port,
+            }))
+            with open(encodeFilename(filename), 'rb') as f:
+                self.assertEqual(f.read(), expected)
+        finally:
+            try_rm(encodeFilename(filename))
+        return progress
+
+    def test_coalesced(self):
+        progress = self._download({'hls_byterange_size': 6500})
+        self.assertEqual(self.httpd.ranges, [
+            'bytes=0-6499', 'bytes=6500-12499', 'bytes=12500-18499'])
+        self.assertIn(13, progress)
+
+    def test_default(self):
+        self._download()
+        self.assertEqual(self.httpd.ranges, ['bytes=0-18499'])
+
+    def test_disabled(self):
+        self._download({'hls_byterange_size': 0})
+        self.assertEqual(len(self.httpd.ranges), len(SIZES))
+
+    def test_short_range(self):
+        # Servers may send less than the range asked for
+        self.httpd.max_range = 4000
+        progress = self._download({'hls_byterange_size': 6500})
+        self.assertEqual(self.httpd.ranges[:5], [
+            'bytes=0-6499', 'bytes=3500-4999', 'bytes=5000-6499',
+            'bytes=6500-12499', 'bytes=9500-10999'])
+        self.assertEqual([i for i in progress if i is not None][-1], 13)
+
+    def test_unavailable(self):
+        # Fragment 7 is missing: its group is downloaded again fragment by
+        # fragment, and only fragment 7 is skipped
+        self.httpd.missing = 8000
+        self._download(
+            {'hls_byterange_size': 6500, 'skip_unavailable_fragments': True},
+            MEDIA[:8000] + MEDIA[9500:sum(SIZES)])
+        self.assertEqual(self.httpd.ranges, [
+            'bytes=0-6499', 'bytes=6500-12499', 'bytes=6500-7999', 'bytes=8000-9499',
+            'bytes=9500-10999', 'bytes=11000-12499', 'bytes=12500-18499'])
+
+    def test_range_ignored(self):
+        self.httpd.ignore_range = True
+        self._download({'hls_byterange_size': 6500})
+        self.assertEqual(len(self.httpd.ranges), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
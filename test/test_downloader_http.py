@@ -5,11 +5,16 @@ from __future__ import unicode_literals
 # Allow direct execution
 import os
 import re
+import shutil
+import stat
 import sys
+import tempfile
+import time
 import unittest
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from test.helper import (
+    FAKE_FFMPEG,
     FakeLogger,
     http_server_port,
     try_rm,
@@ -17,6 +22,7 @@ from test.helper import (
 from youtube_dl import YoutubeDL
 from youtube_dl.compat import compat_http_server
 from youtube_dl.downloader.http import HttpFD
+from youtube_dl.downloader.streammerge import FFmpegStreamMergeFD
 from youtube_dl.utils import encodeFilename
 import threading
 
@@ -66,6 +72,12 @@ class HTTPTestRequestHandler(compat_http_server.BaseHTTPRequestHandler):
             self.serve(range=False)
         elif self.path == '/no-range-no-content-length':
             self.serve(range=False, content_length=False)
+        elif self.path == '/audio':
+            self.send_response(200)
+            self.send_header('Content-Type', 'audio/mp4')
+            self.send_header('Content-Length', TEST_SIZE // 2)
+            self.end_headers()
+            self.wfile.write(b'@' * (TEST_SIZE // 2))
         else:
             assert False
 
@@ -103,6 +115,114 @@ class TestHttpFD(unittest.TestCase):
             'http_chunk_size': 1000,
         })
 
+    def test_shared_ratelimit(self):
+        # Concurrent downloads share the rate limit: 4 * 10 KiB at 80 KiB/s
+        # with a 10 KiB burst take at least 3/8 s
+        params = {'ratelimit': 80 * 1024, 'ratelimit_burst': TEST_SIZE}
+        ydl = YoutubeDL({'logger': FakeLogger()})
+        results = []
+
+        def download(i):
+            downloader = HttpFD(ydl, params)
+            filename = 'testfile-%d.mp4' % i
+            results.append(downloader.real_download(filename, {
+                'url': 'http://127.0.0.1:%d/regular' % self.port,
+            }) and os.path.getsize(encodeFilename(filename)))
+            try_rm(encodeFilename(filename))
+
+        threads = [threading.Thread(target=download, args=(i,)) for i in range(4)]
+        start = time.time()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertGreaterEqual(time.time() - start, 0.35)
+        self.assertEqual(results, [TEST_SIZE] * 4)
+
+
+@unittest.skipUnless(hasattr(os, 'mkfifo'), 'named pipes are required')
+class TestFFmpegStreamMergeFD(unittest.TestCase):
+    def setUp(self):
+        self.httpd = compat_http_server.HTTPServer(
+            ('127.0.0.1', 0), HTTPTestRequestHandler)
+        self.port = http_server_port(self.httpd)
+        self.server_thread = threading.Thread(target=self.httpd.serve_forever)
+        self.server_thread.daemon = True
+        self.server_thread.start()
+        self.ffmpeg_dir = tempfile.mkdtemp()
+        ffmpeg = os.path.join(self.ffmpeg_dir, 'ffmpeg')
+        with open(ffmpeg, 'w') as f:
+            f.write(FAKE_FFMPEG)
+        os.chmod(ffmpeg, stat.S_IRWXU)
+
+    def tearDown(self):
+        shutil.rmtree(self.ffmpeg_dir)
+
+    def _formats(self, filename):
+        return [{
+            'format_id': format_id,
+            'ext': 'mp4',
+            'url': 'http://127.0.0.1:%d/%s' % (self.port, ep),
+            'protocol': 'http',
+            '_filename': '%s.f%s.mp4' % (filename[:-4], format_id),
+        } for format_id, ep in (('1', 'regular'), ('2', 'audio'))]
+
+    def test_merge(self):
+        params = {
+            'logger': FakeLogger(),
+            'ffmpeg_location': self.ffmpeg_dir,
+        }
+        ydl = YoutubeDL(params)
+        downloader = FFmpegStreamMergeFD(ydl, params)
+        filename = 'testfile.mp4'
+        try_rm(encodeFilename(filename))
+        formats = self._formats(filename)
+        self.assertTrue(downloader.can_merge(formats))
+        try:
+            self.assertTrue(downloader.real_download(filename, {
+                'ext': 'mp4',
+                'requested_formats': formats,
+            }))
+            with open(encodeFilename(filename), 'rb') as f:
+                self.assertEqual(f.read(), b'#' * TEST_SIZE + b'@' * (TEST_SIZE // 2))
+            for f in formats:
+                self.assertFalse(os.path.exists(f['_filename']))
+        finally:
+            try_rm(encodeFilename(filename))
+
+    def test_resume_is_file_based(self):
+        params = {
+            'logger': FakeLogger(),
+            'ffmpeg_location': self.ffmpeg_dir,
+        }
+        downloader = FFmpegStreamMergeFD(YoutubeDL(params), params)
+        formats = self._formats('testfile.mp4')
+        partial = formats[1]['_filename'] + '.part'
+        with open(partial, 'wb') as f:
+            f.write(b'@')
+        try:
+            self.assertFalse(downloader.can_merge(formats))
+        finally:
+            try_rm(partial)
+
+    def test_live(self):
+        params = {
+            'logger': FakeLogger(),
+            'ffmpeg_location': self.ffmpeg_dir,
+        }
+        downloader = FFmpegStreamMergeFD(YoutubeDL(params), params)
+        formats = self._formats('testfile.mp4')
+        for f in formats:
+            f['is_live'] = True
+        self.assertFalse(downloader.can_merge(formats))
+        # The formats of a live DASH manifest are downloaded together
+        for f in formats:
+            f.update({
+                'protocol': 'http_dash_segments_live',
+                'dash_representation_id': f['format_id'],
+            })
+        self.assertTrue(downloader.can_merge(formats))
+
 
 if __name__ == '__main__':
     unittest.main()
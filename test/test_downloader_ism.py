@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+
+from __future__ import unicode_literals
+
+# Allow direct execution
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+
+from youtube_dl.downloader.ism import (
+    box,
+    extract_box_data,
+    find_box,
+    full_box,
+    iter_boxes,
+    piff_header,
+    u32,
+    u64,
+    write_piff_header,
+)
+
+
+def fragment(track_id, mdat_size):
+    traf = full_box(b'tfhd', 0, 0, u32.pack(track_id)) + full_box(b'trun', 0, 0, u32.pack(0))
+    moof = full_box(b'mfhd', 0, 0, u32.pack(1)) + box(b'traf', traf)
+    return box(b'moof', moof) + box(b'mdat', b'\0' * mdat_size)
+
+
+class TestIsmBoxes(unittest.TestCase):
+    def test_iter_boxes(self):
+        data = fragment(3, 100)
+        self.assertEqual(
+            [(t, e - s) for t, s, e in iter_boxes(data)],
+            [(b'moof', len(data) - 116), (b'mdat', 100)])
+        # 64-bit and open-ended sizes
+        data = u32.pack(1) + b'mdat' + u64.pack(20) + b'\0' * 4 + u32.pack(0) + b'free' + b'\0' * 5
+        self.assertEqual(list(iter_boxes(data)), [(b'mdat', 16, 20), (b'free', 28, 33)])
+        # Truncated boxes are cut at the end of the data
+        self.assertEqual(list(iter_boxes(data[:25])), [(b'mdat', 16, 20)])
+        self.assertEqual(list(iter_boxes(box(b'free', b'abc')[:10])), [(b'free', 8, 10)])
+
+    def test_find_box(self):
+        data = b'\0' * 5 + fragment(7, 1000)
+        start, end = find_box(data, [b'moof', b'traf', b'tfhd'], 5)
+        self.assertEqual(u32.unpack_from(data, start + 4)[0], 7)
+        self.assertEqual(end - start, 8)
+        self.assertIsNone(find_box(data, [b'moof', b'traf', b'senc'], 5))
+        self.assertEqual(extract_box_data(data[5:], [b'moof', b'traf', b'tfhd'])[4:], u32.pack(7))
+        self.assertIsNone(extract_box_data(data[5:], [b'moov']))
+
+    def test_piff_header(self):
+        params = {
+            'track_id': 1,
+            'fourcc': 'AACL',
+            'duration': 50000000,
+            'sampling_rate': 44100,
+        }
+        header = piff_header(params)
+        self.assertIs(piff_header(dict(params)), header)
+        self.assertIsNot(piff_header(dict(params, track_id=2)), header)
+        stream = io.BytesIO()
+        write_piff_header(stream, params)
+        self.assertEqual(stream.getvalue(), header)
+        self.assertEqual([t for t, _, _ in iter_boxes(header)], [b'ftyp', b'moov'])
+        start, end = find_box(header, [b'moov', b'mvex', b'trex'])
+        self.assertEqual(u32.unpack_from(header, start + 4)[0], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
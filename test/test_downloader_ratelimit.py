@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+# coding: utf-8
+from __future__ import unicode_literals
+
+# Allow direct execution
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from test.helper import FakeClock
+from youtube_dl.downloader.ratelimit import (
+    BandwidthScheduler,
+    TokenBucket,
+    get_bandwidth_scheduler,
+)
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst(self):
+        clock = FakeClock()
+        bucket = TokenBucket(1000, 500, clock)
+        self.assertEqual(bucket.take(500), 0)
+        # In debt: wait for the rate to pay it back
+        self.assertEqual(bucket.take(250), 0.25)
+        self.assertEqual(bucket.take(250), 0.5)
+        clock.now += 0.5
+        self.assertEqual(bucket.take(0), 0)
+        # Idle time does not accumulate past the burst
+        clock.now += 10
+        self.assertEqual(bucket.take(500), 0)
+        self.assertEqual(bucket.take(100), 0.1)
+
+    def test_default_burst(self):
+        self.assertEqual(TokenBucket(100000).burst, 25000)
+        self.assertEqual(TokenBucket(100).burst, 1024)
+
+
+class TestBandwidthScheduler(unittest.TestCase):
+    def _scheduler(self, *args, **kwargs):
+        clock = FakeClock()
+        return clock, BandwidthScheduler(*args, clock=clock, sleep=clock.sleep, **kwargs)
+
+    def test_overall_rate(self):
+        clock, scheduler = self._scheduler(1000, 100)
+        for _ in range(10):
+            scheduler.consume(100, 'http://a.example.com/')
+            scheduler.consume(100, 'http://b.example.org/')
+        # 2000 bytes, 100 of them at once
+        self.assertAlmostEqual(clock.now - 1000, 1.9)
+
+    def test_host_rates(self):
+        clock, scheduler = self._scheduler(
+            10000, 100, host_rates={'example.com': 1000, 'slow.example.org': 100})
+        self.assertEqual(scheduler.rate('http://example.com/'), 1000)
+        self.assertEqual(scheduler.rate('https://cdn.EXAMPLE.com:8080/a'), 1000)
+        self.assertEqual(scheduler.rate('http://slow.example.org/'), 100)
+        self.assertEqual(scheduler.rate('http://example.org/'), 10000)
+        self.assertEqual(scheduler.rate('http://notexample.com/'), 10000)
+        self.assertEqual(scheduler.rate(), 10000)
+
+        self.assertEqual(scheduler.consume(100, 'http://cdn.example.com/'), 0)
+        # The host rate limit dominates
+        self.assertEqual(scheduler.consume(100, 'http://example.com/'), 0.1)
+        # Other hosts are only held back by the overall rate limit
+        self.assertEqual(scheduler.consume(100, 'http://example.org/'), 0)
+        self.assertEqual(clock.slept, [0.1])
+
+    def test_consume_without_wait(self):
+        clock, scheduler = self._scheduler(host_rates={'example.com': 1000})
+        self.assertEqual(scheduler.rate('http://example.org/'), None)
+        self.assertEqual(scheduler.burst('http://example.org/'), None)
+        self.assertEqual(scheduler.consume(10 ** 6, 'http://example.org/'), 0)
+        self.assertEqual(scheduler.burst('http://example.com/'), 1024)
+        self.assertAlmostEqual(scheduler.consume(2024, 'http://example.com/', wait=False), 1)
+        self.assertEqual(clock.slept, [])
+
+
+class TestGetBandwidthScheduler(unittest.TestCase):
+    def test_shared(self):
+        self.assertIsNone(get_bandwidth_scheduler({}))
+        self.assertIsNone(get_bandwidth_scheduler({'ratelimit': None, 'ratelimit_hosts': {}}))
+        params = {'ratelimit': 5000, 'ratelimit_hosts': {'example.com': 1000}}
+        scheduler = get_bandwidth_scheduler(params)
+        self.assertIs(scheduler, get_bandwidth_scheduler(dict(params)))
+        self.assertIsNot(scheduler, get_bandwidth_scheduler(dict(params, ratelimit=6000)))
+        self.assertIsNot(scheduler, get_bandwidth_scheduler(dict(params, ratelimit_burst=2048)))
+        self.assertEqual(get_bandwidth_scheduler(dict(params, ratelimit_burst=2048)).burst(), 2048)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python
+# coding: utf-8
+from __future__ import unicode_literals
+
+# Allow direct execution
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import email.utils
+import io
+import threading
+
+from test.helper import (
+    FakeClock,
+    FakeLogger,
+    http_server_port,
+    try_rm,
+)
+from youtube_dl import YoutubeDL
+from youtube_dl.compat import (
+    compat_http_server,
+    compat_urllib_error,
+)
+from youtube_dl.downloader.dash import DashSegmentsFD
+from youtube_dl.downloader.http import HttpFD
+from youtube_dl.downloader.retry import (
+    HostCircuits,
+    RetryPolicy,
+    retry_after,
+)
+from youtube_dl.utils import encodeFilename
+
+
+def http_error(code, headers=None):
+    return compat_urllib_error.HTTPError(
+        'http://example.com/', code, 'Error', headers or {}, io.BytesIO())
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def _policy(self, params, fragment=False, random=lambda: 1):
+        clock = FakeClock()
+        return clock, RetryPolicy(
+            params, fragment, circuits=HostCircuits(clock, clock.sleep),
+            clock=clock, sleep=clock.sleep, random=random)
+
+    def test_backoff(self):
+        clock, policy = self._policy({'retries': 6, 'retry_sleep': 1, 'max_retry_sleep': 10})
+        socket_error = IOError('timed out')
+        self.assertEqual([policy.delay(socket_error, count) for count in range(1, 8)], [1, 2, 4, 8, 10, 10, None])
+        self.assertEqual(policy.delay(http_error(503), 3), 4)
+        # Jitter keeps at least half of the wait
+        _, policy = self._policy({'retries': 3}, random=lambda: 0)
+        self.assertEqual(policy.delay(socket_error, 3), 2)
+        _, policy = self._policy({'retries': 3, 'retry_sleep': 0})
+        self.assertEqual(policy.delay(socket_error, 3), 0)
+        # Defaults
+        _, policy = self._policy({})
+        self.assertIsNone(policy.delay(socket_error, 1))
+        _, policy = self._policy({'retries': float('inf')})
+        self.assertEqual(policy.delay(socket_error, 10000), 10)
+
+        policy.wait(2.5)
+        policy.wait(0)
+        self.assertEqual((policy.retry_count, policy.retry_wait), (2, 2.5))
+
+    def test_status_rules(self):
+        _, policy = self._policy({'retries': 10})
+        for code, retryable in ((404, False), (403, False), (400, False), (408, True), (429, True), (500, True), (503, True)):
+            self.assertEqual(policy.retryable(http_error(code)), retryable, code)
+            self.assertEqual(policy.delay(http_error(code), 1) is not None, retryable, code)
+
+        _, policy = self._policy({'fragment_retries': 10}, fragment=True)
+        # Missing fragments are retried at once first
+        self.assertEqual([policy.delay(http_error(404), count) for count in (1, 2, 3)], [0, 1, 2])
+        self.assertEqual([policy.delay(http_error(403), count) for count in (1, 2)], [0, None])
+        self.assertIsNone(policy.delay(http_error(410), 1))
+        self.assertEqual(policy.delay(http_error(502), 1), 1)
+
+    def test_retry_after(self):
+        clock, policy = self._policy({'retries': 10})
+        self.assertEqual(policy.delay(http_error(429, {'Retry-After': '30'}), 1), 30)
+        self.assertEqual(policy.delay(http_error(503, {'Retry-After': '3600'}), 1), 300)
+        date = email.utils.formatdate(clock.now + 20, usegmt=True)
+        self.assertEqual(retry_after(http_error(503, {'Retry-After': date}), clock), 20)
+        self.assertEqual(retry_after(http_error(503, {'Retry-After': 'soon'}), clock), None)
+        self.assertEqual(retry_after(http_error(503), clock), None)
+        # Errors that are not retried stay so
+        self.assertIsNone(policy.delay(http_error(404, {'Retry-After': '1'}), 1))
+
+
+class TestHostCircuits(unittest.TestCase):
+    def test_circuit(self):
+        clock = FakeClock()
+        circuits = HostCircuits(clock, clock.sleep)
+        url = 'http://cdn.example.com/a'
+        for _ in range(4):
+            circuits.failed(url)
+            self.assertEqual(circuits.wait(url), 0)
+        # Open: held back for the cooldown, then a probe goes
+        circuits.failed(url)
+        self.assertEqual(circuits.wait('http://cdn.example.com/b'), 1)
+        # The others wait for the probe
+        self.assertEqual(circuits.wait(url), 1)
+        self.assertEqual(circuits.wait('http://example.com/'), 0)
+        circuits.failed(url)
+        self.assertEqual(circuits.wait(url), 2)
+        circuits.succeeded(url)
+        self.assertEqual(circuits.wait(url), 0)
+        self.assertEqual(clock.slept, [1, 1, 2])
+
+    def test_hold(self):
+        clock = FakeClock()
+        circuits = HostCircuits(clock, clock.sleep)
+        circuits.failed('http://example.com/a', hold=5)
+        self.assertEqual(circuits.wait('http://example.com/b'), 5)
+        self.assertEqual(circuits.wait('http://example.com/b'), 0)
+
+    def test_policy_records(self):
+        clock = FakeClock()
+        circuits = HostCircuits(clock, clock.sleep)
+        policy = RetryPolicy({}, circuits=circuits, clock=clock, sleep=clock.sleep)
+        # Missing resources do not tell about the host
+        for _ in range(10):
+            policy.record_failure('http://example.com/', http_error(404))
+        policy.record_failure('http://example.com/', http_error(429, {'Retry-After': '7'}))
+        policy.wait_for_host('http://example.com/')
+        self.assertEqual(policy.retry_wait, 7)
+
+
+class RetryTestRequestHandler(compat_http_server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        requests = self.server.requests
+        requests[self.path] = requests.get(self.path, 0) + 1
+        code = self.server.codes.get(self.path, {}).get(requests[self.path], 200)
+        self.send_response(code)
+        if code == 503:
+            self.send_header('Retry-After', '0')
+        body = b'#' * 1024 if code == 200 else b''
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class TestRetries(unittest.TestCase):
+    def setUp(self):
+        self.httpd = compat_http_server.HTTPServer(
+            ('127.0.0.1', 0), RetryTestRequestHandler)
+        self.httpd.requests = {}
+        self.httpd.codes = {
+            # Attempt: status code
+            '/unavailable': {1: 503, 2: 503},
+            '/missing': {1: 404},
+            '/frag2': {1: 404, 2: 404},
+        }
+        self.port = http_server_port(self.httpd)
+        thread = threading.Thread(target=self.httpd.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _url(self, path):
+        return 'http://127.0.0.1:%d/%s' % (self.port, path)
+
+    def _download(self, fd_class, info_dict, params):
+        params = dict(params, logger=FakeLogger(), retry_sleep=0)
+        statuses = []
+        downloader = fd_class(YoutubeDL(params), params)
+        downloader.add_progress_hook(statuses.append)
+        filename = 'testfile.mp4'
+        try_rm(encodeFilename(filename))
+        try:
+            return downloader.real_download(filename, info_dict), statuses
+        finally:
+            try_rm(encodeFilename(filename))
+
+    def test_http(self):
+        success, statuses = self._download(HttpFD, {'url': self._url('unavailable')}, {'retries': 2})
+        self.assertTrue(success)
+        self.assertEqual(self.httpd.requests['/unavailable'], 3)
+        self.assertEqual(statuses[-1]['retry_count'], 2)
+
+        self.assertRaises(
+            compat_urllib_error.HTTPError,
+            self._download, HttpFD, {'url': self._url('missing')}, {'retries': 2})
+        self.assertEqual(self.httpd.requests['/missing'], 1)
+
+    def test_fragments(self):
+        info_dict = {
+            'url': self._url('manifest.mpd'),
+            'fragment_base_url': self._url(''),
+            'fragments': [{'path': 'frag%d' % i} for i in (1, 2, 3)],
+        }
+        success, statuses = self._download(DashSegmentsFD, info_dict, {'fragment_retries': 2})
+        self.assertTrue(success)
+        self.assertEqual(self.httpd.requests['/frag2'], 3)
+        self.assertEqual([s['retry_count'] for s in statuses if s['status'] == 'downloading'][-1], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+from __future__ import unicode_literals
+
+# Allow direct execution
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+
+from test.helper import FakeYDL, http_server_port
+from youtube_dl.compat import compat_http_server
+from youtube_dl.extractor import GenericIE
+
+PAGES = {
+    'vimeo': '<iframe src="https://player.vimeo.com/video/76979871" width="640"></iframe>',
+    'youtube': '<div class="lazyYT" data-youtube-id="BaW_jenozKc"></div>',
+    'wistia': '<div class="wistia_embed wistia_async_807fafadvk" style="width:640px"></div>',
+    'kaltura': (
+        '<script>kWidget.embed({"targetId": "kp", "wid": "_1645161", '
+        '"uiconf_id": 1, "entry_id": "1_a52wc67y"});</script>'),
+    'jwplatform': '<script src="https://content.jwplatform.com/players/nPripu9l-ALJ3XQCI.js"></script>',
+    'soundcloud': (
+        '<iframe src="https://w.soundcloud.com/player/?url=https%3A//api.soundcloud.com/tracks/62986583">'
+        '</iframe>'),
+    # Triggers without an embed, then the HTML5 fallback
+    'html5': '<p>Not on YouTube nor Vimeo</p><video src="/media/clip.mp4"></video>',
+}
+
+
+class GenericTestRequestHandler(compat_http_server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _page(self):
+        body = PAGES[self.path[1:]]
+        return ('<html><head><title>%s</title></head><body>%s</body></html>' % (
+            self.path[1:], body)).encode('utf-8')
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.end_headers()
+
+    def do_GET(self):
+        body = self._page()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class UnfilteredGenericIE(GenericIE):
+    def _find_embeds(self, webpage):
+        return set(self._EMBED_TRIGGERS)
+
+
+class TestGenericEmbeds(unittest.TestCase):
+    def setUp(self):
+        self.httpd = compat_http_server.HTTPServer(('127.0.0.1', 0), GenericTestRequestHandler)
+        thread = threading.Thread(target=self.httpd.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _extract(self, ie_class, page):
+        ie = ie_class(FakeYDL())
+        info = ie.extract('http://127.0.0.1:%d/%s' % (http_server_port(self.httpd), page))
+        if info.get('_type') == 'playlist':
+            info['entries'] = list(info['entries'])
+        return info
+
+    def test_find_embeds(self):
+        ie = GenericIE(FakeYDL())
+
+        def find_embeds(webpage):
+            triggered = ie._find_embeds(webpage)
+            return set(name for name in GenericIE._EMBED_TRIGGERS if name in triggered)
+
+        triggered = find_embeds(PAGES['vimeo'])
+        self.assertIn('Vimeo', triggered)
+        self.assertNotIn('Youtube', triggered)
+        self.assertEqual(find_embeds(PAGES['html5'].upper()), set(['Youtube']))
+        self.assertEqual(find_embeds('<p>Nothing embedded</p>'), set())
+        for name, triggers in GenericIE._EMBED_TRIGGERS.items():
+            for trigger in triggers:
+                self.assertEqual(trigger, trigger.lower(), name)
+
+    def test_triggered_embeds(self):
+        expected = {
+            'vimeo': 'Vimeo',
+            'youtube': 'Youtube',
+            'wistia': 'Wistia',
+            'kaltura': 'Kaltura',
+            'jwplatform': 'JWPlatform',
+            'soundcloud': None,
+        }
+        for page in PAGES:
+            info = self._extract(GenericIE, page)
+            self.assertEqual(info, self._extract(UnfilteredGenericIE, page), page)
+            if page == 'html5':
+                self.assertEqual(info['entries'][0]['formats'][0]['url'], 'http://127.0.0.1:%d/media/clip.mp4' % http_server_port(self.httpd))
+                continue
+            self.assertEqual(len(info['entries']), 1, page)
+            self.assertEqual(info['entries'][0].get('ie_key'), expected[page], page)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+# coding: utf-8
+from __future__ import unicode_literals
+
+# Allow direct execution
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import io
+import socket
+import threading
+
+from test.helper import (
+    FakeLogger,
+    http_server_port,
+    try_rm,
+)
+from youtube_dl import YoutubeDL
+from youtube_dl.compat import (
+    compat_cookiejar,
+    compat_http_client,
+    compat_http_server,
+    compat_urllib_error,
+    compat_urllib_response,
+)
+from youtube_dl.downloader.dash import DashSegmentsFD
+from youtube_dl.http2 import (
+    HTTP2_HEADER,
+    _response_headers,
+    http2_available,
+)
+from youtube_dl.utils import (
+    encodeFilename,
+    sanitized_Request,
+)
+
+if http2_available():
+    import h2.config
+    import h2.connection
+    import h2.events
+    import h2.exceptions
+
+
+def fragment_body(path):
+    return ('%s;' % path).encode('utf-8') * 2000
+
+
+class H2Server(object):
+    """ HTTP/2 stand-in server, with prior knowledge, answering after delay seconds """
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.sock = socket.socket()
+        self.sock.bind(('127.0.0.1', 0))
+        self.sock.listen(5)
+        self.port = self.sock.getsockname()[1]
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = []
+        self.pending = 0
+        self.max_pending = 0
+        thread = threading.Thread(target=self._serve)
+        thread.daemon = True
+        thread.start()
+
+    def close(self):
+        self.sock.close()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except socket.error:
+                return
+            with self.lock:
+                self.connections += 1
+            thread = threading.Thread(target=self._handle, args=(conn,))
+            thread.daemon = True
+            thread.start()
+
+    def _handle(self, conn):
+        h2conn = h2.connection.H2Connection(config=h2.config.H2Configuration(
+            client_side=False, header_encoding='utf-8'))
+        h2conn.initiate_connection()
+        conn.sendall(h2conn.data_to_send())
+        try:
+            while True:
+                data = conn.recv(65536)
+                if not data:
+                    break
+                with self.lock:
+                    for event in h2conn.receive_data(data):
+                        if isinstance(event, h2.events.RequestReceived):
+                            headers = dict(event.headers)
+                            self.requests.append(headers)
+                            self.pending += 1
+                            self.max_pending = max(self.max_pending, self.pending)
+                            timer = threading.Timer(
+                                self.delay, self._respond, (conn, h2conn, event.stream_id, headers[':path']))
+                            timer.daemon = True
+                            timer.start()
+                    conn.sendall(h2conn.data_to_send())
+        except (socket.error, h2.exceptions.ProtocolError):
+            pass
+        finally:
+            conn.close()
+
+    def _respond(self, conn, h2conn, stream_id, path):
+        status, body = ('404', b'') if path == '/missing' else ('200', fragment_body(path))
+        with self.lock:
+            self.pending -= 1
+            try:
+                h2conn.send_headers(stream_id, [
+                    (':status', status), ('content-length', str(len(body))),
+                    ('set-cookie', 'visited=yes; path=/')])
+                # Within the window of the client
+                h2conn.send_data(stream_id, body, end_stream=True)
+                conn.sendall(h2conn.data_to_send())
+            except (socket.error, h2.exceptions.ProtocolError):
+                pass
+
+
+class HTTP1RequestHandler(compat_http_server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.headers.append(dict(self.headers))
+        body = fragment_body(self.path)
+        self.send_response(200)
+        self.send_header('Content-Type', 'video/mp4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class SilentHTTP2RequestHandler(HTTP1RequestHandler):
+    """ Never answers the HTTP/2 connection preface, until the client hangs up """
+
+    def parse_request(self):
+        if self.raw_requestline.startswith(b'PRI '):
+            self.server.prefaces += 1
+            self.connection.settimeout(5)
+            try:
+                while self.rfile.read(1):
+                    pass
+            except socket.timeout:
+                pass
+            self.close_connection = True
+            return False
+        return HTTP1RequestHandler.parse_request(self)
+
+
+def http1_server(handler=HTTP1RequestHandler):
+    httpd = compat_http_server.HTTPServer(('127.0.0.1', 0), handler)
+    httpd.headers = []
+    httpd.prefaces = 0
+    thread = threading.Thread(target=httpd.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return httpd
+
+
+def dash_download(port, params, count=8):
+    info_dict = {
+        'url': 'http://127.0.0.1:%d/manifest.mpd' % port,
+        'fragment_base_url': 'http://127.0.0.1:%d/' % port,
+        'fragments': [{'path': 'frag%d' % i} for i in range(1, count + 1)],
+    }
+    params = dict(params, logger=FakeLogger())
+    downloader = DashSegmentsFD(YoutubeDL(params), params)
+    filename = 'testfile.mp4'
+    try_rm(encodeFilename(filename))
+    try:
+        assert downloader.real_download(filename, info_dict)
+        with open(encodeFilename(filename), 'rb') as f:
+            return f.read()
+    finally:
+        try_rm(encodeFilename(filename))
+
+
+def expected_content(count=8):
+    return b''.join(fragment_body('/frag%d' % i) for i in range(1, count + 1))
+
+
+@unittest.skipUnless(http2_available(), 'h2 is not available')
+class TestHTTP2(unittest.TestCase):
+    def setUp(self):
+        self.server = H2Server()
+
+    def tearDown(self):
+        self.server.close()
+
+    def _request(self, path):
+        req = sanitized_Request('http://127.0.0.1:%d%s' % (self.server.port, path))
+        req.add_header(HTTP2_HEADER, '1')
+        return req
+
+    def test_urlopen(self):
+        ydl = YoutubeDL({'logger': FakeLogger()})
+        for path in ('/a', '/b?c=d'):
+            res = ydl.urlopen(self._request(path))
+            self.assertEqual(res.getcode(), 200)
+            self.assertEqual(res.info().get('Content-Length'), str(len(fragment_body(path))))
+            self.assertEqual(res.read(), fragment_body(path))
+        self.assertEqual(self.server.connections, 1)
+        headers = self.server.requests[-1]
+        self.assertEqual(headers[':path'], '/b?c=d')
+        self.assertEqual(headers[':authority'], '127.0.0.1:%d' % self.server.port)
+        self.assertIn('user-agent', headers)
+        self.assertNotIn(HTTP2_HEADER.lower(), headers)
+        # Cookies set over HTTP/2 are sent back
+        self.assertEqual(headers.get('cookie'), 'visited=yes')
+
+        with self.assertRaises(compat_urllib_error.HTTPError) as cm:
+            ydl.urlopen(self._request('/missing'))
+        self.assertEqual(cm.exception.code, 404)
+
+        # Only the requests asking for it go over HTTP/2
+        self.assertRaises(
+            compat_http_client.HTTPException, ydl.urlopen, 'http://127.0.0.1:%d/' % self.server.port)
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_concurrent_fragments(self):
+        content = dash_download(self.server.port, {'http2': True, 'concurrent_fragments': 4})
+        self.assertEqual(content, expected_content())
+        # Multiplexed over a single connection
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(len(self.server.requests), 8)
+        self.assertGreater(self.server.max_pending, 1)
+        self.assertLessEqual(self.server.max_pending, 4)
+
+
+class TestResponseHeaders(unittest.TestCase):
+    def test_cookies(self):
+        # As HTTPCookieProcessor handles the responses
+        headers = _response_headers([
+            ('Set-Cookie', 'a=1; Path=/'), ('Set-Cookie', 'b=2; Path=/'), ('Content-Length', '0')])
+        self.assertEqual(headers.get('Content-Length'), '0')
+        jar = compat_cookiejar.CookieJar()
+        jar.extract_cookies(
+            compat_urllib_response.addinfourl(io.BytesIO(b''), headers, 'http://example.com/', 200),
+            sanitized_Request('http://example.com/'))
+        self.assertEqual(sorted(cookie.name for cookie in jar), ['a', 'b'])
+
+
+class TestHTTP1Fallback(unittest.TestCase):
+    def setUp(self):
+        self.httpd = http1_server()
+        self.port = http_server_port(self.httpd)
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def test_fallback(self):
+        # Servers that do not speak HTTP/2 are downloaded from as usual
+        content = dash_download(self.port, {'http2': True})
+        self.assertEqual(content, expected_content())
+        for headers in self.httpd.headers:
+            self.assertNotIn(HTTP2_HEADER, headers)
+
+    def test_concurrent_fragments(self):
+        content = dash_download(self.port, {'concurrent_fragments': 3})
+        self.assertEqual(content, expected_content())
+        self.assertEqual(len(self.httpd.headers), 8)
+
+
+@unittest.skipUnless(http2_available(), 'h2 is not available')
+class TestHTTP2Timeout(unittest.TestCase):
+    def setUp(self):
+        self.httpd = http1_server(SilentHTTP2RequestHandler)
+        self.port = http_server_port(self.httpd)
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def test_fallback(self):
+        # Only the first fragment waits for the settings of the server, the
+        # connection being closed for the others to be served over HTTP/1.1
+        content = dash_download(self.port, {'http2': True, 'socket_timeout': 1, 'fragment_retries': 0})
+        self.assertEqual(content, expected_content())
+        self.assertEqual(self.httpd.prefaces, 1)
+        self.assertEqual(len(self.httpd.headers), 8)
+
+
+if __name__ == '__main__':
+    unittest.main()
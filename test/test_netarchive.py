@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+from __future__ import unicode_literals
+
+# Allow direct execution
+import os
+import sys
+import unittest
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import threading
+import zipfile
+
+from test.helper import http_server_port, try_rm
+from youtube_dl import YoutubeDL
+from youtube_dl.compat import (
+    compat_http_server,
+    compat_urllib_error,
+    compat_urllib_HTTPError,
+)
+from youtube_dl.utils import sanitized_Request
+
+TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class NetworkRequestHandler(compat_http_server.BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, code, body, headers={}, content_type='text/plain'):
+        self.send_response(code)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for k, v in headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.server.requests += 1
+        if self.path == '/redirect':
+            self.send_response(302)
+            self.send_header('Location', '/page?a=1')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+        elif self.path == '/media':
+            self._respond(200, b'\0' * 100000, content_type='video/mp4')
+        elif self.path.startswith('/page'):
+            self._respond(200, ('page %d' % self.server.requests).encode('utf-8'), {'X-Test': 'yes'})
+        else:
+            self._respond(404, b'not found')
+
+    def do_POST(self):
+        self.server.requests += 1
+        data = self.rfile.read(int(self.headers['Content-Length']))
+        self._respond(200, b'posted ' + data)
+
+
+class TestNetworkArchive(unittest.TestCase):
+    def setUp(self):
+        self.archive = os.path.join(TEST_DIR, 'testdata', 'network_archive_test.zip')
+        self.httpd = compat_http_server.HTTPServer(('127.0.0.1', 0), NetworkRequestHandler)
+        self.httpd.requests = 0
+        thread = threading.Thread(target=self.httpd.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    def tearDown(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        try_rm(self.archive)
+
+    def _url(self, path):
+        return 'http://127.0.0.1:%d%s' % (http_server_port(self.httpd), path)
+
+    def _exchanges(self, ydl):
+        results = []
+        for path in ('/redirect', '/page?a=1', '/page?t=123', '/missing'):
+            try:
+                res = ydl.urlopen(self._url(path))
+                results.append((res.geturl(), res.getcode(), res.info().get('X-Test'), res.read()))
+            except compat_urllib_HTTPError as err:
+                results.append((err.geturl(), err.code, None, err.read()))
+        res = ydl.urlopen(sanitized_Request(self._url('/form'), data=b'x=1'))
+        results.append((res.geturl(), res.getcode(), None, res.read()))
+        return results
+
+    def test_record_replay(self):
+        ydl = YoutubeDL({'record_network': self.archive})
+        recorded = self._exchanges(ydl)
+        self.assertEqual(recorded[0], (self._url('/page?a=1'), 200, 'yes', b'page 2'))
+        self.assertEqual(recorded[3][1:], (404, None, b'not found'))
+        self.assertEqual(recorded[4][3], b'posted x=1')
+        self.assertEqual(ydl._network_archive.requests, 5)
+        self.assertEqual(self.httpd.requests, 6)
+
+        ydl = YoutubeDL({'replay_network': self.archive})
+        self.assertEqual(self._exchanges(ydl), recorded)
+        self.assertEqual(self.httpd.requests, 6)
+        # Repeated requests get the last recorded response and unknown
+        # queries only fall back to unused responses for the same path
+        self.assertEqual(ydl.urlopen(self._url('/page?a=1')).read(), b'page 3')
+        self.assertEqual(ydl.urlopen(self._url('/redirect')).read(), b'page 2')
+        self.assertRaises(compat_urllib_error.URLError, ydl.urlopen, self._url('/page?t=456'))
+        self.assertRaises(compat_urllib_error.URLError, ydl.urlopen, self._url('/other'))
+        self.assertEqual(ydl._network_archive.requests, 9)
+        self.assertEqual(ydl._network_archive.misses, 2)
+
+    def test_media_not_recorded(self):
+        ydl = YoutubeDL({'record_network': self.archive})
+        self.assertEqual(ydl.urlopen(self._url('/media')).read(), b'\0' * 100000)
+        with zipfile.ZipFile(self.archive) as archive:
+            self.assertEqual(archive.namelist(), ['exchanges/000000.json'])
+        ydl = YoutubeDL({'replay_network': self.archive})
+        self.assertRaises(compat_urllib_error.URLError, ydl.urlopen, self._url('/media'))
+
+    def test_concurrent_recording(self):
+        ydl = YoutubeDL({'record_network': self.archive})
+
+        def fetch(n):
+            for i in range(5):
+                ydl.urlopen(self._url('/page?n=%d-%d' % (n, i))).read()
+
+        threads = [threading.Thread(target=fetch, args=(n,)) for n in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(ydl._network_archive.requests, 30)
+        with zipfile.ZipFile(self.archive) as archive:
+            self.assertIsNone(archive.testzip())
+            exchanges = [n for n in archive.namelist() if n.startswith('exchanges/')]
+        self.assertEqual(exchanges, ['exchanges/%06d.json' % i for i in range(30)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,10 +8,228 @@ import sys
 import unittest
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+import io
+import threading
+import time
+
+from test.helper import try_rm
+from youtube_dl.compat import compat_struct_pack
+from youtube_dl.downloader.ism import write_piff_header
 from youtube_dl.postprocessor import MetadataFromTitlePP
+from youtube_dl.postprocessor.pool import PostProcessingPool
+from youtube_dl.postprocessor.probe import probe_media
+from youtube_dl.utils import PostProcessingError
 
 
 class TestMetadataFromTitle(unittest.TestCase):
     def test_format_to_regex(self):
         pp = MetadataFromTitlePP(None, '%(title)s - %(artist)s')
         self.assertEqual(pp._titleregex, r'(?P<title>.+)\ \-\ (?P<artist>.+)')
+
+
+class TestPostProcessingPool(unittest.TestCase):
+    def test_ordered_reporting(self):
+        pool = PostProcessingPool(3)
+        reported = []
+
+        def job(n, delay):
+            def run():
+                time.sleep(delay)
+                return n
+            return run
+
+        for n, delay in enumerate((0.3, 0.1, 0.2, 0, 0.1)):
+            pool.submit(job(n, delay), reported.append)
+            self.assertTrue(len(pool._jobs) <= 3)
+        pool.join()
+        pool.shutdown()
+        self.assertEqual(reported, [0, 1, 2, 3, 4])
+
+    def test_errors(self):
+        pool = PostProcessingPool(2)
+        reported = []
+        started = threading.Event()
+
+        def fail():
+            # Once the last job is running
+            started.wait(5)
+            raise PostProcessingError('failed')
+
+        def last():
+            started.set()
+            return 3
+
+        with self.assertRaises(PostProcessingError):
+            pool.submit(lambda: 1, reported.append)
+            pool.submit(fail, reported.append)
+            pool.submit(last, reported.append)
+            pool.join()
+        self.assertEqual(reported, [1])
+        pool.shutdown()
+        # The jobs running after the failure are reported
+        self.assertEqual(reported, [1, 3])
+
+    def test_shutdown(self):
+        pool = PostProcessingPool(2)
+        reported = []
+        started = threading.Event()
+
+        def slow():
+            started.set()
+            time.sleep(0.2)
+            return 0
+
+        pool.submit(slow, reported.append)
+        started.wait()
+        pool.shutdown()
+        self.assertEqual(reported, [0])
+        self.assertEqual(pool._threads, [])
+        self.assertRaises(AssertionError, pool.submit, lambda: 1)
+
+
+def _ebml(element_id, payload):
+    # Element IDs are written with their marker, sizes on 8 bytes
+    return element_id + b'\x01' + compat_struct_pack('>Q', len(payload))[1:] + payload
+
+
+class TestProbe(unittest.TestCase):
+    FILENAME = 'probe-testfile'
+
+    def tearDown(self):
+        try_rm(self.FILENAME)
+
+    def probe(self, data):
+        with open(self.FILENAME, 'wb') as f:
+            f.write(data)
+        return probe_media(self.FILENAME)
+
+    def test_mp4(self):
+        stream = io.BytesIO()
+        write_piff_header(stream, {
+            'track_id': 1,
+            'fourcc': 'AACL',
+            'duration': 50000000,
+            'sampling_rate': 44100,
+        })
+        self.assertEqual(self.probe(stream.getvalue() + b'\0\0\0\x08mdat'), {
+            'container': 'mp4',
+            'major_brand': 'isml',
+            'brands': ['piff', 'iso2'],
+            'fragmented': True,
+            'duration': 5.0,
+            'streams': [{
+                'codec_type': 'audio',
+                'codec_name': 'aac',
+                'channels': 2,
+                'sample_rate': 44100,
+                'duration': 5.0,
+            }],
+        })
+
+        stream = io.BytesIO()
+        write_piff_header(stream, {
+            'track_id': 1,
+            'fourcc': 'H264',
+            'duration': 50000000,
+            'width': 1280,
+            'height': 720,
+            'codec_private_data': '00000001674d401f0000000168ee3c80',
+        })
+        info = self.probe(stream.getvalue())
+        self.assertEqual(info['streams'], [{
+            'codec_type': 'video',
+            'codec_name': 'h264',
+            'width': 1280,
+            'height': 720,
+            'duration': 5.0,
+        }])
+
+    def test_flv(self):
+        def tag(tag_type, data):
+            return (compat_struct_pack('>BI', tag_type, len(data))[0:1]
+                    + compat_struct_pack('>I', len(data))[1:]
+                    + b'\0' * 7 + data + b'\0' * 4)
+
+        def amf_string(s):
+            return compat_struct_pack('>H', len(s)) + s
+
+        metadata = (
+            b'\x02' + amf_string(b'onMetaData') + b'\x08' + compat_struct_pack('>I', 2)
+            + amf_string(b'duration') + b'\x00' + compat_struct_pack('>d', 12.5)
+            + amf_string(b'width') + b'\x00' + compat_struct_pack('>d', 640)
+            + amf_string(b'') + b'\x09')
+        data = (
+            b'FLV\x01\x05' + compat_struct_pack('>I', 9) + b'\0' * 4
+            + tag(18, metadata) + tag(9, b'\x17\x00') + tag(8, b'\xaf\x00'))
+        self.assertEqual(self.probe(data), {
+            'container': 'flv',
+            'duration': 12.5,
+            'streams': [{
+                'codec_type': 'audio',
+                'codec_name': 'aac',
+                'channels': 2,
+            }, {
+                'codec_type': 'video',
+                'codec_name': 'h264',
+                'width': 640,
+            }],
+        })
+
+    def test_webm(self):
+        data = _ebml(b'\x1a\x45\xdf\xa3', _ebml(b'\x42\x82', b'webm'))
+        data += _ebml(b'\x18\x53\x80\x67', (
+            _ebml(b'\x15\x49\xa9\x66', (
+                _ebml(b'\x2a\xd7\xb1', b'\x0f\x42\x40')
+                + _ebml(b'\x44\x89', compat_struct_pack('>d', 2500.0))))
+            + _ebml(b'\x16\x54\xae\x6b', (
+                _ebml(b'\xae', (
+                    _ebml(b'\x83', b'\x01') + _ebml(b'\x86', b'V_VP9')
+                    + _ebml(b'\xe0', _ebml(b'\xb0', b'\x02\x80') + _ebml(b'\xba', b'\x01\x68'))))
+                + _ebml(b'\xae', (
+                    _ebml(b'\x83', b'\x02') + _ebml(b'\x86', b'A_OPUS')
+                    + _ebml(b'\xe1', _ebml(b'\xb5', compat_struct_pack('>f', 48000.0)) + _ebml(b'\x9f', b'\x02'))))))
+            + _ebml(b'\x1f\x43\xb6\x75', b'')))
+        self.assertEqual(self.probe(data), {
+            'container': 'webm',
+            'duration': 2.5,
+            'streams': [{
+                'codec_type': 'video',
+                'codec_name': 'vp9',
+                'width': 640,
+                'height': 360,
+            }, {
+                'codec_type': 'audio',
+                'codec_name': 'opus',
+                'sample_rate': 48000,
+                'channels': 2,
+            }],
+        })
+
+    def test_mpegts(self):
+        def packet(pid, section):
+            payload = b'\x00' + section + b'\0' * 4  # pointer field, CRC
+            return (b'\x47' + compat_struct_pack('>H', 0x4000 | pid) + b'\x10'
+                    + payload + b'\xff' * (184 - len(payload)))
+
+        def section(table_id, body):
+            return compat_struct_pack('>BH', table_id, 0xb000 | (len(body) + 4))[:3] + body
+
+        pat = section(0, b'\x00\x01\xc1\x00\x00' + b'\x00\x01\xf0\x00')
+        pmt = section(2, (
+            b'\x00\x01\xc1\x00\x00' + b'\xe1\x00\xf0\x00'
+            + b'\x1b\xe1\x00\xf0\x00' + b'\x0f\xe1\x01\xf0\x00'))
+        self.assertEqual(self.probe(packet(0, pat) + packet(0x1000, pmt)), {
+            'container': 'mpegts',
+            'streams': [{
+                'codec_type': 'video',
+                'codec_name': 'h264',
+            }, {
+                'codec_type': 'audio',
+                'codec_name': 'aac',
+            }],
+        })
+
+    def test_unsupported(self):
+        self.assertIsNone(self.probe(b'ID3\x03\x00' + b'\0' * 100))
+        self.assertIsNone(self.probe(b'\0\0\0\x20ftypisom'))
+        self.assertIsNone(probe_media('nonexistent-probe-testfile'))
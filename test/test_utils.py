@@ -40,13 +40,16 @@ from youtube_dl.utils import (
     find_xpath_attr,
     fix_xml_ampersands,
     float_or_none,
+    FragmentList,
     get_element_by_class,
     get_element_by_attribute,
     get_elements_by_class,
     get_elements_by_attribute,
+    html_index,
     get_first,
     InAdvancePagedList,
     int_or_none,
+    iterparse_xml_children,
     intlist_to_bytes,
     is_html,
     join_nonempty,
@@ -111,6 +114,7 @@ from youtube_dl.utils import (
     xpath_attr,
     render_table,
     match_str,
+    compile_match_filter,
     parse_dfxp_time_expr,
     dfxp2srt,
     cli_option,
@@ -126,6 +130,7 @@ from youtube_dl.compat import (
     compat_setenv,
     compat_str,
     compat_urlparse,
+    compat_xml_parse_error,
 )
 
 
@@ -422,6 +427,25 @@ class TestUtil(unittest.TestCase):
         self.assertEqual(find_xpath_attr(doc, './/node', 'y', 'd'), doc[3])
         self.assertEqual(find_xpath_attr(doc, './/node', 'x', ''), doc[4])
 
+    def test_iterparse_xml_children(self):
+        doc = b'''<?xml version="1.0"?>
+            <root a="1"><first>\xc3\xa4</first><second><x/></second><third/></root>'''
+        stream = io.BytesIO(doc)
+        children = []
+        for root, child in iterparse_xml_children(stream, chunk_size=16):
+            self.assertEqual(root.get('a'), '1')
+            children.append(child.tag)
+            self.assertIn(child, list(root))
+            if child.tag == 'first':
+                self.assertEqual(child.text, 'ä')
+                # Children are yielded before the end of the document is read
+                self.assertLess(stream.tell(), len(doc))
+            root.remove(child)
+        self.assertEqual(children, ['first', 'second', 'third'])
+        self.assertEqual(len(root), 0)
+        self.assertRaises(
+            compat_xml_parse_error, list, iterparse_xml_children(io.BytesIO(b'<root><a></root>')))
+
     def test_xpath_with_ns(self):
         testxml = '''<root xmlns:media="http://example.com/">
             <media:song>
@@ -1359,6 +1383,32 @@ ffmpeg version 2.4.4 Copyright (c) 2000-2014 the FFmpeg ...'''), '2.4.4')
         self.assertTrue(match_str('title', {'title': ''}))
         self.assertFalse(match_str('!title', {'title': 'abc'}))
         self.assertFalse(match_str('!title', {'title': ''}))
+        self.assertTrue(match_str('x > 1 | y = foo', {'x': 0, 'y': 'foo'}))
+        self.assertFalse(match_str('x > 1 | y = foo', {'x': 0, 'y': 'bar'}))
+        self.assertTrue(match_str('x > 1 | y = foo & z', {'x': 2}))
+        self.assertFalse(match_str('(x > 1 | y = foo) & z', {'x': 2}))
+        self.assertTrue(match_str('(x > 1 | (y = foo)) & !z', {'y': 'foo'}))
+        self.assertTrue(match_str('title = "a & (b | c)"', {'title': 'a & (b | c)'}))
+        self.assertRaises(ValueError, match_str, 'x & ', {})
+        self.assertRaises(ValueError, match_str, '(x', {})
+        self.assertRaises(ValueError, match_str, 'x)', {})
+        self.assertRaises(ValueError, compile_match_filter, 'x < foo')
+
+    def test_compile_match_filter(self):
+        predicate = compile_match_filter('duration > 60 & title != foo')
+        self.assertTrue(predicate({'duration': 120, 'title': 'bar'}))
+        self.assertFalse(predicate({'duration': 120}))
+        self.assertIsNone(predicate({'duration': 120}, incomplete=True))
+        self.assertIsNone(predicate({'duration': None}, incomplete=True))
+        self.assertFalse(predicate({'duration': 30}, incomplete=True))
+        self.assertFalse(predicate({'title': 'foo'}, incomplete=True))
+        self.assertTrue(predicate({'duration': 120, 'title': 'bar'}, incomplete=True))
+
+        predicate = compile_match_filter('duration > 60 | like_count >? 10')
+        self.assertTrue(predicate({'duration': 120}, incomplete=True))
+        self.assertIsNone(predicate({'duration': 30}, incomplete=True))
+        self.assertTrue(predicate({'duration': 30}))
+        self.assertFalse(predicate({'duration': 30, 'like_count': 5}, incomplete=True))
 
     def test_parse_dfxp_time_expr(self):
         self.assertEqual(parse_dfxp_time_expr(None), None)
@@ -1611,6 +1661,28 @@ Line 1
         self.assertEqual(get_elements_by_attribute('class', 'foo', html), [])
         self.assertEqual(get_elements_by_attribute('class', 'no-such-foo', html), [])
 
+    def test_html_index(self):
+        self.assertIsNone(html_index('<meta name="a" content="b">'))
+        padding = '<p>%s</p>' % ('x' * 20000)
+        html = (
+            '<META name="a" content="1">' + padding + '<meta name="a" content="2">'
+            '<input type="hidden"><script>1</script><span class="foo">nice</span>')
+        index = html_index(html)
+        self.assertIs(html_index(html), index)
+        self.assertIsNot(html_index(html + ' '), index)
+        self.assertEqual(len(index.positions('meta')), 2)
+        self.assertEqual(len(index.positions('input')), 1)
+        self.assertEqual(index.positions('link'), [])
+        pattern = r'<meta name="a" content="(\d)">'
+        self.assertEqual(
+            [m.group(1) for m in index.finditer(pattern, 'meta', re.I)],
+            [m.group(1) for m in re.finditer(pattern, html, re.I)])
+        self.assertEqual(index.search(pattern, 'meta').group(1), '2')
+        self.assertEqual(index.memoize('key', lambda: 1), 1)
+        self.assertEqual(index.memoize('key', lambda: 2), 1)
+        self.assertEqual(get_elements_by_class('foo', html), ['nice'])
+        self.assertEqual(get_elements_by_class('bar', html), [])
+
     def test_clean_podcast_url(self):
         self.assertEqual(clean_podcast_url('https://www.podtrac.com/pts/redirect.mp3/chtbl.com/track/5899E/traffic.megaphone.fm/HSW7835899191.mp3'), 'https://traffic.megaphone.fm/HSW7835899191.mp3')
         self.assertEqual(clean_podcast_url('https://play.podtrac.com/npr-344098539/edge1.pod.npr.org/anon.npr-podcasts/podcast/npr/waitwait/2020/10/20201003_waitwait_wwdtmpodcast201003-015621a5-f035-4eca-a9a1-7c118d90bc3c.mp3'), 'https://edge1.pod.npr.org/anon.npr-podcasts/podcast/npr/waitwait/2020/10/20201003_waitwait_wwdtmpodcast201003-015621a5-f035-4eca-a9a1-7c118d90bc3c.mp3')
@@ -1660,6 +1732,40 @@ Line 1
         ll = reversed(ll)
         test(ll, -15, 14, range(15))
 
+    def test_FragmentList(self):
+        fragments = FragmentList(
+            3, template='%(Number)d/%(Time)d-%(Bandwidth)d.m4s', start_number=5,
+            times=[0, 10, 20], bandwidth=1000, durations=[1.0, 1.0, 0.5],
+            head=[{'path': 'init.mp4'}])
+        expected = [
+            {'path': 'init.mp4'},
+            {'path': '5/0-1000.m4s', 'duration': 1.0},
+            {'path': '6/10-1000.m4s', 'duration': 1.0},
+            {'path': '7/20-1000.m4s', 'duration': 0.5},
+        ]
+        self.assertEqual(len(fragments), 4)
+        self.assertEqual(list(fragments), expected)
+        self.assertEqual([fragments[i] for i in range(-4, 4)], expected * 2)
+        self.assertEqual(fragments[1:3], expected[1:3])
+        self.assertEqual(fragments, expected)
+        self.assertNotEqual(fragments, expected[:3])
+        self.assertRaises(IndexError, lambda: fragments[4])
+        # Built fragments are not kept
+        fragments[0]['path'] = 'other.mp4'
+        self.assertEqual(fragments[0], expected[0])
+
+        fragments = FragmentList(
+            2, locations=['http://example.com/a', 'b', 'c'], duration=2.0)
+        self.assertEqual(list(fragments), [
+            {'url': 'http://example.com/a', 'duration': 2.0},
+            {'path': 'b', 'duration': 2.0},
+        ])
+        self.assertEqual(FragmentList(1, template='http://example.com/%(Number)d'), [
+            {'url': 'http://example.com/1'}])
+        self.assertFalse(FragmentList(0, locations=[]))
+        # Template errors are raised when building the list
+        self.assertRaises(KeyError, FragmentList, 1, template='%(Time)d')
+
     def test_try_call(self):
         def total(*x, **kwargs):
             return sum(x) + sum(kwargs.values())
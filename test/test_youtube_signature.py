@@ -9,6 +9,7 @@ import unittest
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import re
+import shutil
 import string
 
 from youtube_dl.compat import (
@@ -184,6 +185,52 @@ class TestPlayerInfo(unittest.TestCase):
             self.assertEqual(player_id, expected_player_id)
 
 
+class TestPlayerCache(unittest.TestCase):
+    PLAYER_URL = 'https://www.youtube.com/s/player/0123abcd/player_ias.vflset/en_US/base.js'
+    PLAYER_CODE = '''
+        var Xy={ab:function(a){a.reverse()},cd:function(a,b){a.splice(0,b)}};
+        var sig=function(a){a=a.split("");Xy.ab(a,1);Xy.cd(a,2);return a.join("")};
+        c&&d.set(b,encodeURIComponent(sig(c)));
+        var nfn=function(a){var b=a.split("");b.reverse();return b.join("")};
+        a.get("n"))&&(b=nfn(c),d.set("n",b));
+        signatureTimestamp:19876
+    '''
+
+    def setUp(self):
+        TEST_DIR = os.path.dirname(os.path.abspath(__file__))
+        self.cachedir = os.path.join(TEST_DIR, 'testdata', 'player_cache_test')
+        self.tearDown()
+        self.downloads = []
+
+    def tearDown(self):
+        if os.path.exists(self.cachedir):
+            shutil.rmtree(self.cachedir)
+
+    def _ie(self):
+        ie = YoutubeIE(FakeYDL({'cachedir': self.cachedir, 'verbose': False}))
+
+        def download_webpage(url, *args, **kwargs):
+            self.downloads.append(url)
+            return self.PLAYER_CODE
+        ie._download_webpage = download_webpage
+        return ie
+
+    def test_shared_player_cache(self):
+        ie = self._ie()
+        self.assertEqual(ie._decrypt_signature('abcdefgh', 'id', self.PLAYER_URL), 'fedcba')
+        self.assertEqual(ie._n_descramble('abcDEF123', self.PLAYER_URL, 'id'), '321FEDcba')
+        self.assertEqual(self.downloads, [self.PLAYER_URL])
+
+        # Other instances, as in other processes, use the shared cache
+        ie = self._ie()
+        self.assertEqual(ie._decrypt_signature('12345678', 'id', self.PLAYER_URL), '654321')
+        self.assertEqual(ie._extract_signature_timestamp('id', self.PLAYER_URL), 19876)
+        self.assertEqual(self.downloads, [self.PLAYER_URL])
+        # Results of seen n challenges are reused without the n function
+        ie._extract_n_function = None
+        self.assertEqual(ie._n_descramble('abcDEF123', self.PLAYER_URL, 'id'), '321FEDcba')
+
+
 class TestSignature(unittest.TestCase):
     def setUp(self):
         TEST_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -4,9 +4,11 @@
 from __future__ import absolute_import, unicode_literals
 
 import collections
+import contextlib
 import copy
 import datetime
 import errno
+import functools
 import io
 import itertools
 import json
@@ -29,7 +31,6 @@ try:
 except ImportError:
     # Must be Python 2.6, should be built against 1.0.2
     OPENSSL_VERSION = 'OpenSSL 1.0.2(?)'
-from string import ascii_letters
 
 from .compat import (
     compat_basestring,
@@ -70,6 +71,7 @@ from .utils import (
     ExtractorError,
     format_bytes,
     formatSeconds,
+    FragmentList,
     GeoRestrictedError,
     int_or_none,
     ISO3166Utils,
@@ -79,6 +81,7 @@ from .utils import (
     make_HTTPS_handler,
     MaxDownloadsReached,
     orderedSet,
+    OutputTemplate,
     PagedList,
     parse_filesize,
     PerRequestProxyHandler,
@@ -91,7 +94,6 @@ from .utils import (
     render_table,
     replace_extension,
     SameFileError,
-    sanitize_filename,
     sanitize_path,
     sanitize_url,
     sanitized_Request,
@@ -110,11 +112,24 @@ from .utils import (
     YoutubeDLRedirectHandler,
     ytdl_is_updateable,
 )
-from .cache import Cache
+from .cache import (
+    Cache,
+    ResponseCache,
+)
+from .connect import get_connector
+from .http2 import (
+    YoutubeDLHTTP2Handler,
+    http2_available,
+)
+from .netarchive import (
+    NetworkRecorder,
+    NetworkReplayer,
+)
 from .extractor import get_info_extractor, gen_extractor_classes, _LAZY_LOADER
 from .extractor.openload import PhantomJSwrapper
 from .downloader import get_suitable_downloader
 from .downloader.rtmp import rtmpdump_version
+from .downloader.streammerge import FFmpegStreamMergeFD
 from .postprocessor import (
     FFmpegFixupM3u8PP,
     FFmpegFixupM4aPP,
@@ -123,6 +138,7 @@ from .postprocessor import (
     FFmpegPostProcessor,
     get_postprocessor,
 )
+from .postprocessor.pool import PostProcessingPool
 from .version import __version__
 
 if compat_os_name == 'nt':
@@ -205,11 +221,28 @@ class YoutubeDL(object):
     listsubtitles:     Lists all available subtitles for the video
     subtitlesformat:   The format code for subtitles
     subtitleslangs:    List of languages of the subtitles to download
+    max_sidecar_workers: Number of background threads writing the description,
+                       annotations, subtitles, info JSON and thumbnails of a
+                       video, while it is being downloaded unless a rate
+                       limit is set; 0 or None to write them one after another
+                       before the download. Ignored if sleep_interval is set.
     keepvideo:         Keep the video file after post-processing
     daterange:         A DateRange object, download only if the upload_date is in the range.
     skip_download:     Skip the actual download of the video file
     cachedir:          Location of the cache files in the filesystem.
                        False to disable filesystem cache.
+    cache_backend:     How the cache stores its entries: 'sqlite' (default if
+                       the sqlite3 module is available) for a single database
+                       file, or 'files' for a JSON file per entry.
+    cache_max_size:    Maximum size in bytes of the entries of the 'sqlite'
+                       cache backend (default 64 MiB).
+    response_cache:    Cache the HTTP responses downloaded by extractors in
+                       the cache directory and revalidate them when they are
+                       requested again (see ResponseCache in cache.py).
+    response_cache_max_size:
+                       Maximum size in bytes of the cached response bodies
+                       (default 100 MiB). Least recently used responses are
+                       evicted first.
     noplaylist:        Download single video instead of a playlist if in doubt.
     age_limit:         An integer representing the user's age in years.
                        Unsuitable videos for the given age are skipped.
@@ -236,6 +269,10 @@ class YoutubeDL(object):
     bidi_workaround:   Work around buggy terminals without bidirectional text
                        support, using fridibi
     debug_printtraffic:Print out sent and received HTTP traffic
+    record_network:    Record the HTTP exchanges of urlopen to this network
+                       archive file (see NetworkRecorder in netarchive.py).
+    replay_network:    Serve the HTTP exchanges recorded in this network
+                       archive file instead of using the network.
     include_ads:       Download ads as well
     default_search:    Prepend this string if an input url is not valid.
                        'auto' for elaborate guessing
@@ -269,6 +306,9 @@ class YoutubeDL(object):
                                          downloaded video fragment.
                        * fragment_count: The number of fragments (= individual
                                          files that will be merged)
+                       * retry_count: The number of retries so far
+                       * retry_wait: The number of seconds waited before
+                                     retries so far
 
                        Progress hooks are guaranteed to be called at least once
                        (with status "finished") if the download is successful.
@@ -280,6 +320,12 @@ class YoutubeDL(object):
                        - "detect_or_warn": check whether we can do anything
                                            about it, warn otherwise (default)
     source_address:    Client-side IP address to bind to.
+    dns_cache_ttl:     Seconds to keep the addresses of host names (default: 60),
+                       0 not to cache them. The cache is shared by the
+                       YoutubeDL instances of the process.
+    http2:             Download the fragments over HTTP/2 when the server
+                       supports it, with a single connection per host
+                       (needs the h2 package).
     call_home:         Boolean, true iff we are allowed to contact the
                        youtube-dl servers for debugging.
     sleep_interval:    Number of seconds to sleep before each download when
@@ -298,7 +344,9 @@ class YoutubeDL(object):
                        every video.
                        If it returns a message, the video is ignored.
                        If it returns None, the video is downloaded.
-                       match_filter_func in utils.py is one example for this.
+                       match_filter_func in utils.py is one example for this;
+                       the filters it builds are also applied to playlist
+                       entries before they are extracted.
     no_color:          Do not emit color codes in output.
     geo_bypass:        Bypass geographic restriction via faking X-Forwarded-For
                        HTTP header
@@ -319,10 +367,12 @@ class YoutubeDL(object):
 
     The following parameters are not used by YoutubeDL itself, they are used by
     the downloader (see youtube_dl/downloader/common.py):
-    nopart, updatetime, buffersize, ratelimit, min_filesize, max_filesize, test,
-    noresizebuffer, retries, continuedl, noprogress, consoletitle,
+    nopart, updatetime, buffersize, ratelimit, ratelimit_burst,
+    ratelimit_hosts, min_filesize, max_filesize, test,
+    noresizebuffer, retries, retry_sleep, max_retry_sleep, continuedl,
+    noprogress, consoletitle, concurrent_fragments, live_from_start,
     xattr_set_filesize, external_downloader_args, hls_use_mpegts,
-    http_chunk_size.
+    hls_byterange_size, http_chunk_size.
 
     The following options are used by the post processors:
     prefer_ffmpeg:     If False, use avconv instead of ffmpeg if both are available,
@@ -331,6 +381,12 @@ class YoutubeDL(object):
                        to the binary or its containing directory.
     postprocessor_args: A list of additional command-line arguments for the
                         postprocessor.
+    stream_merge:      Merge the requested formats with ffmpeg while they are
+                       being downloaded instead of writing them to separate
+                       files first (not possible when resuming a download).
+    max_pp_workers:    Number of background threads running the postprocessors
+                       while the following videos are downloaded; 0 or None
+                       to post-process each file before the next download.
 
     The following options are used by the Youtube extractor:
     youtube_include_dash_manifest: If True (default), DASH manifests and related
@@ -358,6 +414,9 @@ class YoutubeDL(object):
     _playlist_level = 0
     _playlist_urls = set()
     _screen_file = None
+    _pp_pool = None
+    _sidecar_pool = None
+    _outtmpl = None
 
     def __init__(self, params=None, auto_init=True):
         """Create a FileDownloader object with the given options."""
@@ -377,6 +436,7 @@ class YoutubeDL(object):
         }
         self.params.update(params)
         self.cache = Cache(self)
+        self.response_cache = ResponseCache(self)
 
         self._header_cookies = []
         self._load_cookies_from_headers(self.params.get('http_headers'))
@@ -440,6 +500,12 @@ class YoutubeDL(object):
 
         self._setup_opener()
 
+        self._network_archive = None
+        if self.params.get('replay_network'):
+            self._network_archive = NetworkReplayer(self.params['replay_network'])
+        elif self.params.get('record_network'):
+            self._network_archive = NetworkRecorder(self.params['record_network'])
+
         if auto_init:
             self.print_debug_header()
             self.add_default_info_extractors()
@@ -583,6 +649,7 @@ class YoutubeDL(object):
 
     def __exit__(self, *args):
         self.restore_console_title()
+        self.print_debug_footer()
 
         if self.params.get('cookiefile') is not None:
             self.cookiejar.save(ignore_discard=True, ignore_expires=True)
@@ -678,84 +745,41 @@ class YoutubeDL(object):
         except UnicodeEncodeError:
             self.to_screen('[download] The file has already been downloaded')
 
+    def _output_template(self):
+        """ Return the OutputTemplate for the current parameters """
+        autonumber_size = self.params.get('autonumber_size')
+        if autonumber_size is None:
+            autonumber_size = 5
+        key = (
+            self.params.get('outtmpl', DEFAULT_OUTTMPL),
+            self.params.get('restrictfilenames'),
+            self.params.get('outtmpl_na_placeholder', 'NA'),
+            autonumber_size)
+        if self._outtmpl is None or self._outtmpl[0] != key:
+            self._outtmpl = key, OutputTemplate(
+                key[0], numeric_fields=self._NUMERIC_FIELDS, restricted=key[1],
+                na_placeholder=key[2], autonumber_size=key[3])
+        return self._outtmpl[1]
+
     def prepare_filename(self, info_dict):
         """Generate the output filename."""
         try:
-            template_dict = dict(info_dict)
-
-            template_dict['epoch'] = int(time.time())
-            autonumber_size = self.params.get('autonumber_size')
-            if autonumber_size is None:
-                autonumber_size = 5
-            template_dict['autonumber'] = self.params.get('autonumber_start', 1) - 1 + self._num_downloads
-            if template_dict.get('resolution') is None:
-                if template_dict.get('width') and template_dict.get('height'):
-                    template_dict['resolution'] = '%dx%d' % (template_dict['width'], template_dict['height'])
-                elif template_dict.get('height'):
-                    template_dict['resolution'] = '%sp' % template_dict['height']
-                elif template_dict.get('width'):
-                    template_dict['resolution'] = '%dx?' % template_dict['width']
-
-            sanitize = lambda k, v: sanitize_filename(
-                compat_str(v),
-                restricted=self.params.get('restrictfilenames'),
-                is_id=(k == 'id' or k.endswith('_id')))
-            template_dict = dict((k, v if isinstance(v, compat_numeric_types) else sanitize(k, v))
-                                 for k, v in template_dict.items()
-                                 if v is not None and not isinstance(v, (list, tuple, dict)))
-            template_dict = collections.defaultdict(lambda: self.params.get('outtmpl_na_placeholder', 'NA'), template_dict)
-
-            outtmpl = self.params.get('outtmpl', DEFAULT_OUTTMPL)
-
-            # For fields playlist_index and autonumber convert all occurrences
-            # of %(field)s to %(field)0Nd for backward compatibility
-            field_size_compat_map = {
-                'playlist_index': len(str(template_dict['n_entries'])),
-                'autonumber': autonumber_size,
-            }
-            FIELD_SIZE_COMPAT_RE = r'(?<!%)%\((?P<field>autonumber|playlist_index)\)s'
-            mobj = re.search(FIELD_SIZE_COMPAT_RE, outtmpl)
-            if mobj:
-                outtmpl = re.sub(
-                    FIELD_SIZE_COMPAT_RE,
-                    r'%%(\1)0%dd' % field_size_compat_map[mobj.group('field')],
-                    outtmpl)
-
-            # Missing numeric fields used together with integer presentation types
-            # in format specification will break the argument substitution since
-            # string NA placeholder is returned for missing fields. We will patch
-            # output template for missing fields to meet string presentation type.
-            for numeric_field in self._NUMERIC_FIELDS:
-                if numeric_field not in template_dict:
-                    # As of [1] format syntax is:
-                    #  %[mapping_key][conversion_flags][minimum_width][.precision][length_modifier]type
-                    # 1. https://docs.python.org/2/library/stdtypes.html#string-formatting
-                    FORMAT_RE = r'''(?x)
-                        (?<!%)
-                        %
-                        \({0}\)  # mapping key
-                        (?:[#0\-+ ]+)?  # conversion flags (optional)
-                        (?:\d+)?  # minimum field width (optional)
-                        (?:\.\d+)?  # precision (optional)
-                        [hlL]?  # length modifier (optional)
-                        [diouxXeEfFgGcrs%]  # conversion type
-                    '''
-                    outtmpl = re.sub(
-                        FORMAT_RE.format(numeric_field),
-                        r'%({0})s'.format(numeric_field), outtmpl)
-
-            # expand_path translates '%%' into '%' and '$$' into '$'
-            # correspondingly that is not what we want since we need to keep
-            # '%%' intact for template dict substitution step. Working around
-            # with boundary-alike separator hack.
-            sep = ''.join([random.choice(ascii_letters) for _ in range(32)])
-            outtmpl = outtmpl.replace('%%', '%{0}%'.format(sep)).replace('$$', '${0}$'.format(sep))
-
-            # outtmpl should be expand_path'ed before template dict substitution
-            # because meta fields may contain env variables we don't want to
-            # be expanded. For example, for outtmpl "%(title)s.%(ext)s" and
-            # title "Hello $PATH", we don't want `$PATH` to be expanded.
-            filename = expand_path(outtmpl).replace(sep, '') % template_dict
+            outtmpl = self._output_template()
+
+            extra_fields = {}
+            if 'epoch' in outtmpl.fields:
+                extra_fields['epoch'] = int(time.time())
+            if 'autonumber' in outtmpl.fields:
+                extra_fields['autonumber'] = self.params.get('autonumber_start', 1) - 1 + self._num_downloads
+            if 'resolution' in outtmpl.fields and info_dict.get('resolution') is None:
+                if info_dict.get('width') and info_dict.get('height'):
+                    extra_fields['resolution'] = '%dx%d' % (info_dict['width'], info_dict['height'])
+                elif info_dict.get('height'):
+                    extra_fields['resolution'] = '%sp' % info_dict['height']
+                elif info_dict.get('width'):
+                    extra_fields['resolution'] = '%dx?' % info_dict['width']
+
+            filename = outtmpl.format(info_dict, extra_fields)
 
             # Temporary fix for #4787
             # 'Treat' all problem characters by passing filename through preferredencoding
@@ -1177,6 +1201,8 @@ class YoutubeDL(object):
             }
 
             reason = self._match_entry(entry, incomplete=True)
+            if reason is None:
+                reason = self._match_playlist_entry(entry, extra)
             if reason is not None:
                 self.to_screen('[download] ' + reason)
                 continue
@@ -1188,6 +1214,30 @@ class YoutubeDL(object):
         self.to_screen('[download] Finished downloading playlist: %s' % playlist)
         return ie_result
 
+    def _match_playlist_entry(self, entry, extra):
+        """ Apply the match filter to a playlist entry before it is extracted
+
+        Only filters built by match_filter_func can do this: the entry is
+        rejected if it fails the filter with the fields already known (those
+        of a flat entry plus the playlist ones), whatever the missing fields
+        turn out to be.
+        """
+        match_incomplete = getattr(
+            self.params.get('match_filter'), 'match_incomplete', None)
+        if match_incomplete is None or entry.get('_type') in ('playlist', 'multi_video'):
+            return None
+        fields = dict(
+            (key, value) for key, value in extra.items()
+            if key == 'n_entries' or key.startswith('playlist'))
+        if entry.get('_type') in ('url', 'url_transparent'):
+            # The URL and extractor key of a reference are not those of
+            # the resulting video
+            entry = dict(
+                (key, value) for key, value in entry.items()
+                if key not in ('_type', 'url', 'ie_key'))
+        fields.update(entry)
+        return match_incomplete(fields)
+
     @__handle_extraction_exceptions
     def __process_iterable_entry(self, entry, download, extra_info):
         return self.process_ie_result(
@@ -1963,78 +2013,10 @@ class YoutubeDL(object):
         if not ensure_dir_exists(sanitize_path(encodeFilename(filename))):
             return
 
-        if self.params.get('writedescription', False):
-            descfn = replace_extension(filename, 'description', info_dict.get('ext'))
-            if self.params.get('nooverwrites', False) and os.path.exists(encodeFilename(descfn)):
-                self.to_screen('[info] Video description is already present')
-            elif info_dict.get('description') is None:
-                self.report_warning('There\'s no description to write.')
-            else:
-                try:
-                    self.to_screen('[info] Writing video description to: ' + descfn)
-                    with open(encodeFilename(descfn), 'w', encoding='utf-8') as descfile:
-                        descfile.write(info_dict['description'])
-                except (OSError, IOError):
-                    self.report_error('Cannot write description file ' + descfn)
-                    return
-
-        if self.params.get('writeannotations', False):
-            annofn = replace_extension(filename, 'annotations.xml', info_dict.get('ext'))
-            if self.params.get('nooverwrites', False) and os.path.exists(encodeFilename(annofn)):
-                self.to_screen('[info] Video annotations are already present')
-            elif not info_dict.get('annotations'):
-                self.report_warning('There are no annotations to write.')
-            else:
-                try:
-                    self.to_screen('[info] Writing video annotations to: ' + annofn)
-                    with open(encodeFilename(annofn), 'w', encoding='utf-8') as annofile:
-                        annofile.write(info_dict['annotations'])
-                except (KeyError, TypeError):
-                    self.report_warning('There are no annotations to write.')
-                except (OSError, IOError):
-                    self.report_error('Cannot write annotations file: ' + annofn)
-                    return
-
-        subtitles_are_requested = any([self.params.get('writesubtitles', False),
-                                       self.params.get('writeautomaticsub')])
-
-        if subtitles_are_requested and info_dict.get('requested_subtitles'):
-            # subtitles download errors are already managed as troubles in relevant IE
-            # that way it will silently go on when used with unsupporting IE
-            subtitles = info_dict['requested_subtitles']
-            ie = self.get_info_extractor(info_dict['extractor_key'])
-            for sub_lang, sub_info in subtitles.items():
-                sub_format = sub_info['ext']
-                sub_filename = subtitles_filename(filename, sub_lang, sub_format, info_dict.get('ext'))
-                if self.params.get('nooverwrites', False) and os.path.exists(encodeFilename(sub_filename)):
-                    self.to_screen('[info] Video subtitle %s.%s is already present' % (sub_lang, sub_format))
-                else:
-                    self.to_screen('[info] Writing video subtitles to: ' + sub_filename)
-                    if sub_info.get('data') is not None:
-                        try:
-                            # Use newline='' to prevent conversion of newline characters
-                            # See https://github.com/ytdl-org/youtube-dl/issues/10268
-                            with open(encodeFilename(sub_filename), 'w', encoding='utf-8', newline='') as subfile:
-                                subfile.write(sub_info['data'])
-                        except (OSError, IOError):
-                            self.report_error('Cannot write subtitles file ' + sub_filename)
-                            return
-                    else:
-                        try:
-                            sub_data = ie._request_webpage(
-                                sub_info['url'], info_dict['id'], note=False).read()
-                            with open(encodeFilename(sub_filename), 'wb') as subfile:
-                                subfile.write(sub_data)
-                        except (ExtractorError, IOError, OSError, ValueError) as err:
-                            self.report_warning('Unable to download subtitle for "%s": %s' %
-                                                (sub_lang, error_to_compat_str(err)))
-                            continue
-
-        self._write_info_json(
-            'video description', info_dict,
-            replace_extension(filename, 'info.json', info_dict.get('ext')))
-
-        self._write_thumbnails(info_dict, filename)
+        wait_for_sidecars = self._start_sidecar_writers(
+            self._sidecar_writers(info_dict, filename))
+        if not self._overlap_sidecar_writes() and not wait_for_sidecars():
+            return
 
         if not self.params.get('skip_download', False):
             try:
@@ -2047,17 +2029,20 @@ class YoutubeDL(object):
                                             'ignoring --external-downloader-args.')
                     return dler
 
-                def dl(name, info):
-                    fd = checked_get_suitable_downloader(info, self.params)(self, self.params)
+                def dl_info(info):
+                    new_info = dict((k, v) for k, v in info.items() if not k.startswith('__p'))
+                    new_info['http_headers'] = self._calc_headers(new_info)
+                    return new_info
+
+                def dl(name, info, fd=None):
+                    if fd is None:
+                        fd = checked_get_suitable_downloader(info, self.params)(self, self.params)
                     for ph in self._progress_hooks:
                         fd.add_progress_hook(ph)
                     if self.params.get('verbose'):
                         self.to_screen('[debug] Invoking downloader on %r' % info.get('url'))
 
-                    new_info = dict((k, v) for k, v in info.items() if not k.startswith('__p'))
-                    new_info['http_headers'] = self._calc_headers(new_info)
-
-                    return fd.download(name, new_info)
+                    return fd.download(name, dl_info(info))
 
                 if info_dict.get('requested_formats') is not None:
                     downloaded = []
@@ -2103,6 +2088,7 @@ class YoutubeDL(object):
                             '[download] %s has already been downloaded and '
                             'merged' % filename)
                     else:
+                        formats_info = []
                         for f in requested_formats:
                             new_info = dict(info_dict)
                             new_info.update(f)
@@ -2111,11 +2097,38 @@ class YoutubeDL(object):
                                 'f%s' % f['format_id'], new_info['ext'])
                             if not ensure_dir_exists(fname):
                                 return
-                            downloaded.append(fname)
-                            partial_success = dl(fname, new_info)
-                            success = success and partial_success
-                        info_dict['__postprocessors'] = postprocessors
-                        info_dict['__files_to_merge'] = downloaded
+                            new_info['_filename'] = fname
+                            formats_info.append(new_info)
+
+                        streamed = False
+                        # Live formats end together, they cannot be
+                        # downloaded one after the other
+                        live = all(f.get('is_live') for f in formats_info)
+                        if postprocessors and (live or self.params.get('stream_merge')):
+                            merge_fd = FFmpegStreamMergeFD(self, self.params)
+                            if merge_fd.can_merge(formats_info):
+                                success = streamed = dl(filename, dict(
+                                    info_dict,
+                                    requested_formats=[dl_info(f) for f in formats_info]),
+                                    fd=merge_fd)
+                                if not streamed:
+                                    self.report_warning(
+                                        'Unable to merge formats while downloading, '
+                                        'downloading them separately')
+                            elif live:
+                                self.report_warning(
+                                    'Unable to merge the live formats while downloading, '
+                                    'downloading them one after the other')
+
+                        if not streamed:
+                            success = True
+                            for new_info in formats_info:
+                                fname = new_info['_filename']
+                                downloaded.append(fname)
+                                partial_success = dl(fname, new_info)
+                                success = success and partial_success
+                            info_dict['__postprocessors'] = postprocessors
+                            info_dict['__files_to_merge'] = downloaded
                 else:
                     # Just a single file
                     success = dl(filename, info_dict)
@@ -2191,12 +2204,9 @@ class YoutubeDL(object):
                     else:
                         assert fixup_policy in ('ignore', 'never')
 
-                try:
-                    self.post_process(filename, info_dict)
-                except (PostProcessingError) as err:
-                    self.report_error('postprocessing: %s' % error_to_compat_str(err))
+                if not wait_for_sidecars():
                     return
-                self.record_download_archive(info_dict)
+                self._run_post_processing(filename, info_dict)
                 # avoid possible nugatory search for further items (PR #26638)
                 if self._num_downloads >= max_downloads:
                     raise MaxDownloadsReached()
@@ -2210,19 +2220,20 @@ class YoutubeDL(object):
                 and self.params.get('max_downloads') != 1):
             raise SameFileError(outtmpl)
 
-        for url in url_list:
-            try:
-                # It also downloads the videos
-                res = self.extract_info(
-                    url, force_generic_extractor=self.params.get('force_generic_extractor', False))
-            except UnavailableVideoError:
-                self.report_error('unable to download video')
-            except MaxDownloadsReached:
-                self.to_screen('[info] Maximum number of downloaded files reached.')
-                raise
-            else:
-                if self.params.get('dump_single_json', False):
-                    self.to_stdout(json.dumps(self.sanitize_info(res)))
+        with self._background_post_processing(), self._background_sidecar_writes():
+            for url in url_list:
+                try:
+                    # It also downloads the videos
+                    res = self.extract_info(
+                        url, force_generic_extractor=self.params.get('force_generic_extractor', False))
+                except UnavailableVideoError:
+                    self.report_error('unable to download video')
+                except MaxDownloadsReached:
+                    self.to_screen('[info] Maximum number of downloaded files reached.')
+                    raise
+                else:
+                    if self.params.get('dump_single_json', False):
+                        self.to_stdout(json.dumps(self.sanitize_info(res)))
 
         return self._download_retcode
 
@@ -2230,7 +2241,8 @@ class YoutubeDL(object):
         with open(info_filename, encoding='utf-8') as f:
             info = self.filter_requested_info(json.load(f))
         try:
-            self.process_ie_result(info, download=True)
+            with self._background_post_processing(), self._background_sidecar_writes():
+                self.process_ie_result(info, download=True)
         except DownloadError:
             webpage_url = info.get('webpage_url')
             if webpage_url is not None:
@@ -2240,6 +2252,210 @@ class YoutubeDL(object):
                 raise
         return self._download_retcode
 
+    @contextlib.contextmanager
+    def _background_post_processing(self):
+        """Run the postprocessors of the downloads made in this context in
+        background threads if max_pp_workers is set"""
+        max_workers = int_or_none(self.params.get('max_pp_workers'))
+        if (not max_workers or max_workers < 1 or self._pp_pool is not None
+                or not PostProcessingPool.available()):
+            yield
+            return
+
+        self._pp_pool = pool = PostProcessingPool(max_workers)
+        try:
+            yield
+            pool.join()
+        except MaxDownloadsReached as err:
+            # Files already downloaded must still be post-processed, their
+            # errors, already reported, not hiding that the limit was reached
+            try:
+                pool.join()
+            except Exception:
+                pass
+            raise err
+        except BaseException:
+            pool.shutdown()
+            raise
+        finally:
+            self._pp_pool = None
+            pool.shutdown()
+
+    def _run_post_processing(self, filename, info_dict):
+        """Post-process a downloaded file and record it in the download
+        archive once it has been post-processed successfully"""
+        def post_process():
+            try:
+                self.post_process(filename, info_dict)
+            except PostProcessingError as err:
+                self.report_error('postprocessing: %s' % error_to_compat_str(err))
+                return False
+            return True
+
+        def finish(success):
+            if success:
+                self.record_download_archive(info_dict)
+
+        if self._pp_pool is None:
+            finish(post_process())
+        else:
+            self._pp_pool.submit(post_process, finish)
+
+    @contextlib.contextmanager
+    def _background_sidecar_writes(self):
+        """Write the files accompanying the videos downloaded in this context
+        in background threads if max_sidecar_workers is set"""
+        max_workers = int_or_none(self.params.get('max_sidecar_workers'))
+        # Requests are spaced out by sleep_interval, keep them sequential
+        if (not max_workers or max_workers < 1 or self._sidecar_pool is not None
+                or self.params.get('sleep_interval')
+                or not PostProcessingPool.available()):
+            yield
+            return
+
+        self._sidecar_pool = pool = PostProcessingPool(max_workers)
+        try:
+            yield
+            pool.join()
+        except BaseException:
+            pool.shutdown()
+            raise
+        finally:
+            self._sidecar_pool = None
+            pool.shutdown()
+
+    def _overlap_sidecar_writes(self):
+        """Whether the files accompanying a video can be written while the
+        video itself is being downloaded"""
+        return (self._sidecar_pool is not None
+                and not self.params.get('skip_download', False)
+                and not self.params.get('ratelimit')
+                and not self.params.get('ratelimit_hosts'))
+
+    def _start_sidecar_writers(self, writers):
+        """Start writing the files accompanying a video
+
+        writers are run in order, or concurrently in the background.  Return
+        a function waiting for all of them, that returns False if one of
+        them failed in such a way that the video must not be processed.
+        """
+        pool = self._sidecar_pool
+        results = []
+        if pool is None:
+            for writer in writers:
+                results.append(writer())
+                if not results[-1]:
+                    break
+        else:
+            # Leftovers of a video that has been given up
+            pool.join()
+            for writer in writers:
+                pool.submit(writer, results.append)
+
+        def wait():
+            if pool is not None:
+                pool.join()
+            return all(results)
+        return wait
+
+    def _sidecar_writers(self, info_dict, filename):
+        """Return the functions writing the files accompanying a video"""
+        writers = []
+        if self.params.get('writedescription', False):
+            writers.append(lambda: self._write_description(info_dict, filename))
+        if self.params.get('writeannotations', False):
+            writers.append(lambda: self._write_annotations(info_dict, filename))
+
+        subtitles_are_requested = any([self.params.get('writesubtitles', False),
+                                       self.params.get('writeautomaticsub')])
+
+        if subtitles_are_requested and info_dict.get('requested_subtitles'):
+            # subtitles download errors are already managed as troubles in relevant IE
+            # that way it will silently go on when used with unsupporting IE
+            ie = self.get_info_extractor(info_dict['extractor_key'])
+            for sub_lang, sub_info in info_dict['requested_subtitles'].items():
+                writers.append(functools.partial(
+                    self._write_subtitle, ie, info_dict, filename, sub_lang, sub_info))
+
+        if self.params.get('writeinfojson', False):
+            # The info dict is still updated by the thumbnail writers and
+            # the download while the JSON file is being written
+            json_info = info_dict if self._sidecar_pool is None else copy.deepcopy(info_dict)
+
+            def write_info_json():
+                self._write_info_json(
+                    'video description', json_info,
+                    replace_extension(filename, 'info.json', info_dict.get('ext')))
+                return True
+            writers.append(write_info_json)
+
+        thumbnails = self._requested_thumbnails(info_dict)
+        for t in thumbnails or []:
+            writers.append(functools.partial(
+                self._write_thumbnail, info_dict, filename, t, len(thumbnails) > 1))
+        return writers
+
+    def _write_description(self, info_dict, filename):
+        descfn = replace_extension(filename, 'description', info_dict.get('ext'))
+        if self.params.get('nooverwrites', False) and os.path.exists(encodeFilename(descfn)):
+            self.to_screen('[info] Video description is already present')
+        elif info_dict.get('description') is None:
+            self.report_warning('There\'s no description to write.')
+        else:
+            try:
+                self.to_screen('[info] Writing video description to: ' + descfn)
+                with open(encodeFilename(descfn), 'w', encoding='utf-8') as descfile:
+                    descfile.write(info_dict['description'])
+            except (OSError, IOError):
+                self.report_error('Cannot write description file ' + descfn)
+                return False
+        return True
+
+    def _write_annotations(self, info_dict, filename):
+        annofn = replace_extension(filename, 'annotations.xml', info_dict.get('ext'))
+        if self.params.get('nooverwrites', False) and os.path.exists(encodeFilename(annofn)):
+            self.to_screen('[info] Video annotations are already present')
+        elif not info_dict.get('annotations'):
+            self.report_warning('There are no annotations to write.')
+        else:
+            try:
+                self.to_screen('[info] Writing video annotations to: ' + annofn)
+                with open(encodeFilename(annofn), 'w', encoding='utf-8') as annofile:
+                    annofile.write(info_dict['annotations'])
+            except (KeyError, TypeError):
+                self.report_warning('There are no annotations to write.')
+            except (OSError, IOError):
+                self.report_error('Cannot write annotations file: ' + annofn)
+                return False
+        return True
+
+    def _write_subtitle(self, ie, info_dict, filename, sub_lang, sub_info):
+        sub_format = sub_info['ext']
+        sub_filename = subtitles_filename(filename, sub_lang, sub_format, info_dict.get('ext'))
+        if self.params.get('nooverwrites', False) and os.path.exists(encodeFilename(sub_filename)):
+            self.to_screen('[info] Video subtitle %s.%s is already present' % (sub_lang, sub_format))
+            return True
+        self.to_screen('[info] Writing video subtitles to: ' + sub_filename)
+        if sub_info.get('data') is not None:
+            try:
+                # Use newline='' to prevent conversion of newline characters
+                # See https://github.com/ytdl-org/youtube-dl/issues/10268
+                with open(encodeFilename(sub_filename), 'w', encoding='utf-8', newline='') as subfile:
+                    subfile.write(sub_info['data'])
+            except (OSError, IOError):
+                self.report_error('Cannot write subtitles file ' + sub_filename)
+                return False
+        else:
+            try:
+                sub_data = ie._request_webpage(
+                    sub_info['url'], info_dict['id'], note=False).read()
+                with open(encodeFilename(sub_filename), 'wb') as subfile:
+                    subfile.write(sub_data)
+            except (ExtractorError, IOError, OSError, ValueError) as err:
+                self.report_warning('Unable to download subtitle for "%s": %s' %
+                                    (sub_lang, error_to_compat_str(err)))
+        return True
+
     @staticmethod
     def sanitize_info(info_dict, remove_private_keys=False):
         ''' Sanitize the infodict for converting to json '''
@@ -2257,7 +2473,7 @@ class YoutubeDL(object):
         def filter_fn(obj):
             if isinstance(obj, dict):
                 return dict((k, filter_fn(v)) for k, v in obj.items() if not reject(k, v))
-            elif isinstance(obj, (list, tuple, set, LazyList)):
+            elif isinstance(obj, (list, tuple, set, LazyList, FragmentList)):
                 return list(map(filter_fn, obj))
             elif obj is None or any(isinstance(obj, c)
                                     for c in (compat_integer_types,
@@ -2456,8 +2672,30 @@ class YoutubeDL(object):
         """ Start an HTTP download """
         if isinstance(req, compat_basestring):
             req = sanitized_Request(req)
+        if self._network_archive is not None:
+            return self._network_archive.urlopen(req, self._open_request)
+        return self._open_request(req)
+
+    def _open_request(self, req):
         return self._opener.open(req, timeout=self._socket_timeout)
 
+    def print_debug_footer(self):
+        if not self.params.get('verbose'):
+            return
+
+        stats = get_connector(self.params).stats
+        if not stats['attempts']:
+            return
+        families = dict(stats['families'])
+        family_names = ((socket.AF_INET, 'IPv4'), (getattr(socket, 'AF_INET6', None), 'IPv6'))
+        self._write_string(
+            '[debug] Connections: %d opened in %d attempts, %d failed; '
+            'connect time %.3fs average, %.3fs max; %s\n' % (
+                stats['connections'], stats['attempts'], stats['failures'],
+                stats['connect_time'] / (stats['connections'] or 1),
+                stats['max_connect_time'],
+                ', '.join('%s %d' % (name, families.get(family, 0)) for family, name in family_names)))
+
     def print_debug_header(self):
         if not self.params.get('verbose'):
             return
@@ -2581,6 +2819,11 @@ class YoutubeDL(object):
         debuglevel = 1 if self.params.get('debug_printtraffic') else 0
         https_handler = make_HTTPS_handler(self.params, debuglevel=debuglevel)
         ydlh = YoutubeDLHandler(self.params, debuglevel=debuglevel)
+        http2_handler = YoutubeDLHTTP2Handler(self.params)
+        if self.params.get('http2') and not http2_available():
+            self.report_warning(
+                'HTTP/2 needs the h2 Python package, which is not installed; '
+                'downloading over HTTP/1.1')
         redirect_handler = YoutubeDLRedirectHandler()
         data_handler = compat_urllib_request_DataHandler()
 
@@ -2595,7 +2838,7 @@ class YoutubeDL(object):
         file_handler.file_open = file_open
 
         opener = compat_urllib_request.build_opener(
-            proxy_handler, https_handler, cookie_processor, ydlh, redirect_handler, data_handler, file_handler)
+            proxy_handler, https_handler, http2_handler, cookie_processor, ydlh, redirect_handler, data_handler, file_handler)
 
         # Delete the default user-agent header, which would otherwise apply in
         # cases where our custom HTTP handler doesn't come into play
@@ -2641,38 +2884,43 @@ class YoutubeDL(object):
                 self.report_error(msg('Cannot write %s to JSON file ' + infofn, label))
                 return
 
-    def _write_thumbnails(self, info_dict, filename):
+    def _requested_thumbnails(self, info_dict):
         if self.params.get('writethumbnail', False):
             thumbnails = info_dict.get('thumbnails')
             if thumbnails:
                 thumbnails = [thumbnails[-1]]
+            return thumbnails
         elif self.params.get('write_all_thumbnails', False):
-            thumbnails = info_dict.get('thumbnails')
-        else:
-            return
+            return info_dict.get('thumbnails')
 
+    def _write_thumbnails(self, info_dict, filename):
+        thumbnails = self._requested_thumbnails(info_dict)
         if not thumbnails:
             # No thumbnails present, so return immediately
             return
 
         for t in thumbnails:
-            thumb_ext = determine_ext(t['url'], 'jpg')
-            suffix = '_%s' % t['id'] if len(thumbnails) > 1 else ''
-            thumb_display_id = '%s ' % t['id'] if len(thumbnails) > 1 else ''
-            t['filename'] = thumb_filename = replace_extension(filename + suffix, thumb_ext, info_dict.get('ext'))
-
-            if self.params.get('nooverwrites', False) and os.path.exists(encodeFilename(thumb_filename)):
-                self.to_screen('[%s] %s: Thumbnail %sis already present' %
-                               (info_dict['extractor'], info_dict['id'], thumb_display_id))
-            else:
-                self.to_screen('[%s] %s: Downloading thumbnail %s...' %
-                               (info_dict['extractor'], info_dict['id'], thumb_display_id))
-                try:
-                    uf = self.urlopen(t['url'])
-                    with open(encodeFilename(thumb_filename), 'wb') as thumbf:
-                        shutil.copyfileobj(uf, thumbf)
-                    self.to_screen('[%s] %s: Writing thumbnail %sto: %s' %
-                                   (info_dict['extractor'], info_dict['id'], thumb_display_id, thumb_filename))
-                except (compat_urllib_error.URLError, compat_http_client.HTTPException, socket.error) as err:
-                    self.report_warning('Unable to download thumbnail "%s": %s' %
-                                        (t['url'], error_to_compat_str(err)))
+            self._write_thumbnail(info_dict, filename, t, len(thumbnails) > 1)
+
+    def _write_thumbnail(self, info_dict, filename, t, multiple):
+        thumb_ext = determine_ext(t['url'], 'jpg')
+        suffix = '_%s' % t['id'] if multiple else ''
+        thumb_display_id = '%s ' % t['id'] if multiple else ''
+        t['filename'] = thumb_filename = replace_extension(filename + suffix, thumb_ext, info_dict.get('ext'))
+
+        if self.params.get('nooverwrites', False) and os.path.exists(encodeFilename(thumb_filename)):
+            self.to_screen('[%s] %s: Thumbnail %sis already present' %
+                           (info_dict['extractor'], info_dict['id'], thumb_display_id))
+        else:
+            self.to_screen('[%s] %s: Downloading thumbnail %s...' %
+                           (info_dict['extractor'], info_dict['id'], thumb_display_id))
+            try:
+                uf = self.urlopen(t['url'])
+                with open(encodeFilename(thumb_filename), 'wb') as thumbf:
+                    shutil.copyfileobj(uf, thumbf)
+                self.to_screen('[%s] %s: Writing thumbnail %sto: %s' %
+                               (info_dict['extractor'], info_dict['id'], thumb_display_id, thumb_filename))
+            except (compat_urllib_error.URLError, compat_http_client.HTTPException, socket.error) as err:
+                self.report_warning('Unable to download thumbnail "%s": %s' %
+                                    (t['url'], error_to_compat_str(err)))
+        return True
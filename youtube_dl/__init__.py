@@ -25,6 +25,7 @@ from .utils import (
     decodeOption,
     DEFAULT_OUTTMPL,
     DownloadError,
+    error_to_compat_str,
     expand_path,
     match_filter_func,
     MaxDownloadsReached,
@@ -148,6 +149,18 @@ def _real_main(argv=None):
         if numeric_limit is None:
             parser.error('invalid rate limit specified')
         opts.ratelimit = numeric_limit
+    ratelimit_hosts = {}
+    for host_limit in opts.ratelimit_hosts or []:
+        host, _, limit = host_limit.partition('=')
+        numeric_limit = FileDownloader.parse_bytes(limit)
+        if not host or numeric_limit is None:
+            parser.error('invalid host rate limit specified, it should be host=rate, not "%s"' % host_limit)
+        ratelimit_hosts[host.lower()] = numeric_limit
+    if opts.ratelimit_burst is not None:
+        numeric_limit = FileDownloader.parse_bytes(opts.ratelimit_burst)
+        if numeric_limit is None:
+            parser.error('invalid rate limit burst specified')
+        opts.ratelimit_burst = numeric_limit
     if opts.min_filesize is not None:
         numeric_limit = FileDownloader.parse_bytes(opts.min_filesize)
         if numeric_limit is None:
@@ -170,6 +183,12 @@ def _real_main(argv=None):
             parser.error('max sleep interval must be greater than or equal to min sleep interval')
     else:
         opts.max_sleep_interval = opts.sleep_interval
+    if opts.dns_cache_ttl is not None and opts.dns_cache_ttl < 0:
+        parser.error('DNS cache TTL must be positive or 0')
+    if opts.max_pp_workers is not None and opts.max_pp_workers < 0:
+        parser.error('max pp workers must be positive or 0')
+    if opts.max_sidecar_workers is not None and opts.max_sidecar_workers < 0:
+        parser.error('max sidecar workers must be positive or 0')
     if opts.ap_mso and opts.ap_mso not in MSO_INFO:
         parser.error('Unsupported TV Provider, use --ap-list-mso to get a list of supported TV Providers')
 
@@ -186,6 +205,12 @@ def _real_main(argv=None):
         opts.retries = parse_retries(opts.retries)
     if opts.fragment_retries is not None:
         opts.fragment_retries = parse_retries(opts.fragment_retries)
+    if opts.retry_sleep is not None and opts.retry_sleep < 0:
+        parser.error('retry sleep must be positive or 0')
+    if opts.max_retry_sleep is not None and opts.max_retry_sleep < 0:
+        parser.error('max retry sleep must be positive or 0')
+    if opts.concurrent_fragments is not None and opts.concurrent_fragments < 1:
+        parser.error('concurrent fragments must be positive')
     if opts.buffersize is not None:
         numeric_buffersize = FileDownloader.parse_bytes(opts.buffersize)
         if numeric_buffersize is None:
@@ -196,6 +221,16 @@ def _real_main(argv=None):
         if not numeric_chunksize:
             parser.error('invalid http chunk size specified')
         opts.http_chunk_size = numeric_chunksize
+    if opts.hls_byterange_size is not None:
+        numeric_byterange_size = FileDownloader.parse_bytes(opts.hls_byterange_size)
+        if numeric_byterange_size is None:
+            parser.error('invalid HLS byte range size specified')
+        opts.hls_byterange_size = numeric_byterange_size
+    if opts.response_cache_max_size is not None:
+        numeric_cache_size = FileDownloader.parse_bytes(opts.response_cache_max_size)
+        if numeric_cache_size is None:
+            parser.error('invalid response cache size specified')
+        opts.response_cache_max_size = numeric_cache_size
     if opts.playliststart <= 0:
         raise ValueError('Playlist start must be positive')
     if opts.playlistend not in (-1, None) and opts.playlistend < opts.playliststart:
@@ -308,9 +343,12 @@ def _real_main(argv=None):
     postprocessor_args = None
     if opts.postprocessor_args:
         postprocessor_args = compat_shlex_split(opts.postprocessor_args)
-    match_filter = (
-        None if opts.match_filter is None
-        else match_filter_func(opts.match_filter))
+    match_filter = None
+    if opts.match_filter is not None:
+        try:
+            match_filter = match_filter_func(opts.match_filter)
+        except ValueError as err:
+            parser.error('invalid match filter: %s' % error_to_compat_str(err))
 
     ydl_opts = {
         'usenetrc': opts.usenetrc,
@@ -345,11 +383,18 @@ def _real_main(argv=None):
         'ignoreerrors': opts.ignoreerrors,
         'force_generic_extractor': opts.force_generic_extractor,
         'ratelimit': opts.ratelimit,
+        'ratelimit_hosts': ratelimit_hosts,
+        'ratelimit_burst': opts.ratelimit_burst,
         'nooverwrites': opts.nooverwrites,
         'retries': opts.retries,
         'fragment_retries': opts.fragment_retries,
+        'retry_sleep': opts.retry_sleep,
+        'max_retry_sleep': opts.max_retry_sleep,
         'skip_unavailable_fragments': opts.skip_unavailable_fragments,
         'keep_fragments': opts.keep_fragments,
+        'concurrent_fragments': opts.concurrent_fragments,
+        'http2': opts.http2,
+        'live_from_start': opts.live_from_start,
         'buffersize': opts.buffersize,
         'noresizebuffer': opts.noresizebuffer,
         'http_chunk_size': opts.http_chunk_size,
@@ -368,6 +413,7 @@ def _real_main(argv=None):
         'writedescription': opts.writedescription,
         'writeannotations': opts.writeannotations,
         'writeinfojson': opts.writeinfojson,
+        'max_sidecar_workers': opts.max_sidecar_workers,
         'writethumbnail': opts.writethumbnail,
         'write_all_thumbnails': opts.write_all_thumbnails,
         'writesubtitles': opts.writesubtitles,
@@ -391,6 +437,8 @@ def _real_main(argv=None):
         'max_views': opts.max_views,
         'daterange': date,
         'cachedir': opts.cachedir,
+        'response_cache': opts.response_cache,
+        'response_cache_max_size': opts.response_cache_max_size,
         'youtube_print_sig_code': opts.youtube_print_sig_code,
         'age_limit': opts.age_limit,
         'download_archive': download_archive_fn,
@@ -401,6 +449,8 @@ def _real_main(argv=None):
         'socket_timeout': opts.socket_timeout,
         'bidi_workaround': opts.bidi_workaround,
         'debug_printtraffic': opts.debug_printtraffic,
+        'record_network': opts.record_network,
+        'replay_network': opts.replay_network,
         'prefer_ffmpeg': opts.prefer_ffmpeg,
         'include_ads': opts.include_ads,
         'default_search': opts.default_search,
@@ -409,9 +459,11 @@ def _real_main(argv=None):
         'extract_flat': opts.extract_flat,
         'mark_watched': opts.mark_watched,
         'merge_output_format': opts.merge_output_format,
+        'stream_merge': opts.stream_merge,
         'postprocessors': postprocessors,
         'fixup': opts.fixup,
         'source_address': opts.source_address,
+        'dns_cache_ttl': opts.dns_cache_ttl,
         'call_home': opts.call_home,
         'sleep_interval': opts.sleep_interval,
         'max_sleep_interval': opts.max_sleep_interval,
@@ -424,8 +476,10 @@ def _real_main(argv=None):
         'ffmpeg_location': opts.ffmpeg_location,
         'hls_prefer_native': opts.hls_prefer_native,
         'hls_use_mpegts': opts.hls_use_mpegts,
+        'hls_byterange_size': opts.hls_byterange_size,
         'external_downloader_args': external_downloader_args,
         'postprocessor_args': postprocessor_args,
+        'max_pp_workers': opts.max_pp_workers,
         'cn_verification_proxy': opts.cn_verification_proxy,
         'geo_verification_proxy': opts.geo_verification_proxy,
         'config_location': opts.config_location,
@@ -1,34 +1,302 @@
 from __future__ import unicode_literals
 
+import collections
+import contextlib
 import errno
+import functools
+import hashlib
+import io
 import json
 import os
 import re
 import shutil
+import time
 import traceback
+from email.message import Message
+
+try:
+    import sqlite3
+except ImportError:
+    sqlite3 = None
+
+try:
+    import threading
+except ImportError:
+    threading = None
 
 from .compat import (
     compat_getenv,
     compat_open as open,
+    compat_urllib_HTTPError,
+    compat_urllib_request,
+    compat_urllib_response,
 )
 from .utils import (
     error_to_compat_str,
     expand_path,
     is_outdated_version,
+    locked_file,
     try_get,
+    update_Request,
     write_json_file,
 )
 from .version import __version__
 
 
+def _synchronized(func):
+    """ Run the method under self._lock, if threads are available """
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        if self._lock is None:
+            return func(self, *args, **kwargs)
+        with self._lock:
+            return func(self, *args, **kwargs)
+    return wrapper
+
+
+class _DirectoryCacheBackend(object):
+    """
+    One JSON file per entry, in a directory per section
+
+    The expired entries of a section are removed the first time that an
+    expiring entry is written to it by this process.
+    """
+
+    def __init__(self, cache):
+        self._cache = cache
+        self._pruned = set()
+
+    def read(self, section, key, dtype):
+        cache_fn = self._cache._get_cache_fn(section, key, dtype)
+        try:
+            with open(cache_fn, 'r', encoding='utf-8') as cachef:
+                return cachef.read()
+        except IOError:
+            return None  # No cache available
+
+    def describe(self, section, key, dtype):
+        cache_fn = self._cache._get_cache_fn(section, key, dtype)
+        try:
+            file_size = os.path.getsize(cache_fn)
+        except (OSError, IOError) as oe:
+            file_size = error_to_compat_str(oe)
+        return '%s (%s)' % (cache_fn, file_size)
+
+    def write(self, section, key, dtype, obj, expires=None):
+        fn = self._cache._get_cache_fn(section, key, dtype)
+        try:
+            os.makedirs(os.path.dirname(fn))
+        except OSError as ose:
+            if ose.errno != errno.EEXIST:
+                raise
+        write_json_file(obj, fn)
+        if expires is not None and section not in self._pruned:
+            self._pruned.add(section)
+            self._prune(os.path.dirname(fn))
+
+    @staticmethod
+    def _prune(section_dir):
+        now = time.time()
+        for filename in os.listdir(section_dir):
+            if not filename.endswith('.json'):
+                continue
+            fn = os.path.join(section_dir, filename)
+            try:
+                with open(fn, 'r', encoding='utf-8') as cachef:
+                    expires = try_get(json.load(cachef), lambda x: x['expires'], (int, float))
+                if expires is not None and expires <= now:
+                    os.remove(fn)
+            except (IOError, OSError, ValueError):
+                pass
+
+    def close(self):
+        pass
+
+
+class _SQLiteCacheBackend(object):
+    """
+    All entries in a single SQLite database at the root of the cache
+
+    SQLite makes writes atomic and safe for concurrent processes. The
+    stored size is kept under the cache_max_size parameter by evicting
+    expired and then least recently loaded entries. Entries of the
+    directory layout are imported when the database is created.
+    """
+
+    _DB_NAME = 'cache.sqlite3'
+    _DEFAULT_MAX_SIZE = 64 * 1024 * 1024
+    _ACCESS_RESOLUTION = 60 * 60
+    _SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS entries (
+            section TEXT NOT NULL,
+            key TEXT NOT NULL,
+            dtype TEXT NOT NULL,
+            data TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            expires REAL,
+            accessed REAL NOT NULL,
+            PRIMARY KEY (section, key, dtype));
+        CREATE TABLE IF NOT EXISTS meta (
+            name TEXT PRIMARY KEY,
+            value TEXT);
+    '''
+
+    def __init__(self, cache):
+        self._cache = cache
+        self._db = None
+        self._size = None
+        self._lock = threading.Lock() if threading else None
+
+    @property
+    def max_size(self):
+        max_size = self._cache._ydl.params.get('cache_max_size')
+        return self._DEFAULT_MAX_SIZE if max_size is None else max_size
+
+    def _connect(self):
+        if self._db is not None:
+            return self._db
+        root_dir = self._cache._get_root_dir()
+        try:
+            os.makedirs(root_dir)
+        except OSError as ose:
+            if ose.errno != errno.EEXIST:
+                raise
+        # Entries may be used by worker threads; statements are serialized
+        # by self._lock. The timeout covers writes from other processes.
+        db = sqlite3.connect(
+            os.path.join(root_dir, self._DB_NAME), timeout=30,
+            check_same_thread=False, isolation_level=None)
+        try:
+            # Readers and the writer do not block each other in WAL mode,
+            # which only needs to sync on checkpoints
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute('PRAGMA synchronous=NORMAL')
+        except sqlite3.DatabaseError:
+            pass
+        if not self._migrated(db):
+            db.executescript(self._SCHEMA)
+            with self._transaction(db):
+                if not self._migrated(db):
+                    self._migrate(db, root_dir)
+                    db.execute('INSERT OR REPLACE INTO meta VALUES (?, ?)', ('migrated', __version__))
+        self._db = db
+        return db
+
+    @staticmethod
+    def _migrated(db):
+        try:
+            return db.execute('SELECT 1 FROM meta WHERE name = ?', ('migrated', )).fetchone() is not None
+        except sqlite3.OperationalError:  # No schema yet
+            return False
+
+    @contextlib.contextmanager
+    def _transaction(self, db):
+        # BEGIN IMMEDIATE takes the write lock right away, so that a
+        # concurrent writer waits instead of failing on a stale read
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            yield
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+        db.execute('COMMIT')
+
+    def _migrate(self, db, root_dir):
+        """ Import the entries of the directory layout """
+        for section in os.listdir(root_dir):
+            section_dir = os.path.join(root_dir, section)
+            if not os.path.isdir(section_dir) or not re.match(r'^[a-zA-Z0-9_.-]+$', section):
+                continue
+            for filename in os.listdir(section_dir):
+                key, _, dtype = filename.rpartition('.')
+                if dtype != 'json' or not re.match(r'^[a-zA-Z0-9_.-]+$', key):
+                    continue
+                try:
+                    with open(os.path.join(section_dir, filename), 'r', encoding='utf-8') as cachef:
+                        data = cachef.read()
+                    json.loads(data)
+                except (IOError, OSError, ValueError):
+                    continue
+                db.execute(
+                    'INSERT OR IGNORE INTO entries VALUES (?, ?, ?, ?, ?, NULL, ?)',
+                    (section, key, dtype, data, len(data), time.time()))
+
+    @_synchronized
+    def read(self, section, key, dtype):
+        if self._db is None and not os.path.isdir(self._cache._get_root_dir()):
+            return None
+        db = self._connect()
+        row = db.execute(
+            'SELECT data, expires, accessed FROM entries WHERE section = ? AND key = ? AND dtype = ?',
+            (section, key, dtype)).fetchone()
+        now = time.time()
+        if row is None or row[1] is not None and row[1] <= now:
+            return None
+        # Eviction does not need exact access times, and reads stay cheap
+        # if they do not write every time
+        if row[2] < now - self._ACCESS_RESOLUTION:
+            db.execute(
+                'UPDATE entries SET accessed = ? WHERE section = ? AND key = ? AND dtype = ?',
+                (now, section, key, dtype))
+        return row[0]
+
+    def describe(self, section, key, dtype):
+        return '%s in %s' % (
+            '%s/%s.%s' % (section, key, dtype),
+            os.path.join(self._cache._get_root_dir(), self._DB_NAME))
+
+    @_synchronized
+    def write(self, section, key, dtype, obj, expires=None):
+        db = self._connect()
+        data = json.dumps(obj)
+        with self._transaction(db):
+            db.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (section, key, dtype, data, len(data), expires, time.time()))
+            if self._size is None:
+                self._size = db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+            else:
+                self._size += len(data)
+            if self._size > self.max_size:
+                self._evict(db)
+
+    def _evict(self, db):
+        db.execute('DELETE FROM entries WHERE expires IS NOT NULL AND expires <= ?', (time.time(), ))
+        # Leave some room so that the next entries do not evict again
+        target_size = self.max_size * 0.9
+        size = 0
+        evicted = []
+        for section, key, dtype, entry_size in db.execute(
+                'SELECT section, key, dtype, size FROM entries ORDER BY accessed DESC').fetchall():
+            if size + entry_size > target_size:
+                evicted.append((section, key, dtype))
+            else:
+                size += entry_size
+        db.executemany(
+            'DELETE FROM entries WHERE section = ? AND key = ? AND dtype = ?', evicted)
+        self._size = size
+
+    @_synchronized
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+            self._size = None
+
+
 class Cache(object):
 
     _YTDL_DIR = 'youtube-dl'
     _VERSION_KEY = _YTDL_DIR + '_version'
     _DEFAULT_VERSION = '2021.12.17'
+    _FRONT_SIZE = 256
 
     def __init__(self, ydl):
         self._ydl = ydl
+        self._backend = None
+        # Entries recently loaded or stored by this process, as their
+        # (data, version, expiry time)
+        self._front = collections.OrderedDict()
 
     def _get_root_dir(self):
         res = self._ydl.params.get('cachedir')
@@ -44,60 +312,157 @@ class Cache(object):
         return os.path.join(
             self._get_root_dir(), section, '%s.%s' % (key, dtype))
 
+    def _get_backend(self):
+        if self._backend is None:
+            backend = self._ydl.params.get('cache_backend')
+            if backend is None:
+                backend = 'sqlite' if sqlite3 else 'files'
+            if backend == 'sqlite' and not sqlite3:
+                self._ydl.report_warning('sqlite3 is not available, using the files cache backend')
+                backend = 'files'
+            self._backend = (
+                _SQLiteCacheBackend(self) if backend == 'sqlite'
+                else _DirectoryCacheBackend(self))
+        return self._backend
+
+    def _remember(self, front_key, data):
+        self._front[front_key] = data
+        while len(self._front) > self._FRONT_SIZE:
+            self._front.popitem(last=False)
+
     @property
     def enabled(self):
         return self._ydl.params.get('cachedir') is not False
 
-    def store(self, section, key, data, dtype='json'):
+    def store(self, section, key, data, dtype='json', ttl=None):
+        """
+        Store data under key in section
+
+        With ttl, the entry is only loaded during the next ttl seconds.
+        """
         assert dtype in ('json',)
 
         if not self.enabled:
             return
 
-        fn = self._get_cache_fn(section, key, dtype)
+        self._get_cache_fn(section, key, dtype)  # validates section and key
+        obj = {self._VERSION_KEY: __version__, 'data': data}
+        if ttl is not None:
+            obj['expires'] = time.time() + ttl
+        front_key = (section, key, dtype)
+        self._front.pop(front_key, None)
+        backend = self._get_backend()
         try:
-            try:
-                os.makedirs(os.path.dirname(fn))
-            except OSError as ose:
-                if ose.errno != errno.EEXIST:
-                    raise
-            write_json_file({self._VERSION_KEY: __version__, 'data': data}, fn)
+            backend.write(section, key, dtype, obj, expires=obj.get('expires'))
         except Exception:
             tb = traceback.format_exc()
             self._ydl.report_warning(
-                'Writing cache to %r failed: %s' % (fn, tb))
+                'Writing cache to %s failed: %s' % (backend.describe(section, key, dtype), tb))
+            return
+        # A copy, as loaded from the backend, that the caller cannot alter
+        self._remember(front_key, self._unpack(json.loads(json.dumps(obj))))
 
-    def _validate(self, data, min_ver):
-        version = try_get(data, lambda x: x[self._VERSION_KEY])
+    def _unpack(self, obj):
+        """ Return the (data, version, expiry time) of a stored object """
+        version = try_get(obj, lambda x: x[self._VERSION_KEY])
         if not version:  # Backward compatibility
-            data, version = {'data': data}, self._DEFAULT_VERSION
-        if not is_outdated_version(version, min_ver or '0', assume_new=False):
-            return data['data']
+            return obj, self._DEFAULT_VERSION, None
+        return obj['data'], version, obj.get('expires')
+
+    def _validate(self, entry, min_ver):
+        data, version, expires = entry
+        if expires is not None and expires <= time.time():
+            return None
+        if min_ver is None or not is_outdated_version(version, min_ver, assume_new=False):
+            return data
         self._ydl.to_screen(
             'Discarding old cache from version {version} (needs {min_ver})'.format(**locals()))
 
     def load(self, section, key, dtype='json', default=None, min_ver=None):
+        """
+        Load the data stored under key in section
+
+        Repeated loads return the same object, which is not to be altered.
+        """
         assert dtype in ('json',)
 
         if not self.enabled:
             return default
 
-        cache_fn = self._get_cache_fn(section, key, dtype)
-        try:
+        self._get_cache_fn(section, key, dtype)  # validates section and key
+        front_key = (section, key, dtype)
+        entry = self._front.pop(front_key, None)
+        if entry is None:
+            backend = self._get_backend()
+            try:
+                cached = backend.read(section, key, dtype)
+            except Exception:
+                self._ydl.report_warning(
+                    'Cache retrieval from %s failed: %s' % (
+                        backend.describe(section, key, dtype), traceback.format_exc()))
+                return default
+            if cached is None:
+                return default
             try:
-                with open(cache_fn, 'r', encoding='utf-8') as cachef:
-                    return self._validate(json.load(cachef), min_ver)
+                entry = self._unpack(json.loads(cached))
             except ValueError:
-                try:
-                    file_size = os.path.getsize(cache_fn)
-                except (OSError, IOError) as oe:
-                    file_size = error_to_compat_str(oe)
                 self._ydl.report_warning(
-                    'Cache retrieval from %s failed (%s)' % (cache_fn, file_size))
-        except IOError:
-            pass  # No cache available
+                    'Cache retrieval from %s failed' % backend.describe(section, key, dtype))
+                return default
+        self._remember(front_key, entry)
+        data = self._validate(entry, min_ver)
+        return default if data is None else data
+
+    @contextlib.contextmanager
+    def lock(self, section, key):
+        """
+        Hold an exclusive lock on key in section
+
+        The lock is shared by all the processes using the cache directory.
+        It is advisory: loads and stores do not take it.
+        """
+        if not self.enabled:
+            yield
+            return
+        self._get_cache_fn(section, key, 'json')  # validates section and key
+        lock_fn = os.path.join(self._get_root_dir(), 'locks', '%s.%s.lock' % (section, key))
+        try:
+            try:
+                os.makedirs(os.path.dirname(lock_fn))
+            except OSError as ose:
+                if ose.errno != errno.EEXIST:
+                    raise
+            lockf = locked_file(lock_fn, 'a')
+            lockf.__enter__()
+        except (IOError, OSError) as err:
+            # Locking only avoids duplicate work
+            self._ydl.report_warning(
+                'Unable to lock %s: %s' % (lock_fn, error_to_compat_str(err)))
+            lockf = None
+        try:
+            yield
+        finally:
+            if lockf is not None:
+                lockf.__exit__(None, None, None)
 
-        return default
+    def load_or_store(self, section, key, func, ttl=None, min_ver=None):
+        """
+        Load key from section, or store and return the result of func()
+
+        Processes missing the same key at the same time wait for the first
+        one to store it instead of all calling func. None results are not
+        stored.
+        """
+        data = self.load(section, key, min_ver=min_ver)
+        if data is not None:
+            return data
+        with self.lock(section, key):
+            data = self.load(section, key, min_ver=min_ver)
+            if data is None:
+                data = func()
+                if data is not None:
+                    self.store(section, key, data, ttl=ttl)
+        return data
 
     def remove(self):
         if not self.enabled:
@@ -108,9 +473,241 @@ class Cache(object):
         if not any((term in cachedir) for term in ('cache', 'tmp')):
             raise Exception('Not removing directory %s - this does not look like a cache dir' % cachedir)
 
+        if self._backend is not None:
+            self._backend.close()
+        self._front.clear()
         self._ydl.to_screen(
             'Removing cache dir %s .' % cachedir, skip_eol=True)
         if os.path.exists(cachedir):
             self._ydl.to_screen('.', skip_eol=True)
             shutil.rmtree(cachedir)
         self._ydl.to_screen('.')
+
+
+class ResponseCache(object):
+    """
+    Cache of the HTTP responses downloaded by extractors
+
+    Entries are stored by request under the responses section of the cache
+    directory and refer to response bodies stored once by their SHA-256
+    digest. An entry is used as is while it is younger than the TTL given
+    by the extractor, and is revalidated with its ETag and Last-Modified
+    validators afterwards. The least recently used entries are evicted
+    when the bodies exceed the response_cache_max_size parameter.
+    """
+
+    _SECTION = 'responses'
+    _DEFAULT_MAX_SIZE = 100 * 1024 * 1024
+    # Larger responses are media rather than pages and are not cached
+    _MAX_ENTRY_SIZE = 8 * 1024 * 1024
+    _CACHEABLE_TYPE_RE = re.compile(
+        r'''(?ix)^(?:
+            text/|
+            application/(?:[\w.+-]+\+)?
+                (?:json|xml|javascript|x-javascript|x-mpegurl|vnd\.apple\.mpegurl)\b
+        )''')
+
+    def __init__(self, ydl):
+        self._ydl = ydl
+        self._size = None
+
+    @property
+    def enabled(self):
+        return bool(self._ydl.params.get('response_cache')) and self._ydl.cache.enabled
+
+    @property
+    def max_size(self):
+        max_size = self._ydl.params.get('response_cache_max_size')
+        return self._DEFAULT_MAX_SIZE if max_size is None else max_size
+
+    def _get_fn(self, *parts):
+        return os.path.join(self._ydl.cache._get_root_dir(), self._SECTION, *parts)
+
+    def _entry_fn(self, key):
+        return self._get_fn('entries', hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json')
+
+    def _body_fn(self, digest):
+        return self._get_fn('bodies', digest[:2], digest)
+
+    def _request_key(self, req):
+        # Responses usually depend on the cookies sent, which are only added
+        # when the request is opened
+        cookie_req = compat_urllib_request.Request(req.get_full_url())
+        self._ydl.cookiejar.add_cookie_header(cookie_req)
+        return json.dumps([
+            req.get_method(), req.get_full_url(),
+            sorted((k.lower(), v) for k, v in req.header_items()),
+            cookie_req.get_header('Cookie')])
+
+    def _load(self, key):
+        entry_fn = self._entry_fn(key)
+        try:
+            with open(entry_fn, 'r', encoding='utf-8') as entryf:
+                entry = json.load(entryf)
+            if not os.path.isfile(self._body_fn(entry['digest'])):
+                return None
+            # The modification time of entries is their last use
+            os.utime(entry_fn, None)
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            return None
+        return entry
+
+    def _read_body(self, entry):
+        try:
+            with open(self._body_fn(entry['digest']), 'rb') as bodyf:
+                return bodyf.read()
+        except (IOError, OSError):
+            return None
+
+    @staticmethod
+    def _makedirs(path):
+        try:
+            os.makedirs(path)
+        except OSError as ose:
+            if ose.errno != errno.EEXIST:
+                raise
+
+    def _write_entry(self, key, entry):
+        entry_fn = self._entry_fn(key)
+        self._makedirs(os.path.dirname(entry_fn))
+        write_json_file(entry, entry_fn)
+
+    def _store(self, key, urlh, body):
+        digest = hashlib.sha256(body).hexdigest()
+        headers = urlh.info()
+        entry = {
+            'url': urlh.geturl(),
+            'code': urlh.getcode(),
+            'headers': list(headers.items()),
+            'digest': digest,
+            'size': len(body),
+            'time': time.time(),
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+        }
+        body_fn = self._body_fn(digest)
+        try:
+            if not os.path.isfile(body_fn):
+                self._makedirs(os.path.dirname(body_fn))
+                tmp_fn = body_fn + '.part'
+                with open(tmp_fn, 'wb') as bodyf:
+                    bodyf.write(body)
+                try:
+                    os.rename(tmp_fn, body_fn)
+                except OSError:
+                    # Another process stored the same body meanwhile
+                    if not os.path.isfile(body_fn):
+                        raise
+                    os.remove(tmp_fn)
+                if self._size is not None:
+                    self._size += len(body)
+            self._write_entry(key, entry)
+        except Exception:
+            self._ydl.report_warning(
+                'Writing response cache to %r failed: %s' % (body_fn, traceback.format_exc()))
+            return
+        if self._get_size() > self.max_size:
+            self._evict()
+
+    def _get_size(self):
+        if self._size is None:
+            self._size = 0
+            for dirpath, _, filenames in os.walk(self._get_fn('bodies')):
+                for filename in filenames:
+                    try:
+                        self._size += os.path.getsize(os.path.join(dirpath, filename))
+                    except OSError:
+                        pass
+        return self._size
+
+    def _evict(self):
+        """ Remove least recently used entries and the bodies only they use """
+        entries = []
+        entries_dir = self._get_fn('entries')
+        for filename in os.listdir(entries_dir):
+            entry_fn = os.path.join(entries_dir, filename)
+            try:
+                with open(entry_fn, 'r', encoding='utf-8') as entryf:
+                    entry = json.load(entryf)
+                entries.append((os.path.getmtime(entry_fn), entry_fn, entry['digest'], entry['size']))
+            except (IOError, OSError, ValueError, KeyError, TypeError):
+                continue
+        entries.sort(reverse=True)
+        # Leave some room so that the next responses do not evict again
+        target_size = self.max_size * 0.9
+        kept, size = set(), 0
+        for _, entry_fn, digest, entry_size in entries:
+            if digest not in kept:
+                if size + entry_size > target_size:
+                    try:
+                        os.remove(entry_fn)
+                    except OSError:
+                        pass
+                    continue
+                kept.add(digest)
+                size += entry_size
+        for dirpath, _, filenames in os.walk(self._get_fn('bodies')):
+            for filename in filenames:
+                if filename not in kept:
+                    try:
+                        os.remove(os.path.join(dirpath, filename))
+                    except OSError:
+                        pass
+        self._size = size
+
+    def _cacheable(self, urlh):
+        headers = urlh.info()
+        if urlh.getcode() != 200 or headers.get('Set-Cookie'):
+            # Replaying responses that set cookies would lose them
+            return False
+        if 'no-store' in (headers.get('Cache-Control') or '').lower():
+            return False
+        length = headers.get('Content-Length')
+        if length and length.isdigit() and int(length) > self._MAX_ENTRY_SIZE:
+            return False
+        return bool(self._CACHEABLE_TYPE_RE.match(headers.get('Content-Type') or ''))
+
+    @staticmethod
+    def _response(url, code, headers, body):
+        msg = Message()
+        for k, v in headers:
+            msg[k] = v
+        return compat_urllib_response.addinfourl(io.BytesIO(body), msg, url, code)
+
+    def urlopen(self, req, ttl=0):
+        """
+        Open a GET request through the cache
+
+        A cached response younger than ttl seconds is returned without
+        revalidating it.
+        """
+        key = self._request_key(req)
+        entry = self._load(key)
+        body = entry and self._read_body(entry)
+        if body is not None:
+            if time.time() - entry['time'] < ttl:
+                return self._response(entry['url'], entry['code'], entry['headers'], body)
+            validators = {}
+            if entry.get('etag'):
+                validators['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                validators['If-Modified-Since'] = entry['last_modified']
+            if validators:
+                req = update_Request(req, headers=validators)
+        try:
+            urlh = self._ydl.urlopen(req)
+        except compat_urllib_HTTPError as err:
+            if body is None or err.code != 304:
+                raise
+            entry['time'] = time.time()
+            try:
+                self._write_entry(key, entry)
+            except (IOError, OSError):
+                pass
+            return self._response(entry['url'], entry['code'], entry['headers'], body)
+        if not self._cacheable(urlh):
+            return urlh
+        body = urlh.read()
+        if len(body) <= self._MAX_ENTRY_SIZE:
+            self._store(key, urlh, body)
+        return self._response(urlh.geturl(), urlh.getcode(), list(urlh.info().items()), body)
@@ -0,0 +1,276 @@
+from __future__ import division, unicode_literals
+
+import errno
+import math
+import os
+import select
+import socket
+import time
+
+try:
+    import threading
+except ImportError:
+    threading = None
+
+
+# connect_ex results of a non-blocking connection under way
+_IN_PROGRESS = frozenset(
+    getattr(errno, name) for name in ('EINPROGRESS', 'EWOULDBLOCK', 'EAGAIN', 'WSAEWOULDBLOCK')
+    if hasattr(errno, name))
+
+
+class _Locked(object):
+    def __init__(self):
+        self._lock = threading.Lock() if threading else None
+
+    def _acquire(self):
+        if self._lock is not None:
+            self._lock.acquire()
+
+    def _release(self):
+        if self._lock is not None:
+            self._lock.release()
+
+
+class DNSCache(_Locked):
+    """
+    Cache of the addresses host names resolve to
+
+    getaddrinfo does not tell the TTL of the DNS records: the addresses are
+    kept for ttl seconds. Failed resolutions are not cached.
+    """
+
+    _MAX_ENTRIES = 1024
+
+    def __init__(self, ttl, clock=time.time, getaddrinfo=socket.getaddrinfo):
+        super(DNSCache, self).__init__()
+        self.ttl = ttl
+        self._clock = clock
+        self._getaddrinfo = getaddrinfo
+        # (host, port, family, type): (expiry time, addresses)
+        self._entries = {}
+        self.hits = self.misses = 0
+
+    def getaddrinfo(self, host, port, family=0, type=socket.SOCK_STREAM):
+        key = (host, port, family, type)
+        now = self._clock()
+        self._acquire()
+        try:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        finally:
+            self._release()
+        addrs = self._getaddrinfo(host, port, family, type)
+        self._acquire()
+        try:
+            if len(self._entries) >= self._MAX_ENTRIES:
+                self._entries = dict(
+                    (k, e) for k, e in self._entries.items() if e[0] > now)
+                if len(self._entries) >= self._MAX_ENTRIES:
+                    self._entries.clear()
+            self._entries[key] = (now + self.ttl, addrs)
+        finally:
+            self._release()
+        return addrs
+
+
+def interleave_families(addrs):
+    """
+    Order getaddrinfo results alternating address families
+
+    The family of the first address comes first, as in RFC 8305, section 4.
+    """
+    if not addrs:
+        return []
+    first_family = addrs[0][0]
+    preferred = [a for a in addrs if a[0] == first_family]
+    others = [a for a in addrs if a[0] != first_family]
+    ordered = []
+    for i in range(max(len(preferred), len(others))):
+        ordered.extend(a[i] for a in (preferred, others) if i < len(a))
+    return ordered
+
+
+def _wait_connected(socks, timeout):
+    """ Wait up to timeout seconds for connection attempts, return those that ended """
+    if hasattr(select, 'poll'):
+        # Unlike select, poll has no limit on file descriptor numbers
+        poller = select.poll()
+        by_fd = {}
+        for sock in socks:
+            poller.register(sock, select.POLLOUT | select.POLLERR | select.POLLHUP)
+            by_fd[sock.fileno()] = sock
+        return [by_fd[fd] for fd, _ in poller.poll(
+            None if timeout is None else int(math.ceil(max(timeout, 0) * 1000)))]
+    # Windows reports failed connections as exceptional
+    _, writable, exceptional = select.select([], socks, socks, timeout)
+    return list(set(writable) | set(exceptional))
+
+
+class Connector(_Locked):
+    """
+    Open TCP connections the Happy Eyeballs way (RFC 8305)
+
+    The addresses of the host, from the DNS cache, are tried alternating
+    between IPv6 and IPv4. Each attempt starts attempt_delay seconds after
+    the previous one, or as soon as it fails, without waiting for it to
+    end: the first connection established wins. A broken route to a family
+    of addresses only costs the delay, not a timeout.
+
+    stats counts the connections, the attempts, the failures and the
+    seconds taken to connect, in total and by address family.
+    """
+
+    _ATTEMPT_DELAY = 0.25
+
+    def __init__(self, dns_ttl=60, attempt_delay=None, clock=time.time,
+                 getaddrinfo=socket.getaddrinfo):
+        super(Connector, self).__init__()
+        self.dns_cache = DNSCache(dns_ttl, clock, getaddrinfo) if dns_ttl else None
+        self.attempt_delay = self._ATTEMPT_DELAY if attempt_delay is None else attempt_delay
+        self._clock = clock
+        self._getaddrinfo = getaddrinfo
+        self.stats = {
+            'connections': 0,
+            'attempts': 0,
+            'failures': 0,
+            'connect_time': 0,
+            'max_connect_time': 0,
+            'families': {},
+        }
+
+    def getaddrinfo(self, host, port):
+        if self.dns_cache is not None:
+            return self.dns_cache.getaddrinfo(host, port)
+        return self._getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+
+    def _record(self, attempts, sock=None, elapsed=None):
+        self._acquire()
+        try:
+            stats = self.stats
+            stats['attempts'] += attempts
+            if sock is None:
+                stats['failures'] += 1
+                return
+            stats['connections'] += 1
+            stats['connect_time'] += elapsed
+            stats['max_connect_time'] = max(stats['max_connect_time'], elapsed)
+            families = stats['families']
+            families[sock.family] = families.get(sock.family, 0) + 1
+        finally:
+            self._release()
+
+    def create_connection(self, address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, source_address=None):
+        """ socket.create_connection racing the addresses of the host """
+        host, port = address
+        addrs = self.getaddrinfo(host, port)
+        if source_address:
+            # Only the addresses of the family of source_address can be reached
+            af = socket.AF_INET if '.' in source_address[0] else socket.AF_INET6
+            ip_addrs = [addr for addr in addrs if addr[0] == af]
+            if addrs and not ip_addrs:
+                ip_version = 'v4' if af == socket.AF_INET else 'v6'
+                raise socket.error(
+                    "No remote IP%s addresses available for connect, can't use '%s' as source address"
+                    % (ip_version, source_address[0]))
+            addrs = ip_addrs
+        if timeout is socket._GLOBAL_DEFAULT_TIMEOUT:
+            timeout = socket.getdefaulttimeout()
+        started = self._clock()
+        sock, attempts = self._race(interleave_families(addrs), timeout, source_address)
+        self._record(attempts, sock, self._clock() - started)
+        sock.settimeout(timeout)
+        return sock
+
+    def _start(self, addr, source_address):
+        """ Start connecting to addr, return the socket and the connect_ex result """
+        af, socktype, proto, _, sa = addr
+        sock = socket.socket(af, socktype, proto)
+        try:
+            sock.setblocking(False)
+            if source_address:
+                sock.bind(source_address)
+            return sock, sock.connect_ex(sa)
+        except socket.error:
+            sock.close()
+            raise
+
+    def _race(self, addrs, timeout, source_address):
+        # Socket: time after which the attempt times out
+        pending = {}
+        err = None
+        attempts = 0
+        next_start = self._clock()
+        try:
+            while addrs or pending:
+                now = self._clock()
+                if addrs and (now >= next_start or not pending):
+                    attempts += 1
+                    try:
+                        sock, result = self._start(addrs.pop(0), source_address)
+                    except socket.error as e:
+                        err = e
+                        continue
+                    if result == 0:
+                        return sock, attempts
+                    if result not in _IN_PROGRESS:
+                        sock.close()
+                        err = socket.error(result, os.strerror(result))
+                        continue
+                    pending[sock] = None if timeout is None else now + timeout
+                    next_start = now + self.attempt_delay
+                    continue
+                waits = [deadline - now for deadline in pending.values() if deadline is not None]
+                if addrs:
+                    waits.append(next_start - now)
+                for sock in _wait_connected(list(pending), min(waits) if waits else None):
+                    del pending[sock]
+                    result = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+                    if result == 0:
+                        return sock, attempts
+                    sock.close()
+                    err = socket.error(result, os.strerror(result))
+                    # Start the next attempt at once
+                    next_start = now
+                now = self._clock()
+                for sock, deadline in list(pending.items()):
+                    if deadline is not None and deadline <= now:
+                        del pending[sock]
+                        sock.close()
+                        err = socket.timeout('timed out')
+        finally:
+            for sock in pending:
+                sock.close()
+        self._record(attempts)
+        if err is not None:
+            raise err
+        raise socket.error('getaddrinfo returns an empty list')
+
+
+_connectors = {}
+_connectors_lock = threading.Lock() if threading else None
+
+
+def get_connector(params):
+    """
+    Return the Connector for params
+
+    YoutubeDL instances with the same dns_cache_ttl share the same
+    Connector, and thus its DNS cache.
+    """
+    dns_ttl = params.get('dns_cache_ttl')
+    if dns_ttl is None:
+        dns_ttl = 60
+    if _connectors_lock is not None:
+        _connectors_lock.acquire()
+    try:
+        connector = _connectors.get(dns_ttl)
+        if connector is None:
+            connector = _connectors[dns_ttl] = Connector(dns_ttl)
+        return connector
+    finally:
+        if _connectors_lock is not None:
+            _connectors_lock.release()
@@ -13,7 +13,10 @@ def get_suitable_downloader(info_dict, params={}):
 
 # Some of these require get_suitable_downloader
 from .common import FileDownloader
-from .dash import DashSegmentsFD
+from .dash import (
+    DashLiveFD,
+    DashSegmentsFD,
+)
 from .f4m import F4mFD
 from .hls import HlsFD
 from .http import HttpFD
@@ -34,6 +37,7 @@ PROTOCOL_MAP = {
     'rtsp': RtspFD,
     'f4m': F4mFD,
     'http_dash_segments': DashSegmentsFD,
+    'http_dash_segments_live': DashLiveFD,
     'ism': IsmFD,
     'niconico_dmc': NiconicoDmcFD,
 }
@@ -6,6 +6,8 @@ import sys
 import time
 import random
 
+from .ratelimit import get_bandwidth_scheduler
+from .retry import RetryPolicy
 from ..compat import compat_os_name
 from ..utils import (
     decodeArgument,
@@ -32,7 +34,17 @@ class FileDownloader(object):
     verbose:            Print additional info to stdout.
     quiet:              Do not print messages to stdout.
     ratelimit:          Download speed limit, in bytes/sec.
+    ratelimit_burst:    Bytes that can be downloaded at once without exceeding
+                        the rate limits (default: a quarter of a second of
+                        each rate limit).
+    ratelimit_hosts:    A dictionary of download speed limits, in bytes/sec,
+                        by host name (also for its subdomains). The rate
+                        limits are shared by all the downloads of the process.
     retries:            Number of times to retry for HTTP error 5xx
+    retry_sleep:        Seconds to wait before the first retry, doubled for
+                        each further retry (default: 1).
+    max_retry_sleep:    Longest wait before a retry, in seconds (default: 10),
+                        unless the server asks for longer with Retry-After.
     buffersize:         Size of download buffer in bytes.
     noresizebuffer:     Do not automatically resize the download buffer.
     continuedl:         Try to continue downloads if possible.
@@ -63,6 +75,8 @@ class FileDownloader(object):
         self.ydl = ydl
         self._progress_hooks = []
         self.params = params
+        self._bandwidth_scheduler = get_bandwidth_scheduler(params)
+        self._retry_policy = RetryPolicy(params)
         self.add_progress_hook(self.report_progress)
 
     @staticmethod
@@ -174,21 +188,11 @@ class FileDownloader(object):
     def report_error(self, *args, **kargs):
         self.ydl.report_error(*args, **kargs)
 
-    def slow_down(self, start_time, now, byte_counter):
-        """Sleep if the download speed is over the rate limit."""
-        rate_limit = self.params.get('ratelimit')
-        if rate_limit is None or byte_counter == 0:
-            return
-        if now is None:
-            now = time.time()
-        elapsed = now - start_time
-        if elapsed <= 0.0:
-            return
-        speed = float(byte_counter) / elapsed
-        if speed > rate_limit:
-            sleep_time = float(byte_counter) / rate_limit - elapsed
-            if sleep_time > 0:
-                time.sleep(sleep_time)
+    def slow_down(self, byte_counter, url=None):
+        """Sleep as long as the rate limits require after receiving
+        byte_counter bytes from url."""
+        if self._bandwidth_scheduler is not None and byte_counter:
+            self._bandwidth_scheduler.consume(byte_counter, url)
 
     def temp_name(self, filename):
         """Returns a temporary filename for the given filename."""
@@ -319,11 +323,16 @@ class FileDownloader(object):
         """Report attempt to resume at given byte."""
         self.to_screen('[download] Resuming download at byte %s' % resume_len)
 
-    def report_retry(self, err, count, retries):
+    @staticmethod
+    def format_retry_delay(delay):
+        return ' in %.1f seconds' % delay if delay else ''
+
+    def report_retry(self, err, count, retries, delay=None):
         """Report retry in case of HTTP error 5xx"""
         self.to_screen(
-            '[download] Got server HTTP error: %s. Retrying (attempt %d of %s)...'
-            % (error_to_compat_str(err), count, self.format_retries(retries)))
+            '[download] Got server HTTP error: %s. Retrying%s (attempt %d of %s)...'
+            % (error_to_compat_str(err), self.format_retry_delay(delay), count,
+               self.format_retries(retries)))
 
     def report_file_already_downloaded(self, file_name):
         """Report file has already been fully downloaded."""
@@ -1,14 +1,59 @@
-from __future__ import unicode_literals
+from __future__ import division, unicode_literals
 
 import itertools
+import math
+import os
+import re
+import socket
+import time
+
+try:
+    import threading
+except ImportError:
+    threading = None
 
 from .fragment import FragmentFD
-from ..compat import compat_urllib_error
+from .retry import RetryPolicy
+from ..compat import (
+    compat_etree_fromstring,
+    compat_http_client,
+    compat_urllib_error,
+)
 from ..utils import (
     DownloadError,
+    HEADRequest,
+    encodeFilename,
+    int_or_none,
+    parse_duration,
+    parse_iso8601,
+    sanitized_Request,
+    timeconvert,
     urljoin,
 )
 
+# $Identifier$ and $Identifier%0<width>d$ in SegmentTemplate URLs, $$ for $
+_TEMPLATE_RE = re.compile(r'\$(?:(RepresentationID|Number|Time|Bandwidth)(%0\d+d)?)?\$')
+
+
+def _fill_template(template, values):
+    def substitute(m):
+        name = m.group(1)
+        if name is None:
+            return '$'
+        if name == 'RepresentationID':
+            return values[name]
+        return (m.group(2) or '%d') % values[name]
+    return _TEMPLATE_RE.sub(substitute, template)
+
+
+def _parse_time(value):
+    """ Timestamp of an xs:dateTime, with its fraction of a second """
+    timestamp = parse_iso8601(value)
+    if timestamp is None:
+        return None
+    fraction = re.search(r'T[\d:]+(\.\d+)', value)
+    return timestamp + float(fraction.group(1)) if fraction else timestamp
+
 
 class DashSegmentsFD(FragmentFD):
     """
@@ -29,50 +74,426 @@ class DashSegmentsFD(FragmentFD):
 
         self._prepare_and_start_frag_download(ctx)
 
-        fragment_retries = self.params.get('fragment_retries', 0)
         skip_unavailable_fragments = self.params.get('skip_unavailable_fragments', True)
 
-        for frag_index, fragment in enumerate(fragments, 1):
-            if frag_index <= ctx['fragment_index']:
+        def fragments_to_download():
+            # Fragments are built as they are iterated (see FragmentList), so
+            # those already downloaded are skipped without building them
+            for frag_index, fragment in enumerate(
+                    itertools.islice(fragments, ctx['fragment_index'], None), ctx['fragment_index'] + 1):
+                # In DASH, the first segment contains necessary headers to
+                # generate a valid MP4 file, so always abort for the first segment
+                fatal = frag_index == 1 or not skip_unavailable_fragments
+                fragment_url = fragment.get('url')
+                if not fragment_url:
+                    assert fragment_base_url
+                    fragment_url = urljoin(fragment_base_url, fragment['path'])
+                yield frag_index, fragment_url, fatal
+
+        if self._concurrent_fragments() > 1:
+            if not self._download_fragments(ctx, fragments_to_download(), info_dict):
+                return False
+        else:
+            for frag_index, fragment_url, fatal in fragments_to_download():
+                if not self._download_and_append_fragment(ctx, frag_index, fragment_url, info_dict, fatal):
+                    return False
+
+        self._finish_frag_download(ctx)
+
+        return True
+
+    def _download_and_append_fragment(self, ctx, frag_index, fragment_url, info_dict, fatal):
+        """Download a fragment, retrying it on HTTP errors, and append it
+        Return False if the download is to be aborted"""
+        success = False
+        for count in itertools.count():
+            try:
+                success, frag_content = self._download_fragment(ctx, fragment_url, info_dict)
+                if not success:
+                    return False
+                self._append_fragment(ctx, frag_content)
+            except compat_urllib_error.HTTPError as err:
+                # How each HTTP error is retried is up to the retry policy
+                # (see FRAGMENT_STATUS_RULES)
+                if self._retry_fragment(ctx, err, frag_index, count + 1):
+                    continue
+            except DownloadError:
+                # Don't retry fragment if error occurred during HTTP downloading
+                # itself since it has its own retry settings
+                if fatal:
+                    raise
+            break
+
+        if not success:
+            if not fatal:
+                self.report_skip_fragment(frag_index)
+                return True
+            self.report_error('giving up after %s fragment retries' % count)
+            return False
+        return True
+
+
+class DashLiveManifest(object):
+    """
+    An update of a dynamic MPD manifest (ISO/IEC 23009-1, 5.3.9.5)
+
+    segments() works out the segments of a Representation available at a
+    given time, from its SegmentTemplate with a SegmentTimeline or a
+    segment duration, over the Periods of the manifest. The last update
+    of a stream that ended is static: all its segments are available.
+    """
+
+    def __init__(self, doc, url):
+        self._doc = doc
+        namespace = re.match(r'{([^}]+)}', doc.tag)
+        self._namespace = namespace.group(1) if namespace else None
+        self.dynamic = doc.get('type') == 'dynamic'
+        self.availability_start = _parse_time(doc.get('availabilityStartTime')) or 0
+        self.update_period = parse_duration(doc.get('minimumUpdatePeriod'))
+        self.time_shift_buffer = parse_duration(doc.get('timeShiftBufferDepth'))
+        self.duration = parse_duration(doc.get('mediaPresentationDuration'))
+        self.location = urljoin(url, self._text(doc, 'Location'))
+        self.base_url = urljoin(url, self._text(doc, 'BaseURL')) or url
+        timing = doc.find(self._ns('UTCTiming'))
+        self.utc_timing = None if timing is None else (timing.get('schemeIdUri'), timing.get('value'))
+
+    def _ns(self, name):
+        return '{%s}%s' % (self._namespace, name) if self._namespace else name
+
+    def _text(self, element, name):
+        child = element.find(self._ns(name))
+        return child.text.strip() if child is not None and child.text else None
+
+    def _representation(self, period, representation_id):
+        for adaptation_set in period.findall(self._ns('AdaptationSet')):
+            for representation in adaptation_set.findall(self._ns('Representation')):
+                if representation.get('id') == representation_id:
+                    return adaptation_set, representation
+        return None
+
+    def _timeline(self, timeline, number, end_time):
+        """ Yield the (time, number, duration) of the segments of timeline, in timescale units """
+        entries = timeline.findall(self._ns('S'))
+        segment_time = 0
+        for index, entry in enumerate(entries):
+            segment_time = int(entry.get('t') or segment_time)
+            duration = int(entry.attrib['d'])
+            repeat = int(entry.get('r') or 0)
+            if repeat < 0:
+                # Repeated until the next entry, the end of the Period, or
+                # for as long as the stream goes on
+                next_time = entries[index + 1].get('t') if index + 1 < len(entries) else None
+                until = int(next_time) if next_time else end_time
+                if until is not None:
+                    repeat = max(int(math.ceil((until - segment_time) / duration)) - 1, 0)
+                else:
+                    repeat = None if self.dynamic else 0
+            for _ in (itertools.count() if repeat is None else range(repeat + 1)):
+                yield segment_time, number, duration
+                segment_time += duration
+                number += 1
+
+    def segments(self, representation_id, now):
+        """
+        Return the segments of Representation representation_id available
+        at time now, and the time the next one becomes available, or None
+        if the manifest does not tell
+
+        Segments are dicts with their period, their time (None for an
+        initialization segment), which identify them across updates, their
+        url and, for media segments, their duration.
+        """
+        segments = []
+        next_available = None
+        periods = self._doc.findall(self._ns('Period'))
+        end = None
+        for index, period in enumerate(periods):
+            period_start = parse_duration(period.get('start'))
+            if period_start is None:
+                period_start = end or 0
+            duration = parse_duration(period.get('duration'))
+            if duration is not None:
+                end = period_start + duration
+            elif index + 1 < len(periods):
+                end = parse_duration(periods[index + 1].get('start'))
+            else:
+                end = self.duration
+            found = self._representation(period, representation_id)
+            if found is None:
+                continue
+            adaptation_set, representation = found
+            template = {}
+            timeline = None
+            base_url = self.base_url
+            for element in (period, adaptation_set, representation):
+                base_url = urljoin(base_url, self._text(element, 'BaseURL')) or base_url
+                segment_template = element.find(self._ns('SegmentTemplate'))
+                if segment_template is not None:
+                    template.update(segment_template.attrib)
+                    segment_timeline = segment_template.find(self._ns('SegmentTimeline'))
+                    if segment_timeline is not None:
+                        timeline = segment_timeline
+            media = template.get('media')
+            if not media or (timeline is None and not template.get('duration')):
                 continue
-            # In DASH, the first segment contains necessary headers to
-            # generate a valid MP4 file, so always abort for the first segment
-            fatal = frag_index == 1 or not skip_unavailable_fragments
-            fragment_url = fragment.get('url')
-            if not fragment_url:
-                assert fragment_base_url
-                fragment_url = urljoin(fragment_base_url, fragment['path'])
-            success = False
-            for count in itertools.count():
+            if timeline is None and end is None and not self.dynamic:
+                # Numbered segments with no end to them
+                continue
+            values = {
+                'RepresentationID': representation_id,
+                'Bandwidth': int_or_none(representation.get('bandwidth')) or 0,
+            }
+            period_id = period.get('id') or period_start
+            if template.get('initialization'):
+                segments.append({
+                    'period': period_id,
+                    'time': None,
+                    'url': urljoin(base_url, _fill_template(template['initialization'], values)),
+                })
+            timescale = int(template.get('timescale') or 1)
+            offset = int(template.get('presentationTimeOffset') or 0)
+            number = int(template.get('startNumber') or 1)
+            origin = self.availability_start + period_start
+            if timeline is not None:
+                times = self._timeline(
+                    timeline, number, None if end is None else offset + (end - period_start) * timescale)
+            else:
+                segment_duration = int(template['duration'])
+                first = 0
+                if self.dynamic and self.time_shift_buffer is not None:
+                    # Skip the segments out of the time shift window
+                    first = max(int((now - self.time_shift_buffer - origin) * timescale / segment_duration), 0)
+                times = (
+                    (offset + i * segment_duration, number + i, segment_duration)
+                    for i in itertools.count(first))
+            for segment_time, segment_number, segment_duration in times:
+                segment_start = (segment_time - offset) / timescale
+                if end is not None and period_start + segment_start >= end:
+                    break
+                # Segments are available once complete
+                available = origin + segment_start + segment_duration / timescale
+                if self.dynamic and available > now:
+                    if next_available is None or available < next_available:
+                        next_available = available
+                    break
+                if (self.dynamic and self.time_shift_buffer is not None
+                        and available + self.time_shift_buffer < now):
+                    continue
+                segments.append({
+                    'period': period_id,
+                    'time': segment_time,
+                    'url': urljoin(base_url, _fill_template(media, dict(
+                        values, Number=segment_number, Time=segment_time))),
+                    'duration': segment_duration / timescale,
+                })
+        return segments, next_available
+
+
+class DashLiveFD(DashSegmentsFD):
+    """
+    Download a live DASH stream, following the updates of its manifest
+
+    The manifest is fetched again every minimumUpdatePeriod, and the new
+    segments of the Representation are downloaded once each, as soon as
+    they are available. The download starts at the live edge, or with
+    live_from_start at the earliest segment the server keeps, and ends
+    with the stream: when its manifest becomes static or goes away, when
+    no new segments come for a while, or when interrupted, by the user or
+    by stop() from another thread.
+
+    Available options:
+
+    live_from_start:    Download from the start of the time shift window
+                        rather than from the live edge
+    """
+
+    # Least seconds between two updates of the manifest
+    _MIN_UPDATE_PERIOD = 0.5
+    # Seconds without new segments after which the stream is taken as over
+    _MAX_STALL = 60
+
+    _DIRECT_TIMINGS = ('urn:mpeg:dash:utc:direct:2014', 'urn:mpeg:dash:utc:direct:2012')
+    _HTTP_TIMINGS = (
+        'urn:mpeg:dash:utc:http-iso:2014', 'urn:mpeg:dash:utc:http-xsdate:2014',
+        'urn:mpeg:dash:utc:http-iso:2012', 'urn:mpeg:dash:utc:http-xsdate:2012')
+    _HEAD_TIMINGS = ('urn:mpeg:dash:utc:http-head:2014', 'urn:mpeg:dash:utc:http-head:2012')
+
+    def __init__(self, ydl, params):
+        super(DashLiveFD, self).__init__(ydl, params)
+        self._stop = threading.Event() if threading else None
+        self._clock = time.time
+        # Waiting for the next segments ends as soon as stopped
+        self._sleep = self._stop.wait if self._stop is not None else time.sleep
+
+    def stop(self):
+        """ End the download as if interrupted by the user """
+        if self._stop is not None:
+            self._stop.set()
+
+    def _check_stopped(self):
+        if self._stop is not None and self._stop.is_set():
+            raise KeyboardInterrupt
+
+    def _server_time(self, ctx):
+        return self._clock() + ctx['clock_offset']
+
+    def _clock_offset(self, manifest, urlh, requested, info_dict):
+        """ Seconds the clock of the server is ahead of ours, after its UTCTiming or the Date of the manifest """
+        now = (requested + self._clock()) / 2
+        scheme, value = manifest.utc_timing or (None, None)
+        if value and scheme in self._DIRECT_TIMINGS:
+            server_time = _parse_time(value)
+            if server_time is not None:
+                return server_time - now
+        elif value and scheme in self._HTTP_TIMINGS + self._HEAD_TIMINGS:
+            head = scheme in self._HEAD_TIMINGS
+            requested = self._clock()
+            try:
+                timing = self.ydl.urlopen((HEADRequest if head else sanitized_Request)(
+                    urljoin(manifest.base_url, value.split()[0]), None, info_dict.get('http_headers') or {}))
                 try:
-                    success, frag_content = self._download_fragment(ctx, fragment_url, info_dict)
-                    if not success:
-                        return False
-                    self._append_fragment(ctx, frag_content)
-                except compat_urllib_error.HTTPError as err:
-                    # YouTube may often return 404 HTTP error for a fragment causing the
-                    # whole download to fail. However if the same fragment is immediately
-                    # retried with the same request data this usually succeeds (1-2 attempts
-                    # is usually enough) thus allowing to download the whole file successfully.
-                    # To be future-proof we will retry all fragments that fail with any
-                    # HTTP error.
-                    if count < fragment_retries:
-                        self.report_retry_fragment(err, frag_index, count + 1, fragment_retries)
-                        continue
-                except DownloadError:
-                    # Don't retry fragment if error occurred during HTTP downloading
-                    # itself since it has its own retry settings
-                    if fatal:
-                        raise
+                    server_time = (
+                        timeconvert(timing.info().get('Date')) if head
+                        else _parse_time(timing.read().decode('utf-8').strip()))
+                finally:
+                    timing.close()
+            except (compat_urllib_error.URLError, compat_http_client.HTTPException, socket.error, UnicodeDecodeError):
+                server_time = None
+            if server_time is not None:
+                return server_time - (requested + self._clock()) / 2
+        # Only to the second
+        server_time = timeconvert(urlh.info().get('Date'))
+        if server_time is not None and abs(server_time - now) > 1:
+            return server_time - now
+        return 0
+
+    def _update_manifest(self, ctx, url, info_dict):
+        """ Fetch the manifest from url, return None if the stream is gone """
+        retry_policy = ctx['manifest_retry_policy']
+        for count in itertools.count(1):
+            requested = self._clock()
+            try:
+                urlh = self.ydl.urlopen(sanitized_Request(url, None, info_dict.get('http_headers') or {}))
+                try:
+                    doc = compat_etree_fromstring(urlh.read())
+                finally:
+                    urlh.close()
                 break
+            except (compat_urllib_error.URLError, compat_http_client.HTTPException, socket.error) as err:
+                if (isinstance(err, compat_urllib_error.HTTPError) and err.code in (404, 410)
+                        and 'clock_offset' in ctx):
+                    return None
+                delay = retry_policy.delay(err, count)
+                if delay is None:
+                    raise
+                self.report_retry(err, count, retry_policy.retries, delay)
+                retry_policy.wait(delay)
+        manifest = DashLiveManifest(doc, urlh.geturl())
+        if 'clock_offset' not in ctx:
+            ctx['clock_offset'] = self._clock_offset(manifest, urlh, requested, info_dict)
+        return manifest
+
+    def real_download(self, filename, info_dict):
+        representation_id = info_dict['dash_representation_id']
+        manifest_url = info_dict.get('manifest_url') or info_dict['url']
+        live_from_start = self.params.get('live_from_start', False)
+        skip_unavailable_fragments = self.params.get('skip_unavailable_fragments', True)
+        test = self.params.get('test', False)
 
-            if not success:
-                if not fatal:
-                    self.report_skip_fragment(frag_index)
+        # Segments downloaded before cannot be told apart from those to come
+        tmpfilename = self.temp_name(filename)
+        if os.path.isfile(encodeFilename(tmpfilename)):
+            os.remove(encodeFilename(tmpfilename))
+
+        ctx = {
+            'filename': filename,
+            'total_frags': None,
+            'live': True,
+        }
+        self._prepare_and_start_frag_download(ctx)
+        ctx['manifest_retry_policy'] = RetryPolicy(self.params)
+
+        # Period: time of the last media segment done, and the periods whose
+        # initialization segment is done
+        last_times = {}
+        initialized = set()
+        init_url = None
+        frag_index = 0
+        manifest = None
+        next_update = last_new = self._clock()
+        try:
+            while True:
+                self._check_stopped()
+                if manifest is None or (manifest.update_period is not None and self._clock() >= next_update):
+                    updated = self._update_manifest(ctx, manifest_url, info_dict)
+                    if updated is None:
+                        self.to_screen('[%s] The manifest is gone, the stream is over' % self.FD_NAME)
+                        break
+                    if manifest is None:
+                        # First update
+                        segments, next_available = updated.segments(representation_id, self._server_time(ctx))
+                        if not segments and next_available is None:
+                            self.report_error('Representation %s is not in the manifest' % representation_id)
+                            return False
+                        media = [s for s in segments if s['time'] is not None]
+                        if updated.dynamic and not live_from_start and media:
+                            # Start at the live edge
+                            for segment in media[:-1]:
+                                last_times[segment['period']] = segment['time']
+                                if segment['period'] != media[-1]['period']:
+                                    initialized.add(segment['period'])
+                    manifest = updated
+                    manifest_url = manifest.location or manifest_url
+                    next_update = self._clock() + max(manifest.update_period or 0, self._MIN_UPDATE_PERIOD)
+
+                segments, next_available = manifest.segments(representation_id, self._server_time(ctx))
+                for segment in segments:
+                    period, segment_time = segment['period'], segment['time']
+                    if segment_time is None:
+                        if period in initialized:
+                            continue
+                        initialized.add(period)
+                        # Periods often share their initialization segment
+                        if segment['url'] == init_url:
+                            continue
+                        init_url = segment['url']
+                    else:
+                        if period in last_times and segment_time <= last_times[period]:
+                            continue
+                        last_times[period] = segment_time
+                        last_new = self._clock()
+                    frag_index += 1
+                    fatal = segment_time is None or not skip_unavailable_fragments
+                    if not self._download_and_append_fragment(ctx, frag_index, segment['url'], info_dict, fatal):
+                        return False
+                    if test and segment_time is not None:
+                        break
+                    self._check_stopped()
+                else:
+                    if not manifest.dynamic:
+                        break
+                    if manifest.update_period is None and next_available is None:
+                        # Nothing more is to come
+                        break
+                    if self._clock() - last_new > max(self._MAX_STALL, 5 * (manifest.update_period or 0)):
+                        self.to_screen(
+                            '[%s] No new segments for %d seconds, the stream is over'
+                            % (self.FD_NAME, self._clock() - last_new))
+                        break
+                    wake = []
+                    if manifest.update_period is not None:
+                        wake.append(next_update)
+                    if next_available is not None:
+                        wake.append(next_available - ctx['clock_offset'])
+                    delay = min(wake) - self._clock()
+                    if delay > 0:
+                        self._sleep(delay)
                     continue
-                self.report_error('giving up after %s fragment retries' % count)
-                return False
+                break
+        except KeyboardInterrupt:
+            # Live stream downloading cancellation should be considered as
+            # correct and expected termination (see FFmpegFD)
+            self.to_screen('[%s] Interrupted by user' % self.FD_NAME)
 
         self._finish_frag_download(ctx)
-
         return True
@@ -108,6 +108,14 @@ class ExternalFD(FileDownloader):
     def _configuration_args(self, default=[]):
         return cli_configuration_args(self.params, 'external_downloader_args', default)
 
+    def _rate_limit_option(self, command_option, info_dict):
+        # The external downloader limits its own rate: give it the lowest
+        # rate limit of the URL, overall or of its host
+        scheduler = self._bandwidth_scheduler
+        return cli_option(
+            {'ratelimit': scheduler and scheduler.rate(info_dict['url'])},
+            command_option, 'ratelimit')
+
     def _write_cookies(self):
         if not self.ydl.cookiejar.filename:
             tmp_cookies = tempfile.NamedTemporaryFile(suffix='.cookies', delete=False)
@@ -150,7 +158,7 @@ class CurlFD(ExternalFD):
         cmd += self._bool_option('--continue-at', 'continuedl', '-', '0')
         cmd += self._valueless_option('--silent', 'noprogress')
         cmd += self._valueless_option('--verbose', 'verbose')
-        cmd += self._option('--limit-rate', 'ratelimit')
+        cmd += self._rate_limit_option('--limit-rate', info_dict)
         retry = self._option('--retry', 'retries')
         if len(retry) == 2:
             if retry[1] in ('inf', 'infinite'):
@@ -199,7 +207,7 @@ class WgetFD(ExternalFD):
             cmd += ['--load-cookies', self._write_cookies()]
         for key, val in self._header_items(info_dict):
             cmd += ['--header', '%s: %s' % (key, val)]
-        cmd += self._option('--limit-rate', 'ratelimit')
+        cmd += self._rate_limit_option('--limit-rate', info_dict)
         retry = self._option('--tries', 'retries')
         if len(retry) == 2:
             if retry[1] in ('inf', 'infinite'):
@@ -235,7 +243,7 @@ class Aria2cFD(ExternalFD):
             cmd += ['--header', '%s: %s' % (key, val)]
         cmd += self._configuration_args(['--max-connection-per-server', '4'])
         cmd += ['--out', os.path.basename(tmpfilename)]
-        cmd += self._option('--max-overall-download-limit', 'ratelimit')
+        cmd += self._rate_limit_option('--max-overall-download-limit', info_dict)
         cmd += self._option('--interface', 'source_address')
         cmd += self._option('--all-proxy', 'proxy')
         cmd += self._bool_option('--check-certificate', 'nocheckcertificate', 'false', 'true', '=')
@@ -311,14 +319,24 @@ class Aria2pFD(ExternalFD):
         options['header'] = []
         for key, val in self._header_items(info_dict):
             options['header'].append('{0}: {1}'.format(key, val))
+        rate_limit = self._bandwidth_scheduler and self._bandwidth_scheduler.rate(info_dict['url'])
+        if rate_limit:
+            options['max-download-limit'] = rate_limit
         download = aria2.add_uris([info_dict['url']], options)
         status = {
             'status': 'downloading',
             'tmpfilename': tmpfilename,
         }
         started = time.time()
+        completed_length = 0
         while download.status in ['active', 'waiting']:
             download = aria2.get_download(download.gid)
+            if self._bandwidth_scheduler is not None:
+                # aria2 keeps to the rate limit by itself, but what it
+                # downloads counts for the other downloads of the process
+                self._bandwidth_scheduler.consume(
+                    download.completed_length - completed_length, info_dict['url'], wait=False)
+                completed_length = download.completed_length
             status.update({
                 'downloaded_bytes': download.completed_length,
                 'total_bytes': download.total_length,
@@ -1,18 +1,16 @@
 from __future__ import division, unicode_literals
 
-import io
-import itertools
 import time
 
 from .fragment import FragmentFD
 from ..compat import (
     compat_b64decode,
+    compat_Struct,
     compat_etree_fromstring,
     compat_urlparse,
     compat_urllib_error,
     compat_urllib_parse_urlparse,
     compat_struct_pack,
-    compat_struct_unpack,
 )
 from ..utils import (
     fix_xml_ampersands,
@@ -20,60 +18,103 @@ from ..utils import (
 )
 
 
+u8 = compat_Struct('!B')
+u32 = compat_Struct('!I')
+u64 = compat_Struct('!Q')
+afrt_entry = compat_Struct('!IQI')
+
+
 class DataTruncatedError(Exception):
     pass
 
 
-class FlvReader(io.BytesIO):
+class FlvReader(object):
     """
     Reader for Flv files
     The file format is documented in https://www.adobe.com/devnet/f4v.html
+
+    Numbers are unpacked in place and nested boxes are read by sub readers
+    sharing the same data, so that parsing never copies the underlying
+    buffer.
     """
 
-    def read_bytes(self, n):
-        data = self.read(n)
-        if len(data) < n:
+    def __init__(self, data=b'', start=0, end=None):
+        self.data = data
+        self.pos = start
+        self.end = len(data) if end is None else end
+
+    def tell(self):
+        return self.pos
+
+    def _advance(self, n):
+        pos = self.pos
+        if pos + n > self.end:
             raise DataTruncatedError(
                 'FlvReader error: need %d bytes while only %d bytes got' % (
-                    n, len(data)))
-        return data
+                    n, self.end - pos))
+        self.pos = pos + n
+        return pos
+
+    def read_bytes(self, n):
+        pos = self._advance(n)
+        return self.data[pos:pos + n]
+
+    def skip_bytes(self, n):
+        self._advance(n)
 
     # Utility functions for reading numbers and strings
     def read_unsigned_long_long(self):
-        return compat_struct_unpack('!Q', self.read_bytes(8))[0]
+        return u64.unpack_from(self.data, self._advance(8))[0]
 
     def read_unsigned_int(self):
-        return compat_struct_unpack('!I', self.read_bytes(4))[0]
+        return u32.unpack_from(self.data, self._advance(4))[0]
 
     def read_unsigned_char(self):
-        return compat_struct_unpack('!B', self.read_bytes(1))[0]
+        return u8.unpack_from(self.data, self._advance(1))[0]
 
     def read_string(self):
-        res = b''
-        while True:
-            char = self.read_bytes(1)
-            if char == b'\x00':
-                break
-            res += char
+        end = self.data.find(b'\x00', self.pos, self.end)
+        if end == -1:
+            raise DataTruncatedError('FlvReader error: unterminated string')
+        res = self.data[self.pos:end]
+        self.pos = end + 1
         return res
 
-    def read_box_info(self):
+    def read_box_header(self):
         """
-        Read a box and return the info as a tuple: (box_size, box_type, box_data)
+        Read the header of a box and return (box_type, data_start, data_end)
+        where the offsets delimit the box data in self.data, which is skipped
         """
-        real_size = size = self.read_unsigned_int()
+        box_start = self.pos
+        size = self.read_unsigned_int()
         box_type = self.read_bytes(4)
-        header_end = 8
         if size == 1:
-            real_size = self.read_unsigned_long_long()
-            header_end = 16
-        return real_size, box_type, self.read_bytes(real_size - header_end)
+            size = self.read_unsigned_long_long()
+        data_start = self.pos
+        if size < data_start - box_start:
+            raise DataTruncatedError('FlvReader error: invalid box size %d' % size)
+        self._advance(box_start + size - data_start)
+        return box_type, data_start, self.pos
+
+    def read_box_info(self):
+        """
+        Read a box and return the info as a tuple: (box_size, box_type, box_data)
+        """
+        box_start = self.pos
+        box_type, data_start, data_end = self.read_box_header()
+        return data_end - box_start, box_type, self.data[data_start:data_end]
+
+    def read_box(self, expected_type):
+        """Return a reader for the data of the next box"""
+        box_type, data_start, data_end = self.read_box_header()
+        assert box_type == expected_type
+        return FlvReader(self.data, data_start, data_end)
 
     def read_asrt(self):
         # version
         self.read_unsigned_char()
         # flags
-        self.read_bytes(3)
+        self.skip_bytes(3)
         quality_entry_count = self.read_unsigned_char()
         # QualityEntryCount
         for i in range(quality_entry_count):
@@ -94,7 +135,7 @@ class FlvReader(io.BytesIO):
         # version
         self.read_unsigned_char()
         # flags
-        self.read_bytes(3)
+        self.skip_bytes(3)
         # time scale
         self.read_unsigned_int()
 
@@ -106,9 +147,8 @@ class FlvReader(io.BytesIO):
         fragments_count = self.read_unsigned_int()
         fragments = []
         for i in range(fragments_count):
-            first = self.read_unsigned_int()
-            first_ts = self.read_unsigned_long_long()
-            duration = self.read_unsigned_int()
+            first, first_ts, duration = afrt_entry.unpack_from(
+                self.data, self._advance(afrt_entry.size))
             if duration == 0:
                 discontinuity_indicator = self.read_unsigned_char()
             else:
@@ -128,7 +168,7 @@ class FlvReader(io.BytesIO):
         # version
         self.read_unsigned_char()
         # flags
-        self.read_bytes(3)
+        self.skip_bytes(3)
 
         self.read_unsigned_int()  # BootstrapinfoVersion
         # Profile,Live,Update,Reserved
@@ -158,16 +198,11 @@ class FlvReader(io.BytesIO):
         segments_count = self.read_unsigned_char()
         segments = []
         for i in range(segments_count):
-            box_size, box_type, box_data = self.read_box_info()
-            assert box_type == b'asrt'
-            segment = FlvReader(box_data).read_asrt()
-            segments.append(segment)
+            segments.append(self.read_box(b'asrt').read_asrt())
         fragments_run_count = self.read_unsigned_char()
         fragments = []
         for i in range(fragments_run_count):
-            box_size, box_type, box_data = self.read_box_info()
-            assert box_type == b'afrt'
-            fragments.append(FlvReader(box_data).read_afrt())
+            fragments.append(self.read_box(b'afrt').read_afrt())
 
         return {
             'segments': segments,
@@ -176,34 +211,60 @@ class FlvReader(io.BytesIO):
         }
 
     def read_bootstrap_info(self):
-        total_size, box_type, box_data = self.read_box_info()
-        assert box_type == b'abst'
-        return FlvReader(box_data).read_abst()
+        return self.read_box(b'abst').read_abst()
+
+
+def data_view(data, start, end):
+    """Return data[start:end], without copying it where possible"""
+    try:
+        return memoryview(data)[start:end]
+    except NameError:  # Python 2.6
+        return data[start:end]
 
 
 def read_bootstrap_info(bootstrap_bytes):
     return FlvReader(bootstrap_bytes).read_bootstrap_info()
 
 
-def build_fragments_list(boot_info):
-    """ Return a list of (segment, fragment) for each fragment in the video """
-    res = []
+def build_fragments_list(boot_info, latest_fragment=None):
+    """ Return a list of (segment, fragment) for each fragment in the video
+
+    If latest_fragment is given, only the fragments following it are listed.
+    Fragment numbers are computed from the run tables, so that runs of
+    fragments that are skipped are never expanded.
+    """
     segment_run_table = boot_info['segments'][0]
     fragment_run_entry_table = boot_info['fragments'][0]['fragments']
+    runs = []
     first_frag_number = fragment_run_entry_table[0]['first']
-    fragments_counter = itertools.count(first_frag_number)
     for segment, fragments_count in segment_run_table['segment_run']:
         # In some live HDS streams (for example Rai), `fragments_count` is
         # abnormal and causing out-of-memory errors. It's OK to change the
         # number of fragments for live streams as they are updated periodically
         if fragments_count == 4294967295 and boot_info['live']:
             fragments_count = 2
-        for _ in range(fragments_count):
-            res.append((segment, next(fragments_counter)))
+        runs.append((segment, first_frag_number, fragments_count))
+        first_frag_number += fragments_count
 
     if boot_info['live']:
-        res = res[-2:]
+        # Only the last 2 fragments are downloaded
+        last_runs = []
+        remaining = 2
+        for segment, first, count in reversed(runs):
+            if remaining <= 0:
+                break
+            count = min(count, remaining)
+            last_runs.insert(0, (segment, first_frag_number - count, count))
+            first_frag_number -= count
+            remaining -= count
+        runs = last_runs
 
+    res = []
+    for segment, first, count in runs:
+        if latest_fragment is not None and first <= latest_fragment:
+            count -= latest_fragment + 1 - first
+            first = latest_fragment + 1
+        res.extend((segment, fragment) for fragment in range(first, first + count))
     return res
 
 
@@ -278,17 +339,21 @@ class F4mFD(FragmentFD):
             self.report_error('Unsupported DRM')
         return media
 
+    _bootstrap = None
+
     def _get_bootstrap_from_url(self, bootstrap_url):
         bootstrap = self.ydl.urlopen(bootstrap_url).read()
-        return read_bootstrap_info(bootstrap)
+        # Live bootstraps are polled until they change, only parse new ones
+        if self._bootstrap is None or self._bootstrap[0] != bootstrap:
+            self._bootstrap = (bootstrap, read_bootstrap_info(bootstrap))
+        return self._bootstrap[1]
 
     def _update_live_fragments(self, bootstrap_url, latest_fragment):
         fragments_list = []
         retries = 30
         while (not fragments_list) and (retries > 0):
             boot_info = self._get_bootstrap_from_url(bootstrap_url)
-            fragments_list = build_fragments_list(boot_info)
-            fragments_list = [f for f in fragments_list if f[1] > latest_fragment]
+            fragments_list = build_fragments_list(boot_info, latest_fragment)
             if not fragments_list:
                 # Retry after a while
                 time.sleep(5.0)
@@ -403,7 +468,7 @@ class F4mFD(FragmentFD):
                 reader = FlvReader(down_data)
                 while True:
                     try:
-                        _, box_type, box_data = reader.read_box_info()
+                        box_type, data_start, data_end = reader.read_box_header()
                     except DataTruncatedError:
                         if test:
                             # In tests, segments may be truncated, and thus
@@ -414,7 +479,9 @@ class F4mFD(FragmentFD):
                             break
                         raise
                     if box_type == b'mdat':
-                        self._append_fragment(ctx, box_data)
+                        # The FLV tags are written straight from the
+                        # downloaded fragment
+                        self._append_fragment(ctx, data_view(down_data, data_start, data_end))
                         break
             except (compat_urllib_error.HTTPError, ) as err:
                 if live and (err.code == 404 or err.code == 410):
@@ -1,12 +1,27 @@
 from __future__ import division, unicode_literals
 
+import collections
+import itertools
 import os
 import time
 import json
+import zlib
+
+try:
+    import threading
+except ImportError:
+    threading = None
 
 from .common import FileDownloader
-from .http import HttpFD
+from .http import (
+    HttpFD,
+    is_named_pipe,
+)
+from .retry import RetryPolicy
+from ..compat import compat_urllib_error
+from ..http2 import HTTP2_HEADER
 from ..utils import (
+    DownloadError,
     error_to_compat_str,
     encodeFilename,
     sanitize_open,
@@ -31,32 +46,66 @@ class FragmentFD(FileDownloader):
                         Skip unavailable fragments (DASH and hlsnative only)
     keep_fragments:     Keep downloaded fragments on disk after downloading is
                         finished
+    concurrent_fragments:
+                        Number of fragments to download concurrently (DASH
+                        only, default is 1)
+    http2:              Download the fragments over HTTP/2 when the server
+                        supports it, multiplexed over a single connection
+                        per host
 
     For each incomplete fragment download youtube-dl keeps on disk a special
     bookkeeping file with download state and metadata (in future such files will
     be used for any incomplete download handled by youtube-dl). This file is
     used to properly handle resuming, check download file consistency and detect
-    potential errors. The file has a .ytdl extension and represents a standard
-    JSON file of the following format:
+    potential errors. The file has a .ytdl extension and is an append-only
+    journal of JSON objects, one per line. The first one is the header:
 
     extractor:
         Dictionary of extractor related data. TBD.
 
     downloader:
         Dictionary of downloader related data. May contain following data:
-            current_fragment:
-                Dictionary with current (being downloaded) fragment data:
-                index:  0-based index of current fragment among all fragments
             fragment_count:
                 Total count of fragments
 
+    Then comes a line for each fragment appended to the download file:
+
+    fragment:
+        Dictionary with the fragment data:
+            index:  Count of fragments complete with this one
+            offset: Byte offset of the fragment in the download file
+            length: Length of the fragment in bytes
+            crc32:  CRC-32 of the content of the fragment
+
+    The journal and the download file are synced to disk every few fragments,
+    the download file first. On resume, the fragments are checked against
+    the download file, which is truncated after the last one that matches.
+    Files of older versions, with a single downloader.current_fragment.index
+    entry, are trusted as they are.
+
     This feature is experimental and file format may change in future.
     """
 
-    def report_retry_fragment(self, err, frag_index, count, retries):
+    # Fragments and seconds between syncs of the journal to disk
+    _JOURNAL_SYNC_FRAGMENTS = 16
+    _JOURNAL_SYNC_INTERVAL = 5
+
+    def report_retry_fragment(self, err, frag_index, count, retries, delay=None):
         self.to_screen(
-            '[download] Got server HTTP error: %s. Retrying fragment %d (attempt %d of %s)...'
-            % (error_to_compat_str(err), frag_index, count, self.format_retries(retries)))
+            '[download] Got server HTTP error: %s. Retrying fragment %d%s (attempt %d of %s)...'
+            % (error_to_compat_str(err), frag_index, self.format_retry_delay(delay), count,
+               self.format_retries(retries)))
+
+    def _retry_fragment(self, ctx, err, frag_index, count):
+        """Wait before retry count of a fragment that failed with err
+        Return False if it is not to be retried"""
+        retry_policy = ctx['retry_policy']
+        delay = retry_policy.delay(err, count)
+        if delay is None:
+            return False
+        self.report_retry_fragment(err, frag_index, count, retry_policy.retries, delay)
+        retry_policy.wait(delay)
+        return True
 
     def report_skip_fragment(self, frag_index):
         self.to_screen('[download] Skipping fragment %d...' % frag_index)
@@ -71,35 +120,133 @@ class FragmentFD(FileDownloader):
 
     @staticmethod
     def __do_ytdl_file(ctx):
-        return ctx['live'] is not True and ctx['tmpfilename'] != '-'
+        return ctx['live'] is not True and ctx['tmpfilename'] != '-' and not ctx['to_pipe']
 
     def _read_ytdl_file(self, ctx):
         assert 'ytdl_corrupt' not in ctx
         stream, _ = sanitize_open(self.ytdl_filename(ctx['filename']), 'r')
         try:
-            ctx['fragment_index'] = json.loads(stream.read())['downloader']['current_fragment']['index']
+            lines = stream.read().splitlines()
+            downloader = json.loads(lines[0])['downloader']
+            if 'current_fragment' in downloader:
+                ctx['fragment_index'] = downloader['current_fragment']['index']
+                return
+            journal = []
+            for line in lines[1:]:
+                try:
+                    journal.append(json.loads(line)['fragment'])
+                except ValueError:
+                    # Torn by an interrupted write
+                    break
+            ctx['ytdl_journal'] = journal
         except Exception:
             ctx['ytdl_corrupt'] = True
         finally:
             stream.close()
 
-    def _write_ytdl_file(self, ctx):
-        frag_index_stream, _ = sanitize_open(self.ytdl_filename(ctx['filename']), 'w')
-        downloader = {
-            'current_fragment': {
-                'index': ctx['fragment_index'],
-            },
+    def _verify_ytdl_journal(self, ctx, journal):
+        """Check the fragments of journal against the download file
+        Return the fragments that match, up to the first one that does not"""
+        verified = []
+        try:
+            stream = open(encodeFilename(ctx['tmpfilename']), 'rb')
+        except (IOError, OSError):
+            return verified
+        try:
+            end = 0
+            for fragment in journal:
+                if fragment['offset'] != end or (verified and fragment['index'] <= verified[-1]['index']):
+                    break
+                content = stream.read(fragment['length'])
+                if len(content) != fragment['length'] or zlib.crc32(content) & 0xffffffff != fragment['crc32']:
+                    break
+                verified.append(fragment)
+                end += fragment['length']
+        except (KeyError, TypeError):
+            pass
+        finally:
+            stream.close()
+        return verified
+
+    def _checksum_fragments(self, ctx, length):
+        """Return a journal entry for the first length bytes of the download file"""
+        crc32 = 0
+        with open(encodeFilename(ctx['tmpfilename']), 'rb') as stream:
+            remaining = length
+            while remaining > 0:
+                content = stream.read(min(remaining, 1024 * 1024))
+                if not content:
+                    break
+                crc32 = zlib.crc32(content, crc32)
+                remaining -= len(content)
+        return {
+            'index': ctx['fragment_index'],
+            'offset': 0,
+            'length': length,
+            'crc32': crc32 & 0xffffffff,
         }
+
+    def _write_ytdl_file(self, ctx, journal=()):
+        """Start the journal over with the fragments of journal"""
+        if ctx.get('ytdl_stream'):
+            ctx['ytdl_stream'].close()
+        stream, _ = sanitize_open(self.ytdl_filename(ctx['filename']), 'w')
+        downloader = {}
         if ctx.get('fragment_count') is not None:
             downloader['fragment_count'] = ctx['fragment_count']
-        frag_index_stream.write(json.dumps({'downloader': downloader}))
-        frag_index_stream.close()
+        stream.write(json.dumps({'downloader': downloader}) + '\n')
+        for fragment in journal:
+            stream.write(json.dumps({'fragment': fragment}) + '\n')
+        stream.flush()
+        ctx.update({
+            'ytdl_stream': stream,
+            'ytdl_synced': time.time(),
+            'ytdl_unsynced': 0,
+        })
 
-    def _download_fragment(self, ctx, frag_url, info_dict, headers=None):
+    def _journal_fragment(self, ctx, frag_content):
+        offset = ctx['journal_offset']
+        stream = ctx['ytdl_stream']
+        stream.write(json.dumps({'fragment': {
+            'index': ctx['fragment_index'],
+            'offset': offset,
+            'length': len(frag_content),
+            'crc32': zlib.crc32(frag_content) & 0xffffffff,
+        }}) + '\n')
+        stream.flush()
+        ctx['journal_offset'] = offset + len(frag_content)
+        ctx['ytdl_unsynced'] += 1
+        if (ctx['ytdl_unsynced'] >= self._JOURNAL_SYNC_FRAGMENTS
+                or time.time() - ctx['ytdl_synced'] >= self._JOURNAL_SYNC_INTERVAL):
+            self._sync_ytdl_file(ctx)
+
+    def _sync_ytdl_file(self, ctx):
+        # The fragments in the journal are to be in the download file
+        # whatever happens
+        for stream in (ctx['dest_stream'], ctx['ytdl_stream']):
+            try:
+                os.fsync(stream.fileno())
+            except (IOError, OSError):
+                pass
+        ctx['ytdl_synced'] = time.time()
+        ctx['ytdl_unsynced'] = 0
+
+    def _fragment_headers(self, info_dict, headers=None):
+        headers = headers or info_dict.get('http_headers')
+        if self.params.get('http2'):
+            # Lets YoutubeDLHTTP2Handler send the request over HTTP/2
+            headers = dict(headers or {})
+            headers[HTTP2_HEADER] = '1'
+        return headers
+
+    def _download_fragment(self, ctx, frag_url, info_dict, headers=None, frag_count=1):
+        """Download frag_url, which holds frag_count fragments
+        Return (success, content)"""
+        ctx['fragment_download_count'] = frag_count
         fragment_filename = '%s-Frag%d' % (ctx['tmpfilename'], ctx['fragment_index'])
         fragment_info_dict = {
             'url': frag_url,
-            'http_headers': headers or info_dict.get('http_headers'),
+            'http_headers': self._fragment_headers(info_dict, headers),
         }
         frag_resume_len = 0
         if ctx['dl'].params.get('continuedl', True):
@@ -119,16 +266,110 @@ class FragmentFD(FileDownloader):
         down.close()
         return True, frag_content
 
+    def _concurrent_fragments(self):
+        return (self.params.get('concurrent_fragments') or 1) if threading else 1
+
+    def _download_fragments(self, ctx, fragments, info_dict):
+        """
+        Download fragments concurrent_fragments at a time, append them in order
+
+        fragments yields (frag_index, fragment URL, fatal) tuples, frag_index
+        being 1-based. Each fragment is downloaded into its own file by its
+        own HttpQuietDownloader, with its HTTP errors retried as one at a
+        time, and progress is reported as fragments complete. Over HTTP/2
+        the fragments from a host share a single connection.
+        Return False if a fatal fragment fails.
+        """
+        concurrency = self._concurrent_fragments()
+        dl_params = ctx['dl'].params
+        # frag_index: (fragment filename, downloader) or exception
+        results = {}
+
+        def download_fragment(frag_index, frag_url):
+            dl = HttpQuietDownloader(self.ydl, dl_params)
+            fragment_filename = '%s-Frag%d' % (ctx['tmpfilename'], frag_index - 1)
+            fragment_info_dict = {
+                'url': frag_url,
+                'http_headers': self._fragment_headers(info_dict),
+            }
+            try:
+                for count in itertools.count(1):
+                    try:
+                        if dl.download(fragment_filename, fragment_info_dict):
+                            results[frag_index] = (fragment_filename, fragment_info_dict, dl)
+                        else:
+                            results[frag_index] = DownloadError('unable to download fragment %d' % frag_index)
+                        return
+                    except compat_urllib_error.HTTPError as err:
+                        if not self._retry_fragment(ctx, err, frag_index, count):
+                            raise
+            except BaseException as e:
+                results[frag_index] = e
+
+        def append_fragment(frag_index, fatal):
+            result = results.pop(frag_index)
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                if not fatal:
+                    self.report_skip_fragment(frag_index)
+                    return True
+                if isinstance(result, DownloadError):
+                    raise result
+                self.report_error('fragment %d failed: %s' % (frag_index, error_to_compat_str(result)))
+                return False
+            fragment_filename, fragment_info_dict, dl = result
+            if fragment_info_dict.get('filetime'):
+                ctx['fragment_filetime'] = fragment_info_dict['filetime']
+            down, ctx['fragment_filename_sanitized'] = sanitize_open(fragment_filename, 'rb')
+            frag_content = down.read()
+            down.close()
+            frag_size = len(frag_content)
+            ctx['dl']._hook_progress({
+                'status': 'finished',
+                'filename': fragment_filename,
+                'downloaded_bytes': frag_size,
+                'total_bytes': frag_size,
+                'retry_count': dl._retry_policy.retry_count,
+                'retry_wait': dl._retry_policy.retry_wait,
+            })
+            self._append_fragment(ctx, frag_content)
+            return True
+
+        # (frag_index, fatal, thread), in the order the fragments are appended.
+        # On failure, the fragments still downloading are left to finish in
+        # the background.
+        running = collections.deque()
+        for frag_index, frag_url, fatal in fragments:
+            if len(running) >= concurrency:
+                done_index, done_fatal, thread = running.popleft()
+                thread.join()
+                if not append_fragment(done_index, done_fatal):
+                    return False
+            thread = threading.Thread(target=download_fragment, args=(frag_index, frag_url))
+            thread.daemon = True
+            thread.start()
+            running.append((frag_index, fatal, thread))
+        while running:
+            frag_index, fatal, thread = running.popleft()
+            thread.join()
+            if not append_fragment(frag_index, fatal):
+                return False
+        return True
+
     def _append_fragment(self, ctx, frag_content):
         try:
             ctx['dest_stream'].write(frag_content)
             ctx['dest_stream'].flush()
-        finally:
             if self.__do_ytdl_file(ctx):
-                self._write_ytdl_file(ctx)
-            if not self.params.get('keep_fragments', False):
-                os.remove(encodeFilename(ctx['fragment_filename_sanitized']))
-            del ctx['fragment_filename_sanitized']
+                self._journal_fragment(ctx, frag_content)
+        finally:
+            self._discard_fragment(ctx)
+
+    def _discard_fragment(self, ctx):
+        if not self.params.get('keep_fragments', False):
+            os.remove(encodeFilename(ctx['fragment_filename_sanitized']))
+        del ctx['fragment_filename_sanitized']
 
     def _prepare_frag_download(self, ctx):
         if not ctx.setdefault('live', False):
@@ -149,29 +390,42 @@ class FragmentFD(FileDownloader):
                 'quiet': True,
                 'noprogress': True,
                 'ratelimit': self.params.get('ratelimit'),
+                'ratelimit_burst': self.params.get('ratelimit_burst'),
+                'ratelimit_hosts': self.params.get('ratelimit_hosts'),
                 'retries': self.params.get('retries', 0),
+                'retry_sleep': self.params.get('retry_sleep'),
+                'max_retry_sleep': self.params.get('max_retry_sleep'),
                 'nopart': self.params.get('nopart', False),
                 'test': self.params.get('test', False),
             }
         )
         tmpfilename = self.temp_name(ctx['filename'])
-        open_mode = 'wb'
 
         # Establish possible resume length
         resume_len = self.filesize_or_none(tmpfilename) or 0
-        if resume_len > 0:
-            open_mode = 'ab'
 
         # Should be initialized before ytdl file check
         ctx.update({
             'tmpfilename': tmpfilename,
             'fragment_index': 0,
+            # Named pipes (see FFmpegStreamMergeFD) can neither be resumed
+            # nor synced
+            'to_pipe': is_named_pipe(tmpfilename),
         })
 
         if self.__do_ytdl_file(ctx):
+            journal = []
             ytdl_file_exists = os.path.isfile(encodeFilename(self.ytdl_filename(ctx['filename'])))
             if continuedl and ytdl_file_exists:
                 self._read_ytdl_file(ctx)
+                if 'ytdl_journal' in ctx:
+                    journal = self._verify_ytdl_journal(ctx, ctx.pop('ytdl_journal'))
+                    verified_len = journal[-1]['offset'] + journal[-1]['length'] if journal else 0
+                    if verified_len < resume_len:
+                        self.report_warning(
+                            'Discarding %d bytes of the download not matching the .ytdl file' % (resume_len - verified_len))
+                    ctx['fragment_index'] = journal[-1]['index'] if journal else 0
+                    resume_len = verified_len
                 is_corrupt = ctx.get('ytdl_corrupt') is True
                 is_inconsistent = ctx['fragment_index'] > 0 and resume_len == 0
                 if is_corrupt or is_inconsistent:
@@ -183,20 +437,24 @@ class FragmentFD(FileDownloader):
                     ctx['fragment_index'] = resume_len = 0
                     if 'ytdl_corrupt' in ctx:
                         del ctx['ytdl_corrupt']
-                    self._write_ytdl_file(ctx)
-
+                elif not journal and ctx['fragment_index'] > 0:
+                    # Taken over from an older version as a single fragment
+                    journal = [self._checksum_fragments(ctx, resume_len)]
             else:
-                if not continuedl:
-                    if ytdl_file_exists:
-                        self._read_ytdl_file(ctx)
-                    ctx['fragment_index'] = resume_len = 0
-                self._write_ytdl_file(ctx)
-                assert ctx['fragment_index'] == 0
+                # Without a journal, nothing in the download file is known
+                # to be right
+                ctx['fragment_index'] = resume_len = 0
+            self._write_ytdl_file(ctx, journal)
+            ctx['journal_offset'] = resume_len
 
-        dest_stream, tmpfilename = sanitize_open(tmpfilename, open_mode)
+        dest_stream, tmpfilename = sanitize_open(tmpfilename, 'ab' if resume_len > 0 else 'wb')
+        if self.__do_ytdl_file(ctx):
+            # Drop what follows the last fragment done
+            dest_stream.truncate(resume_len)
 
         ctx.update({
             'dl': dl,
+            'retry_policy': RetryPolicy(self.params, fragment=True),
             'dest_stream': dest_stream,
             'tmpfilename': tmpfilename,
             # Total complete fragments downloaded so far in bytes
@@ -235,16 +493,22 @@ class FragmentFD(FileDownloader):
 
             time_now = time.time()
             state['elapsed'] = time_now - start
+            # Retries of the fragments, and within their HTTP downloads
+            state['retry_count'] = ctx['retry_policy'].retry_count + s.get('retry_count', 0)
+            state['retry_wait'] = ctx['retry_policy'].retry_wait + s.get('retry_wait', 0)
             frag_total_bytes = s.get('total_bytes') or 0
+            # Fragments coalesced into the download
+            frag_count = ctx.get('fragment_download_count', 1)
             if not ctx['live']:
                 estimated_size = (
                     (ctx['complete_frags_downloaded_bytes'] + frag_total_bytes)
-                    / (state['fragment_index'] + 1) * total_frags)
+                    / (ctx['fragment_index'] + frag_count) * total_frags)
                 state['total_bytes_estimate'] = estimated_size
 
             if s['status'] == 'finished':
-                state['fragment_index'] += 1
-                ctx['fragment_index'] = state['fragment_index']
+                # Downloaders may take back fragments of the download
+                ctx['fragment_index'] += frag_count
+                state['fragment_index'] = ctx['fragment_index']
                 state['downloaded_bytes'] += frag_total_bytes - ctx['prev_frag_downloaded_bytes']
                 ctx['complete_frags_downloaded_bytes'] = state['downloaded_bytes']
                 ctx['speed'] = state['speed'] = self.calc_speed(
@@ -268,6 +532,7 @@ class FragmentFD(FileDownloader):
     def _finish_frag_download(self, ctx):
         ctx['dest_stream'].close()
         if self.__do_ytdl_file(ctx):
+            ctx['ytdl_stream'].close()
             ytdl_filename = encodeFilename(self.ytdl_filename(ctx['filename']))
             if os.path.isfile(ytdl_filename):
                 os.remove(ytdl_filename)
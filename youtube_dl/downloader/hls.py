@@ -1,5 +1,6 @@
 from __future__ import unicode_literals
 
+import collections
 import re
 import binascii
 try:
@@ -22,11 +23,67 @@ from ..utils import (
 )
 
 
+def coalesce_byte_ranges(fragments, max_size):
+    """
+    Group the fragments to download with a single request
+
+    Consecutive fragments that are contiguous byte ranges of the same
+    media file, as in single file playlists, are grouped as long as the
+    range they span is not over max_size bytes. Yield lists of fragments.
+    """
+    group = []
+    for fragment in fragments:
+        byte_range = fragment['byte_range']
+        if group:
+            first, last = group[0], group[-1]
+            if not (byte_range and last['byte_range']
+                    and fragment['url'] == last['url']
+                    and byte_range['start'] == last['byte_range']['end']
+                    and byte_range['end'] - first['byte_range']['start'] <= max_size):
+                yield group
+                group = []
+        group.append(fragment)
+    if group:
+        yield group
+
+
+def split_byte_ranges(content, group):
+    """
+    Split the content downloaded for a group of fragments into theirs
+
+    The fragments past the end of a content shorter than their range are
+    left out.
+    """
+    if not group[0]['byte_range']:
+        return [content]
+    start = group[0]['byte_range']['start']
+    end = group[-1]['byte_range']['end']
+    if len(content) != end - start:
+        if len(content) >= end:
+            # The whole media file, from a server ignoring the Range header
+            start = 0
+        elif len(group) == 1:
+            return [content]
+    return [
+        content[f['byte_range']['start'] - start:f['byte_range']['end'] - start]
+        for f in group if f['byte_range']['end'] - start <= len(content)]
+
+
 class HlsFD(FragmentFD):
-    """ A limited implementation that does not require ffmpeg """
+    """
+    A limited implementation that does not require ffmpeg
+
+    Available options:
+
+    hls_byterange_size: Largest byte range, in bytes, to download contiguous
+                        EXT-X-BYTERANGE fragments of a media file with in a
+                        single request (default is 10M, 0 to disable)
+    """
 
     FD_NAME = 'hlsnative'
 
+    _BYTERANGE_SIZE = 10 * 1024 * 1024
+
     @staticmethod
     def can_download(manifest, info_dict):
         UNSUPPORTED_FEATURES = (
@@ -111,15 +168,20 @@ class HlsFD(FragmentFD):
 
         self._prepare_and_start_frag_download(ctx)
 
-        fragment_retries = self.params.get('fragment_retries', 0)
         skip_unavailable_fragments = self.params.get('skip_unavailable_fragments', True)
         test = self.params.get('test', False)
+        byterange_size = self.params.get('hls_byterange_size')
+        if byterange_size is None:
+            byterange_size = self._BYTERANGE_SIZE
+        if test:
+            # Only the start of the first fragment is downloaded
+            byterange_size = 0
 
         extra_query = None
         extra_param_to_segment_url = info_dict.get('extra_param_to_segment_url')
         if extra_param_to_segment_url:
             extra_query = compat_urlparse.parse_qs(extra_param_to_segment_url)
-        i = 0
+        fragments = []
         media_sequence = 0
         decrypt_info = {'METHOD': 'NONE'}
         byte_range = {}
@@ -132,57 +194,22 @@ class HlsFD(FragmentFD):
                     if ad_frag_next:
                         continue
                     frag_index += 1
-                    if frag_index <= ctx['fragment_index']:
-                        continue
                     frag_url = (
                         line
                         if re.match(r'^https?://', line)
                         else compat_urlparse.urljoin(man_url, line))
                     if extra_query:
                         frag_url = update_url_query(frag_url, extra_query)
-                    count = 0
-                    headers = info_dict.get('http_headers', {})
-                    if byte_range:
-                        headers['Range'] = 'bytes=%d-%d' % (byte_range['start'], byte_range['end'] - 1)
-                    while count <= fragment_retries:
-                        try:
-                            success, frag_content = self._download_fragment(
-                                ctx, frag_url, info_dict, headers)
-                            if not success:
-                                return False
-                            break
-                        except compat_urllib_error.HTTPError as err:
-                            # Unavailable (possibly temporary) fragments may be served.
-                            # First we try to retry then either skip or abort.
-                            # See https://github.com/ytdl-org/youtube-dl/issues/10165,
-                            # https://github.com/ytdl-org/youtube-dl/issues/10448).
-                            count += 1
-                            if count <= fragment_retries:
-                                self.report_retry_fragment(err, frag_index, count, fragment_retries)
-                    if count > fragment_retries:
-                        if skip_unavailable_fragments:
-                            i += 1
-                            media_sequence += 1
-                            self.report_skip_fragment(frag_index)
-                            continue
-                        self.report_error(
-                            'giving up after %s fragment retries' % fragment_retries)
-                        return False
-                    if decrypt_info['METHOD'] == 'AES-128':
-                        iv = decrypt_info.get('IV') or compat_struct_pack('>8xq', media_sequence)
-                        decrypt_info['KEY'] = decrypt_info.get('KEY') or self.ydl.urlopen(
-                            self._prepare_url(info_dict, info_dict.get('_decryption_key_url') or decrypt_info['URI'])).read()
-                        # Don't decrypt the content in tests since the data is explicitly truncated and it's not to a valid block
-                        # size (see https://github.com/ytdl-org/youtube-dl/pull/27660). Tests only care that the correct data downloaded,
-                        # not what it decrypts to.
-                        if not test:
-                            frag_content = AES.new(
-                                decrypt_info['KEY'], AES.MODE_CBC, iv).decrypt(frag_content)
-                    self._append_fragment(ctx, frag_content)
-                    # We only download the first fragment during the test
-                    if test:
-                        break
-                    i += 1
+                    if frag_index > ctx['fragment_index']:
+                        fragments.append({
+                            'index': frag_index,
+                            'url': frag_url,
+                            'byte_range': byte_range,
+                            # Shared by the fragments it applies to, that
+                            # fetch the key once
+                            'decrypt_info': decrypt_info,
+                            'media_sequence': media_sequence,
+                        })
                     media_sequence += 1
                 elif line.startswith('#EXT-X-KEY'):
                     decrypt_url = decrypt_info.get('URI')
@@ -211,6 +238,69 @@ class HlsFD(FragmentFD):
                 elif is_ad_fragment_end(line):
                     ad_frag_next = False
 
+        groups = collections.deque(coalesce_byte_ranges(fragments, byterange_size))
+        while groups:
+            group = groups.popleft()
+            frag_index = group[0]['index']
+            headers = dict(info_dict.get('http_headers') or {})
+            if group[0]['byte_range']:
+                headers['Range'] = 'bytes=%d-%d' % (
+                    group[0]['byte_range']['start'], group[-1]['byte_range']['end'] - 1)
+            count = 0
+            frag_content = None
+            while True:
+                try:
+                    success, frag_content = self._download_fragment(
+                        ctx, group[0]['url'], info_dict, headers, frag_count=len(group))
+                    if not success:
+                        return False
+                    break
+                except compat_urllib_error.HTTPError as err:
+                    # Unavailable (possibly temporary) fragments may be served.
+                    # First we try to retry then either skip or abort.
+                    # See https://github.com/ytdl-org/youtube-dl/issues/10165,
+                    # https://github.com/ytdl-org/youtube-dl/issues/10448).
+                    count += 1
+                    if not self._retry_fragment(ctx, err, frag_index, count):
+                        break
+            if frag_content is None:
+                if len(group) > 1:
+                    # Only the fragments that fail on their own are given up
+                    groups.extendleft([f] for f in reversed(group))
+                    continue
+                if skip_unavailable_fragments:
+                    self.report_skip_fragment(frag_index)
+                    continue
+                self.report_error(
+                    'giving up after %s fragment retries' % (count - 1))
+                return False
+            contents = split_byte_ranges(frag_content, group)
+            if len(contents) < len(group):
+                # Less than the range asked for came: the fragments left out
+                # are downloaded one by one
+                ctx['fragment_index'] -= len(group) - len(contents)
+                groups.extendleft([f] for f in reversed(group[len(contents):]))
+                group = group[:len(contents)]
+                if not group:
+                    self._discard_fragment(ctx)
+                    continue
+            for i, fragment in enumerate(group):
+                decrypt_info = fragment['decrypt_info']
+                if decrypt_info['METHOD'] == 'AES-128':
+                    iv = decrypt_info.get('IV') or compat_struct_pack('>8xq', fragment['media_sequence'])
+                    decrypt_info['KEY'] = decrypt_info.get('KEY') or self.ydl.urlopen(
+                        self._prepare_url(info_dict, info_dict.get('_decryption_key_url') or decrypt_info['URI'])).read()
+                    # Don't decrypt the content in tests since the data is explicitly truncated and it's not to a valid block
+                    # size (see https://github.com/ytdl-org/youtube-dl/pull/27660). Tests only care that the correct data downloaded,
+                    # not what it decrypts to.
+                    if not test:
+                        contents[i] = AES.new(
+                            decrypt_info['KEY'], AES.MODE_CBC, iv).decrypt(contents[i])
+            self._append_fragment(ctx, b''.join(contents))
+            # We only download the first fragment during the test
+            if test:
+                break
+
         self._finish_frag_download(ctx)
 
         return True
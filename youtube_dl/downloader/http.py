@@ -6,6 +6,7 @@ import socket
 import time
 import random
 import re
+import stat
 
 from .common import FileDownloader
 from ..compat import (
@@ -24,6 +25,13 @@ from ..utils import (
 )
 
 
+def is_named_pipe(filename):
+    try:
+        return stat.S_ISFIFO(os.stat(encodeFilename(filename)).st_mode)
+    except OSError:
+        return False
+
+
 class HttpFD(FileDownloader):
     def real_download(self, filename, info_dict):
         url = info_dict['url']
@@ -65,7 +73,7 @@ class HttpFD(FileDownloader):
         ctx.is_resume = ctx.resume_len > 0
 
         count = 0
-        retries = self.params.get('retries', 0)
+        retry_policy = self._retry_policy
 
         class SucceedDownload(Exception):
             pass
@@ -105,15 +113,18 @@ class HttpFD(FileDownloader):
             if has_range:
                 set_range(request, range_start, range_end)
             # Establish connection
+            retry_policy.wait_for_host(url)
             try:
                 try:
                     ctx.data = self.ydl.urlopen(request)
                 except (compat_urllib_error.URLError, ) as err:
+                    retry_policy.record_failure(url, err)
                     # reason may not be available, e.g. for urllib2.HTTPError on python 2.6
                     reason = getattr(err, 'reason', None)
                     if isinstance(reason, socket.timeout):
                         raise RetryDownload(err)
                     raise err
+                retry_policy.record_success(url)
                 # When trying to resume, Content-Range HTTP header of response has to be checked
                 # to match the value of requested Range HTTP header. This is due to webservers
                 # that don't support resuming and serve a whole file with no Content-Range
@@ -184,7 +195,7 @@ class HttpFD(FileDownloader):
                             ctx.resume_len = 0
                             ctx.open_mode = 'wb'
                             return
-                elif err.code < 500 or err.code >= 600:
+                elif not retry_policy.retryable(err):
                     # Unexpected HTTP error
                     raise
                 raise RetryDownload(err)
@@ -192,6 +203,7 @@ class HttpFD(FileDownloader):
                 if err.errno != errno.ECONNRESET:
                     # Connection reset is no problem, just retry
                     raise
+                retry_policy.record_failure(url, err)
                 raise RetryDownload(err)
 
         def download():
@@ -220,17 +232,31 @@ class HttpFD(FileDownloader):
             block_size = ctx.block_size
             start = time.time()
 
+            # Reads of at most the burst of the rate limits keep the rate
+            # smooth
+            data_url = ctx.data.geturl()
+            max_block_size = (
+                self._bandwidth_scheduler.burst(data_url)
+                if self._bandwidth_scheduler is not None else None)
+            if max_block_size:
+                block_size = min(block_size, max_block_size)
+
             # measure time over whole while-loop, so slow_down() and best_block_size() work together properly
-            now = None  # needed for slow_down() in the first loop run
             before = start  # start measuring
 
             def retry(e):
                 to_stdout = ctx.tmpfilename == '-'
-                if ctx.stream is not None:
-                    if not to_stdout:
-                        ctx.stream.close()
+                # A named pipe (see FFmpegStreamMergeFD) can neither be
+                # reopened nor measured: keep writing to the same stream
+                to_pipe = to_stdout or (
+                    ctx.stream is not None and is_named_pipe(ctx.tmpfilename))
+                if ctx.stream is not None and not to_pipe:
+                    ctx.stream.close()
+                    ctx.stream = None
+                elif to_stdout:
                     ctx.stream = None
-                ctx.resume_len = byte_counter if to_stdout else os.path.getsize(encodeFilename(ctx.tmpfilename))
+                ctx.resume_len = byte_counter if to_pipe else os.path.getsize(encodeFilename(ctx.tmpfilename))
+                retry_policy.record_failure(url, e)
                 raise RetryDownload(e)
 
             while True:
@@ -280,7 +306,7 @@ class HttpFD(FileDownloader):
                     return False
 
                 # Apply rate limit
-                self.slow_down(start, now, byte_counter - ctx.resume_len)
+                self.slow_down(len(data_block), data_url)
 
                 # end measuring of one loop run
                 now = time.time()
@@ -289,6 +315,8 @@ class HttpFD(FileDownloader):
                 # Adjust block size
                 if not self.params.get('noresizebuffer', False):
                     block_size = self.best_block_size(after - before, len(data_block))
+                    if max_block_size:
+                        block_size = min(block_size, max_block_size)
 
                 before = after
 
@@ -305,6 +333,8 @@ class HttpFD(FileDownloader):
                     'eta': eta,
                     'speed': speed,
                     'elapsed': now - ctx.start_time,
+                    'retry_count': retry_policy.retry_count,
+                    'retry_wait': retry_policy.retry_wait,
                 })
 
                 if data_len is not None and byte_counter == data_len:
@@ -324,7 +354,7 @@ class HttpFD(FileDownloader):
 
             if data_len is not None and byte_counter != data_len:
                 err = ContentTooShortError(byte_counter, int(data_len))
-                if count <= retries:
+                if count <= retry_policy.retries:
                     retry(err)
                 raise err
 
@@ -340,23 +370,28 @@ class HttpFD(FileDownloader):
                 'filename': ctx.filename,
                 'status': 'finished',
                 'elapsed': time.time() - ctx.start_time,
+                'retry_count': retry_policy.retry_count,
+                'retry_wait': retry_policy.retry_wait,
             })
 
             return True
 
-        while count <= retries:
+        while True:
             try:
                 establish_connection()
                 return download()
             except RetryDownload as e:
                 count += 1
-                if count <= retries:
-                    self.report_retry(e.source_error, count, retries)
+                delay = retry_policy.delay(e.source_error, count)
+                if delay is None:
+                    break
+                self.report_retry(e.source_error, count, retry_policy.retries, delay)
+                retry_policy.wait(delay)
                 continue
             except NextFragment:
                 continue
             except SucceedDownload:
                 return True
 
-        self.report_error('giving up after %s retries' % retries)
+        self.report_error('giving up after %s retries' % (count - 1))
         return False
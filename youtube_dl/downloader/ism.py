@@ -2,7 +2,6 @@ from __future__ import unicode_literals
 
 import time
 import binascii
-import io
 
 from .fragment import FragmentFD
 from ..compat import (
@@ -23,6 +22,8 @@ s16 = compat_Struct('>h')
 s1616 = compat_Struct('>hxx')
 s32 = compat_Struct('>i')
 
+box_header = compat_Struct('>I4s')
+
 unity_matrix = (s32.pack(0x10000) + s32.pack(0) * 3) * 2 + s32.pack(0x40000000)
 
 TRACK_ENABLED = 0x1
@@ -40,7 +41,36 @@ def full_box(box_type, version, flags, payload):
     return box(box_type, u8.pack(version) + u32.pack(flags)[1:] + payload)
 
 
+# Parameters of _download_params that the PIFF header depends on
+PIFF_HEADER_PARAMS = (
+    'track_id', 'fourcc', 'duration', 'timescale', 'language', 'height',
+    'width', 'channels', 'bits_per_sample', 'sampling_rate',
+    'codec_private_data', 'nal_unit_length_field')
+
+_piff_header_cache = {}
+_PIFF_HEADER_CACHE_SIZE = 16
+
+
+def piff_header(params):
+    """Return the ftyp and moov boxes of a track as bytes
+
+    Headers are built once per track and reused for every download of the
+    same track parameters.
+    """
+    key = tuple(params.get(p) for p in PIFF_HEADER_PARAMS)
+    header = _piff_header_cache.get(key)
+    if header is None:
+        if len(_piff_header_cache) >= _PIFF_HEADER_CACHE_SIZE:
+            _piff_header_cache.clear()
+        header = _piff_header_cache[key] = _build_piff_header(params)
+    return header
+
+
 def write_piff_header(stream, params):
+    stream.write(piff_header(params))
+
+
+def _build_piff_header(params):
     track_id = params['track_id']
     fourcc = params['fourcc']
     duration = params['duration']
@@ -54,7 +84,7 @@ def write_piff_header(stream, params):
     ftyp_payload = b'isml'  # major brand
     ftyp_payload += u32.pack(1)  # minor version
     ftyp_payload += b'piff' + b'iso2'  # compatible brands
-    stream.write(box(b'ftyp', ftyp_payload))  # File Type Box
+    header = box(b'ftyp', ftyp_payload)  # File Type Box
 
     mvhd_payload = u64.pack(creation_time)
     mvhd_payload += u64.pack(modification_time)
@@ -187,20 +217,56 @@ def write_piff_header(stream, params):
     mvex_payload += full_box(b'trex', 0, 0, trex_payload)  # Track Extends Box
 
     moov_payload += box(b'mvex', mvex_payload)  # Movie Extends Box
-    stream.write(box(b'moov', moov_payload))  # Movie Box
+    return header + box(b'moov', moov_payload)  # Movie Box
+
+
+def iter_boxes(data, start=0, end=None):
+    """Iterate over the boxes found in data[start:end]
+
+    Yields (box_type, payload_start, payload_end) tuples of offsets into
+    data, so that nested boxes can be walked without copying any payload.
+    Boxes truncated by end are cut at end.
+    """
+    if end is None:
+        end = len(data)
+    while start + 8 <= end:
+        box_size, box_type = box_header.unpack_from(data, start)
+        header_size = 8
+        if box_size == 1:
+            if start + 16 > end:
+                return
+            box_size = u64.unpack_from(data, start + 8)[0]
+            header_size = 16
+        elif box_size == 0:
+            box_size = end - start
+        if box_size < header_size:
+            return
+        box_end = min(start + box_size, end)
+        yield box_type, start + header_size, box_end
+        start = box_end
+
+
+def find_box(data, box_sequence, start=0, end=None):
+    """Return the (start, end) offsets of the payload of a nested box
+
+    box_sequence is the path of box types leading to the box; None is
+    returned if there is no such box.
+    """
+    for wanted_type in box_sequence:
+        for box_type, start, end in iter_boxes(data, start, end):
+            if box_type == wanted_type:
+                break
+        else:
+            return None
+    return start, end
 
 
 def extract_box_data(data, box_sequence):
-    data_reader = io.BytesIO(data)
-    while True:
-        box_size = u32.unpack(data_reader.read(4))[0]
-        box_type = data_reader.read(4)
-        if box_type == box_sequence[0]:
-            box_data = data_reader.read(box_size - 8)
-            if len(box_sequence) == 1:
-                return box_data
-            return extract_box_data(box_data, box_sequence[1:])
-        data_reader.seek(box_size - 8, 1)
+    offsets = find_box(data, box_sequence)
+    if offsets is None:
+        return None
+    start, end = offsets
+    return data[start:end]
 
 
 class IsmFD(FragmentFD):
@@ -221,7 +287,6 @@ class IsmFD(FragmentFD):
 
         self._prepare_and_start_frag_download(ctx)
 
-        fragment_retries = self.params.get('fragment_retries', 0)
         skip_unavailable_fragments = self.params.get('skip_unavailable_fragments', True)
 
         track_written = False
@@ -231,27 +296,31 @@ class IsmFD(FragmentFD):
             if frag_index <= ctx['fragment_index']:
                 continue
             count = 0
-            while count <= fragment_retries:
+            success = False
+            while True:
                 try:
                     success, frag_content = self._download_fragment(ctx, segment['url'], info_dict)
                     if not success:
                         return False
                     if not track_written:
-                        tfhd_data = extract_box_data(frag_content, [b'moof', b'traf', b'tfhd'])
-                        info_dict['_download_params']['track_id'] = u32.unpack(tfhd_data[4:8])[0]
+                        tfhd = find_box(frag_content, [b'moof', b'traf', b'tfhd'])
+                        if tfhd is None:
+                            self.report_error('fragment %d has no track fragment header' % frag_index)
+                            return False
+                        info_dict['_download_params']['track_id'] = u32.unpack_from(frag_content, tfhd[0] + 4)[0]
                         write_piff_header(ctx['dest_stream'], info_dict['_download_params'])
                         track_written = True
                     self._append_fragment(ctx, frag_content)
                     break
                 except compat_urllib_error.HTTPError as err:
                     count += 1
-                    if count <= fragment_retries:
-                        self.report_retry_fragment(err, frag_index, count, fragment_retries)
-            if count > fragment_retries:
+                    if not self._retry_fragment(ctx, err, frag_index, count):
+                        break
+            if not success:
                 if skip_unavailable_fragments:
                     self.report_skip_fragment(frag_index)
                     continue
-                self.report_error('giving up after %s fragment retries' % fragment_retries)
+                self.report_error('giving up after %s fragment retries' % (count - 1))
                 return False
 
         self._finish_frag_download(ctx)
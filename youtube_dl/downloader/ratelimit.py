@@ -0,0 +1,132 @@
+from __future__ import division, unicode_literals
+
+import time
+
+try:
+    import threading
+except ImportError:
+    threading = None
+
+from ..compat import compat_urllib_parse_urlparse
+
+
+class TokenBucket(object):
+    """
+    Limit the rate at which bytes are taken to rate bytes per second
+
+    Up to burst bytes can be taken at once after the bucket has been idle.
+    Taking more than what is left puts the bucket in debt, which later takes
+    wait for: the rate holds for all the threads taking from the bucket.
+    """
+
+    # Default burst, in seconds of the rate
+    _BURST_TIME = 0.25
+    _MIN_BURST = 1024
+
+    def __init__(self, rate, burst=None, clock=time.time):
+        self.rate = float(rate)
+        self.burst = float(burst or max(self.rate * self._BURST_TIME, self._MIN_BURST))
+        self._clock = clock
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock() if threading else None
+
+    def _take(self, amount):
+        now = self._clock()
+        self._tokens = min(
+            self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= amount
+        return max(0, -self._tokens / self.rate)
+
+    def take(self, amount):
+        """ Take amount bytes and return the seconds to wait before using them """
+        if self._lock is None:
+            return self._take(amount)
+        with self._lock:
+            return self._take(amount)
+
+
+class BandwidthScheduler(object):
+    """
+    Share the download rate limits of the downloaders of a process
+
+    There is a bucket for the overall rate limit and one for each host with
+    a rate limit of its own, which also applies to its subdomains. Bytes
+    received from a host are taken from both.
+    """
+
+    def __init__(self, rate=None, burst=None, host_rates=None, clock=time.time, sleep=time.sleep):
+        self._bucket = TokenBucket(rate, burst, clock) if rate else None
+        self._host_buckets = dict(
+            (host.lower(), TokenBucket(host_rate, burst, clock))
+            for host, host_rate in (host_rates or {}).items())
+        self._sleep = sleep
+        self._buckets = {}
+
+    def _host_bucket(self, host):
+        while host:
+            bucket = self._host_buckets.get(host)
+            if bucket is not None:
+                return bucket
+            host = host.partition('.')[2]
+
+    def buckets(self, url=None):
+        """ Return the buckets that bytes received from url are taken from """
+        host = compat_urllib_parse_urlparse(url).hostname if url else None
+        buckets = self._buckets.get(host)
+        if buckets is None:
+            host_bucket = self._host_bucket(host)
+            buckets = self._buckets[host] = [
+                b for b in (self._bucket, host_bucket) if b is not None]
+        return buckets
+
+    def burst(self, url=None):
+        """ Return the largest amount of bytes from url that can be taken at once """
+        bursts = [b.burst for b in self.buckets(url)]
+        return int(min(bursts)) if bursts else None
+
+    def rate(self, url=None):
+        """ Return the rate limit of url in bytes per second, or None """
+        rates = [b.rate for b in self.buckets(url)]
+        return int(min(rates)) if rates else None
+
+    def consume(self, amount, url=None, wait=True):
+        """
+        Take amount bytes received from url from the rate limits
+
+        Unless wait is False, sleep as long as the rate limits require.
+        Return the seconds to wait.
+        """
+        delay = max([b.take(amount) for b in self.buckets(url)] or [0])
+        if wait and delay > 0:
+            self._sleep(delay)
+        return delay
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock() if threading else None
+
+
+def get_bandwidth_scheduler(params):
+    """
+    Return the BandwidthScheduler of the rate limits of params, or None
+
+    Downloaders with the same rate limits share the same scheduler.
+    """
+    rate = params.get('ratelimit')
+    host_rates = params.get('ratelimit_hosts') or {}
+    if not rate and not host_rates:
+        return None
+    key = (rate, params.get('ratelimit_burst'), tuple(sorted(host_rates.items())))
+    if _schedulers_lock is not None:
+        _schedulers_lock.acquire()
+    try:
+        scheduler = _schedulers.get(key)
+        if scheduler is None:
+            scheduler = _schedulers[key] = BandwidthScheduler(
+                rate, params.get('ratelimit_burst'), host_rates)
+        return scheduler
+    finally:
+        if _schedulers_lock is not None:
+            _schedulers_lock.release()
@@ -0,0 +1,231 @@
+from __future__ import division, unicode_literals
+
+import random
+import time
+
+try:
+    import threading
+except ImportError:
+    threading = None
+
+from ..compat import (
+    compat_urllib_error,
+    compat_urllib_parse_urlparse,
+)
+from ..utils import (
+    float_or_none,
+    timeconvert,
+)
+
+# How HTTP errors are retried, by status code: the most retries (None for as
+# many as configured) and whether the first retry is immediate. Server
+# errors (5xx) are retried as configured, other statuses are not retried.
+HTTP_STATUS_RULES = {
+    408: (None, False),
+    429: (None, False),
+}
+
+FRAGMENT_STATUS_RULES = {
+    # Signed fragment URLs may expire: once more is all it can take
+    403: (1, True),
+    # YouTube may often return 404 HTTP error for a fragment causing the
+    # whole download to fail. However if the same fragment is immediately
+    # retried with the same request data this usually succeeds (1-2 attempts
+    # is usually enough)
+    404: (None, True),
+    408: (None, False),
+    429: (None, False),
+}
+
+
+def _host(url):
+    return compat_urllib_parse_urlparse(url).hostname if url else None
+
+
+def _is_host_failure(err):
+    """ Whether err tells that the host is unwell, rather than the resource """
+    if isinstance(err, compat_urllib_error.HTTPError):
+        return err.code in (408, 429) or 500 <= err.code < 600
+    return True
+
+
+def retry_after(err, clock=time.time):
+    """ Return the seconds the Retry-After header of HTTP error err asks to wait, or None """
+    if not isinstance(err, compat_urllib_error.HTTPError):
+        return None
+    value = err.info().get('Retry-After')
+    if not value:
+        return None
+    seconds = float_or_none(value)
+    if seconds is None:
+        timestamp = timeconvert(value)
+        if timestamp is None:
+            return None
+        seconds = timestamp - clock()
+    return max(seconds, 0)
+
+
+class HostCircuits(object):
+    """
+    Hold back the requests to hosts that keep failing
+
+    After _FAILURES consecutive failures of a host, its circuit opens: the
+    requests to the host wait until it half-opens, _COOLDOWN seconds later,
+    doubled for each further failure. Then a single request probes the host,
+    and its success closes the circuit. A Retry-After header holds back all
+    the requests to the host as long as it asks.
+    """
+
+    _FAILURES = 5
+    _COOLDOWN = 1
+    _MAX_COOLDOWN = 60
+
+    def __init__(self, clock=time.time, sleep=time.sleep):
+        self._clock = clock
+        self._sleep = sleep
+        # host: [consecutive failures, time until which it is held back]
+        self._hosts = {}
+        self._lock = threading.Lock() if threading else None
+
+    def _cooldown(self, failures):
+        return min(self._COOLDOWN * 2 ** min(failures - self._FAILURES, 32), self._MAX_COOLDOWN)
+
+    def _acquire(self):
+        if self._lock is not None:
+            self._lock.acquire()
+
+    def _release(self):
+        if self._lock is not None:
+            self._lock.release()
+
+    def failed(self, url, hold=None):
+        """ Record a failure of the host of url, held back for hold seconds if set """
+        host = _host(url)
+        self._acquire()
+        try:
+            state = self._hosts.setdefault(host, [0, 0])
+            state[0] += 1
+            now = self._clock()
+            if state[0] >= self._FAILURES:
+                state[1] = max(state[1], now + self._cooldown(state[0]))
+            if hold:
+                state[1] = max(state[1], now + hold)
+        finally:
+            self._release()
+
+    def succeeded(self, url):
+        """ Record a success of the host of url, which closes its circuit """
+        host = _host(url)
+        self._acquire()
+        try:
+            self._hosts.pop(host, None)
+        finally:
+            self._release()
+
+    def wait(self, url):
+        """ Sleep until a request to the host of url may go, return the seconds slept """
+        host = _host(url)
+        slept = 0
+        while True:
+            self._acquire()
+            try:
+                state = self._hosts.get(host)
+                if state is None:
+                    return slept
+                now = self._clock()
+                delay = state[1] - now
+                if delay <= 0:
+                    if state[0] >= self._FAILURES:
+                        # Half-open: this request probes the host, the
+                        # others wait for its outcome
+                        state[1] = now + self._cooldown(state[0])
+                    return slept
+            finally:
+                self._release()
+            self._sleep(delay)
+            slept += delay
+
+
+_circuits = HostCircuits()
+
+
+class RetryPolicy(object):
+    """
+    Decide whether and when a failed request of a download is retried
+
+    Retries wait exponentially longer, from retry_sleep seconds up to
+    max_retry_sleep, with random jitter so that concurrent downloads do not
+    retry in lockstep, or as long as the Retry-After header of the response
+    asks. HTTP errors are retried according to their status code (see
+    HTTP_STATUS_RULES and FRAGMENT_STATUS_RULES). The failures and successes
+    of the requests are shared by all the downloads of the process, per
+    host, in HostCircuits.
+
+    retry_count and retry_wait count the retries and the seconds waited for
+    them.
+    """
+
+    # Longest wait a Retry-After header is followed for
+    _MAX_RETRY_AFTER = 300
+
+    def __init__(self, params, fragment=False, circuits=None,
+                 clock=time.time, sleep=time.sleep, random=random.random):
+        self.retries = params.get('fragment_retries' if fragment else 'retries', 0)
+        self._status_rules = FRAGMENT_STATUS_RULES if fragment else HTTP_STATUS_RULES
+        self._retry_sleep = float_or_none(params.get('retry_sleep'), default=1)
+        self._max_retry_sleep = max(
+            float_or_none(params.get('max_retry_sleep'), default=10), self._retry_sleep)
+        self._circuits = circuits or _circuits
+        self._clock = clock
+        self._sleep = sleep
+        self._random = random
+        self.retry_count = 0
+        self.retry_wait = 0
+
+    def _rule(self, err):
+        if not isinstance(err, compat_urllib_error.HTTPError):
+            return None, False
+        rule = self._status_rules.get(err.code)
+        if rule is not None:
+            return rule
+        return (None, False) if 500 <= err.code < 600 else (0, False)
+
+    def retryable(self, err):
+        """ Whether err may be retried at all """
+        return self._rule(err)[0] != 0
+
+    def delay(self, err, count):
+        """ Return the seconds to wait before retry count after err, or None not to retry """
+        max_retries, immediate = self._rule(err)
+        if count > self.retries or (max_retries is not None and count > max_retries):
+            return None
+        wait = retry_after(err, self._clock)
+        if wait is not None:
+            return min(wait, self._MAX_RETRY_AFTER)
+        if immediate:
+            if count == 1:
+                return 0
+            count -= 1
+        wait = min(self._retry_sleep * 2 ** min(count - 1, 32), self._max_retry_sleep)
+        return wait / 2 * (1 + self._random())
+
+    def wait(self, delay):
+        """ Sleep delay seconds before a retry """
+        self.retry_count += 1
+        if delay > 0:
+            self._sleep(delay)
+            self.retry_wait += delay
+
+    def wait_for_host(self, url):
+        """ Sleep until a request to url may go """
+        self.retry_wait += self._circuits.wait(url)
+
+    def record_failure(self, url, err):
+        """ Record that a request to url failed with err """
+        if _is_host_failure(err):
+            hold = retry_after(err, self._clock)
+            self._circuits.failed(url, hold and min(hold, self._MAX_RETRY_AFTER))
+
+    def record_success(self, url):
+        """ Record that a request to url succeeded """
+        self._circuits.succeeded(url)
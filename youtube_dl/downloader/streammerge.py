@@ -0,0 +1,228 @@
+from __future__ import unicode_literals
+
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+
+try:
+    import threading
+except ImportError:
+    threading = None
+
+from .common import FileDownloader
+from .dash import DashLiveFD
+from .fragment import FragmentFD
+from .http import HttpFD
+from ..downloader import get_suitable_downloader
+from ..postprocessor.ffmpeg import FFmpegPostProcessor, EXT_TO_OUT_FORMATS
+from ..utils import (
+    cli_configuration_args,
+    encodeArgument,
+    encodeFilename,
+    error_to_compat_str,
+    process_communicate_or_kill,
+)
+
+
+class FFmpegStreamMergeFD(FileDownloader):
+    """Download the requested formats of a video and merge them on the fly
+
+    Each format is downloaded by its native downloader into a named pipe
+    that is read by a single ffmpeg process writing the final container,
+    so that no intermediate format files are written to disk.
+
+    The info dict must have a "requested_formats" list of (video, audio)
+    format dicts ready to be passed to their downloaders, each with a
+    "_filename" key holding the intermediate file name that would be used
+    by a file based merge.
+
+    When live formats are interrupted by the user, their downloaders are
+    stopped and ffmpeg finishes the merge of what has been downloaded, as
+    a live download on its own would be.
+    """
+
+    FD_NAME = 'ffmpeg'
+
+    # Seconds between checks of the ffmpeg process while the formats are
+    # being downloaded
+    _POLL_INTERVAL = 0.5
+
+    def can_merge(self, formats):
+        """Check whether formats can be merged while being downloaded
+
+        Downloads that have been interrupted can only be resumed by the file
+        based merge, so streaming is refused if any intermediate file exists.
+        Of the live formats, only those of DASH manifests can be merged.
+        """
+        if threading is None or not hasattr(os, 'mkfifo'):
+            return False
+        if len(formats) != 2 or not FFmpegPostProcessor(self.ydl).available:
+            return False
+        for f in formats:
+            fd = get_suitable_downloader(f, self.params)
+            if not issubclass(fd, (HttpFD, FragmentFD)):
+                return False
+            if f.get('is_live') and not issubclass(fd, DashLiveFD):
+                return False
+            fname = f['_filename']
+            if any(os.path.exists(encodeFilename(fn)) for fn in (
+                    fname, self.temp_name(fname), self.ytdl_filename(fname))):
+                return False
+        return True
+
+    @staticmethod
+    def _remove_file(filename):
+        try:
+            os.remove(encodeFilename(filename))
+        except OSError:
+            pass
+
+    def _build_command(self, ffpp, input_paths, tmpfilename, ext):
+        args = [ffpp.executable, '-y']
+        if ffpp.basename == 'ffmpeg':
+            args += ['-loglevel', 'repeat+info' if self.params.get('verbose') else 'error']
+        for path in input_paths:
+            args += ['-i', ffpp._ffmpeg_filename_argument(path)]
+        args += ['-c', 'copy', '-map', '0:v:0', '-map', '1:a:0']
+        args += cli_configuration_args(self.params, 'postprocessor_args')
+        args += ['-f', EXT_TO_OUT_FORMATS.get(ext, ext)]
+        args = [encodeArgument(opt) for opt in args]
+        args.append(encodeFilename(ffpp._ffmpeg_filename_argument(tmpfilename), True))
+        return args
+
+    def real_download(self, filename, info_dict):
+        formats = info_dict['requested_formats']
+        ffpp = FFmpegPostProcessor(self.ydl)
+        ffpp.check_version()
+
+        tmpfilename = self.temp_name(filename)
+        pipe_dir = tempfile.mkdtemp(prefix='youtube-dl-merge-')
+        pipes = [
+            os.path.join(pipe_dir, 'f%s.%s' % (f['format_id'], f['ext']))
+            for f in formats]
+        for path in pipes:
+            os.mkfifo(encodeFilename(path))
+
+        self.to_screen('[%s] Merging formats into "%s" while downloading' % (self.FD_NAME, filename))
+        args = self._build_command(ffpp, pipes, tmpfilename, info_dict['ext'])
+        self._debug_cmd(args)
+
+        start = time.time()
+        progress = [{} for _ in formats]
+        results = [None] * len(formats)
+        downloaders = [None] * len(formats)
+        live = all(f.get('is_live') for f in formats)
+        interrupted = False
+
+        def hook_progress(idx, s):
+            progress[idx] = s
+            if s['status'] != 'downloading':
+                return
+            downloaded = sum(p.get('downloaded_bytes') or 0 for p in progress)
+            totals = [p.get('total_bytes') or p.get('total_bytes_estimate') for p in progress]
+            total = sum(totals) if all(totals) else None
+            now = time.time()
+            speed = self.calc_speed(start, now, downloaded)
+            self._hook_progress({
+                'status': 'downloading',
+                'filename': filename,
+                'tmpfilename': tmpfilename,
+                'downloaded_bytes': downloaded,
+                'total_bytes_estimate': total,
+                'elapsed': now - start,
+                'speed': speed,
+                'eta': self.calc_eta(speed, total and total - downloaded),
+            })
+
+        def download_format(idx):
+            fmt = formats[idx]
+            fd = get_suitable_downloader(fmt, self.params)(self.ydl, self.params)
+            # Progress is reported once for all formats
+            fd._progress_hooks = [lambda s: hook_progress(idx, s)]
+            downloaders[idx] = fd
+            try:
+                results[idx] = fd.download(pipes[idx], fmt)
+            except BaseException as e:
+                results[idx] = e
+
+        def release_pipes():
+            # Writers blocked on opening a pipe that ffmpeg will never read
+            # are released by opening and closing its read end
+            for path in pipes:
+                try:
+                    os.close(os.open(encodeFilename(path), os.O_RDONLY | os.O_NONBLOCK))
+                except OSError:
+                    pass
+
+        proc = subprocess.Popen(args, stdin=subprocess.PIPE)
+        threads = []
+        try:
+            for idx in range(len(formats)):
+                thread = threading.Thread(target=download_format, args=(idx, ))
+                thread.daemon = True
+                threads.append(thread)
+                thread.start()
+            while any(t.is_alive() for t in threads):
+                try:
+                    failed = any(r is not None and r is not True for r in results)
+                    if (failed and not interrupted) or proc.poll() is not None:
+                        if proc.poll() is None:
+                            proc.kill()
+                        proc.wait()
+                        release_pipes()
+                    for thread in threads:
+                        thread.join(self._POLL_INTERVAL)
+                except KeyboardInterrupt:
+                    if not live or interrupted:
+                        raise
+                    # Only the main thread is interrupted: the downloaders
+                    # end the formats, and ffmpeg the output, once stopped
+                    interrupted = True
+                    self.to_screen('[%s] Interrupted by user, finishing the merge' % self.FD_NAME)
+                    for fd in downloaders:
+                        if hasattr(fd, 'stop'):
+                            fd.stop()
+            if interrupted and proc.poll() is None:
+                process_communicate_or_kill(proc, b'q')
+            retval = proc.wait()
+        except BaseException:
+            # A merge interrupted, unless live and for the first time, cannot
+            # be resumed: there is nothing worth asking ffmpeg to finalize
+            proc.kill()
+            proc.wait()
+            release_pipes()
+            self._remove_file(tmpfilename)
+            raise
+        finally:
+            shutil.rmtree(pipe_dir, ignore_errors=True)
+
+        if interrupted:
+            # ffmpeg may have been interrupted too, as may the downloads
+            # writing to it then
+            succeeded = os.path.exists(encodeFilename(tmpfilename))
+        else:
+            for fmt, result in zip(formats, results):
+                if isinstance(result, BaseException):
+                    if not isinstance(result, Exception):
+                        raise result
+                    self.report_warning('Unable to download format %s: %s' % (
+                        fmt['format_id'], error_to_compat_str(result)))
+            succeeded = retval == 0 and all(r is True for r in results)
+        if not succeeded:
+            self._remove_file(tmpfilename)
+            if retval != 0:
+                self.report_warning('%s exited with code %d' % (ffpp.basename, retval))
+            return False
+
+        self.try_rename(tmpfilename, filename)
+        fsize = os.path.getsize(encodeFilename(filename))
+        self._hook_progress({
+            'downloaded_bytes': fsize,
+            'total_bytes': fsize,
+            'filename': filename,
+            'status': 'finished',
+            'elapsed': time.time() - start,
+        })
+        return True
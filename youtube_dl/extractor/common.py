@@ -5,6 +5,7 @@ import base64
 import datetime
 import functools
 import hashlib
+import itertools
 import json
 import netrc
 import os
@@ -55,9 +56,12 @@ from ..utils import (
     extract_attributes,
     fix_xml_ampersands,
     float_or_none,
+    FragmentList,
     GeoRestrictedError,
     GeoUtils,
+    html_index,
     int_or_none,
+    iterparse_xml_children,
     js_to_json,
     JSON_LD_RE,
     mimetype2ext,
@@ -164,12 +168,19 @@ class InfoExtractor(object):
                     * protocol   The protocol that will be used for the actual
                                  download, lower-case.
                                  "http", "https", "rtsp", "rtmp", "rtmpe",
-                                 "m3u8", "m3u8_native" or "http_dash_segments".
+                                 "m3u8", "m3u8_native", "http_dash_segments"
+                                 or "http_dash_segments_live".
+                    * dash_representation_id
+                                 For "http_dash_segments_live", the id of the
+                                 Representation in the MPD manifest at url,
+                                 whose segments are downloaded as the
+                                 manifest is updated.
                     * fragment_base_url
                                  Base URL for fragments. Each fragment's path
                                  value (if present) will be relative to
                                  this URL.
-                    * fragments  A list of fragments of a fragmented media.
+                    * fragments  A list of fragments of a fragmented media,
+                                 or a FragmentList for long manifests.
                                  Each fragment entry must contain either an url
                                  or a path. If an url is present it should be
                                  considered by a client. Otherwise both path and
@@ -405,6 +416,12 @@ class InfoExtractor(object):
     will be used by geo restriction bypass mechanism similarly
     to _GEO_COUNTRIES.
 
+    _RESPONSE_CACHE_TTL attribute is the number of seconds during which
+    responses stored in the response cache (if enabled) are used without
+    asking the server whether they have changed. It may be set to None in
+    order to never cache the responses of a particular extractor, e.g. when
+    its pages embed short-lived tokens.
+
     Finally, the _WORKING attribute should be set to False for broken IEs
     in order to warn the users and skip the tests.
     """
@@ -415,6 +432,7 @@ class InfoExtractor(object):
     _GEO_BYPASS = True
     _GEO_COUNTRIES = None
     _GEO_IP_BLOCKS = None
+    _RESPONSE_CACHE_TTL = 0
     _WORKING = True
 
     def __init__(self, downloader=None):
@@ -662,7 +680,7 @@ class InfoExtractor(object):
         if hasattr(ssl, 'CertificateError'):
             exceptions.append(ssl.CertificateError)
         try:
-            return self._downloader.urlopen(url_or_request)
+            return self._urlopen(url_or_request)
         except tuple(exceptions) as err:
             if isinstance(err, compat_urllib_error.HTTPError):
                 if self.__can_accept_status_code(err, expected_status):
@@ -685,6 +703,18 @@ class InfoExtractor(object):
                 self._downloader.report_warning(errmsg)
                 return False
 
+    def _urlopen(self, url_or_request):
+        """ Open the request, through the response cache if it applies """
+        response_cache = getattr(self._downloader, 'response_cache', None)
+        if (self._RESPONSE_CACHE_TTL is None or response_cache is None
+                or not response_cache.enabled):
+            return self._downloader.urlopen(url_or_request)
+        if not isinstance(url_or_request, compat_urllib_request.Request):
+            url_or_request = sanitized_Request(url_or_request)
+        if url_or_request.get_method() != 'GET':
+            return self._downloader.urlopen(url_or_request)
+        return response_cache.urlopen(url_or_request, self._RESPONSE_CACHE_TTL)
+
     def _download_webpage_handle(self, url_or_request, video_id, note=None, errnote=None, fatal=True, encoding=None, data=None, headers={}, query={}, expected_status=None):
         """
         Return a tuple (page content as string, URL handle).
@@ -1011,18 +1041,27 @@ class InfoExtractor(object):
             video_info['description'] = playlist_description
         return video_info
 
-    def _search_regex(self, pattern, string, name, default=NO_DEFAULT, fatal=True, flags=0, group=None):
+    @staticmethod
+    def _re_search(pattern, string, flags=0, html_tag=None):
+        index = html_tag and html_index(string)
+        if index is not None:
+            return index.search(pattern, html_tag, flags)
+        return re.search(pattern, string, flags)
+
+    def _search_regex(self, pattern, string, name, default=NO_DEFAULT, fatal=True, flags=0, group=None, html_tag=None):
         """
         Perform a regex search on the given string, using a single or a list of
         patterns returning the first matching group.
         In case of failure return a default value or raise a WARNING or a
         RegexNotFoundError, depending on fatal, specifying the field name.
+        If the patterns can only match at an html_tag (meta, input or script)
+        of a webpage, only the positions of this tag are searched.
         """
         if isinstance(pattern, (str, compat_str, compiled_regex_type)):
-            mobj = re.search(pattern, string, flags)
+            mobj = self._re_search(pattern, string, flags, html_tag)
         else:
             for p in pattern:
-                mobj = re.search(p, string, flags)
+                mobj = self._re_search(p, string, flags, html_tag)
                 if mobj:
                     break
         if not self._downloader.params.get('no_color') and compat_os_name != 'nt' and sys.stderr.isatty():
@@ -1046,11 +1085,11 @@ class InfoExtractor(object):
             self._downloader.report_warning('unable to extract %s' % _name + bug_reports_message())
             return None
 
-    def _html_search_regex(self, pattern, string, name, default=NO_DEFAULT, fatal=True, flags=0, group=None):
+    def _html_search_regex(self, pattern, string, name, default=NO_DEFAULT, fatal=True, flags=0, group=None, html_tag=None):
         """
         Like _search_regex, but strips HTML tags and unescapes entities.
         """
-        res = self._search_regex(pattern, string, name, default, fatal, flags, group)
+        res = self._search_regex(pattern, string, name, default, fatal, flags, group, html_tag)
         if isinstance(res, tuple):
             return tuple(map(clean_html, res))
         return clean_html(res)
@@ -1140,7 +1179,7 @@ class InfoExtractor(object):
         og_regexes = []
         for p in prop:
             og_regexes.extend(self._og_regexes(p))
-        escaped = self._search_regex(og_regexes, html, name, flags=re.DOTALL, **kargs)
+        escaped = self._search_regex(og_regexes, html, name, flags=re.DOTALL, html_tag='meta', **kargs)
         if escaped is None:
             return None
         return unescapeHTML(escaped)
@@ -1158,7 +1197,7 @@ class InfoExtractor(object):
         regexes = self._og_regexes('video') + self._og_regexes('video:url')
         if secure:
             regexes = self._og_regexes('video:secure_url') + regexes
-        return self._html_search_regex(regexes, html, name, **kargs)
+        return self._html_search_regex(regexes, html, name, html_tag='meta', **kargs)
 
     def _og_search_url(self, html, **kargs):
         return self._og_search_property('url', html, **kargs)
@@ -1170,16 +1209,16 @@ class InfoExtractor(object):
             display_name = name[0]
         return self._html_search_regex(
             [self._meta_regex(n) for n in name],
-            html, display_name, fatal=fatal, group='content', **kwargs)
+            html, display_name, fatal=fatal, group='content', html_tag='meta', **kwargs)
 
     def _dc_search_uploader(self, html):
         return self._html_search_meta('dc.creator', html, 'uploader')
 
     def _rta_search(self, html):
         # See http://www.rtalabel.org/index.php?content=howtofaq#single
-        if re.search(r'(?ix)<meta\s+name="rating"\s+'
-                     r'     content="RTA-5042-1996-1400-1577-RTA"',
-                     html):
+        if self._re_search(r'(?ix)<meta\s+name="rating"\s+'
+                           r'     content="RTA-5042-1996-1400-1577-RTA"',
+                           html, html_tag='meta'):
             return 18
         return 0
 
@@ -1220,7 +1259,12 @@ class InfoExtractor(object):
                                       'twitter card player')
 
     def _search_json_ld(self, html, video_id, expected_type=None, **kwargs):
-        json_ld_list = list(re.finditer(JSON_LD_RE, html))
+        index = html_index(html)
+        if index is not None:
+            json_ld_list = index.memoize(
+                'json_ld', lambda: list(index.finditer(JSON_LD_RE, 'script')))
+        else:
+            json_ld_list = list(re.finditer(JSON_LD_RE, html))
         default = kwargs.get('default', NO_DEFAULT)
         # JSON-LD may be malformed and thus `fatal` should be respected.
         # At the same time `default` may be passed that assumes `fatal=False`
@@ -1418,6 +1462,14 @@ class InfoExtractor(object):
 
     @staticmethod
     def _hidden_inputs(html):
+        index = html_index(html)
+        if index is not None:
+            return dict(index.memoize(
+                'hidden_inputs', lambda: InfoExtractor._find_hidden_inputs(html)))
+        return InfoExtractor._find_hidden_inputs(html)
+
+    @staticmethod
+    def _find_hidden_inputs(html):
         html = re.sub(r'<!--(?:(?!<!--).)*-->', '', html)
         hidden_inputs = {}
         for input in re.findall(r'(?i)(<input[^>]+>)', html):
@@ -2141,30 +2193,81 @@ class InfoExtractor(object):
         return entries
 
     def _extract_mpd_formats(self, mpd_url, video_id, mpd_id=None, note=None, errnote=None, fatal=True, data=None, headers={}, query={}):
-        res = self._download_xml_handle(
-            mpd_url, video_id,
-            note=note or 'Downloading MPD manifest',
-            errnote=errnote or 'Failed to download MPD manifest',
-            fatal=fatal, data=data, headers=headers, query=query)
-        if res is False:
+        note = note or 'Downloading MPD manifest'
+        errnote = errnote or 'Failed to download MPD manifest'
+        params = self._downloader.params
+        if params.get('dump_intermediate_pages') or params.get('write_pages'):
+            # These need the whole manifest
+            res = self._download_xml_handle(
+                mpd_url, video_id, note=note, errnote=errnote,
+                fatal=fatal, data=data, headers=headers, query=query)
+            if res is False:
+                return []
+            mpd_doc, urlh = res
+            if mpd_doc is None:
+                return []
+            mpd_base_url = base_url(urlh.geturl())
+
+            return self._parse_mpd_formats(
+                mpd_doc, mpd_id, mpd_base_url, mpd_url)
+
+        # Strip hashes from the URL (#1038)
+        if isinstance(mpd_url, (compat_str, str)):
+            mpd_url = mpd_url.partition('#')[0]
+        urlh = self._request_webpage(
+            mpd_url, video_id, note, errnote, fatal,
+            data=data, headers=headers, query=query)
+        if urlh is False:
+            return []
+        try:
+            return self._parse_mpd_formats_stream(
+                urlh, mpd_id, base_url(urlh.geturl()), mpd_url)
+        except compat_xml_parse_error as ve:
+            errmsg = '%s: Failed to parse XML ' % video_id
+            if fatal:
+                raise ExtractorError(errmsg, cause=ve)
+            self.report_warning(errmsg + str(ve))
             return []
-        mpd_doc, urlh = res
-        if mpd_doc is None:
+        finally:
+            urlh.close()
+
+    def _parse_mpd_formats_stream(self, stream, mpd_id=None, mpd_base_url='', mpd_url=None):
+        """
+        Parse formats from the MPD manifest read from the file object stream
+
+        Periods are parsed and freed as they are read, so that the whole
+        document is never held in memory.
+        """
+        children = iterparse_xml_children(stream)
+        for mpd_doc, first_child in children:
+            break
+        else:
             return []
-        mpd_base_url = base_url(urlh.geturl())
+
+        def periods():
+            for child in itertools.chain(
+                    [first_child], (child for _, child in children)):
+                yield child
+                if child.tag.rpartition('}')[2] == 'Period':
+                    mpd_doc.remove(child)
 
         return self._parse_mpd_formats(
-            mpd_doc, mpd_id, mpd_base_url, mpd_url)
+            mpd_doc, mpd_id, mpd_base_url, mpd_url, periods=periods())
 
-    def _parse_mpd_formats(self, mpd_doc, mpd_id=None, mpd_base_url='', mpd_url=None):
+    def _parse_mpd_formats(self, mpd_doc, mpd_id=None, mpd_base_url='', mpd_url=None, periods=None):
         """
         Parse formats from MPD manifest.
         References:
          1. MPEG-DASH Standard, ISO/IEC 23009-1:2014(E),
             http://standards.iso.org/ittf/PubliclyAvailableStandards/c065274_ISO_IEC_23009-1_2014.zip
          2. https://en.wikipedia.org/wiki/Dynamic_Adaptive_Streaming_over_HTTP
+
+        periods, if given, iterates over the children of mpd_doc as they
+        are parsed instead of its Period elements.
         """
-        if mpd_doc.get('type') == 'dynamic':
+        # Live streams are downloaded following the updates of the manifest
+        is_live = mpd_doc.get('type') == 'dynamic'
+        if is_live and not mpd_url:
             return []
 
         namespace = self._search_regex(r'(?i)^{([^}]+)?}MPD$', mpd_doc.tag, 'namespace', default=None)
@@ -2235,7 +2338,12 @@ class InfoExtractor(object):
 
         mpd_duration = parse_duration(mpd_doc.get('mediaPresentationDuration'))
         formats = []
-        for period in mpd_doc.findall(_add_ns('Period')):
+        live_representations = set()
+        if periods is None:
+            periods = mpd_doc.findall(_add_ns('Period'))
+        for period in periods:
+            if period.tag != _add_ns('Period'):
+                continue
             period_duration = parse_duration(period.get('duration')) or mpd_duration
             period_ms_info = extract_multisegment_info(period, {
                 'start_number': 1,
@@ -2289,6 +2397,19 @@ class InfoExtractor(object):
                         }
                         f.update(parse_codecs(representation_attrib.get('codecs')))
                         representation_ms_info = extract_multisegment_info(representation, adaption_set_ms_info)
+                        if is_live:
+                            # Formats of live streams span all the periods
+                            if representation_id and 'media' in representation_ms_info and representation_id not in live_representations:
+                                live_representations.add(representation_id)
+                                f.update({
+                                    'url': mpd_url,
+                                    'fragment_base_url': base_url,
+                                    'protocol': 'http_dash_segments_live',
+                                    'dash_representation_id': representation_id,
+                                    'is_live': True,
+                                })
+                                formats.append(f)
+                            continue
 
                         def prepare_template(template_name, identifiers):
                             tmpl = representation_ms_info[template_name]
@@ -2332,7 +2453,6 @@ class InfoExtractor(object):
                         if 'segment_urls' not in representation_ms_info and 'media' in representation_ms_info:
 
                             media_template = prepare_template('media', ('Number', 'Bandwidth', 'Time'))
-                            media_location_key = location_key(media_template)
 
                             # As per [1, 5.3.9.4.4, Table 16, page 55] $Number$ and $Time$
                             # can't be used at the same time
@@ -2341,78 +2461,62 @@ class InfoExtractor(object):
                                 if 'total_number' not in representation_ms_info and 'segment_duration' in representation_ms_info:
                                     segment_duration = float_or_none(representation_ms_info['segment_duration'], representation_ms_info['timescale'])
                                     representation_ms_info['total_number'] = int(math.ceil(float(period_duration) / segment_duration))
-                                representation_ms_info['fragments'] = [{
-                                    media_location_key: media_template % {
-                                        'Number': segment_number,
-                                        'Bandwidth': bandwidth,
-                                    },
+                                representation_ms_info['fragments'] = {
+                                    'count': representation_ms_info['total_number'],
+                                    'template': media_template,
+                                    'start_number': representation_ms_info['start_number'],
+                                    'bandwidth': bandwidth,
                                     'duration': segment_duration,
-                                } for segment_number in range(
-                                    representation_ms_info['start_number'],
-                                    representation_ms_info['total_number'] + representation_ms_info['start_number'])]
+                                }
                             else:
                                 # $Number*$ or $Time$ in media template with S list available
                                 # Example $Number*$: http://www.svtplay.se/klipp/9023742/stopptid-om-bjorn-borg
                                 # Example $Time$: https://play.arkena.com/embed/avp/v2/player/media/b41dda37-d8e7-4d3f-b1b5-9a9db578bdfe/1/129411
-                                representation_ms_info['fragments'] = []
+                                segment_times = []
+                                segment_durations = []
                                 segment_time = 0
-                                segment_d = None
-                                segment_number = representation_ms_info['start_number']
-
-                                def add_segment_url():
-                                    segment_url = media_template % {
-                                        'Time': segment_time,
-                                        'Bandwidth': bandwidth,
-                                        'Number': segment_number,
-                                    }
-                                    representation_ms_info['fragments'].append({
-                                        media_location_key: segment_url,
-                                        'duration': float_or_none(segment_d, representation_ms_info['timescale']),
-                                    })
-
-                                for num, s in enumerate(representation_ms_info['s']):
+                                for s in representation_ms_info['s']:
                                     segment_time = s.get('t') or segment_time
                                     segment_d = s['d']
-                                    add_segment_url()
-                                    segment_number += 1
-                                    for r in range(s.get('r', 0)):
+                                    duration = float_or_none(segment_d, representation_ms_info['timescale'])
+                                    for r in range(s.get('r', 0) + 1):
+                                        segment_times.append(segment_time)
+                                        segment_durations.append(duration)
                                         segment_time += segment_d
-                                        add_segment_url()
-                                        segment_number += 1
-                                    segment_time += segment_d
+                                representation_ms_info['fragments'] = {
+                                    'count': len(segment_times),
+                                    'template': media_template,
+                                    'start_number': representation_ms_info['start_number'],
+                                    'times': segment_times,
+                                    'bandwidth': bandwidth,
+                                    'durations': segment_durations,
+                                }
                         elif 'segment_urls' in representation_ms_info and 's' in representation_ms_info:
                             # No media template
                             # Example: https://www.youtube.com/watch?v=iXZV5uAYMJI
                             # or any YouTube dashsegments video
-                            fragments = []
-                            segment_index = 0
+                            segment_durations = []
                             timescale = representation_ms_info['timescale']
                             for s in representation_ms_info['s']:
                                 duration = float_or_none(s['d'], timescale)
-                                for r in range(s.get('r', 0) + 1):
-                                    segment_uri = representation_ms_info['segment_urls'][segment_index]
-                                    fragments.append({
-                                        location_key(segment_uri): segment_uri,
-                                        'duration': duration,
-                                    })
-                                    segment_index += 1
-                            representation_ms_info['fragments'] = fragments
+                                segment_durations.extend([duration] * (s.get('r', 0) + 1))
+                            representation_ms_info['fragments'] = {
+                                'count': len(segment_durations),
+                                'locations': representation_ms_info['segment_urls'],
+                                'durations': segment_durations,
+                            }
                         elif 'segment_urls' in representation_ms_info:
                             # Segment URLs with no SegmentTimeline
                             # Example: https://www.seznam.cz/zpravy/clanek/cesko-zasahne-vitr-o-sile-vichrice-muze-byt-i-zivotu-nebezpecny-39091
                             # https://github.com/ytdl-org/youtube-dl/pull/14844
-                            fragments = []
                             segment_duration = float_or_none(
                                 representation_ms_info['segment_duration'],
                                 representation_ms_info['timescale']) if 'segment_duration' in representation_ms_info else None
-                            for segment_url in representation_ms_info['segment_urls']:
-                                fragment = {
-                                    location_key(segment_url): segment_url,
-                                }
-                                if segment_duration:
-                                    fragment['duration'] = segment_duration
-                                fragments.append(fragment)
-                            representation_ms_info['fragments'] = fragments
+                            representation_ms_info['fragments'] = {
+                                'count': len(representation_ms_info['segment_urls']),
+                                'locations': representation_ms_info['segment_urls'],
+                                'duration': segment_duration or None,
+                            }
                         # If there is a fragments key available then we correctly recognized fragmented media.
                         # Otherwise we will assume unfragmented media with direct access. Technically, such
                         # assumption is not necessarily correct since we may simply have no support for
@@ -2422,15 +2526,17 @@ class InfoExtractor(object):
                                 # NB: mpd_url may be empty when MPD manifest is parsed from a string
                                 'url': mpd_url or base_url,
                                 'fragment_base_url': base_url,
-                                'fragments': [],
                                 'protocol': 'http_dash_segments',
                             })
+                            head = []
                             if 'initialization_url' in representation_ms_info:
                                 initialization_url = representation_ms_info['initialization_url']
                                 if not f.get('url'):
                                     f['url'] = initialization_url
-                                f['fragments'].append({location_key(initialization_url): initialization_url})
-                            f['fragments'].extend(representation_ms_info['fragments'])
+                                head.append({location_key(initialization_url): initialization_url})
+                            # Long manifests have many fragments, see FragmentList
+                            f['fragments'] = FragmentList(
+                                head=head, **representation_ms_info['fragments'])
                         else:
                             # Assuming direct URL to unfragmented media.
                             f['url'] = base_url
@@ -2491,7 +2597,8 @@ class InfoExtractor(object):
                 track_url_pattern = re.sub(r'{[Bb]itrate}', track.attrib['Bitrate'], url_pattern)
                 track_url_pattern = compat_urlparse.urljoin(ism_url, track_url_pattern)
 
-                fragments = []
+                fragment_times = []
+                fragment_durations = []
                 fragment_ctx = {
                     'time': 0,
                 }
@@ -2507,11 +2614,14 @@ class InfoExtractor(object):
                             next_fragment_time = duration
                         fragment_ctx['duration'] = (next_fragment_time - fragment_ctx['time']) / fragment_repeat
                     for _ in range(fragment_repeat):
-                        fragments.append({
-                            'url': re.sub(r'{start[ _]time}', compat_str(fragment_ctx['time']), track_url_pattern),
-                            'duration': fragment_ctx['duration'] / stream_timescale,
-                        })
+                        fragment_times.append(fragment_ctx['time'])
+                        fragment_durations.append(fragment_ctx['duration'] / stream_timescale)
                         fragment_ctx['time'] += fragment_ctx['duration']
+                fragments = FragmentList(
+                    len(fragment_times),
+                    template=re.sub(
+                        r'{start[ _]time}', '%(Time)s', track_url_pattern.replace('%', '%%')),
+                    times=fragment_times, durations=fragment_durations)
 
                 format_id = []
                 if ism_id:
@@ -134,6 +134,22 @@ from .medialaan import MedialaanIE
 from .simplecast import SimplecastIE
 
 
+class _TriggeredEmbeds(object):
+    """
+    The embed detectors of GenericIE whose triggers are in a page
+
+    The triggers of a detector are looked for when it is about to run, so
+    that the page is not scanned for detectors after the embed found.
+    """
+
+    def __init__(self, webpage, embed_triggers):
+        self._webpage = webpage.lower()
+        self._embed_triggers = embed_triggers
+
+    def __contains__(self, name):
+        return any(trigger in self._webpage for trigger in self._embed_triggers[name])
+
+
 class GenericIE(InfoExtractor):
     IE_DESC = 'Generic downloader that works on some sites'
     _VALID_URL = r'.*'
@@ -2526,6 +2542,140 @@ class GenericIE(InfoExtractor):
             'formats': formats,
         }
 
+    # Substrings, in lower case, one of which is in any page an embed
+    # detector of _real_extract matches: detectors none of whose triggers
+    # are in the page are skipped. Keep them in sync with the detectors.
+    _EMBED_TRIGGERS = {
+        'BrightcoveLegacy': ('brightcove', 'custombc.createvideo('),
+        'BrightcoveNew': ('players.brightcove.net/', 'data-video-id'),
+        'Nexx': ('onplayready',),
+        'NexxEmbed': ('embed.nexx',),
+        'ThePlatform': ('player.theplatform.com/p/',),
+        'ArcPublishing': ('powa',),
+        'Medialaan': ('data-mychannels-type="video"',),
+        'RtlNl': ('rtl.nl/',),
+        'Vimeo': ('vimeo.com/',),
+        'VHXEmbed': ('embed.vhx.tv/videos/',),
+        'Vidme': ('vid.me/',),
+        'Youtube': ('youtube', 'yvii_single_video_player'),
+        'Dailymotion': ('dailymotion.com/', 'dm.player('),
+        'DailymotionPlaylist': ('/widget/jukebox?',),
+        'DailyMail': ('dailymail.co.uk/embed/video/',),
+        'Teachable': ('teachabletracker.linker:autolink',),
+        'Wistia': ('wistia',),
+        'SVT': ('svt.se/wd?',),
+        'Bandcamp': ('bandcamp.com',),
+        'Vevo': ('vevo.com/',),
+        'Viddler': ('viddler.com/',),
+        'NYTimes': ('graphics8.nytimes.com/bcvideo/',),
+        'Libsyn': ('html5-player.libsyn.com/embed/',),
+        'Ooyala': ('ooyala', 'oo.player.create'),
+        'OoyalaSBN': ('sbn.videolinkset.entrygroup(',),
+        'Aparat': ('www.aparat.com/video/',),
+        'Mpora': ('mpora.com/videos/', 'mpora.de/videos/'),
+        'Facebook': ('facebook',),
+        'VK': ('vk.com/video_ext.php',),
+        'Odnoklassniki': ('.ru/videoembed/',),
+        'Sibnet': ('video.sibnet.ru/shell.php',),
+        'Ivi': ('ivi.ru/video/player',),
+        'HuffPost': ('embed.live.huffingtonpost.com/',),
+        'Embedly': ('embedly-',),
+        'FunnyOrDie': ('funnyordie.com/embed/',),
+        'Simplecast': ('simplecast.com/',),
+        'BBCCoUk': ('bbc.co.uk/iplayer/',),
+        'RUTV': ('player.rutv.ru/', 'player.vgtrk.com/'),
+        'TVC': ('tvc.ru/video/iframe/id/',),
+        'SportBox': ('.ru/vdl/player',),
+        'XHamsterEmbed': ('xhamster.com/xembed.php?video=',),
+        'TNAFlixNetworkEmbed': ('player.tnaflix.com/video/', 'player.empflix.com/video/'),
+        'PornHub': ('pornhub',),
+        'DrTuber': ('drtuber.com/embed/',),
+        'RedTube': ('embed.redtube.com/?',),
+        'Tube8': ('tube8.com/embed/',),
+        'MofosexEmbed': ('mofosex.com/embed',),
+        'Spankwire': ('spankwire.com/embedplayer.aspx',),
+        'YouPorn': ('youporn.com/embed/',),
+        'Tvigle': ('cloud.tvigle.ru/video/',),
+        'TED': ('embed.ted.com/', 'embed-ssl.ted.com/'),
+        'Ustream': ('ustream.tv/embed/', 'video.ibm.com/embed/'),
+        'ArteTVEmbed': ('arte.tv/player/v',),
+        'FranceTVEmbed': ('embed.francetv.fr/?ue=',),
+        'Myvi': ('myvi.ru/player/', 'myvi.tv/'),
+        'SoundcloudEmbed': ('soundcloud.com/player',),
+        'TuneIn': ('tunein.com/embed/player/',),
+        'MTVServicesEmbedded': ('media.mtvnservices.com/embed/',),
+        'Yahoo': ('.html?format=embed',),
+        'SBS': ('sbs.com.au/ondemand/video/',),
+        'Cinchcast': ('player.cinchcast.com/',),
+        'MLB': ('mlb.com/',),
+        'CondeNast': ('//player.', '//player-backend.'),
+        'Livestream': ('livestream.com/',),
+        'Zapiks': ('zapiks.fr/index.php?',),
+        'Kaltura': ('kwidget.', 'kaltura.com'),
+        'EaglePlatform': ('.media.eagleplatform.com',),
+        'ClipYou': ('media.clipyou.ru/index/player?',),
+        'Pladform': ('out.pladform.ru/player?',),
+        'Videomore': ('videomore.ru/',),
+        'WebcasterFeed': ('webcaster',),
+        'Playwire': ('config.playwire.com/',),
+        'FiveMin': ('embed.5min.com/',),
+        'CrooksAndLiars': ('embed.crooksandliars.com/',),
+        'NBCSportsVPlayer': ('vplayer.nbcsports.com/', 'nbcsports.com/vplayer/'),
+        'NBCNews': ('nbcnews.com/widget/video-embed/',),
+        'GoogleDrive': ('video.google.com/get_player?', 'docs.google.com/file/d/', 'drive.google.com/file/d/'),
+        'UDNEmbed': ('video.udn.com/',),
+        'SenateISVP': ('senate.gov/isvp',),
+        'KinjaEmbed': ('ajax/inset/iframe?', 'embed/video/iframe?'),
+        'OnionStudios': ('onionstudios.com/',),
+        'ViewLiftEmbed': ('/embed/player',),
+        'JWPlatform': ('content.jwplatform.com/players/', 'cdn.jwplayer.com/players/'),
+        'Digiteka': ('ultimedia.com/deliver/',),
+        'Arkena': ('play.arkena.com/embed/avp/',),
+        'Piksel': ('player.piksel.com/v/',),
+        'Limelight': ('limelight',),
+        'Anvato': ('data-anvp',),
+        'AdobeTVVideo': ('video.tv.adobe.com/v/',),
+        'Vine': ('vine.co/v/',),
+        'VODPlatform': ('vod-platform.net/', 'embed.kwikmotion.com/'),
+        'Mangomolo': ('mangomolo.com/',),
+        'Instagram': ('instagram',),
+        'ThreeQSDN': ('playout.3qsdn.com/',),
+        'Vbox7': ('vbox7.com/emb/external.php',),
+        'DBTV': ('dagbladet.no/video/embed/',),
+        'Videa': ('videa.hu/player?',),
+        'TwentyMinuten': ('20min.ch/videoplayer/',),
+        'VideoPress': ('press.com/embed/',),
+        'Rutube': ('rutube.ru/embed/',),
+        'WashingtonPost': ('washingtonpost.com/video/c/embed/',),
+        'Mediaset': ('video.mediaset.it/player/playeriframe',),
+        'Joj': ('media.joj.sk/embed/',),
+        'Megaphone': ('player.megaphone.fm/',),
+        'Vzaar': ('view.vzaar.com/',),
+        'Channel9': ('channel9.msdn.com/',),
+        'VShare': ('vshare.io/v/',),
+        'Mediasite': ('/mediasite/play/',),
+        'SpringboardPlatform': ('cms.springboardplatform.com/embed_iframe/',),
+        'YapFiles': ('yapfiles.ru/get_player',),
+        'Vice': ('video.vice.com/',),
+        'XFileShare': ('/embed-',),
+        'CloudflareStream': ('cloudflarestream.com/embed/', 'videodelivery.net/embed/', 'bytehighway.net/embed/'),
+        'PeerTube': ('/videos/embed/', 'peertube'),
+        'IndavideoEmbed': ('embed.indavideo.hu/player/video/',),
+        'APA': ('.apa.at/embed/',),
+        'FoxNews': ('video.foxnews.com/v/video-embed.htm',),
+        'ShareVideos': ('embed.share-videos.se/auto/embed/',),
+        'Viqeo': ('cdn.viqeo.tv/embed',),
+        'Expressen': ('/tvspelare/video/tv/', '/videoplayer/embed/tv/'),
+        'Zype': ('player.zype.com/embed/',),
+    }
+
+    def _find_embeds(self, webpage):
+        """ Return the names of the embed detectors triggered by webpage """
+        # Looking for each trigger with the substring search of str is
+        # faster than a single regular expression of all the triggers,
+        # which re tries at every position of the page
+        return _TriggeredEmbeds(webpage, self._EMBED_TRIGGERS)
+
     def _real_extract(self, url):
         if url.startswith('//'):
             return self.url_result(self.http_scheme() + url)
@@ -2759,764 +2909,888 @@ class GenericIE(InfoExtractor):
             'age_limit': age_limit,
         })
 
-        # Look for Brightcove Legacy Studio embeds
-        bc_urls = BrightcoveLegacyIE._extract_brightcove_urls(webpage)
-        if bc_urls:
-            entries = [{
-                '_type': 'url',
-                'url': smuggle_url(bc_url, {'Referer': url}),
-                'ie_key': 'BrightcoveLegacy'
-            } for bc_url in bc_urls]
+        # Only run the embed detectors whose triggers are on the page
+        triggered = self._find_embeds(webpage)
 
-            return {
-                '_type': 'playlist',
-                'title': video_title,
-                'id': video_id,
-                'entries': entries,
-            }
+        # Look for Brightcove Legacy Studio embeds
+        if 'BrightcoveLegacy' in triggered:
+            bc_urls = BrightcoveLegacyIE._extract_brightcove_urls(webpage)
+            if bc_urls:
+                entries = [{
+                    '_type': 'url',
+                    'url': smuggle_url(bc_url, {'Referer': url}),
+                    'ie_key': 'BrightcoveLegacy'
+                } for bc_url in bc_urls]
+
+                return {
+                    '_type': 'playlist',
+                    'title': video_title,
+                    'id': video_id,
+                    'entries': entries,
+                }
 
         # Look for Brightcove New Studio embeds
-        bc_urls = BrightcoveNewIE._extract_urls(self, webpage)
-        if bc_urls:
-            return self.playlist_from_matches(
-                bc_urls, video_id, video_title,
-                getter=lambda x: smuggle_url(x, {'referrer': url}),
-                ie='BrightcoveNew')
+        if 'BrightcoveNew' in triggered:
+            bc_urls = BrightcoveNewIE._extract_urls(self, webpage)
+            if bc_urls:
+                return self.playlist_from_matches(
+                    bc_urls, video_id, video_title,
+                    getter=lambda x: smuggle_url(x, {'referrer': url}),
+                    ie='BrightcoveNew')
 
         # Look for Nexx embeds
-        nexx_urls = NexxIE._extract_urls(webpage)
-        if nexx_urls:
-            return self.playlist_from_matches(nexx_urls, video_id, video_title, ie=NexxIE.ie_key())
+        if 'Nexx' in triggered:
+            nexx_urls = NexxIE._extract_urls(webpage)
+            if nexx_urls:
+                return self.playlist_from_matches(nexx_urls, video_id, video_title, ie=NexxIE.ie_key())
 
         # Look for Nexx iFrame embeds
-        nexx_embed_urls = NexxEmbedIE._extract_urls(webpage)
-        if nexx_embed_urls:
-            return self.playlist_from_matches(nexx_embed_urls, video_id, video_title, ie=NexxEmbedIE.ie_key())
+        if 'NexxEmbed' in triggered:
+            nexx_embed_urls = NexxEmbedIE._extract_urls(webpage)
+            if nexx_embed_urls:
+                return self.playlist_from_matches(nexx_embed_urls, video_id, video_title, ie=NexxEmbedIE.ie_key())
 
         # Look for ThePlatform embeds
-        tp_urls = ThePlatformIE._extract_urls(webpage)
-        if tp_urls:
-            return self.playlist_from_matches(tp_urls, video_id, video_title, ie='ThePlatform')
-
-        arc_urls = ArcPublishingIE._extract_urls(webpage)
-        if arc_urls:
-            return self.playlist_from_matches(arc_urls, video_id, video_title, ie=ArcPublishingIE.ie_key())
-
-        mychannels_urls = MedialaanIE._extract_urls(webpage)
-        if mychannels_urls:
-            return self.playlist_from_matches(
-                mychannels_urls, video_id, video_title, ie=MedialaanIE.ie_key())
+        if 'ThePlatform' in triggered:
+            tp_urls = ThePlatformIE._extract_urls(webpage)
+            if tp_urls:
+                return self.playlist_from_matches(tp_urls, video_id, video_title, ie='ThePlatform')
+
+        if 'ArcPublishing' in triggered:
+            arc_urls = ArcPublishingIE._extract_urls(webpage)
+            if arc_urls:
+                return self.playlist_from_matches(arc_urls, video_id, video_title, ie=ArcPublishingIE.ie_key())
+
+        if 'Medialaan' in triggered:
+            mychannels_urls = MedialaanIE._extract_urls(webpage)
+            if mychannels_urls:
+                return self.playlist_from_matches(
+                    mychannels_urls, video_id, video_title, ie=MedialaanIE.ie_key())
 
         # Look for embedded rtl.nl player
-        matches = re.findall(
-            r'<iframe[^>]+?src="((?:https?:)?//(?:(?:www|static)\.)?rtl\.nl/(?:system/videoplayer/[^"]+(?:video_)?)?embed[^"]+)"',
-            webpage)
-        if matches:
-            return self.playlist_from_matches(matches, video_id, video_title, ie='RtlNl')
-
-        vimeo_urls = VimeoIE._extract_urls(url, webpage)
-        if vimeo_urls:
-            return self.playlist_from_matches(vimeo_urls, video_id, video_title, ie=VimeoIE.ie_key())
-
-        vhx_url = VHXEmbedIE._extract_url(webpage)
-        if vhx_url:
-            return self.url_result(vhx_url, VHXEmbedIE.ie_key())
-
-        vid_me_embed_url = self._search_regex(
-            r'src=[\'"](https?://vid\.me/[^\'"]+)[\'"]',
-            webpage, 'vid.me embed', default=None)
-        if vid_me_embed_url is not None:
-            return self.url_result(vid_me_embed_url, 'Vidme')
+        if 'RtlNl' in triggered:
+            matches = re.findall(
+                r'<iframe[^>]+?src="((?:https?:)?//(?:(?:www|static)\.)?rtl\.nl/(?:system/videoplayer/[^"]+(?:video_)?)?embed[^"]+)"',
+                webpage)
+            if matches:
+                return self.playlist_from_matches(matches, video_id, video_title, ie='RtlNl')
+
+        if 'Vimeo' in triggered:
+            vimeo_urls = VimeoIE._extract_urls(url, webpage)
+            if vimeo_urls:
+                return self.playlist_from_matches(vimeo_urls, video_id, video_title, ie=VimeoIE.ie_key())
+
+        if 'VHXEmbed' in triggered:
+            vhx_url = VHXEmbedIE._extract_url(webpage)
+            if vhx_url:
+                return self.url_result(vhx_url, VHXEmbedIE.ie_key())
+
+        if 'Vidme' in triggered:
+            vid_me_embed_url = self._search_regex(
+                r'src=[\'"](https?://vid\.me/[^\'"]+)[\'"]',
+                webpage, 'vid.me embed', default=None)
+            if vid_me_embed_url is not None:
+                return self.url_result(vid_me_embed_url, 'Vidme')
 
         # Look for YouTube embeds
-        youtube_urls = YoutubeIE._extract_urls(webpage)
-        if youtube_urls:
-            return self.playlist_from_matches(
-                youtube_urls, video_id, video_title, ie=YoutubeIE.ie_key())
+        if 'Youtube' in triggered:
+            youtube_urls = YoutubeIE._extract_urls(webpage)
+            if youtube_urls:
+                return self.playlist_from_matches(
+                    youtube_urls, video_id, video_title, ie=YoutubeIE.ie_key())
 
-        matches = DailymotionIE._extract_urls(webpage)
-        if matches:
-            return self.playlist_from_matches(matches, video_id, video_title)
+        if 'Dailymotion' in triggered:
+            matches = DailymotionIE._extract_urls(webpage)
+            if matches:
+                return self.playlist_from_matches(matches, video_id, video_title)
 
         # Look for embedded Dailymotion playlist player (#3822)
-        m = re.search(
-            r'<iframe[^>]+?src=(["\'])(?P<url>(?:https?:)?//(?:www\.)?dailymotion\.[a-z]{2,3}/widget/jukebox\?.+?)\1', webpage)
-        if m:
-            playlists = re.findall(
-                r'list\[\]=/playlist/([^/]+)/', unescapeHTML(m.group('url')))
-            if playlists:
-                return self.playlist_from_matches(
-                    playlists, video_id, video_title, lambda p: '//dailymotion.com/playlist/%s' % p)
+        if 'DailymotionPlaylist' in triggered:
+            m = re.search(
+                r'<iframe[^>]+?src=(["\'])(?P<url>(?:https?:)?//(?:www\.)?dailymotion\.[a-z]{2,3}/widget/jukebox\?.+?)\1', webpage)
+            if m:
+                playlists = re.findall(
+                    r'list\[\]=/playlist/([^/]+)/', unescapeHTML(m.group('url')))
+                if playlists:
+                    return self.playlist_from_matches(
+                        playlists, video_id, video_title, lambda p: '//dailymotion.com/playlist/%s' % p)
 
         # Look for DailyMail embeds
-        dailymail_urls = DailyMailIE._extract_urls(webpage)
-        if dailymail_urls:
-            return self.playlist_from_matches(
-                dailymail_urls, video_id, video_title, ie=DailyMailIE.ie_key())
+        if 'DailyMail' in triggered:
+            dailymail_urls = DailyMailIE._extract_urls(webpage)
+            if dailymail_urls:
+                return self.playlist_from_matches(
+                    dailymail_urls, video_id, video_title, ie=DailyMailIE.ie_key())
 
         # Look for Teachable embeds, must be before Wistia
-        teachable_url = TeachableIE._extract_url(webpage, url)
-        if teachable_url:
-            return self.url_result(teachable_url)
+        if 'Teachable' in triggered:
+            teachable_url = TeachableIE._extract_url(webpage, url)
+            if teachable_url:
+                return self.url_result(teachable_url)
 
         # Look for embedded Wistia player
-        wistia_urls = WistiaIE._extract_urls(webpage)
-        if wistia_urls:
-            playlist = self.playlist_from_matches(wistia_urls, video_id, video_title, ie=WistiaIE.ie_key())
-            for entry in playlist['entries']:
-                entry.update({
-                    '_type': 'url_transparent',
-                    'uploader': video_uploader,
-                })
-            return playlist
+        if 'Wistia' in triggered:
+            wistia_urls = WistiaIE._extract_urls(webpage)
+            if wistia_urls:
+                playlist = self.playlist_from_matches(wistia_urls, video_id, video_title, ie=WistiaIE.ie_key())
+                for entry in playlist['entries']:
+                    entry.update({
+                        '_type': 'url_transparent',
+                        'uploader': video_uploader,
+                    })
+                return playlist
 
         # Look for SVT player
-        svt_url = SVTIE._extract_url(webpage)
-        if svt_url:
-            return self.url_result(svt_url, 'SVT')
+        if 'SVT' in triggered:
+            svt_url = SVTIE._extract_url(webpage)
+            if svt_url:
+                return self.url_result(svt_url, 'SVT')
 
         # Look for Bandcamp pages with custom domain
-        mobj = re.search(r'<meta property="og:url"[^>]*?content="(.*?bandcamp\.com.*?)"', webpage)
-        if mobj is not None:
-            burl = unescapeHTML(mobj.group(1))
-            # Don't set the extractor because it can be a track url or an album
-            return self.url_result(burl)
+        if 'Bandcamp' in triggered:
+            mobj = re.search(r'<meta property="og:url"[^>]*?content="(.*?bandcamp\.com.*?)"', webpage)
+            if mobj is not None:
+                burl = unescapeHTML(mobj.group(1))
+                # Don't set the extractor because it can be a track url or an album
+                return self.url_result(burl)
 
         # Look for embedded Vevo player
-        mobj = re.search(
-            r'<iframe[^>]+?src=(["\'])(?P<url>(?:https?:)?//(?:cache\.)?vevo\.com/.+?)\1', webpage)
-        if mobj is not None:
-            return self.url_result(mobj.group('url'))
+        if 'Vevo' in triggered:
+            mobj = re.search(
+                r'<iframe[^>]+?src=(["\'])(?P<url>(?:https?:)?//(?:cache\.)?vevo\.com/.+?)\1', webpage)
+            if mobj is not None:
+                return self.url_result(mobj.group('url'))
 
         # Look for embedded Viddler player
-        mobj = re.search(
-            r'<(?:iframe[^>]+?src|param[^>]+?value)=(["\'])(?P<url>(?:https?:)?//(?:www\.)?viddler\.com/(?:embed|player)/.+?)\1',
-            webpage)
-        if mobj is not None:
-            return self.url_result(mobj.group('url'))
+        if 'Viddler' in triggered:
+            mobj = re.search(
+                r'<(?:iframe[^>]+?src|param[^>]+?value)=(["\'])(?P<url>(?:https?:)?//(?:www\.)?viddler\.com/(?:embed|player)/.+?)\1',
+                webpage)
+            if mobj is not None:
+                return self.url_result(mobj.group('url'))
 
         # Look for NYTimes player
-        mobj = re.search(
-            r'<iframe[^>]+src=(["\'])(?P<url>(?:https?:)?//graphics8\.nytimes\.com/bcvideo/[^/]+/iframe/embed\.html.+?)\1>',
-            webpage)
-        if mobj is not None:
-            return self.url_result(mobj.group('url'))
+        if 'NYTimes' in triggered:
+            mobj = re.search(
+                r'<iframe[^>]+src=(["\'])(?P<url>(?:https?:)?//graphics8\.nytimes\.com/bcvideo/[^/]+/iframe/embed\.html.+?)\1>',
+                webpage)
+            if mobj is not None:
+                return self.url_result(mobj.group('url'))
 
         # Look for Libsyn player
-        mobj = re.search(
-            r'<iframe[^>]+src=(["\'])(?P<url>(?:https?:)?//html5-player\.libsyn\.com/embed/.+?)\1', webpage)
-        if mobj is not None:
-            return self.url_result(mobj.group('url'))
+        if 'Libsyn' in triggered:
+            mobj = re.search(
+                r'<iframe[^>]+src=(["\'])(?P<url>(?:https?:)?//html5-player\.libsyn\.com/embed/.+?)\1', webpage)
+            if mobj is not None:
+                return self.url_result(mobj.group('url'))
 
         # Look for Ooyala videos
-        mobj = (re.search(r'player\.ooyala\.com/[^"?]+[?#][^"]*?(?:embedCode|ec)=(?P<ec>[^"&]+)', webpage)
-                or re.search(r'OO\.Player\.create\([\'"].*?[\'"],\s*[\'"](?P<ec>.{32})[\'"]', webpage)
-                or re.search(r'OO\.Player\.create\.apply\(\s*OO\.Player\s*,\s*op\(\s*\[\s*[\'"][^\'"]*[\'"]\s*,\s*[\'"](?P<ec>.{32})[\'"]', webpage)
-                or re.search(r'SBN\.VideoLinkset\.ooyala\([\'"](?P<ec>.{32})[\'"]\)', webpage)
-                or re.search(r'data-ooyala-video-id\s*=\s*[\'"](?P<ec>.{32})[\'"]', webpage))
-        if mobj is not None:
-            embed_token = self._search_regex(
-                r'embedToken[\'"]?\s*:\s*[\'"]([^\'"]+)',
-                webpage, 'ooyala embed token', default=None)
-            return OoyalaIE._build_url_result(smuggle_url(
-                mobj.group('ec'), {
-                    'domain': url,
-                    'embed_token': embed_token,
-                }))
+        if 'Ooyala' in triggered:
+            mobj = (re.search(r'player\.ooyala\.com/[^"?]+[?#][^"]*?(?:embedCode|ec)=(?P<ec>[^"&]+)', webpage)
+                    or re.search(r'OO\.Player\.create\([\'"].*?[\'"],\s*[\'"](?P<ec>.{32})[\'"]', webpage)
+                    or re.search(r'OO\.Player\.create\.apply\(\s*OO\.Player\s*,\s*op\(\s*\[\s*[\'"][^\'"]*[\'"]\s*,\s*[\'"](?P<ec>.{32})[\'"]', webpage)
+                    or re.search(r'SBN\.VideoLinkset\.ooyala\([\'"](?P<ec>.{32})[\'"]\)', webpage)
+                    or re.search(r'data-ooyala-video-id\s*=\s*[\'"](?P<ec>.{32})[\'"]', webpage))
+            if mobj is not None:
+                embed_token = self._search_regex(
+                    r'embedToken[\'"]?\s*:\s*[\'"]([^\'"]+)',
+                    webpage, 'ooyala embed token', default=None)
+                return OoyalaIE._build_url_result(smuggle_url(
+                    mobj.group('ec'), {
+                        'domain': url,
+                        'embed_token': embed_token,
+                    }))
 
         # Look for multiple Ooyala embeds on SBN network websites
-        mobj = re.search(r'SBN\.VideoLinkset\.entryGroup\((\[.*?\])', webpage)
-        if mobj is not None:
-            embeds = self._parse_json(mobj.group(1), video_id, fatal=False)
-            if embeds:
-                return self.playlist_from_matches(
-                    embeds, video_id, video_title,
-                    getter=lambda v: OoyalaIE._url_for_embed_code(smuggle_url(v['provider_video_id'], {'domain': url})), ie='Ooyala')
+        if 'OoyalaSBN' in triggered:
+            mobj = re.search(r'SBN\.VideoLinkset\.entryGroup\((\[.*?\])', webpage)
+            if mobj is not None:
+                embeds = self._parse_json(mobj.group(1), video_id, fatal=False)
+                if embeds:
+                    return self.playlist_from_matches(
+                        embeds, video_id, video_title,
+                        getter=lambda v: OoyalaIE._url_for_embed_code(smuggle_url(v['provider_video_id'], {'domain': url})), ie='Ooyala')
 
         # Look for Aparat videos
-        mobj = re.search(r'<iframe .*?src="(http://www\.aparat\.com/video/[^"]+)"', webpage)
-        if mobj is not None:
-            return self.url_result(mobj.group(1), 'Aparat')
+        if 'Aparat' in triggered:
+            mobj = re.search(r'<iframe .*?src="(http://www\.aparat\.com/video/[^"]+)"', webpage)
+            if mobj is not None:
+                return self.url_result(mobj.group(1), 'Aparat')
 
         # Look for MPORA videos
-        mobj = re.search(r'<iframe .*?src="(http://mpora\.(?:com|de)/videos/[^"]+)"', webpage)
-        if mobj is not None:
-            return self.url_result(mobj.group(1), 'Mpora')
+        if 'Mpora' in triggered:
+            mobj = re.search(r'<iframe .*?src="(http://mpora\.(?:com|de)/videos/[^"]+)"', webpage)
+            if mobj is not None:
+                return self.url_result(mobj.group(1), 'Mpora')
 
         # Look for embedded Facebook player
-        facebook_urls = FacebookIE._extract_urls(webpage)
-        if facebook_urls:
-            return self.playlist_from_matches(facebook_urls, video_id, video_title)
+        if 'Facebook' in triggered:
+            facebook_urls = FacebookIE._extract_urls(webpage)
+            if facebook_urls:
+                return self.playlist_from_matches(facebook_urls, video_id, video_title)
 
         # Look for embedded VK player
-        mobj = re.search(r'<iframe[^>]+?src=(["\'])(?P<url>https?://vk\.com/video_ext\.php.+?)\1', webpage)
-        if mobj is not None:
-            return self.url_result(mobj.group('url'), 'VK')
+        if 'VK' in triggered:
+            mobj = re.search(r'<iframe[^>]+?src=(["\'])(?P<url>https?://vk\.com/video_ext\.php.+?)\1', webpage)
+            if mobj is not None:
+                return self.url_result(mobj.group('url'), 'VK')
 
         # Look for embedded Odnoklassniki player
-        odnoklassniki_url = OdnoklassnikiIE._extract_url(webpage)
-        if odnoklassniki_url:
-            return self.url_result(odnoklassniki_url, OdnoklassnikiIE.ie_key())
+        if 'Odnoklassniki' in triggered:
+            odnoklassniki_url = OdnoklassnikiIE._extract_url(webpage)
+            if odnoklassniki_url:
+                return self.url_result(odnoklassniki_url, OdnoklassnikiIE.ie_key())
 
         # Look for sibnet embedded player
-        sibnet_urls = VKIE._extract_sibnet_urls(webpage)
-        if sibnet_urls:
-            return self.playlist_from_matches(sibnet_urls, video_id, video_title)
+        if 'Sibnet' in triggered:
+            sibnet_urls = VKIE._extract_sibnet_urls(webpage)
+            if sibnet_urls:
+                return self.playlist_from_matches(sibnet_urls, video_id, video_title)
 
         # Look for embedded ivi player
-        mobj = re.search(r'<embed[^>]+?src=(["\'])(?P<url>https?://(?:www\.)?ivi\.ru/video/player.+?)\1', webpage)
-        if mobj is not None:
-            return self.url_result(mobj.group('url'), 'Ivi')
+        if 'Ivi' in triggered:
+            mobj = re.search(r'<embed[^>]+?src=(["\'])(?P<url>https?://(?:www\.)?ivi\.ru/video/player.+?)\1', webpage)
+            if mobj is not None:
+                return self.url_result(mobj.group('url'), 'Ivi')
 
         # Look for embedded Huffington Post player
-        mobj = re.search(
-            r'<iframe[^>]+?src=(["\'])(?P<url>https?://embed\.live\.huffingtonpost\.com/.+?)\1', webpage)
-        if mobj is not None:
-            return self.url_result(mobj.group('url'), 'HuffPost')
+        if 'HuffPost' in triggered:
+            mobj = re.search(
+                r'<iframe[^>]+?src=(["\'])(?P<url>https?://embed\.live\.huffingtonpost\.com/.+?)\1', webpage)
+            if mobj is not None:
+                return self.url_result(mobj.group('url'), 'HuffPost')
 
         # Look for embed.ly
-        mobj = re.search(r'class=["\']embedly-card["\'][^>]href=["\'](?P<url>[^"\']+)', webpage)
-        if mobj is not None:
-            return self.url_result(mobj.group('url'))
-        mobj = re.search(r'class=["\']embedly-embed["\'][^>]src=["\'][^"\']*url=(?P<url>[^&]+)', webpage)
-        if mobj is not None:
-            return self.url_result(compat_urllib_parse_unquote(mobj.group('url')))
+        if 'Embedly' in triggered:
+            mobj = re.search(r'class=["\']embedly-card["\'][^>]href=["\'](?P<url>[^"\']+)', webpage)
+            if mobj is not None:
+                return self.url_result(mobj.group('url'))
+            mobj = re.search(r'class=["\']embedly-embed["\'][^>]src=["\'][^"\']*url=(?P<url>[^&]+)', webpage)
+            if mobj is not None:
+                return self.url_result(compat_urllib_parse_unquote(mobj.group('url')))
 
         # Look for funnyordie embed
-        matches = re.findall(r'<iframe[^>]+?src="(https?://(?:www\.)?funnyordie\.com/embed/[^"]+)"', webpage)
-        if matches:
-            return self.playlist_from_matches(
-                matches, video_id, video_title, getter=unescapeHTML, ie='FunnyOrDie')
+        if 'FunnyOrDie' in triggered:
+            matches = re.findall(r'<iframe[^>]+?src="(https?://(?:www\.)?funnyordie\.com/embed/[^"]+)"', webpage)
+            if matches:
+                return self.playlist_from_matches(
+                    matches, video_id, video_title, getter=unescapeHTML, ie='FunnyOrDie')
 
         # Look for Simplecast embeds
-        simplecast_urls = SimplecastIE._extract_urls(webpage)
-        if simplecast_urls:
-            return self.playlist_from_matches(
-                simplecast_urls, video_id, video_title)
+        if 'Simplecast' in triggered:
+            simplecast_urls = SimplecastIE._extract_urls(webpage)
+            if simplecast_urls:
+                return self.playlist_from_matches(
+                    simplecast_urls, video_id, video_title)
 
         # Look for BBC iPlayer embed
-        matches = re.findall(r'setPlaylist\("(https?://www\.bbc\.co\.uk/iplayer/[^/]+/[\da-z]{8})"\)', webpage)
-        if matches:
-            return self.playlist_from_matches(matches, video_id, video_title, ie='BBCCoUk')
+        if 'BBCCoUk' in triggered:
+            matches = re.findall(r'setPlaylist\("(https?://www\.bbc\.co\.uk/iplayer/[^/]+/[\da-z]{8})"\)', webpage)
+            if matches:
+                return self.playlist_from_matches(matches, video_id, video_title, ie='BBCCoUk')
 
         # Look for embedded RUTV player
-        rutv_url = RUTVIE._extract_url(webpage)
-        if rutv_url:
-            return self.url_result(rutv_url, 'RUTV')
+        if 'RUTV' in triggered:
+            rutv_url = RUTVIE._extract_url(webpage)
+            if rutv_url:
+                return self.url_result(rutv_url, 'RUTV')
 
         # Look for embedded TVC player
-        tvc_url = TVCIE._extract_url(webpage)
-        if tvc_url:
-            return self.url_result(tvc_url, 'TVC')
+        if 'TVC' in triggered:
+            tvc_url = TVCIE._extract_url(webpage)
+            if tvc_url:
+                return self.url_result(tvc_url, 'TVC')
 
         # Look for embedded SportBox player
-        sportbox_urls = SportBoxIE._extract_urls(webpage)
-        if sportbox_urls:
-            return self.playlist_from_matches(sportbox_urls, video_id, video_title, ie=SportBoxIE.ie_key())
+        if 'SportBox' in triggered:
+            sportbox_urls = SportBoxIE._extract_urls(webpage)
+            if sportbox_urls:
+                return self.playlist_from_matches(sportbox_urls, video_id, video_title, ie=SportBoxIE.ie_key())
 
         # Look for embedded XHamster player
-        xhamster_urls = XHamsterEmbedIE._extract_urls(webpage)
-        if xhamster_urls:
-            return self.playlist_from_matches(xhamster_urls, video_id, video_title, ie='XHamsterEmbed')
+        if 'XHamsterEmbed' in triggered:
+            xhamster_urls = XHamsterEmbedIE._extract_urls(webpage)
+            if xhamster_urls:
+                return self.playlist_from_matches(xhamster_urls, video_id, video_title, ie='XHamsterEmbed')
 
         # Look for embedded TNAFlixNetwork player
-        tnaflix_urls = TNAFlixNetworkEmbedIE._extract_urls(webpage)
-        if tnaflix_urls:
-            return self.playlist_from_matches(tnaflix_urls, video_id, video_title, ie=TNAFlixNetworkEmbedIE.ie_key())
+        if 'TNAFlixNetworkEmbed' in triggered:
+            tnaflix_urls = TNAFlixNetworkEmbedIE._extract_urls(webpage)
+            if tnaflix_urls:
+                return self.playlist_from_matches(tnaflix_urls, video_id, video_title, ie=TNAFlixNetworkEmbedIE.ie_key())
 
         # Look for embedded PornHub player
-        pornhub_urls = PornHubIE._extract_urls(webpage)
-        if pornhub_urls:
-            return self.playlist_from_matches(pornhub_urls, video_id, video_title, ie=PornHubIE.ie_key())
+        if 'PornHub' in triggered:
+            pornhub_urls = PornHubIE._extract_urls(webpage)
+            if pornhub_urls:
+                return self.playlist_from_matches(pornhub_urls, video_id, video_title, ie=PornHubIE.ie_key())
 
         # Look for embedded DrTuber player
-        drtuber_urls = DrTuberIE._extract_urls(webpage)
-        if drtuber_urls:
-            return self.playlist_from_matches(drtuber_urls, video_id, video_title, ie=DrTuberIE.ie_key())
+        if 'DrTuber' in triggered:
+            drtuber_urls = DrTuberIE._extract_urls(webpage)
+            if drtuber_urls:
+                return self.playlist_from_matches(drtuber_urls, video_id, video_title, ie=DrTuberIE.ie_key())
 
         # Look for embedded RedTube player
-        redtube_urls = RedTubeIE._extract_urls(webpage)
-        if redtube_urls:
-            return self.playlist_from_matches(redtube_urls, video_id, video_title, ie=RedTubeIE.ie_key())
+        if 'RedTube' in triggered:
+            redtube_urls = RedTubeIE._extract_urls(webpage)
+            if redtube_urls:
+                return self.playlist_from_matches(redtube_urls, video_id, video_title, ie=RedTubeIE.ie_key())
 
         # Look for embedded Tube8 player
-        tube8_urls = Tube8IE._extract_urls(webpage)
-        if tube8_urls:
-            return self.playlist_from_matches(tube8_urls, video_id, video_title, ie=Tube8IE.ie_key())
+        if 'Tube8' in triggered:
+            tube8_urls = Tube8IE._extract_urls(webpage)
+            if tube8_urls:
+                return self.playlist_from_matches(tube8_urls, video_id, video_title, ie=Tube8IE.ie_key())
 
         # Look for embedded Mofosex player
-        mofosex_urls = MofosexEmbedIE._extract_urls(webpage)
-        if mofosex_urls:
-            return self.playlist_from_matches(mofosex_urls, video_id, video_title, ie=MofosexEmbedIE.ie_key())
+        if 'MofosexEmbed' in triggered:
+            mofosex_urls = MofosexEmbedIE._extract_urls(webpage)
+            if mofosex_urls:
+                return self.playlist_from_matches(mofosex_urls, video_id, video_title, ie=MofosexEmbedIE.ie_key())
 
         # Look for embedded Spankwire player
-        spankwire_urls = SpankwireIE._extract_urls(webpage)
-        if spankwire_urls:
-            return self.playlist_from_matches(spankwire_urls, video_id, video_title, ie=SpankwireIE.ie_key())
+        if 'Spankwire' in triggered:
+            spankwire_urls = SpankwireIE._extract_urls(webpage)
+            if spankwire_urls:
+                return self.playlist_from_matches(spankwire_urls, video_id, video_title, ie=SpankwireIE.ie_key())
 
         # Look for embedded YouPorn player
-        youporn_urls = YouPornIE._extract_urls(webpage)
-        if youporn_urls:
-            return self.playlist_from_matches(youporn_urls, video_id, video_title, ie=YouPornIE.ie_key())
+        if 'YouPorn' in triggered:
+            youporn_urls = YouPornIE._extract_urls(webpage)
+            if youporn_urls:
+                return self.playlist_from_matches(youporn_urls, video_id, video_title, ie=YouPornIE.ie_key())
 
         # Look for embedded Tvigle player
-        mobj = re.search(
-            r'<iframe[^>]+?src=(["\'])(?P<url>(?:https?:)?//cloud\.tvigle\.ru/video/.+?)\1', webpage)
-        if mobj is not None:
-            return self.url_result(mobj.group('url'), 'Tvigle')
+        if 'Tvigle' in triggered:
+            mobj = re.search(
+                r'<iframe[^>]+?src=(["\'])(?P<url>(?:https?:)?//cloud\.tvigle\.ru/video/.+?)\1', webpage)
+            if mobj is not None:
+                return self.url_result(mobj.group('url'), 'Tvigle')
 
         # Look for embedded TED player
-        mobj = re.search(
-            r'<iframe[^>]+?src=(["\'])(?P<url>https?://embed(?:-ssl)?\.ted\.com/.+?)\1', webpage)
-        if mobj is not None:
-            return self.url_result(mobj.group('url'), 'TED')
+        if 'TED' in triggered:
+            mobj = re.search(
+                r'<iframe[^>]+?src=(["\'])(?P<url>https?://embed(?:-ssl)?\.ted\.com/.+?)\1', webpage)
+            if mobj is not None:
+                return self.url_result(mobj.group('url'), 'TED')
 
         # Look for embedded Ustream videos
-        ustream_url = UstreamIE._extract_url(webpage)
-        if ustream_url:
-            return self.url_result(ustream_url, UstreamIE.ie_key())
+        if 'Ustream' in triggered:
+            ustream_url = UstreamIE._extract_url(webpage)
+            if ustream_url:
+                return self.url_result(ustream_url, UstreamIE.ie_key())
 
         # Look for embedded arte.tv player
-        arte_urls = ArteTVEmbedIE._extract_urls(webpage)
-        if arte_urls:
-            return self.playlist_from_matches(arte_urls, video_id, video_title)
+        if 'ArteTVEmbed' in triggered:
+            arte_urls = ArteTVEmbedIE._extract_urls(webpage)
+            if arte_urls:
+                return self.playlist_from_matches(arte_urls, video_id, video_title)
 
         # Look for embedded francetv player
-        mobj = re.search(
-            r'<iframe[^>]+?src=(["\'])(?P<url>(?:https?://)?embed\.francetv\.fr/\?ue=.+?)\1',
-            webpage)
-        if mobj is not None:
-            return self.url_result(mobj.group('url'))
+        if 'FranceTVEmbed' in triggered:
+            mobj = re.search(
+                r'<iframe[^>]+?src=(["\'])(?P<url>(?:https?://)?embed\.francetv\.fr/\?ue=.+?)\1',
+                webpage)
+            if mobj is not None:
+                return self.url_result(mobj.group('url'))
 
         # Look for embedded Myvi.ru player
-        myvi_url = MyviIE._extract_url(webpage)
-        if myvi_url:
-            return self.url_result(myvi_url)
+        if 'Myvi' in triggered:
+            myvi_url = MyviIE._extract_url(webpage)
+            if myvi_url:
+                return self.url_result(myvi_url)
 
         # Look for embedded soundcloud player
-        soundcloud_urls = SoundcloudEmbedIE._extract_urls(webpage)
-        if soundcloud_urls:
-            return self.playlist_from_matches(soundcloud_urls, video_id, video_title, getter=unescapeHTML)
+        if 'SoundcloudEmbed' in triggered:
+            soundcloud_urls = SoundcloudEmbedIE._extract_urls(webpage)
+            if soundcloud_urls:
+                return self.playlist_from_matches(soundcloud_urls, video_id, video_title, getter=unescapeHTML)
 
         # Look for tunein player
-        tunein_urls = TuneInBaseIE._extract_urls(webpage)
-        if tunein_urls:
-            return self.playlist_from_matches(tunein_urls, video_id, video_title)
+        if 'TuneIn' in triggered:
+            tunein_urls = TuneInBaseIE._extract_urls(webpage)
+            if tunein_urls:
+                return self.playlist_from_matches(tunein_urls, video_id, video_title)
 
         # Look for embedded mtvservices player
-        mtvservices_url = MTVServicesEmbeddedIE._extract_url(webpage)
-        if mtvservices_url:
-            return self.url_result(mtvservices_url, ie='MTVServicesEmbedded')
+        if 'MTVServicesEmbedded' in triggered:
+            mtvservices_url = MTVServicesEmbeddedIE._extract_url(webpage)
+            if mtvservices_url:
+                return self.url_result(mtvservices_url, ie='MTVServicesEmbedded')
 
         # Look for embedded yahoo player
-        mobj = re.search(
-            r'<iframe[^>]+?src=(["\'])(?P<url>https?://(?:screen|movies)\.yahoo\.com/.+?\.html\?format=embed)\1',
-            webpage)
-        if mobj is not None:
-            return self.url_result(mobj.group('url'), 'Yahoo')
+        if 'Yahoo' in triggered:
+            mobj = re.search(
+                r'<iframe[^>]+?src=(["\'])(?P<url>https?://(?:screen|movies)\.yahoo\.com/.+?\.html\?format=embed)\1',
+                webpage)
+            if mobj is not None:
+                return self.url_result(mobj.group('url'), 'Yahoo')
 
         # Look for embedded sbs.com.au player
-        mobj = re.search(
-            r'''(?x)
-            (?:
-                <meta\s+property="og:video"\s+content=|
-                <iframe[^>]+?src=
-            )
-            (["\'])(?P<url>https?://(?:www\.)?sbs\.com\.au/ondemand/video/.+?)\1''',
-            webpage)
-        if mobj is not None:
-            return self.url_result(mobj.group('url'), 'SBS')
+        if 'SBS' in triggered:
+            mobj = re.search(
+                r'''(?x)
+                (?:
+                    <meta\s+property="og:video"\s+content=|
+                    <iframe[^>]+?src=
+                )
+                (["\'])(?P<url>https?://(?:www\.)?sbs\.com\.au/ondemand/video/.+?)\1''',
+                webpage)
+            if mobj is not None:
+                return self.url_result(mobj.group('url'), 'SBS')
 
         # Look for embedded Cinchcast player
-        mobj = re.search(
-            r'<iframe[^>]+?src=(["\'])(?P<url>https?://player\.cinchcast\.com/.+?)\1',
-            webpage)
-        if mobj is not None:
-            return self.url_result(mobj.group('url'), 'Cinchcast')
-
-        mobj = re.search(
-            r'<iframe[^>]+?src=(["\'])(?P<url>https?://m(?:lb)?\.mlb\.com/shared/video/embed/embed\.html\?.+?)\1',
-            webpage)
-        if not mobj:
+        if 'Cinchcast' in triggered:
             mobj = re.search(
-                r'data-video-link=["\'](?P<url>http://m\.mlb\.com/video/[^"\']+)',
+                r'<iframe[^>]+?src=(["\'])(?P<url>https?://player\.cinchcast\.com/.+?)\1',
                 webpage)
-        if mobj is not None:
-            return self.url_result(mobj.group('url'), 'MLB')
+            if mobj is not None:
+                return self.url_result(mobj.group('url'), 'Cinchcast')
 
-        mobj = re.search(
-            r'<(?:iframe|script)[^>]+?src=(["\'])(?P<url>%s)\1' % CondeNastIE.EMBED_URL,
-            webpage)
-        if mobj is not None:
-            return self.url_result(self._proto_relative_url(mobj.group('url'), scheme='http:'), 'CondeNast')
+        if 'MLB' in triggered:
+            mobj = re.search(
+                r'<iframe[^>]+?src=(["\'])(?P<url>https?://m(?:lb)?\.mlb\.com/shared/video/embed/embed\.html\?.+?)\1',
+                webpage)
+            if not mobj:
+                mobj = re.search(
+                    r'data-video-link=["\'](?P<url>http://m\.mlb\.com/video/[^"\']+)',
+                    webpage)
+            if mobj is not None:
+                return self.url_result(mobj.group('url'), 'MLB')
+
+        if 'CondeNast' in triggered:
+            mobj = re.search(
+                r'<(?:iframe|script)[^>]+?src=(["\'])(?P<url>%s)\1' % CondeNastIE.EMBED_URL,
+                webpage)
+            if mobj is not None:
+                return self.url_result(self._proto_relative_url(mobj.group('url'), scheme='http:'), 'CondeNast')
 
-        mobj = re.search(
-            r'<iframe[^>]+src="(?P<url>https?://(?:new\.)?livestream\.com/[^"]+/player[^"]+)"',
-            webpage)
-        if mobj is not None:
-            return self.url_result(mobj.group('url'), 'Livestream')
+        if 'Livestream' in triggered:
+            mobj = re.search(
+                r'<iframe[^>]+src="(?P<url>https?://(?:new\.)?livestream\.com/[^"]+/player[^"]+)"',
+                webpage)
+            if mobj is not None:
+                return self.url_result(mobj.group('url'), 'Livestream')
 
         # Look for Zapiks embed
-        mobj = re.search(
-            r'<iframe[^>]+src="(?P<url>https?://(?:www\.)?zapiks\.fr/index\.php\?.+?)"', webpage)
-        if mobj is not None:
-            return self.url_result(mobj.group('url'), 'Zapiks')
+        if 'Zapiks' in triggered:
+            mobj = re.search(
+                r'<iframe[^>]+src="(?P<url>https?://(?:www\.)?zapiks\.fr/index\.php\?.+?)"', webpage)
+            if mobj is not None:
+                return self.url_result(mobj.group('url'), 'Zapiks')
 
         # Look for Kaltura embeds
-        kaltura_urls = KalturaIE._extract_urls(webpage)
-        if kaltura_urls:
-            return self.playlist_from_matches(
-                kaltura_urls, video_id, video_title,
-                getter=lambda x: smuggle_url(x, {'source_url': url}),
-                ie=KalturaIE.ie_key())
+        if 'Kaltura' in triggered:
+            kaltura_urls = KalturaIE._extract_urls(webpage)
+            if kaltura_urls:
+                return self.playlist_from_matches(
+                    kaltura_urls, video_id, video_title,
+                    getter=lambda x: smuggle_url(x, {'source_url': url}),
+                    ie=KalturaIE.ie_key())
 
         # Look for EaglePlatform embeds
-        eagleplatform_url = EaglePlatformIE._extract_url(webpage)
-        if eagleplatform_url:
-            return self.url_result(smuggle_url(eagleplatform_url, {'referrer': url}), EaglePlatformIE.ie_key())
+        if 'EaglePlatform' in triggered:
+            eagleplatform_url = EaglePlatformIE._extract_url(webpage)
+            if eagleplatform_url:
+                return self.url_result(smuggle_url(eagleplatform_url, {'referrer': url}), EaglePlatformIE.ie_key())
 
         # Look for ClipYou (uses EaglePlatform) embeds
-        mobj = re.search(
-            r'<iframe[^>]+src="https?://(?P<host>media\.clipyou\.ru)/index/player\?.*\brecord_id=(?P<id>\d+).*"', webpage)
-        if mobj is not None:
-            return self.url_result('eagleplatform:%(host)s:%(id)s' % mobj.groupdict(), 'EaglePlatform')
+        if 'ClipYou' in triggered:
+            mobj = re.search(
+                r'<iframe[^>]+src="https?://(?P<host>media\.clipyou\.ru)/index/player\?.*\brecord_id=(?P<id>\d+).*"', webpage)
+            if mobj is not None:
+                return self.url_result('eagleplatform:%(host)s:%(id)s' % mobj.groupdict(), 'EaglePlatform')
 
         # Look for Pladform embeds
-        pladform_url = PladformIE._extract_url(webpage)
-        if pladform_url:
-            return self.url_result(pladform_url)
+        if 'Pladform' in triggered:
+            pladform_url = PladformIE._extract_url(webpage)
+            if pladform_url:
+                return self.url_result(pladform_url)
 
         # Look for Videomore embeds
-        videomore_url = VideomoreIE._extract_url(webpage)
-        if videomore_url:
-            return self.url_result(videomore_url)
+        if 'Videomore' in triggered:
+            videomore_url = VideomoreIE._extract_url(webpage)
+            if videomore_url:
+                return self.url_result(videomore_url)
 
         # Look for Webcaster embeds
-        webcaster_url = WebcasterFeedIE._extract_url(self, webpage)
-        if webcaster_url:
-            return self.url_result(webcaster_url, ie=WebcasterFeedIE.ie_key())
+        if 'WebcasterFeed' in triggered:
+            webcaster_url = WebcasterFeedIE._extract_url(self, webpage)
+            if webcaster_url:
+                return self.url_result(webcaster_url, ie=WebcasterFeedIE.ie_key())
 
         # Look for Playwire embeds
-        mobj = re.search(
-            r'<script[^>]+data-config=(["\'])(?P<url>(?:https?:)?//config\.playwire\.com/.+?)\1', webpage)
-        if mobj is not None:
-            return self.url_result(mobj.group('url'))
+        if 'Playwire' in triggered:
+            mobj = re.search(
+                r'<script[^>]+data-config=(["\'])(?P<url>(?:https?:)?//config\.playwire\.com/.+?)\1', webpage)
+            if mobj is not None:
+                return self.url_result(mobj.group('url'))
 
         # Look for 5min embeds
-        mobj = re.search(
-            r'<meta[^>]+property="og:video"[^>]+content="https?://embed\.5min\.com/(?P<id>[0-9]+)/?', webpage)
-        if mobj is not None:
-            return self.url_result('5min:%s' % mobj.group('id'), 'FiveMin')
+        if 'FiveMin' in triggered:
+            mobj = re.search(
+                r'<meta[^>]+property="og:video"[^>]+content="https?://embed\.5min\.com/(?P<id>[0-9]+)/?', webpage)
+            if mobj is not None:
+                return self.url_result('5min:%s' % mobj.group('id'), 'FiveMin')
 
         # Look for Crooks and Liars embeds
-        mobj = re.search(
-            r'<(?:iframe[^>]+src|param[^>]+value)=(["\'])(?P<url>(?:https?:)?//embed\.crooksandliars\.com/(?:embed|v)/.+?)\1', webpage)
-        if mobj is not None:
-            return self.url_result(mobj.group('url'))
+        if 'CrooksAndLiars' in triggered:
+            mobj = re.search(
+                r'<(?:iframe[^>]+src|param[^>]+value)=(["\'])(?P<url>(?:https?:)?//embed\.crooksandliars\.com/(?:embed|v)/.+?)\1', webpage)
+            if mobj is not None:
+                return self.url_result(mobj.group('url'))
 
         # Look for NBC Sports VPlayer embeds
-        nbc_sports_url = NBCSportsVPlayerIE._extract_url(webpage)
-        if nbc_sports_url:
-            return self.url_result(nbc_sports_url, 'NBCSportsVPlayer')
+        if 'NBCSportsVPlayer' in triggered:
+            nbc_sports_url = NBCSportsVPlayerIE._extract_url(webpage)
+            if nbc_sports_url:
+                return self.url_result(nbc_sports_url, 'NBCSportsVPlayer')
 
         # Look for NBC News embeds
-        nbc_news_embed_url = re.search(
-            r'<iframe[^>]+src=(["\'])(?P<url>(?:https?:)?//www\.nbcnews\.com/widget/video-embed/[^"\']+)\1', webpage)
-        if nbc_news_embed_url:
-            return self.url_result(nbc_news_embed_url.group('url'), 'NBCNews')
+        if 'NBCNews' in triggered:
+            nbc_news_embed_url = re.search(
+                r'<iframe[^>]+src=(["\'])(?P<url>(?:https?:)?//www\.nbcnews\.com/widget/video-embed/[^"\']+)\1', webpage)
+            if nbc_news_embed_url:
+                return self.url_result(nbc_news_embed_url.group('url'), 'NBCNews')
 
         # Look for Google Drive embeds
-        google_drive_url = GoogleDriveIE._extract_url(webpage)
-        if google_drive_url:
-            return self.url_result(google_drive_url, 'GoogleDrive')
+        if 'GoogleDrive' in triggered:
+            google_drive_url = GoogleDriveIE._extract_url(webpage)
+            if google_drive_url:
+                return self.url_result(google_drive_url, 'GoogleDrive')
 
         # Look for UDN embeds
-        mobj = re.search(
-            r'<iframe[^>]+src="(?:https?:)?(?P<url>%s)"' % UDNEmbedIE._PROTOCOL_RELATIVE_VALID_URL, webpage)
-        if mobj is not None:
-            return self.url_result(
-                compat_urlparse.urljoin(url, mobj.group('url')), 'UDNEmbed')
+        if 'UDNEmbed' in triggered:
+            mobj = re.search(
+                r'<iframe[^>]+src="(?:https?:)?(?P<url>%s)"' % UDNEmbedIE._PROTOCOL_RELATIVE_VALID_URL, webpage)
+            if mobj is not None:
+                return self.url_result(
+                    compat_urlparse.urljoin(url, mobj.group('url')), 'UDNEmbed')
 
         # Look for Senate ISVP iframe
-        senate_isvp_url = SenateISVPIE._search_iframe_url(webpage)
-        if senate_isvp_url:
-            return self.url_result(senate_isvp_url, 'SenateISVP')
+        if 'SenateISVP' in triggered:
+            senate_isvp_url = SenateISVPIE._search_iframe_url(webpage)
+            if senate_isvp_url:
+                return self.url_result(senate_isvp_url, 'SenateISVP')
 
         # Look for Kinja embeds
-        kinja_embed_urls = KinjaEmbedIE._extract_urls(webpage, url)
-        if kinja_embed_urls:
-            return self.playlist_from_matches(
-                kinja_embed_urls, video_id, video_title)
+        if 'KinjaEmbed' in triggered:
+            kinja_embed_urls = KinjaEmbedIE._extract_urls(webpage, url)
+            if kinja_embed_urls:
+                return self.playlist_from_matches(
+                    kinja_embed_urls, video_id, video_title)
 
         # Look for OnionStudios embeds
-        onionstudios_url = OnionStudiosIE._extract_url(webpage)
-        if onionstudios_url:
-            return self.url_result(onionstudios_url)
+        if 'OnionStudios' in triggered:
+            onionstudios_url = OnionStudiosIE._extract_url(webpage)
+            if onionstudios_url:
+                return self.url_result(onionstudios_url)
 
         # Look for ViewLift embeds
-        viewlift_url = ViewLiftEmbedIE._extract_url(webpage)
-        if viewlift_url:
-            return self.url_result(viewlift_url)
+        if 'ViewLiftEmbed' in triggered:
+            viewlift_url = ViewLiftEmbedIE._extract_url(webpage)
+            if viewlift_url:
+                return self.url_result(viewlift_url)
 
         # Look for JWPlatform embeds
-        jwplatform_urls = JWPlatformIE._extract_urls(webpage)
-        if jwplatform_urls:
-            return self.playlist_from_matches(jwplatform_urls, video_id, video_title, ie=JWPlatformIE.ie_key())
+        if 'JWPlatform' in triggered:
+            jwplatform_urls = JWPlatformIE._extract_urls(webpage)
+            if jwplatform_urls:
+                return self.playlist_from_matches(jwplatform_urls, video_id, video_title, ie=JWPlatformIE.ie_key())
 
         # Look for Digiteka embeds
-        digiteka_url = DigitekaIE._extract_url(webpage)
-        if digiteka_url:
-            return self.url_result(self._proto_relative_url(digiteka_url), DigitekaIE.ie_key())
+        if 'Digiteka' in triggered:
+            digiteka_url = DigitekaIE._extract_url(webpage)
+            if digiteka_url:
+                return self.url_result(self._proto_relative_url(digiteka_url), DigitekaIE.ie_key())
 
         # Look for Arkena embeds
-        arkena_url = ArkenaIE._extract_url(webpage)
-        if arkena_url:
-            return self.url_result(arkena_url, ArkenaIE.ie_key())
+        if 'Arkena' in triggered:
+            arkena_url = ArkenaIE._extract_url(webpage)
+            if arkena_url:
+                return self.url_result(arkena_url, ArkenaIE.ie_key())
 
         # Look for Piksel embeds
-        piksel_url = PikselIE._extract_url(webpage)
-        if piksel_url:
-            return self.url_result(piksel_url, PikselIE.ie_key())
+        if 'Piksel' in triggered:
+            piksel_url = PikselIE._extract_url(webpage)
+            if piksel_url:
+                return self.url_result(piksel_url, PikselIE.ie_key())
 
         # Look for Limelight embeds
-        limelight_urls = LimelightBaseIE._extract_urls(webpage, url)
-        if limelight_urls:
-            return self.playlist_result(
-                limelight_urls, video_id, video_title, video_description)
+        if 'Limelight' in triggered:
+            limelight_urls = LimelightBaseIE._extract_urls(webpage, url)
+            if limelight_urls:
+                return self.playlist_result(
+                    limelight_urls, video_id, video_title, video_description)
 
         # Look for Anvato embeds
-        anvato_urls = AnvatoIE._extract_urls(self, webpage, video_id)
-        if anvato_urls:
-            return self.playlist_result(
-                anvato_urls, video_id, video_title, video_description)
+        if 'Anvato' in triggered:
+            anvato_urls = AnvatoIE._extract_urls(self, webpage, video_id)
+            if anvato_urls:
+                return self.playlist_result(
+                    anvato_urls, video_id, video_title, video_description)
 
         # Look for AdobeTVVideo embeds
-        mobj = re.search(
-            r'<iframe[^>]+src=[\'"]((?:https?:)?//video\.tv\.adobe\.com/v/\d+[^"]+)[\'"]',
-            webpage)
-        if mobj is not None:
-            return self.url_result(
-                self._proto_relative_url(unescapeHTML(mobj.group(1))),
-                'AdobeTVVideo')
+        if 'AdobeTVVideo' in triggered:
+            mobj = re.search(
+                r'<iframe[^>]+src=[\'"]((?:https?:)?//video\.tv\.adobe\.com/v/\d+[^"]+)[\'"]',
+                webpage)
+            if mobj is not None:
+                return self.url_result(
+                    self._proto_relative_url(unescapeHTML(mobj.group(1))),
+                    'AdobeTVVideo')
 
         # Look for Vine embeds
-        mobj = re.search(
-            r'<iframe[^>]+src=[\'"]((?:https?:)?//(?:www\.)?vine\.co/v/[^/]+/embed/(?:simple|postcard))',
-            webpage)
-        if mobj is not None:
-            return self.url_result(
-                self._proto_relative_url(unescapeHTML(mobj.group(1))), 'Vine')
+        if 'Vine' in triggered:
+            mobj = re.search(
+                r'<iframe[^>]+src=[\'"]((?:https?:)?//(?:www\.)?vine\.co/v/[^/]+/embed/(?:simple|postcard))',
+                webpage)
+            if mobj is not None:
+                return self.url_result(
+                    self._proto_relative_url(unescapeHTML(mobj.group(1))), 'Vine')
 
         # Look for VODPlatform embeds
-        mobj = re.search(
-            r'<iframe[^>]+src=(["\'])(?P<url>(?:https?:)?//(?:(?:www\.)?vod-platform\.net|embed\.kwikmotion\.com)/[eE]mbed/.+?)\1',
-            webpage)
-        if mobj is not None:
-            return self.url_result(
-                self._proto_relative_url(unescapeHTML(mobj.group('url'))), 'VODPlatform')
+        if 'VODPlatform' in triggered:
+            mobj = re.search(
+                r'<iframe[^>]+src=(["\'])(?P<url>(?:https?:)?//(?:(?:www\.)?vod-platform\.net|embed\.kwikmotion\.com)/[eE]mbed/.+?)\1',
+                webpage)
+            if mobj is not None:
+                return self.url_result(
+                    self._proto_relative_url(unescapeHTML(mobj.group('url'))), 'VODPlatform')
 
         # Look for Mangomolo embeds
-        mobj = re.search(
-            r'''(?x)<iframe[^>]+src=(["\'])(?P<url>(?:https?:)?//
-                (?:
-                    admin\.mangomolo\.com/analytics/index\.php/customers/embed|
-                    player\.mangomolo\.com/v1
-                )/
-                (?:
-                    video\?.*?\bid=(?P<video_id>\d+)|
-                    (?:index|live)\?.*?\bchannelid=(?P<channel_id>(?:[A-Za-z0-9+/=]|%2B|%2F|%3D)+)
-                ).+?)\1''', webpage)
-        if mobj is not None:
-            info = {
-                '_type': 'url_transparent',
-                'url': self._proto_relative_url(unescapeHTML(mobj.group('url'))),
-                'title': video_title,
-                'description': video_description,
-                'thumbnail': video_thumbnail,
-                'uploader': video_uploader,
-            }
-            video_id = mobj.group('video_id')
-            if video_id:
-                info.update({
-                    'ie_key': 'MangomoloVideo',
-                    'id': video_id,
-                })
-            else:
-                info.update({
-                    'ie_key': 'MangomoloLive',
-                    'id': mobj.group('channel_id'),
-                })
-            return info
+        if 'Mangomolo' in triggered:
+            mobj = re.search(
+                r'''(?x)<iframe[^>]+src=(["\'])(?P<url>(?:https?:)?//
+                    (?:
+                        admin\.mangomolo\.com/analytics/index\.php/customers/embed|
+                        player\.mangomolo\.com/v1
+                    )/
+                    (?:
+                        video\?.*?\bid=(?P<video_id>\d+)|
+                        (?:index|live)\?.*?\bchannelid=(?P<channel_id>(?:[A-Za-z0-9+/=]|%2B|%2F|%3D)+)
+                    ).+?)\1''', webpage)
+            if mobj is not None:
+                info = {
+                    '_type': 'url_transparent',
+                    'url': self._proto_relative_url(unescapeHTML(mobj.group('url'))),
+                    'title': video_title,
+                    'description': video_description,
+                    'thumbnail': video_thumbnail,
+                    'uploader': video_uploader,
+                }
+                video_id = mobj.group('video_id')
+                if video_id:
+                    info.update({
+                        'ie_key': 'MangomoloVideo',
+                        'id': video_id,
+                    })
+                else:
+                    info.update({
+                        'ie_key': 'MangomoloLive',
+                        'id': mobj.group('channel_id'),
+                    })
+                return info
 
         # Look for Instagram embeds
-        instagram_embed_url = InstagramIE._extract_embed_url(webpage)
-        if instagram_embed_url is not None:
-            return self.url_result(
-                self._proto_relative_url(instagram_embed_url), InstagramIE.ie_key())
+        if 'Instagram' in triggered:
+            instagram_embed_url = InstagramIE._extract_embed_url(webpage)
+            if instagram_embed_url is not None:
+                return self.url_result(
+                    self._proto_relative_url(instagram_embed_url), InstagramIE.ie_key())
 
         # Look for 3Q SDN embeds
-        threeqsdn_url = ThreeQSDNIE._extract_url(webpage)
-        if threeqsdn_url:
-            return {
-                '_type': 'url_transparent',
-                'ie_key': ThreeQSDNIE.ie_key(),
-                'url': self._proto_relative_url(threeqsdn_url),
-                'title': video_title,
-                'description': video_description,
-                'thumbnail': video_thumbnail,
-                'uploader': video_uploader,
-            }
+        if 'ThreeQSDN' in triggered:
+            threeqsdn_url = ThreeQSDNIE._extract_url(webpage)
+            if threeqsdn_url:
+                return {
+                    '_type': 'url_transparent',
+                    'ie_key': ThreeQSDNIE.ie_key(),
+                    'url': self._proto_relative_url(threeqsdn_url),
+                    'title': video_title,
+                    'description': video_description,
+                    'thumbnail': video_thumbnail,
+                    'uploader': video_uploader,
+                }
 
         # Look for VBOX7 embeds
-        vbox7_url = Vbox7IE._extract_url(webpage)
-        if vbox7_url:
-            return self.url_result(vbox7_url, Vbox7IE.ie_key())
+        if 'Vbox7' in triggered:
+            vbox7_url = Vbox7IE._extract_url(webpage)
+            if vbox7_url:
+                return self.url_result(vbox7_url, Vbox7IE.ie_key())
 
         # Look for DBTV embeds
-        dbtv_urls = DBTVIE._extract_urls(webpage)
-        if dbtv_urls:
-            return self.playlist_from_matches(dbtv_urls, video_id, video_title, ie=DBTVIE.ie_key())
+        if 'DBTV' in triggered:
+            dbtv_urls = DBTVIE._extract_urls(webpage)
+            if dbtv_urls:
+                return self.playlist_from_matches(dbtv_urls, video_id, video_title, ie=DBTVIE.ie_key())
 
         # Look for Videa embeds
-        videa_urls = VideaIE._extract_urls(webpage)
-        if videa_urls:
-            return self.playlist_from_matches(videa_urls, video_id, video_title, ie=VideaIE.ie_key())
+        if 'Videa' in triggered:
+            videa_urls = VideaIE._extract_urls(webpage)
+            if videa_urls:
+                return self.playlist_from_matches(videa_urls, video_id, video_title, ie=VideaIE.ie_key())
 
         # Look for 20 minuten embeds
-        twentymin_urls = TwentyMinutenIE._extract_urls(webpage)
-        if twentymin_urls:
-            return self.playlist_from_matches(
-                twentymin_urls, video_id, video_title, ie=TwentyMinutenIE.ie_key())
+        if 'TwentyMinuten' in triggered:
+            twentymin_urls = TwentyMinutenIE._extract_urls(webpage)
+            if twentymin_urls:
+                return self.playlist_from_matches(
+                    twentymin_urls, video_id, video_title, ie=TwentyMinutenIE.ie_key())
 
         # Look for VideoPress embeds
-        videopress_urls = VideoPressIE._extract_urls(webpage)
-        if videopress_urls:
-            return self.playlist_from_matches(
-                videopress_urls, video_id, video_title, ie=VideoPressIE.ie_key())
+        if 'VideoPress' in triggered:
+            videopress_urls = VideoPressIE._extract_urls(webpage)
+            if videopress_urls:
+                return self.playlist_from_matches(
+                    videopress_urls, video_id, video_title, ie=VideoPressIE.ie_key())
 
         # Look for Rutube embeds
-        rutube_urls = RutubeIE._extract_urls(webpage)
-        if rutube_urls:
-            return self.playlist_from_matches(
-                rutube_urls, video_id, video_title, ie=RutubeIE.ie_key())
+        if 'Rutube' in triggered:
+            rutube_urls = RutubeIE._extract_urls(webpage)
+            if rutube_urls:
+                return self.playlist_from_matches(
+                    rutube_urls, video_id, video_title, ie=RutubeIE.ie_key())
 
         # Look for WashingtonPost embeds
-        wapo_urls = WashingtonPostIE._extract_urls(webpage)
-        if wapo_urls:
-            return self.playlist_from_matches(
-                wapo_urls, video_id, video_title, ie=WashingtonPostIE.ie_key())
+        if 'WashingtonPost' in triggered:
+            wapo_urls = WashingtonPostIE._extract_urls(webpage)
+            if wapo_urls:
+                return self.playlist_from_matches(
+                    wapo_urls, video_id, video_title, ie=WashingtonPostIE.ie_key())
 
         # Look for Mediaset embeds
-        mediaset_urls = MediasetIE._extract_urls(self, webpage)
-        if mediaset_urls:
-            return self.playlist_from_matches(
-                mediaset_urls, video_id, video_title, ie=MediasetIE.ie_key())
+        if 'Mediaset' in triggered:
+            mediaset_urls = MediasetIE._extract_urls(self, webpage)
+            if mediaset_urls:
+                return self.playlist_from_matches(
+                    mediaset_urls, video_id, video_title, ie=MediasetIE.ie_key())
 
         # Look for JOJ.sk embeds
-        joj_urls = JojIE._extract_urls(webpage)
-        if joj_urls:
-            return self.playlist_from_matches(
-                joj_urls, video_id, video_title, ie=JojIE.ie_key())
+        if 'Joj' in triggered:
+            joj_urls = JojIE._extract_urls(webpage)
+            if joj_urls:
+                return self.playlist_from_matches(
+                    joj_urls, video_id, video_title, ie=JojIE.ie_key())
 
         # Look for megaphone.fm embeds
-        mpfn_urls = MegaphoneIE._extract_urls(webpage)
-        if mpfn_urls:
-            return self.playlist_from_matches(
-                mpfn_urls, video_id, video_title, ie=MegaphoneIE.ie_key())
+        if 'Megaphone' in triggered:
+            mpfn_urls = MegaphoneIE._extract_urls(webpage)
+            if mpfn_urls:
+                return self.playlist_from_matches(
+                    mpfn_urls, video_id, video_title, ie=MegaphoneIE.ie_key())
 
         # Look for vzaar embeds
-        vzaar_urls = VzaarIE._extract_urls(webpage)
-        if vzaar_urls:
-            return self.playlist_from_matches(
-                vzaar_urls, video_id, video_title, ie=VzaarIE.ie_key())
+        if 'Vzaar' in triggered:
+            vzaar_urls = VzaarIE._extract_urls(webpage)
+            if vzaar_urls:
+                return self.playlist_from_matches(
+                    vzaar_urls, video_id, video_title, ie=VzaarIE.ie_key())
 
-        channel9_urls = Channel9IE._extract_urls(webpage)
-        if channel9_urls:
-            return self.playlist_from_matches(
-                channel9_urls, video_id, video_title, ie=Channel9IE.ie_key())
+        if 'Channel9' in triggered:
+            channel9_urls = Channel9IE._extract_urls(webpage)
+            if channel9_urls:
+                return self.playlist_from_matches(
+                    channel9_urls, video_id, video_title, ie=Channel9IE.ie_key())
 
-        vshare_urls = VShareIE._extract_urls(webpage)
-        if vshare_urls:
-            return self.playlist_from_matches(
-                vshare_urls, video_id, video_title, ie=VShareIE.ie_key())
+        if 'VShare' in triggered:
+            vshare_urls = VShareIE._extract_urls(webpage)
+            if vshare_urls:
+                return self.playlist_from_matches(
+                    vshare_urls, video_id, video_title, ie=VShareIE.ie_key())
 
         # Look for Mediasite embeds
-        mediasite_urls = MediasiteIE._extract_urls(webpage)
-        if mediasite_urls:
-            entries = [
-                self.url_result(smuggle_url(
-                    compat_urlparse.urljoin(url, mediasite_url),
-                    {'UrlReferrer': url}), ie=MediasiteIE.ie_key())
-                for mediasite_url in mediasite_urls]
-            return self.playlist_result(entries, video_id, video_title)
+        if 'Mediasite' in triggered:
+            mediasite_urls = MediasiteIE._extract_urls(webpage)
+            if mediasite_urls:
+                entries = [
+                    self.url_result(smuggle_url(
+                        compat_urlparse.urljoin(url, mediasite_url),
+                        {'UrlReferrer': url}), ie=MediasiteIE.ie_key())
+                    for mediasite_url in mediasite_urls]
+                return self.playlist_result(entries, video_id, video_title)
+
+        if 'SpringboardPlatform' in triggered:
+            springboardplatform_urls = SpringboardPlatformIE._extract_urls(webpage)
+            if springboardplatform_urls:
+                return self.playlist_from_matches(
+                    springboardplatform_urls, video_id, video_title,
+                    ie=SpringboardPlatformIE.ie_key())
+
+        if 'YapFiles' in triggered:
+            yapfiles_urls = YapFilesIE._extract_urls(webpage)
+            if yapfiles_urls:
+                return self.playlist_from_matches(
+                    yapfiles_urls, video_id, video_title, ie=YapFilesIE.ie_key())
+
+        if 'Vice' in triggered:
+            vice_urls = ViceIE._extract_urls(webpage)
+            if vice_urls:
+                return self.playlist_from_matches(
+                    vice_urls, video_id, video_title, ie=ViceIE.ie_key())
+
+        if 'XFileShare' in triggered:
+            xfileshare_urls = XFileShareIE._extract_urls(webpage)
+            if xfileshare_urls:
+                return self.playlist_from_matches(
+                    xfileshare_urls, video_id, video_title, ie=XFileShareIE.ie_key())
+
+        if 'CloudflareStream' in triggered:
+            cloudflarestream_urls = CloudflareStreamIE._extract_urls(webpage)
+            if cloudflarestream_urls:
+                return self.playlist_from_matches(
+                    cloudflarestream_urls, video_id, video_title, ie=CloudflareStreamIE.ie_key())
+
+        if 'PeerTube' in triggered:
+            peertube_urls = PeerTubeIE._extract_urls(webpage, url)
+            if peertube_urls:
+                return self.playlist_from_matches(
+                    peertube_urls, video_id, video_title, ie=PeerTubeIE.ie_key())
 
-        springboardplatform_urls = SpringboardPlatformIE._extract_urls(webpage)
-        if springboardplatform_urls:
-            return self.playlist_from_matches(
-                springboardplatform_urls, video_id, video_title,
-                ie=SpringboardPlatformIE.ie_key())
-
-        yapfiles_urls = YapFilesIE._extract_urls(webpage)
-        if yapfiles_urls:
-            return self.playlist_from_matches(
-                yapfiles_urls, video_id, video_title, ie=YapFilesIE.ie_key())
-
-        vice_urls = ViceIE._extract_urls(webpage)
-        if vice_urls:
-            return self.playlist_from_matches(
-                vice_urls, video_id, video_title, ie=ViceIE.ie_key())
-
-        xfileshare_urls = XFileShareIE._extract_urls(webpage)
-        if xfileshare_urls:
-            return self.playlist_from_matches(
-                xfileshare_urls, video_id, video_title, ie=XFileShareIE.ie_key())
-
-        cloudflarestream_urls = CloudflareStreamIE._extract_urls(webpage)
-        if cloudflarestream_urls:
-            return self.playlist_from_matches(
-                cloudflarestream_urls, video_id, video_title, ie=CloudflareStreamIE.ie_key())
-
-        peertube_urls = PeerTubeIE._extract_urls(webpage, url)
-        if peertube_urls:
-            return self.playlist_from_matches(
-                peertube_urls, video_id, video_title, ie=PeerTubeIE.ie_key())
-
-        indavideo_urls = IndavideoEmbedIE._extract_urls(webpage)
-        if indavideo_urls:
-            return self.playlist_from_matches(
-                indavideo_urls, video_id, video_title, ie=IndavideoEmbedIE.ie_key())
-
-        apa_urls = APAIE._extract_urls(webpage)
-        if apa_urls:
-            return self.playlist_from_matches(
-                apa_urls, video_id, video_title, ie=APAIE.ie_key())
-
-        foxnews_urls = FoxNewsIE._extract_urls(webpage)
-        if foxnews_urls:
-            return self.playlist_from_matches(
-                foxnews_urls, video_id, video_title, ie=FoxNewsIE.ie_key())
-
-        sharevideos_urls = [sharevideos_mobj.group('url') for sharevideos_mobj in re.finditer(
-            r'<iframe[^>]+?\bsrc\s*=\s*(["\'])(?P<url>(?:https?:)?//embed\.share-videos\.se/auto/embed/\d+\?.*?\buid=\d+.*?)\1',
-            webpage)]
-        if sharevideos_urls:
-            return self.playlist_from_matches(
-                sharevideos_urls, video_id, video_title)
-
-        viqeo_urls = ViqeoIE._extract_urls(webpage)
-        if viqeo_urls:
-            return self.playlist_from_matches(
-                viqeo_urls, video_id, video_title, ie=ViqeoIE.ie_key())
-
-        expressen_urls = ExpressenIE._extract_urls(webpage)
-        if expressen_urls:
-            return self.playlist_from_matches(
-                expressen_urls, video_id, video_title, ie=ExpressenIE.ie_key())
-
-        zype_urls = ZypeIE._extract_urls(webpage)
-        if zype_urls:
-            return self.playlist_from_matches(
-                zype_urls, video_id, video_title, ie=ZypeIE.ie_key())
+        if 'IndavideoEmbed' in triggered:
+            indavideo_urls = IndavideoEmbedIE._extract_urls(webpage)
+            if indavideo_urls:
+                return self.playlist_from_matches(
+                    indavideo_urls, video_id, video_title, ie=IndavideoEmbedIE.ie_key())
+
+        if 'APA' in triggered:
+            apa_urls = APAIE._extract_urls(webpage)
+            if apa_urls:
+                return self.playlist_from_matches(
+                    apa_urls, video_id, video_title, ie=APAIE.ie_key())
+
+        if 'FoxNews' in triggered:
+            foxnews_urls = FoxNewsIE._extract_urls(webpage)
+            if foxnews_urls:
+                return self.playlist_from_matches(
+                    foxnews_urls, video_id, video_title, ie=FoxNewsIE.ie_key())
+
+        if 'ShareVideos' in triggered:
+            sharevideos_urls = [sharevideos_mobj.group('url') for sharevideos_mobj in re.finditer(
+                r'<iframe[^>]+?\bsrc\s*=\s*(["\'])(?P<url>(?:https?:)?//embed\.share-videos\.se/auto/embed/\d+\?.*?\buid=\d+.*?)\1',
+                webpage)]
+            if sharevideos_urls:
+                return self.playlist_from_matches(
+                    sharevideos_urls, video_id, video_title)
+
+        if 'Viqeo' in triggered:
+            viqeo_urls = ViqeoIE._extract_urls(webpage)
+            if viqeo_urls:
+                return self.playlist_from_matches(
+                    viqeo_urls, video_id, video_title, ie=ViqeoIE.ie_key())
+
+        if 'Expressen' in triggered:
+            expressen_urls = ExpressenIE._extract_urls(webpage)
+            if expressen_urls:
+                return self.playlist_from_matches(
+                    expressen_urls, video_id, video_title, ie=ExpressenIE.ie_key())
+
+        if 'Zype' in triggered:
+            zype_urls = ZypeIE._extract_urls(webpage)
+            if zype_urls:
+                return self.playlist_from_matches(
+                    zype_urls, video_id, video_title, ie=ZypeIE.ie_key())
 
         # Look for HTML5 media
         entries = self._parse_html5_media_entries(url, webpage, video_id, m3u8_id='hls')
@@ -28,6 +28,7 @@ from ..utils import (
     dict_get,
     error_to_compat_str,
     float_or_none,
+    FragmentList,
     extract_attributes,
     get_element_by_attribute,
     int_or_none,
@@ -568,6 +569,11 @@ class YoutubeIE(YoutubeBaseInfoExtractor):
 
     _GEO_BYPASS = False
 
+    # Players are immutable, but stale ones should not linger in the cache
+    _PLAYER_CACHE_TTL = 7 * 24 * 60 * 60
+    # Media URLs with an n challenge expire after 6 hours
+    _NSIG_VALUE_CACHE_TTL = 6 * 60 * 60
+
     IE_NAME = 'youtube'
     _TESTS = [
         {
@@ -1485,10 +1491,15 @@ class YoutubeIE(YoutubeBaseInfoExtractor):
             player_id = self._extract_player_info(player_url)
 
         if player_id not in self._code_cache:
-            self._code_cache[player_id] = self._download_webpage(
-                player_url, video_id,
-                note='Downloading player ' + player_id,
-                errnote='Download of %s failed' % player_url)
+            # Shared with the other processes using the cache, only one of
+            # which downloads a new player
+            self._code_cache[player_id] = self._downloader.cache.load_or_store(
+                'youtube-player', player_id,
+                lambda: self._download_webpage(
+                    player_url, video_id,
+                    note='Downloading player ' + player_id,
+                    errnote='Download of %s failed' % player_url),
+                ttl=self._PLAYER_CACHE_TTL)
         return self._code_cache[player_id]
 
     def _extract_signature_function(self, video_id, player_url, example_sig):
@@ -1499,19 +1510,15 @@ class YoutubeIE(YoutubeBaseInfoExtractor):
             player_id, self._signature_cache_id(example_sig))
         assert os.path.basename(func_id) == func_id
 
-        cache_spec = self._downloader.cache.load('youtube-sigfuncs', func_id)
-        if cache_spec is not None:
-            return lambda s: ''.join(s[i] for i in cache_spec)
-
-        code = self._get_player_code(video_id, player_url, player_id)
-        res = self._parse_sig_js(code)
-
-        test_string = ''.join(map(compat_chr, range(len(example_sig))))
-        cache_res = res(test_string)
-        cache_spec = [ord(c) for c in cache_res]
+        def extract_cache_spec():
+            code = self._get_player_code(video_id, player_url, player_id)
+            res = self._parse_sig_js(code)
+            test_string = ''.join(map(compat_chr, range(len(example_sig))))
+            return [ord(c) for c in res(test_string)]
 
-        self._downloader.cache.store('youtube-sigfuncs', func_id, cache_spec)
-        return res
+        cache_spec = self._downloader.cache.load_or_store(
+            'youtube-sigfuncs', func_id, extract_cache_spec)
+        return lambda s: ''.join(s[i] for i in cache_spec)
 
     def _print_sig_code(self, func, example_sig):
         def gen_sig_code(idxs):
@@ -1642,16 +1649,16 @@ class YoutubeIE(YoutubeBaseInfoExtractor):
 
     def _extract_n_function(self, video_id, player_url):
         player_id = self._extract_player_info(player_url)
-        func_code = self._downloader.cache.load('youtube-nsig', player_id)
 
-        if func_code:
-            jsi = JSInterpreter(func_code)
-        else:
+        def extract_func_code():
             jscode = self._get_player_code(video_id, player_url, player_id)
             funcname = self._extract_n_function_name(jscode)
-            jsi = JSInterpreter(jscode)
-            func_code = jsi.extract_function_code(funcname)
-            self._downloader.cache.store('youtube-nsig', player_id, func_code)
+            return JSInterpreter(jscode).extract_function_code(funcname)
+
+        func_code = self._downloader.cache.load_or_store(
+            'youtube-nsig', player_id, extract_func_code)
+        # The function may refer to objects of the player, if it was loaded
+        jsi = JSInterpreter(self._code_cache.get(player_id) or func_code)
 
         if self._downloader.params.get('youtube_print_sig_code'):
             self.to_screen('Extracted nsig function from {0}:\n{1}\n'.format(player_id, func_code[1]))
@@ -1673,6 +1680,16 @@ class YoutubeIE(YoutubeBaseInfoExtractor):
         if sig_id in self._player_cache:
             return self._player_cache[sig_id]
 
+        # Other processes may have seen the same challenge recently
+        value_key = None
+        player_id = self._extract_player_info(player_url) if player_url else None
+        if player_id and re.match(r'^[a-zA-Z0-9_-]+$', n_param):
+            value_key = '%s_%s' % (player_id, n_param)
+            ret = self._downloader.cache.load('youtube-nsig-values', value_key)
+            if ret is not None:
+                self._player_cache[sig_id] = ret
+                return ret
+
         try:
             player_id = ('nsig', player_url)
             if player_id not in self._player_cache:
@@ -1682,6 +1699,9 @@ class YoutubeIE(YoutubeBaseInfoExtractor):
             if ret.startswith('enhanced_except_'):
                 raise ExtractorError('Unhandled exception in decode')
             self._player_cache[sig_id] = ret
+            if value_key:
+                self._downloader.cache.store(
+                    'youtube-nsig-values', value_key, ret, ttl=self._NSIG_VALUE_CACHE_TTL)
             if self._downloader.params.get('verbose', False):
                 self._downloader.to_screen('[debug] [%s] %s' % (self.IE_NAME, 'Decrypted nsig {0} => {1}'.format(n_param, self._player_cache[sig_id])))
             return self._player_cache[sig_id]
@@ -1704,6 +1724,9 @@ class YoutubeIE(YoutubeBaseInfoExtractor):
             if n_response is None:
                 # give up if descrambling failed
                 break
+            if isinstance(fmt.get('fragments'), FragmentList):
+                # Expand the fragments so that their URLs can be updated
+                fmt['fragments'] = list(fmt['fragments'])
             for fmt_dct in traverse_obj(fmt, (None, (None, ('fragments', Ellipsis))), expected_type=dict):
                 fmt_dct['url'] = update_url(
                     fmt_dct['url'], query_update={'n': [n_response]})
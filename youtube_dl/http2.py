@@ -0,0 +1,445 @@
+from __future__ import unicode_literals
+
+import collections
+import io
+import socket
+import ssl
+import sys
+import time
+
+try:
+    import threading
+except ImportError:
+    threading = None
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+    import h2.exceptions
+    import h2.settings
+except ImportError:
+    h2 = None
+
+from .compat import (
+    compat_http_client,
+    compat_urllib_error,
+    compat_urllib_parse,
+    compat_urllib_parse_urlparse,
+    compat_urllib_request,
+    compat_urllib_response,
+)
+from .connect import get_connector
+
+# Requests with this header may go over HTTP/2. Only the requests that gain
+# from sharing a connection, as those of the fragments, set it; the header
+# itself is never sent.
+HTTP2_HEADER = 'Ytdl-http2'
+
+# Connection-specific headers, which HTTP/2 forbids (RFC 9113, section 8.2.2)
+_CONNECTION_HEADERS = frozenset((
+    'connection', 'host', 'keep-alive', 'proxy-connection', 'te',
+    'transfer-encoding', 'upgrade'))
+
+# Receive windows, large enough not to throttle concurrent streams
+_STREAM_WINDOW = 2 ** 20
+_CONNECTION_WINDOW = 2 ** 24
+
+_CANCEL = 0x8
+
+
+def http2_available():
+    return h2 is not None and threading is not None
+
+
+def _response_headers(header_items):
+    """ The headers of a response, as those of an HTTP/1.1 response are held """
+    if sys.version_info[0] >= 3:
+        msg = compat_http_client.HTTPMessage()
+        for name, value in header_items:
+            msg[name] = value
+        return msg
+    # Python 2 parses them, for rfc822.Message methods such as getheaders()
+    return compat_http_client.HTTPMessage(io.BytesIO(''.join(
+        '%s: %s\r\n' % item for item in header_items).encode('latin-1') + b'\r\n'))
+
+
+class _ConnectionClosed(socket.error):
+    pass
+
+
+def _deadline(timeout):
+    return None if timeout is None else time.time() + timeout
+
+
+def _wait(cond, deadline):
+    """ Wait on cond until deadline, raise socket.timeout past it """
+    if deadline is None:
+        cond.wait()
+        return
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        raise socket.timeout('timed out')
+    cond.wait(remaining)
+
+
+class _Stream(object):
+    """ The body of the response to a request over an HTTP2Connection """
+
+    def __init__(self, connection, stream_id, timeout):
+        self._connection = connection
+        self.stream_id = stream_id
+        self.timeout = timeout
+        self.headers = None
+        # (data, flow controlled length) received, not read yet
+        self.chunks = collections.deque()
+        self.ended = False
+        self.error = None
+        self._buffer = b''
+
+    def _fill(self, size=None, stop=None):
+        data = [self._buffer]
+        length = len(self._buffer)
+        while size is None or length < size:
+            if stop is not None and stop in data[-1]:
+                break
+            chunk = self._connection.receive(self)
+            if not chunk:
+                break
+            data.append(chunk)
+            length += len(chunk)
+        self._buffer = b''.join(data)
+
+    def read(self, amt=None):
+        self._fill(amt)
+        if amt is None:
+            data, self._buffer = self._buffer, b''
+        else:
+            data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        return data
+
+    def readline(self):
+        self._fill(stop=b'\n')
+        end = self._buffer.find(b'\n') + 1 or len(self._buffer)
+        line, self._buffer = self._buffer[:end], self._buffer[end:]
+        return line
+
+    def close(self):
+        self._connection.cancel(self)
+
+
+class HTTP2Connection(object):
+    """
+    An HTTP/2 connection to an origin, multiplexing concurrent requests
+
+    A thread reads the frames from the socket and dispatches them to the
+    streams, whose data is acknowledged to the server as it is read, so
+    that a stream not read does not hold back the others.
+    """
+
+    def __init__(self, sock):
+        self._sock = sock
+        self._conn = h2.connection.H2Connection(config=h2.config.H2Configuration(
+            client_side=True, header_encoding=None))
+        self._cond = threading.Condition()
+        # stream id: _Stream, until the server ends or resets it
+        self._streams = {}
+        self.closed = False
+        self.ready = False
+        self._conn.initiate_connection()
+        self._conn.update_settings({
+            h2.settings.SettingCodes.INITIAL_WINDOW_SIZE: _STREAM_WINDOW,
+            h2.settings.SettingCodes.ENABLE_PUSH: 0,
+        })
+        self._conn.increment_flow_control_window(_CONNECTION_WINDOW - 65535)
+        self._send()
+        reader = threading.Thread(target=self._read_frames)
+        reader.daemon = True
+        reader.start()
+
+    def _send(self):
+        data = self._conn.data_to_send()
+        if data:
+            self._sock.sendall(data)
+
+    def wait_ready(self, timeout):
+        """ Wait for the settings of the server, return whether it speaks HTTP/2 """
+        deadline = _deadline(timeout)
+        with self._cond:
+            while not self.ready and not self.closed:
+                _wait(self._cond, deadline)
+            return self.ready and not self.closed
+
+    def _read_frames(self):
+        err = None
+        try:
+            while True:
+                data = self._sock.recv(65536)
+                if not data:
+                    break
+                with self._cond:
+                    for event in self._conn.receive_data(data):
+                        self._handle(event)
+                    self._send()
+                    self._cond.notify_all()
+        except socket.error as e:
+            err = e
+        except h2.exceptions.ProtocolError as e:
+            err = socket.error('HTTP/2 protocol error: %s' % e)
+        self.close(err)
+
+    def _handle(self, event):
+        if isinstance(event, h2.events.RemoteSettingsChanged):
+            self.ready = True
+            return
+        if isinstance(event, h2.events.ConnectionTerminated):
+            # No more streams: those the server did not process fail
+            self.closed = True
+            for stream_id, stream in list(self._streams.items()):
+                if stream_id > (event.last_stream_id or 0):
+                    stream.error = _ConnectionClosed('HTTP/2 connection closed by the server')
+                    del self._streams[stream_id]
+            return
+        stream_id = getattr(event, 'stream_id', None)
+        stream = self._streams.get(stream_id)
+        if isinstance(event, h2.events.DataReceived):
+            if stream is None:
+                # Data of a cancelled stream still counts for the connection
+                self._conn.acknowledge_received_data(event.flow_controlled_length, stream_id)
+            else:
+                stream.chunks.append((event.data, event.flow_controlled_length))
+        if stream is None:
+            return
+        if isinstance(event, h2.events.ResponseReceived):
+            stream.headers = event.headers
+        elif isinstance(event, h2.events.StreamEnded):
+            stream.ended = True
+            del self._streams[stream_id]
+        elif isinstance(event, h2.events.StreamReset):
+            stream.error = socket.error(
+                'HTTP/2 stream reset by the server (error code %d)' % event.error_code)
+            del self._streams[stream_id]
+
+    def close(self, err=None):
+        with self._cond:
+            if self._streams:
+                err = err or _ConnectionClosed('HTTP/2 connection closed')
+                for stream in self._streams.values():
+                    stream.error = err
+                self._streams.clear()
+            self.closed = True
+            self._cond.notify_all()
+        try:
+            # Wakes up the reader thread, which close() alone may not do
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except socket.error:
+            pass
+        try:
+            self._sock.close()
+        except socket.error:
+            pass
+
+    def request(self, headers, timeout):
+        """ Send a request without a body, return its _Stream once the response headers arrive """
+        deadline = _deadline(timeout)
+        with self._cond:
+            while not self.closed and (
+                    self._conn.open_outbound_streams >= self._conn.remote_settings.max_concurrent_streams):
+                _wait(self._cond, deadline)
+            if self.closed:
+                raise _ConnectionClosed('HTTP/2 connection closed')
+            try:
+                stream_id = self._conn.get_next_available_stream_id()
+            except h2.exceptions.NoAvailableStreamIDError:
+                self.closed = True
+                raise _ConnectionClosed('HTTP/2 stream identifiers exhausted')
+            stream = self._streams[stream_id] = _Stream(self, stream_id, timeout)
+            self._conn.send_headers(stream_id, headers, end_stream=True)
+            self._send()
+            while stream.headers is None:
+                if stream.error is not None:
+                    raise stream.error
+                if stream.ended:
+                    raise socket.error('HTTP/2 stream ended without a response')
+                _wait(self._cond, deadline)
+        return stream
+
+    def receive(self, stream):
+        """ Return the next data of stream, b'' at its end """
+        deadline = _deadline(stream.timeout)
+        with self._cond:
+            while not stream.chunks:
+                if stream.ended:
+                    return b''
+                if stream.error is not None:
+                    raise stream.error
+                _wait(self._cond, deadline)
+            data, length = stream.chunks.popleft()
+            if length and not self.closed:
+                self._conn.acknowledge_received_data(length, stream.stream_id)
+                self._send()
+        return data
+
+    def cancel(self, stream):
+        """ Stop receiving stream, releasing its unread data """
+        with self._cond:
+            if self.closed:
+                return
+            if self._streams.pop(stream.stream_id, None) is not None:
+                self._conn.reset_stream(stream.stream_id, _CANCEL)
+            length = sum(length for _, length in stream.chunks)
+            stream.chunks.clear()
+            if length:
+                self._conn.acknowledge_received_data(length, stream.stream_id)
+            self._send()
+
+
+class YoutubeDLHTTP2Handler(compat_urllib_request.BaseHandler):
+    """
+    Handler sending requests over HTTP/2 with a single connection per origin
+
+    Only the requests with the Ytdl-http2 header, and without a body or a
+    proxy, go over HTTP/2, and only when the h2 package is available. HTTPS
+    origins are asked for HTTP/2 with ALPN, HTTP ones with prior knowledge
+    (RFC 9113, section 3.3). The other requests, and those to origins that
+    do not speak HTTP/2, are left to the HTTP/1.1 handlers. The responses
+    go through the same processors as theirs (cookies, decompression,
+    redirects and errors).
+    """
+
+    # After the proxy handler, before the HTTP/1.1 handlers
+    handler_order = 400
+
+    def __init__(self, params):
+        self._params = params
+        # (scheme, host, port): HTTP2Connection
+        self._connections = {}
+        self._no_http2 = set()
+        # (scheme, host, port): lock held while connecting to the origin
+        self._connecting = {}
+        self._lock = threading.Lock() if threading else None
+
+    def http_open(self, req):
+        return self._open(req, 'http')
+
+    def https_open(self, req):
+        return self._open(req, 'https')
+
+    def _ssl_context(self):
+        if not getattr(ssl, 'HAS_ALPN', False):
+            return None
+        context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH)
+        context.set_alpn_protocols(['h2', 'http/1.1'])
+        if self._params.get('nocheckcertificate', False):
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        return context
+
+    def _connect(self, origin, timeout):
+        """ Open an HTTP/2 connection to origin, or return None if it does not speak HTTP/2 """
+        scheme, host, port = origin
+        context = None
+        if scheme == 'https':
+            context = self._ssl_context()
+            if context is None:
+                return None
+        source_address = self._params.get('source_address')
+        sock = get_connector(self._params).create_connection(
+            (host, port), timeout, (source_address, 0) if source_address else None)
+        try:
+            if context is not None:
+                sock = context.wrap_socket(sock, server_hostname=host)
+                if sock.selected_alpn_protocol() != 'h2':
+                    sock.close()
+                    return None
+            # The reader thread waits for frames as long as the connection lasts
+            sock.settimeout(None)
+            connection = HTTP2Connection(sock)
+        except socket.error:
+            sock.close()
+            raise
+        try:
+            ready = connection.wait_ready(timeout)
+        except socket.timeout:
+            # Never got the settings of the server
+            ready = False
+        if not ready:
+            connection.close()
+            return None
+        return connection
+
+    def _connection(self, origin, timeout):
+        with self._lock:
+            connecting = self._connecting.setdefault(origin, threading.Lock())
+        # The requests to an origin wait for its connection, those to the
+        # others go on meanwhile
+        with connecting:
+            with self._lock:
+                if origin in self._no_http2:
+                    return None
+                connection = self._connections.get(origin)
+            if connection is None or connection.closed:
+                connection = self._connect(origin, timeout)
+                with self._lock:
+                    if connection is None:
+                        self._no_http2.add(origin)
+                        self._connections.pop(origin, None)
+                        return None
+                    self._connections[origin] = connection
+            return connection
+
+    @staticmethod
+    def _headers(req, scheme, url):
+        path = compat_urllib_parse.urlunparse(('', '', url.path or '/', url.params, url.query, ''))
+        headers = [
+            (':method', req.get_method()),
+            (':scheme', scheme),
+            (':authority', req.get_header('Host') or url.netloc),
+            (':path', path),
+        ]
+        for name, value in req.header_items():
+            name = name.lower()
+            if name not in _CONNECTION_HEADERS:
+                headers.append((name, value))
+        return headers
+
+    def _open(self, req, scheme):
+        if req.headers.pop(HTTP2_HEADER, None) is None or not http2_available():
+            return None
+        if (req.data is not None or req.has_proxy() or getattr(req, '_tunnel_host', None)
+                or req.has_header('Ytdl-socks-proxy')):
+            return None
+        url = compat_urllib_parse_urlparse(req.get_full_url())
+        origin = (scheme, url.hostname, url.port or (443 if scheme == 'https' else 80))
+        timeout = req.timeout
+        if timeout is socket._GLOBAL_DEFAULT_TIMEOUT:
+            timeout = socket.getdefaulttimeout()
+        headers = self._headers(req, scheme, url)
+        try:
+            for attempt in range(2):
+                connection = self._connection(origin, timeout)
+                if connection is None:
+                    return None
+                try:
+                    stream = connection.request(headers, timeout)
+                    break
+                except _ConnectionClosed:
+                    # Closed before the request was processed: once more
+                    # on a new connection
+                    if attempt:
+                        raise
+        except (socket.error, h2.exceptions.ProtocolError) as err:
+            raise compat_urllib_error.URLError(err)
+
+        status = 0
+        header_items = []
+        for name, value in stream.headers:
+            name, value = name.decode('latin-1'), value.decode('latin-1')
+            if name == ':status':
+                status = int(value)
+            elif not name.startswith(':'):
+                header_items.append((name, value))
+        resp = compat_urllib_response.addinfourl(
+            stream, _response_headers(header_items), req.get_full_url(), status)
+        resp.msg = compat_http_client.responses.get(status, '')
+        return resp
@@ -0,0 +1,220 @@
+from __future__ import unicode_literals
+
+import hashlib
+import io
+import json
+import zipfile
+from email.message import Message
+
+try:
+    import threading
+except ImportError:
+    threading = None
+
+from .compat import (
+    compat_str,
+    compat_urllib_error,
+    compat_urllib_HTTPError,
+    compat_urllib_parse_urlparse,
+    compat_urllib_response,
+)
+from .utils import (
+    error_to_compat_str,
+    int_or_none,
+)
+
+
+def _digest(data):
+    return hashlib.sha1(data).hexdigest()
+
+
+def _make_headers(header_items):
+    headers = Message()
+    for k, v in header_items:
+        headers[k] = v
+    return headers
+
+
+def _url_without_query(url):
+    return compat_urllib_parse_urlparse(url)._replace(query='', fragment='').geturl()
+
+
+class NetworkRecorder(object):
+    """
+    Record the HTTP exchanges of YoutubeDL.urlopen to a network archive
+
+    The archive is a ZIP file with one JSON member per exchange, in request
+    order, and the response bodies stored once by their SHA-1 digest. It is
+    written as the exchanges happen so that an interrupted run still leaves
+    a usable archive. Bodies are read in full to be recorded, but for those
+    of media (by their Content-Type) and those over _MAX_BODY_SIZE bytes,
+    which are left unread for the caller and not recorded: recording is
+    meant for extraction (e.g. with --skip-download).
+
+    Exchanges may be recorded from several threads at once.
+    """
+
+    _MAX_BODY_SIZE = 8 * 1024 * 1024
+    _MEDIA_TYPES = ('video/', 'audio/', 'image/', 'application/octet-stream', 'application/mp4')
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.requests = 0
+        # Truncate any previous recording
+        zipfile.ZipFile(filename, 'w').close()
+        self._bodies = set()
+        self._lock = threading.Lock() if threading else None
+
+    def _write(self, exchange, body):
+        if self._lock is not None:
+            self._lock.acquire()
+        try:
+            with zipfile.ZipFile(self.filename, 'a', zipfile.ZIP_DEFLATED) as archive:
+                if body is not None:
+                    exchange['body'] = _digest(body)
+                    if exchange['body'] not in self._bodies:
+                        archive.writestr('bodies/%s' % exchange['body'], body)
+                        self._bodies.add(exchange['body'])
+                archive.writestr(
+                    'exchanges/%06d.json' % self.requests,
+                    json.dumps(exchange, sort_keys=True).encode('utf-8'))
+            self.requests += 1
+        finally:
+            if self._lock is not None:
+                self._lock.release()
+
+    def _records_body(self, headers):
+        content_type = (headers.get('Content-Type') or '').lower()
+        if content_type.startswith(self._MEDIA_TYPES):
+            return False
+        content_length = int_or_none(headers.get('Content-Length'))
+        return content_length is None or content_length <= self._MAX_BODY_SIZE
+
+    def urlopen(self, req, open_request):
+        """ Open req with open_request and record the exchange """
+        data = req.data if hasattr(req, 'data') else req.get_data()
+        exchange = {
+            'method': req.get_method(),
+            'url': req.get_full_url(),
+            'request_headers': sorted(req.header_items()),
+            'data': _digest(data) if data is not None else None,
+        }
+        try:
+            res = open_request(req)
+        except compat_urllib_HTTPError as err:
+            body = err.read()
+            exchange.update({
+                'http_error': True,
+                'final_url': err.geturl(),
+                'code': err.code,
+                'msg': compat_str(err.msg),
+                'headers': list(err.info().items()),
+            })
+            self._write(exchange, body)
+            raise compat_urllib_HTTPError(
+                err.geturl(), err.code, err.msg, err.info(), io.BytesIO(body))
+        except compat_urllib_error.URLError as err:
+            exchange['error'] = error_to_compat_str(err.reason)
+            self._write(exchange, None)
+            raise
+        exchange.update({
+            'final_url': res.geturl(),
+            'code': res.getcode(),
+            'msg': compat_str(getattr(res, 'msg', '') or ''),
+            'headers': list(res.info().items()),
+        })
+        if not self._records_body(res.info()):
+            exchange['body_skipped'] = True
+            self._write(exchange, None)
+            return res
+        body = res.read()
+        res.close()
+        self._write(exchange, body)
+        return NetworkReplayer._response(exchange, body)
+
+
+class NetworkReplayer(object):
+    """
+    Serve the exchanges of a network archive instead of the network
+
+    Requests are matched by method, URL and request body. Exchanges
+    recorded several times for a request are served in order, the last
+    one being repeated. A request whose URL is not in the archive is
+    served the next unused exchange with the same URL save for the query
+    (for time stamps and nonces in queries), and fails with URLError
+    if there is none.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.requests = 0
+        self.misses = 0
+        self._exchanges = {}
+        self._index = {}
+        self._fallback = {}
+        self._served = set()
+        with zipfile.ZipFile(filename, 'r') as archive:
+            names = sorted(
+                name for name in archive.namelist()
+                if name.startswith('exchanges/'))
+            self._bodies = dict(
+                (name[len('bodies/'):], archive.read(name))
+                for name in archive.namelist() if name.startswith('bodies/'))
+            for name in names:
+                exchange = json.loads(archive.read(name).decode('utf-8'))
+                self._index.setdefault(self._key(
+                    exchange['method'], exchange['url'], exchange['data']), []).append(name)
+                self._fallback.setdefault(self._fallback_key(
+                    exchange['method'], exchange['url']), []).append(name)
+                self._exchanges[name] = exchange
+
+    @staticmethod
+    def _key(method, url, data):
+        return (method, url, data)
+
+    @staticmethod
+    def _fallback_key(method, url):
+        return (method, _url_without_query(url))
+
+    @staticmethod
+    def _response(exchange, body):
+        res = compat_urllib_response.addinfourl(
+            io.BytesIO(body), _make_headers(exchange['headers']),
+            exchange['final_url'], exchange['code'])
+        res.msg = exchange.get('msg')
+        return res
+
+    def _find(self, req, data):
+        names = self._index.get(self._key(req.get_method(), req.get_full_url(), data))
+        if names:
+            for name in names:
+                if name not in self._served:
+                    return name
+            return names[-1]
+        names = self._fallback.get(self._fallback_key(req.get_method(), req.get_full_url()))
+        for name in names or []:
+            if name not in self._served:
+                return name
+
+    def urlopen(self, req, open_request=None):
+        """ Serve req from the archive """
+        data = req.data if hasattr(req, 'data') else req.get_data()
+        self.requests += 1
+        name = self._find(req, _digest(data) if data is not None else None)
+        if name is None:
+            self.misses += 1
+            raise compat_urllib_error.URLError(
+                'no recorded response for %s %s' % (req.get_method(), req.get_full_url()))
+        self._served.add(name)
+        exchange = self._exchanges[name]
+        if exchange.get('error') is not None:
+            raise compat_urllib_error.URLError(exchange['error'])
+        if exchange.get('body_skipped'):
+            raise compat_urllib_error.URLError(
+                'the response to %s %s was not recorded' % (req.get_method(), req.get_full_url()))
+        body = self._bodies.get(exchange.get('body'), b'')
+        if exchange.get('http_error'):
+            raise compat_urllib_HTTPError(
+                exchange['final_url'], exchange['code'], exchange.get('msg'),
+                _make_headers(exchange['headers']), io.BytesIO(body))
+        return self._response(exchange, body)
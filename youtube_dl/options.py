@@ -224,6 +224,10 @@ def parseOpts(overrideArguments=None):
         action='store_const', const='::', dest='source_address',
         help='Make all connections via IPv6',
     )
+    network.add_option(
+        '--dns-cache-ttl',
+        dest='dns_cache_ttl', type=float, default=60, metavar='SECONDS',
+        help='Number of seconds to keep the addresses of host names (default is %default), or 0 not to cache them')
 
     geo = optparse.OptionGroup(parser, 'Geo Restriction')
     geo.add_option(
@@ -317,7 +321,9 @@ def parseOpts(overrideArguments=None):
             '>=, <, <=, !=, =) to compare against a number, '
             'key = \'LITERAL\' (like "uploader = \'Mike Smith\'", also works with !=) '
             'to match against a string literal '
-            'and & to require multiple matches. '
+            'and & to require multiple matches '
+            '(| to require any of them, with & binding tighter; '
+            'use parentheses to group). '
             'Values which are not known are excluded unless you '
             'put a question mark (?) after the operator. '
             'For example, to only match videos that have been liked more than '
@@ -419,6 +425,13 @@ def parseOpts(overrideArguments=None):
             'If a merge is required (e.g. bestvideo+bestaudio), '
             'output to given container format. One of mkv, mp4, ogg, webm, flv. '
             'Ignored if no merge is required'))
+    video_format.add_option(
+        '--stream-merge',
+        action='store_true', dest='stream_merge', default=False,
+        help=(
+            'Merge the formats with ffmpeg while they are being downloaded, '
+            'without writing them to separate files first. '
+            'Interrupted downloads are resumed as separate files'))
 
     subtitles = optparse.OptionGroup(parser, 'Subtitle Options')
     subtitles.add_option(
@@ -452,6 +465,16 @@ def parseOpts(overrideArguments=None):
         '-r', '--limit-rate', '--rate-limit',
         dest='ratelimit', metavar='RATE',
         help='Maximum download rate in bytes per second (e.g. 50K or 4.2M)')
+    downloader.add_option(
+        '--limit-rate-host',
+        dest='ratelimit_hosts', metavar='HOST=RATE', action='append',
+        help='Maximum download rate from HOST and its subdomains in bytes per second (e.g. example.com=50K). '
+             'You can use this option multiple times. All the downloads of the process share the rate limits')
+    downloader.add_option(
+        '--limit-rate-burst',
+        dest='ratelimit_burst', metavar='SIZE',
+        help='Maximum amount of data in bytes downloaded at once within the rate limits (e.g. 64K). '
+             'By default a quarter of a second of each rate limit')
     downloader.add_option(
         '-R', '--retries',
         dest='retries', metavar='RETRIES', default=10,
@@ -460,6 +483,16 @@ def parseOpts(overrideArguments=None):
         '--fragment-retries',
         dest='fragment_retries', metavar='RETRIES', default=10,
         help='Number of retries for a fragment (default is %default), or "infinite" (DASH, hlsnative and ISM)')
+    downloader.add_option(
+        '--retry-sleep',
+        dest='retry_sleep', metavar='SECONDS', type=float, default=1,
+        help='Number of seconds to wait before the first retry, doubled for each further retry '
+             'up to --max-retry-sleep, with random jitter (default is %default). '
+             'Waits asked for by the server with Retry-After are followed instead')
+    downloader.add_option(
+        '--max-retry-sleep',
+        dest='max_retry_sleep', metavar='SECONDS', type=float, default=10,
+        help='Maximum number of seconds to wait before a retry (default is %default)')
     downloader.add_option(
         '--skip-unavailable-fragments',
         action='store_true', dest='skip_unavailable_fragments', default=True,
@@ -472,6 +505,20 @@ def parseOpts(overrideArguments=None):
         '--keep-fragments',
         action='store_true', dest='keep_fragments', default=False,
         help='Keep downloaded fragments on disk after downloading is finished; fragments are erased by default')
+    downloader.add_option(
+        '-N', '--concurrent-fragments',
+        dest='concurrent_fragments', metavar='N', type=int, default=1,
+        help='Number of fragments of a DASH video to download concurrently (default is %default)')
+    downloader.add_option(
+        '--http2',
+        action='store_true', dest='http2', default=False,
+        help='Download fragments over HTTP/2 when the server supports it, '
+             'over a single connection per host (needs the h2 Python package)')
+    downloader.add_option(
+        '--live-from-start',
+        action='store_true', dest='live_from_start', default=False,
+        help='Download live DASH streams from the earliest segment the server keeps, '
+             'rather than from the live edge')
     downloader.add_option(
         '--buffer-size',
         dest='buffersize', metavar='SIZE', default='1024',
@@ -514,6 +561,11 @@ def parseOpts(overrideArguments=None):
         dest='hls_use_mpegts', action='store_true',
         help='Use the mpegts container for HLS videos, allowing to play the '
              'video while downloading (some players may not be able to play it)')
+    downloader.add_option(
+        '--hls-byterange-size',
+        dest='hls_byterange_size', metavar='SIZE', default=None,
+        help='Largest byte range (e.g. 10485760 or 10M) to download contiguous byte ranges of '
+             'an HLS media file with in a single request, 0 to disable (default is 10M) (hlsnative only)')
     downloader.add_option(
         '--external-downloader',
         dest='external_downloader', metavar='COMMAND',
@@ -667,6 +719,14 @@ def parseOpts(overrideArguments=None):
         '--print-traffic', '--dump-headers',
         dest='debug_printtraffic', action='store_true', default=False,
         help='Display sent and read HTTP traffic')
+    verbosity.add_option(
+        '--record-network',
+        metavar='FILE', dest='record_network', default=None,
+        help='Record the HTTP requests and responses to FILE, to replay them later with --replay-network')
+    verbosity.add_option(
+        '--replay-network',
+        metavar='FILE', dest='replay_network', default=None,
+        help='Serve the HTTP requests from the responses recorded in FILE instead of using the network')
     verbosity.add_option(
         '-C', '--call-home',
         dest='call_home', action='store_true', default=False,
@@ -753,6 +813,10 @@ def parseOpts(overrideArguments=None):
         '--write-annotations',
         action='store_true', dest='writeannotations', default=False,
         help='Write video annotations to a .annotations.xml file')
+    filesystem.add_option(
+        '--max-sidecar-workers',
+        metavar='NUMBER', dest='max_sidecar_workers', default=0, type=int,
+        help='Write the description, annotations, subtitles, info JSON and thumbnails of a video in up to NUMBER background threads while it is being downloaded (default is 0, write them one after another before the download). Ignored with --sleep-interval, and the files are written before the download with --limit-rate')
     filesystem.add_option(
         '--load-info-json', '--load-info',
         dest='load_info_filename', metavar='FILE',
@@ -771,6 +835,15 @@ def parseOpts(overrideArguments=None):
         '--rm-cache-dir',
         action='store_true', dest='rm_cachedir',
         help='Delete all filesystem cache files')
+    filesystem.add_option(
+        '--response-cache',
+        action='store_true', dest='response_cache', default=False,
+        help='Cache the web pages and API responses downloaded by extractors in the cache directory '
+             'and only download them again if they have changed (experimental)')
+    filesystem.add_option(
+        '--response-cache-max-size',
+        metavar='SIZE', dest='response_cache_max_size', default=None,
+        help='Maximum size of the response cache (e.g. 50M or 1G, default is 100M)')
 
     thumbnail = optparse.OptionGroup(parser, 'Thumbnail Options')
     thumbnail.add_option(
@@ -862,6 +935,10 @@ def parseOpts(overrideArguments=None):
         '--exec',
         metavar='CMD', dest='exec_cmd',
         help='Execute a command on the file after downloading and post-processing, similar to find\'s -exec syntax. Example: --exec \'adb push {} /sdcard/Music/ && rm {}\'')
+    postproc.add_option(
+        '--max-pp-workers',
+        metavar='NUMBER', dest='max_pp_workers', default=0, type=int,
+        help='Run the postprocessors in up to NUMBER background threads while the next videos are downloaded (default is 0, post-process each file before the next download)')
     postproc.add_option(
         '--convert-subs', '--convert-subtitles',
         metavar='FORMAT', dest='convertsubtitles', default=None,
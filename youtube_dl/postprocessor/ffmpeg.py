@@ -162,7 +162,29 @@ class FFmpegPostProcessor(PostProcessor):
     def probe_executable(self):
         return self._paths[self.probe_basename]
 
+    def probe_media(self, path):
+        """Inspect the container headers of a media file natively
+
+        See probe.probe_media for the returned dict. Returns None if the
+        container is not supported, callers should then fall back to
+        ffprobe/avprobe.
+        """
+        # Imported here since downloader imports this module
+        from .probe import probe_media
+        info = probe_media(path)
+        if info is not None and self._downloader and self._downloader.params.get('verbose', False):
+            self._downloader.to_screen(
+                '[debug] Probed %s container of %s natively' % (info['container'], path))
+        return info
+
     def get_audio_codec(self, path):
+        info = self.probe_media(path)
+        if info is not None:
+            for stream in info['streams']:
+                if stream['codec_type'] == 'audio':
+                    return stream['codec_name']
+            return None
+
         if not self.probe_available and not self.available:
             raise PostProcessingError('ffprobe/avprobe and ffmpeg/avconv not found. Please install one.')
         try:
@@ -571,6 +593,10 @@ class FFmpegFixupM4aPP(FFmpegPostProcessor):
             return [], info
 
         filename = info['filepath']
+        probe = self.probe_media(filename)
+        if probe and probe['container'] == 'mp4' and not probe.get('fragmented'):
+            # Already a regular MP4 file
+            return [], info
         temp_filename = prepend_extension(filename, 'temp')
 
         options = ['-c', 'copy', '-f', 'mp4']
@@ -0,0 +1,139 @@
+from __future__ import unicode_literals
+
+import collections
+import sys
+
+try:
+    import threading
+except ImportError:
+    threading = None
+
+
+class _PostProcessingJob(object):
+    def __init__(self, func, callback):
+        self.func = func
+        self.callback = callback
+        self.done = False
+        self.result = None
+        self.exc_info = None
+
+    def run(self):
+        try:
+            self.result = self.func()
+        except BaseException:
+            self.exc_info = sys.exc_info()
+        finally:
+            self.done = True
+
+
+class PostProcessingPool(object):
+    """Bounded pool of background post-processing workers.
+
+    Jobs are started in submission order on up to max_workers threads so
+    that the next download can proceed while the previous file is being
+    converted.  Completion is always reported (the callback is invoked or
+    the job's exception is re-raised) in submission order and from the
+    thread calling submit(), join() or shutdown(), never from a worker.
+
+    At most max_workers jobs are outstanding at any time: submit() blocks
+    until the oldest job has been reported when the pool is full.
+    """
+
+    # Seconds between wake-ups while waiting, so that the waiting thread
+    # stays responsive to KeyboardInterrupt on Python 2
+    _WAIT_INTERVAL = 0.5
+
+    def __init__(self, max_workers):
+        assert max_workers > 0
+        self.max_workers = max_workers
+        self._jobs = collections.deque()
+        self._pending = collections.deque()
+        self._threads = []
+        self._stopped = False
+        self._cond = threading.Condition()
+
+    @staticmethod
+    def available():
+        return threading is not None
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._stopped:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                job = self._pending.popleft()
+            job.run()
+            with self._cond:
+                self._cond.notify_all()
+
+    def submit(self, func, callback=None):
+        """Queue func() to run in the background
+
+        callback, if given, is called with func's return value once the job
+        and all jobs submitted before it have completed.
+        """
+        job = _PostProcessingJob(func, callback)
+        with self._cond:
+            assert not self._stopped, 'pool has been shut down'
+            self._jobs.append(job)
+            self._pending.append(job)
+            if len(self._threads) < min(self.max_workers, len(self._jobs)):
+                thread = threading.Thread(target=self._worker)
+                thread.daemon = True
+                self._threads.append(thread)
+                thread.start()
+            self._cond.notify_all()
+        while len(self._jobs) > self.max_workers:
+            self._report_next()
+        self.poll()
+
+    def poll(self):
+        """Report jobs that have completed, without blocking"""
+        while self._jobs and self._jobs[0].done:
+            self._report_next()
+
+    def _wait(self, job):
+        with self._cond:
+            while not job.done:
+                self._cond.wait(self._WAIT_INTERVAL)
+
+    def _report_next(self, raise_errors=True):
+        job = self._jobs[0]
+        self._wait(job)
+        self._jobs.popleft()
+        if job.exc_info is not None:
+            if raise_errors:
+                raise job.exc_info[1]
+        elif job.callback is not None:
+            job.callback(job.result)
+
+    def join(self):
+        """Wait for all submitted jobs and report them in order
+
+        The exception of the first failed job is re-raised; jobs submitted
+        after it are left in the pool.
+        """
+        while self._jobs:
+            self._report_next()
+
+    def shutdown(self):
+        """Stop the pool after an error or an interruption
+
+        Jobs that have not started yet are dropped, running jobs are waited
+        for and those that succeeded are reported.  Failures are not
+        re-raised since their errors have already been reported by the jobs
+        themselves.
+        """
+        with self._cond:
+            self._stopped = True
+            for job in self._pending:
+                self._jobs.remove(job)
+            self._pending.clear()
+            self._cond.notify_all()
+        while self._jobs:
+            self._report_next(raise_errors=False)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
@@ -0,0 +1,643 @@
+from __future__ import division, unicode_literals
+
+import io
+import struct
+
+from ..compat import (
+    compat_Struct,
+    compat_open as open,
+)
+from ..downloader.f4m import (
+    DataTruncatedError,
+    FlvReader,
+)
+from ..downloader.ism import (
+    u16,
+    u32,
+    u64,
+)
+from ..utils import encodeFilename
+
+
+f32 = compat_Struct('>f')
+f64 = compat_Struct('>d')
+
+# Maps of container specific codec identifiers to ffprobe codec names
+
+MP4_CODECS = {
+    b'avc1': 'h264',
+    b'avc3': 'h264',
+    b'hvc1': 'hevc',
+    b'hev1': 'hevc',
+    b'vp08': 'vp8',
+    b'vp09': 'vp9',
+    b'av01': 'av1',
+    b'mp4v': 'mpeg4',
+    b'mp4a': 'aac',
+    b'Opus': 'opus',
+    b'fLaC': 'flac',
+    b'ac-3': 'ac3',
+    b'ec-3': 'eac3',
+    b'.mp3': 'mp3',
+    b'alac': 'alac',
+}
+
+# MPEG-4 objectTypeIndication values found in esds boxes
+MP4_OBJECT_TYPES = {
+    0x40: 'aac',
+    0x66: 'aac',
+    0x67: 'aac',
+    0x68: 'aac',
+    0x69: 'mp3',
+    0x6B: 'mp3',
+    0xA5: 'ac3',
+    0xA6: 'eac3',
+    0xAD: 'opus',
+    0xDD: 'vorbis',
+}
+
+MP4_HANDLERS = {
+    b'soun': 'audio',
+    b'vide': 'video',
+    b'subt': 'subtitle',
+    b'text': 'subtitle',
+    b'sbtl': 'subtitle',
+}
+
+FLV_AUDIO_CODECS = {
+    0: 'pcm',
+    1: 'adpcm_swf',
+    2: 'mp3',
+    4: 'nellymoser',
+    5: 'nellymoser',
+    6: 'nellymoser',
+    10: 'aac',
+    11: 'speex',
+    14: 'mp3',
+}
+
+FLV_VIDEO_CODECS = {
+    2: 'flv1',
+    3: 'flashsv',
+    4: 'vp6f',
+    5: 'vp6a',
+    6: 'flashsv2',
+    7: 'h264',
+    12: 'hevc',
+}
+
+MATROSKA_CODECS = {
+    'V_MPEG4/ISO/AVC': 'h264',
+    'V_MPEGH/ISO/HEVC': 'hevc',
+    'V_VP8': 'vp8',
+    'V_VP9': 'vp9',
+    'V_AV1': 'av1',
+    'V_THEORA': 'theora',
+    'A_AAC': 'aac',
+    'A_OPUS': 'opus',
+    'A_VORBIS': 'vorbis',
+    'A_FLAC': 'flac',
+    'A_MPEG/L3': 'mp3',
+    'A_AC3': 'ac3',
+    'A_EAC3': 'eac3',
+    'S_TEXT/WEBVTT': 'webvtt',
+    'S_TEXT/UTF8': 'subrip',
+    'S_TEXT/ASS': 'ass',
+}
+
+MPEGTS_STREAM_TYPES = {
+    0x01: ('video', 'mpeg1video'),
+    0x02: ('video', 'mpeg2video'),
+    0x03: ('audio', 'mp3'),
+    0x04: ('audio', 'mp3'),
+    0x0F: ('audio', 'aac'),
+    0x11: ('audio', 'aac_latm'),
+    0x1B: ('video', 'h264'),
+    0x24: ('video', 'hevc'),
+    0x81: ('audio', 'ac3'),
+    0x87: ('audio', 'eac3'),
+}
+
+
+class ProbeError(Exception):
+    pass
+
+
+def _stream(codec_type, codec_name, **kwargs):
+    stream = dict((k, v) for k, v in kwargs.items() if v is not None)
+    stream.update({
+        'codec_type': codec_type,
+        'codec_name': codec_name,
+    })
+    return stream
+
+
+# ISO base media file format (MP4, M4A, ISMV, ...)
+
+def _read_box_header(f):
+    """Read a box header from a file, return (type, header size, box size)"""
+    header = f.read(8)
+    if len(header) < 8:
+        return None
+    size, box_type = u32.unpack(header[:4])[0], header[4:]
+    header_size = 8
+    if size == 1:
+        large_size = f.read(8)
+        if len(large_size) < 8:
+            return None
+        size = u64.unpack(large_size)[0]
+        header_size = 16
+    return box_type, header_size, size
+
+
+def _iter_boxes(data):
+    """Iterate over the (type, payload) of boxes concatenated in data"""
+    reader = FlvReader(data)
+    while reader.tell() < len(data):
+        _, box_type, box_data = reader.read_box_info()
+        yield box_type, box_data
+
+
+def _find_box(data, box_type):
+    for btype, bdata in _iter_boxes(data):
+        if btype == box_type:
+            return bdata
+
+
+def _full_box_version(data):
+    return ord(data[:1])
+
+
+def _parse_esds(data):
+    # Skip version and flags, then walk the descriptors down to the
+    # DecoderConfigDescriptor
+    pos = 4
+    while pos < len(data):
+        tag = ord(data[pos:pos + 1])
+        pos += 1
+        size = 0
+        for _ in range(4):
+            b = ord(data[pos:pos + 1])
+            pos += 1
+            size = (size << 7) | (b & 0x7f)
+            if not b & 0x80:
+                break
+        if tag == 0x03:  # ES_Descriptor
+            flags = ord(data[pos + 2:pos + 3])
+            pos += 3
+            if flags & 0x80:
+                pos += 2
+            if flags & 0x40:
+                pos += 1 + ord(data[pos:pos + 1])
+            if flags & 0x20:
+                pos += 2
+        elif tag == 0x04:  # DecoderConfigDescriptor
+            return ord(data[pos:pos + 1])
+        else:
+            pos += size
+
+
+def _parse_sample_entry(handler, entry_type, entry):
+    # Size of the fixed part of the sample entry before its child boxes
+    children_offset = {'audio': 28, 'video': 78}.get(handler)
+    children = entry[children_offset:] if children_offset else b''
+    if entry_type in (b'enca', b'encv'):
+        sinf = _find_box(children, b'sinf')
+        frma = sinf and _find_box(sinf, b'frma')
+        if frma:
+            entry_type = frma[:4]
+    codec_name = MP4_CODECS.get(entry_type) or entry_type.decode('latin-1').strip()
+    info = {}
+    if handler == 'audio':
+        info['channels'] = u16.unpack(entry[16:18])[0]
+        info['sample_rate'] = u32.unpack(entry[24:28])[0] >> 16
+        if entry_type == b'mp4a':
+            esds = _find_box(children, b'esds')
+            object_type = esds and _parse_esds(esds)
+            codec_name = MP4_OBJECT_TYPES.get(object_type, codec_name)
+    elif handler == 'video':
+        info['width'] = u16.unpack(entry[24:26])[0]
+        info['height'] = u16.unpack(entry[26:28])[0]
+    return codec_name, info
+
+
+def _parse_trak(trak):
+    mdia = _find_box(trak, b'mdia')
+    if mdia is None:
+        return
+    hdlr = _find_box(mdia, b'hdlr')
+    handler = MP4_HANDLERS.get(hdlr and hdlr[8:12])
+    if handler is None:
+        return
+    info = {}
+    mdhd = _find_box(mdia, b'mdhd')
+    if mdhd:
+        if _full_box_version(mdhd) == 1:
+            timescale, duration = u32.unpack(mdhd[20:24])[0], u64.unpack(mdhd[24:32])[0]
+        else:
+            timescale, duration = u32.unpack(mdhd[12:16])[0], u32.unpack(mdhd[16:20])[0]
+        if timescale and duration and duration not in (0xffffffff, 0xffffffffffffffff):
+            info['duration'] = duration / timescale
+    codec_name = None
+    stsd = _find_box(mdia, b'minf')
+    for box_type in (b'stbl', b'stsd'):
+        stsd = stsd and _find_box(stsd, box_type)
+    if stsd and u32.unpack(stsd[4:8])[0]:
+        # Only the first sample description is considered
+        entry_type, entry = next(_iter_boxes(stsd[8:]))
+        codec_name, entry_info = _parse_sample_entry(handler, entry_type, entry)
+        info.update(entry_info)
+    return _stream(handler, codec_name, **info)
+
+
+def _parse_moov(moov, info):
+    mvhd = _find_box(moov, b'mvhd')
+    timescale = duration = None
+    if mvhd:
+        if _full_box_version(mvhd) == 1:
+            timescale, duration = u32.unpack(mvhd[20:24])[0], u64.unpack(mvhd[24:32])[0]
+        else:
+            timescale, duration = u32.unpack(mvhd[12:16])[0], u32.unpack(mvhd[16:20])[0]
+    mvex = _find_box(moov, b'mvex')
+    info['fragmented'] = mvex is not None
+    if not duration and mvex:
+        mehd = _find_box(mvex, b'mehd')
+        if mehd:
+            duration = (u64.unpack(mehd[4:12]) if _full_box_version(mehd) == 1
+                        else u32.unpack(mehd[4:8]))[0]
+    if timescale and duration and duration not in (0xffffffff, 0xffffffffffffffff):
+        info['duration'] = duration / timescale
+    for box_type, box_data in _iter_boxes(moov):
+        if box_type == b'trak':
+            stream = _parse_trak(box_data)
+            if stream:
+                info['streams'].append(stream)
+
+
+def probe_mp4(f):
+    info = {
+        'container': 'mp4',
+        'streams': [],
+    }
+    while True:
+        start = f.tell()
+        header = _read_box_header(f)
+        if header is None:
+            break
+        box_type, header_size, size = header
+        if box_type == b'ftyp':
+            ftyp = f.read(size - header_size)
+            info['major_brand'] = ftyp[:4].decode('latin-1')
+            info['brands'] = [ftyp[i:i + 4].decode('latin-1') for i in range(8, len(ftyp) - 3, 4)]
+        elif box_type == b'moov':
+            _parse_moov(f.read(size - header_size), info)
+            return info
+        elif size == 0:
+            # Box extends to the end of the file
+            break
+        f.seek(start + size)
+    raise ProbeError('no moov box found')
+
+
+# Flash video
+
+class FlvTagReader(FlvReader):
+    def read_unsigned_short(self):
+        return u16.unpack(self.read_bytes(2))[0]
+
+    def read_unsigned_int24(self):
+        return u32.unpack(b'\x00' + self.read_bytes(3))[0]
+
+    def read_double(self):
+        return f64.unpack(self.read_bytes(8))[0]
+
+    def read_amf_string(self):
+        return self.read_bytes(self.read_unsigned_short()).decode('utf-8', 'replace')
+
+    def read_amf_value(self):
+        amf_type = self.read_unsigned_char()
+        if amf_type == 0:  # number
+            return self.read_double()
+        elif amf_type == 1:  # boolean
+            return self.read_unsigned_char() != 0
+        elif amf_type == 2:  # string
+            return self.read_amf_string()
+        elif amf_type in (3, 8):  # object, ECMA array
+            if amf_type == 8:
+                self.read_unsigned_int()  # approximate array length
+            res = {}
+            while True:
+                key = self.read_amf_string()
+                if not key:
+                    if self.read_unsigned_char() != 9:  # object end
+                        raise ProbeError('invalid AMF0 object')
+                    return res
+                res[key] = self.read_amf_value()
+        elif amf_type in (5, 6):  # null, undefined
+            return None
+        elif amf_type == 10:  # strict array
+            return [self.read_amf_value() for _ in range(self.read_unsigned_int())]
+        elif amf_type == 11:  # date
+            value = self.read_double()
+            self.read_bytes(2)  # time zone
+            return value
+        raise ProbeError('unsupported AMF0 type %d' % amf_type)
+
+
+# Tags inspected at most when looking for the first audio and video tags
+_FLV_MAX_TAGS = 100
+
+
+def probe_flv(f):
+    header = FlvTagReader(f.read(9))
+    if header.read_bytes(3) != b'FLV':
+        raise ProbeError('not a FLV file')
+    header.read_unsigned_char()  # version
+    flags = header.read_unsigned_char()
+    f.seek(header.read_unsigned_int())
+    has_audio, has_video = bool(flags & 0x04), bool(flags & 0x01)
+
+    info = {
+        'container': 'flv',
+        'streams': [],
+    }
+    metadata = {}
+    audio = video = None
+    for _ in range(_FLV_MAX_TAGS):
+        if (audio or not has_audio) and (video or not has_video):
+            break
+        tag_header = f.read(4 + 11 + 1)  # PreviousTagSize, TagHeader, first byte
+        if len(tag_header) < 16:
+            break
+        reader = FlvTagReader(tag_header[4:])
+        tag_type = reader.read_unsigned_char() & 0x1f
+        data_size = reader.read_unsigned_int24()
+        reader.read_bytes(7)  # timestamp, stream id
+        first_byte = reader.read_unsigned_char()
+        if tag_type == 8 and audio is None:
+            audio = first_byte
+        elif tag_type == 9 and video is None:
+            video = first_byte
+        elif tag_type == 18 and not metadata:
+            script = FlvTagReader(tag_header[-1:] + f.read(data_size - 1))
+            try:
+                if script.read_amf_value() == 'onMetaData':
+                    metadata = script.read_amf_value() or {}
+            except (DataTruncatedError, ProbeError):
+                pass
+            continue
+        f.seek(data_size - 1, io.SEEK_CUR)
+
+    if metadata.get('duration'):
+        info['duration'] = metadata['duration']
+    if audio is not None:
+        info['streams'].append(_stream(
+            'audio', FLV_AUDIO_CODECS.get(audio >> 4),
+            sample_rate=int(metadata['audiosamplerate']) if metadata.get('audiosamplerate') else None,
+            channels=2 if audio & 1 else 1))
+    if video is not None:
+        info['streams'].append(_stream(
+            'video', FLV_VIDEO_CODECS.get(video & 0x0f),
+            width=int(metadata['width']) if metadata.get('width') else None,
+            height=int(metadata['height']) if metadata.get('height') else None))
+    return info
+
+
+# Matroska and WebM
+
+EBML_HEADER = 0x1A45DFA3
+EBML_DOCTYPE = 0x4282
+MKV_SEGMENT = 0x18538067
+MKV_INFO = 0x1549A966
+MKV_TIMECODE_SCALE = 0x2AD7B1
+MKV_DURATION = 0x4489
+MKV_TRACKS = 0x1654AE6B
+MKV_TRACK_ENTRY = 0xAE
+MKV_TRACK_TYPE = 0x83
+MKV_CODEC_ID = 0x86
+MKV_VIDEO = 0xE0
+MKV_PIXEL_WIDTH = 0xB0
+MKV_PIXEL_HEIGHT = 0xBA
+MKV_AUDIO = 0xE1
+MKV_SAMPLING_FREQUENCY = 0xB5
+MKV_CHANNELS = 0x9F
+MKV_CLUSTER = 0x1F43B675
+
+MKV_TRACK_TYPES = {
+    1: 'video',
+    2: 'audio',
+    17: 'subtitle',
+}
+
+
+def _read_vint(f, keep_marker):
+    first = f.read(1)
+    if not first:
+        raise ProbeError('unexpected end of file')
+    first = ord(first)
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first & mask:
+        length += 1
+        mask >>= 1
+    if length > 8:
+        raise ProbeError('invalid EBML variable size integer')
+    value = first if keep_marker else first & (mask - 1)
+    rest = f.read(length - 1)
+    if len(rest) < length - 1:
+        raise ProbeError('unexpected end of file')
+    for c in bytearray(rest):
+        value = (value << 8) | c
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        value = None  # Unknown size
+    return value
+
+
+def _read_ebml_element(f):
+    return _read_vint(f, True), _read_vint(f, False)
+
+
+def _iter_ebml_children(f, size):
+    end = None if size is None else f.tell() + size
+    while end is None or f.tell() < end:
+        try:
+            element_id, element_size = _read_ebml_element(f)
+        except ProbeError:
+            if end is None:
+                return
+            raise
+        start = f.tell()
+        yield element_id, element_size
+        if element_size is None:
+            return
+        f.seek(start + element_size)
+
+
+def _read_ebml_uint(f, size):
+    value = 0
+    for c in bytearray(f.read(size)):
+        value = (value << 8) | c
+    return value
+
+
+def _read_ebml_float(f, size):
+    data = f.read(size)
+    return (f32 if size == 4 else f64).unpack(data)[0]
+
+
+def _parse_mkv_track(f, size):
+    track = {}
+    for element_id, element_size in _iter_ebml_children(f, size):
+        if element_id == MKV_TRACK_TYPE:
+            track['codec_type'] = MKV_TRACK_TYPES.get(_read_ebml_uint(f, element_size))
+        elif element_id == MKV_CODEC_ID:
+            codec_id = f.read(element_size).rstrip(b'\0').decode('ascii', 'replace')
+            track['codec_name'] = MATROSKA_CODECS.get(codec_id, codec_id.lower())
+        elif element_id == MKV_VIDEO:
+            for sub_id, sub_size in _iter_ebml_children(f, element_size):
+                if sub_id == MKV_PIXEL_WIDTH:
+                    track['width'] = _read_ebml_uint(f, sub_size)
+                elif sub_id == MKV_PIXEL_HEIGHT:
+                    track['height'] = _read_ebml_uint(f, sub_size)
+        elif element_id == MKV_AUDIO:
+            for sub_id, sub_size in _iter_ebml_children(f, element_size):
+                if sub_id == MKV_SAMPLING_FREQUENCY:
+                    track['sample_rate'] = int(_read_ebml_float(f, sub_size))
+                elif sub_id == MKV_CHANNELS:
+                    track['channels'] = _read_ebml_uint(f, sub_size)
+    if track.get('codec_type'):
+        return _stream(**track)
+
+
+def probe_matroska(f):
+    element_id, size = _read_ebml_element(f)
+    if element_id != EBML_HEADER:
+        raise ProbeError('not an EBML file')
+    info = {
+        'container': 'matroska',
+        'streams': [],
+    }
+    for element_id, element_size in _iter_ebml_children(f, size):
+        if element_id == EBML_DOCTYPE:
+            doctype = f.read(element_size).rstrip(b'\0').decode('ascii', 'replace')
+            if doctype not in ('matroska', 'webm'):
+                raise ProbeError('unsupported EBML document type %s' % doctype)
+            info['container'] = doctype
+
+    element_id, size = _read_ebml_element(f)
+    if element_id != MKV_SEGMENT:
+        raise ProbeError('no segment found')
+    timecode_scale, duration = 1000000, None
+    tracks_found = False
+    for element_id, element_size in _iter_ebml_children(f, size):
+        if element_id == MKV_INFO:
+            for sub_id, sub_size in _iter_ebml_children(f, element_size):
+                if sub_id == MKV_TIMECODE_SCALE:
+                    timecode_scale = _read_ebml_uint(f, sub_size)
+                elif sub_id == MKV_DURATION:
+                    duration = _read_ebml_float(f, sub_size)
+        elif element_id == MKV_TRACKS:
+            tracks_found = True
+            for sub_id, sub_size in _iter_ebml_children(f, element_size):
+                if sub_id == MKV_TRACK_ENTRY:
+                    track = _parse_mkv_track(f, sub_size)
+                    if track:
+                        info['streams'].append(track)
+        elif element_id == MKV_CLUSTER:
+            break
+        if tracks_found and duration is not None:
+            break
+    if not tracks_found:
+        raise ProbeError('no tracks found before media data')
+    if duration is not None:
+        info['duration'] = duration * timecode_scale / 1000000000
+    return info
+
+
+# MPEG transport stream
+
+MPEGTS_PACKET_SIZE = 188
+# Packets inspected at most when looking for the program tables
+_MPEGTS_MAX_PACKETS = 1000
+
+
+def _mpegts_section(packet):
+    """Return the PSI section starting in a TS packet, if any"""
+    if not ord(packet[1:2]) & 0x40:  # payload unit start indicator
+        return None
+    pos = 4
+    adaptation = (ord(packet[3:4]) >> 4) & 0x3
+    if adaptation == 2:
+        return None
+    if adaptation == 3:
+        pos += 1 + ord(packet[4:5])
+    pos += 1 + ord(packet[pos:pos + 1])  # pointer field
+    section_length = u16.unpack(packet[pos + 1:pos + 3])[0] & 0xfff
+    return packet[pos:pos + 3 + section_length]
+
+
+def probe_mpegts(f):
+    info = {
+        'container': 'mpegts',
+        'streams': [],
+    }
+    pmt_pids = None
+    for _ in range(_MPEGTS_MAX_PACKETS):
+        packet = f.read(MPEGTS_PACKET_SIZE)
+        if len(packet) < MPEGTS_PACKET_SIZE or packet[:1] != b'\x47':
+            break
+        pid = u16.unpack(packet[1:3])[0] & 0x1fff
+        if pid == 0 and pmt_pids is None:
+            section = _mpegts_section(packet)
+            if not section or ord(section[:1]) != 0:
+                continue
+            pmt_pids = set()
+            for pos in range(8, len(section) - 4, 4):
+                program, pmt_pid = u32.unpack(section[pos:pos + 4])[0] >> 16, u16.unpack(section[pos + 2:pos + 4])[0] & 0x1fff
+                if program:
+                    pmt_pids.add(pmt_pid)
+        elif pmt_pids and pid in pmt_pids:
+            section = _mpegts_section(packet)
+            if not section or ord(section[:1]) != 2:
+                continue
+            pos = 12 + (u16.unpack(section[10:12])[0] & 0xfff)
+            while pos < len(section) - 4:
+                stream_type = ord(section[pos:pos + 1])
+                es_info_length = u16.unpack(section[pos + 3:pos + 5])[0] & 0xfff
+                codec = MPEGTS_STREAM_TYPES.get(stream_type)
+                if codec:
+                    info['streams'].append(_stream(*codec))
+                pos += 5 + es_info_length
+            return info
+    raise ProbeError('no program map table found')
+
+
+_PROBES = (
+    (lambda h: h[4:8] in (b'ftyp', b'moov', b'styp', b'free', b'skip', b'wide', b'mdat'), probe_mp4),
+    (lambda h: h[:3] == b'FLV', probe_flv),
+    (lambda h: h[:4] == b'\x1a\x45\xdf\xa3', probe_matroska),
+    (lambda h: h[:1] == b'\x47' and h[MPEGTS_PACKET_SIZE:MPEGTS_PACKET_SIZE + 1] in (b'\x47', b''), probe_mpegts),
+)
+
+
+def probe_media(path):
+    """Inspect a media file by parsing its container headers
+
+    Supports MP4/ISOBMFF, FLV, Matroska/WebM and MPEG-TS. Only the header
+    bytes are read. Returns a dict similar to ffprobe's output, with the
+    container name, the duration in seconds (if known) and a list of
+    streams with codec_type, codec_name and, when available, width,
+    height, sample_rate and channels. Returns None if the file format is
+    not supported or its headers cannot be parsed.
+    """
+    try:
+        with open(encodeFilename(path), 'rb') as f:
+            head = f.read(MPEGTS_PACKET_SIZE + 1)
+            for detect, probe in _PROBES:
+                if detect(head):
+                    f.seek(0)
+                    return probe(f)
+    except (IOError, OSError, ProbeError, DataTruncatedError, StopIteration,
+            IndexError, TypeError, ValueError, struct.error):
+        pass
+    return None
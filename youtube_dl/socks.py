@@ -251,19 +251,34 @@ class sockssocket(socket.socket):
 
         return (destaddr, destport)
 
-    def _make_proxy(self, connect_func, address):
-        if not self._proxy:
-            return connect_func(self, address)
+    @classmethod
+    def from_socket(cls, sock):
+        """Return a sockssocket taking over the socket sock"""
+        timeout = sock.gettimeout()
+        if hasattr(sock, 'detach'):  # Python 3
+            new_sock = cls(sock.family, sock.type, sock.proto, fileno=sock.detach())
+        else:
+            new_sock = cls(sock.family, sock.type, sock.proto, _sock=sock._sock)
+        new_sock.settimeout(timeout)
+        return new_sock
 
-        result = connect_func(self, (self._proxy.host, self._proxy.port))
-        if result != 0 and result is not None:
-            return result
+    def negotiate(self, address):
+        """Set up the connection to address through the connected proxy"""
         setup_funcs = {
             ProxyType.SOCKS4: self._setup_socks4,
             ProxyType.SOCKS4A: self._setup_socks4a,
             ProxyType.SOCKS5: self._setup_socks5,
         }
         setup_funcs[self._proxy.type](address)
+
+    def _make_proxy(self, connect_func, address):
+        if not self._proxy:
+            return connect_func(self, address)
+
+        result = connect_func(self, (self._proxy.host, self._proxy.port))
+        if result != 0 and result is not None:
+            return result
+        self.negotiate(address)
         return result
 
     def connect(self, address):
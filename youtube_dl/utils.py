@@ -3,6 +3,7 @@
 
 from __future__ import unicode_literals
 
+import array
 import base64
 import binascii
 import calendar
@@ -36,6 +37,7 @@ import traceback
 import unicodedata
 import xml.etree.ElementTree
 import zlib
+from string import ascii_letters
 
 from .compat import (
     compat_HTMLParseError,
@@ -56,6 +58,7 @@ from .compat import (
     compat_integer_types,
     compat_kwargs,
     compat_ncompress as ncompress,
+    compat_numeric_types,
     compat_os_name,
     compat_re_Match,
     compat_re_Pattern,
@@ -72,8 +75,10 @@ from .compat import (
     compat_urllib_parse_unquote_plus,
     compat_urllib_request,
     compat_xpath,
+    compat_zip,
 )
 
+from .connect import get_connector
 from .socks import (
     ProxyType,
     sockssocket,
@@ -1877,6 +1882,65 @@ def write_json_file(obj, fn):
         raise
 
 
+class _XMLChildrenBuilder(xml.etree.ElementTree.TreeBuilder):
+    """ Tree builder keeping the children of the root as they complete """
+
+    def __init__(self):
+        super(_XMLChildrenBuilder, self).__init__()
+        self.root = None
+        self.children = []
+        self._depth = 0
+
+    def doctype(self, name, pubid, system):
+        pass
+
+    def start(self, tag, attrs):
+        elem = super(_XMLChildrenBuilder, self).start(tag, attrs)
+        if sys.version_info[0] < 3:
+            # Python 2 gives ASCII text as bytes, see compat_etree_fromstring
+            for k, v in elem.items():
+                if isinstance(v, bytes):
+                    elem.set(k, v.decode('utf-8'))
+        if self.root is None:
+            self.root = elem
+        self._depth += 1
+        return elem
+
+    def end(self, tag):
+        elem = super(_XMLChildrenBuilder, self).end(tag)
+        self._depth -= 1
+        if isinstance(elem.text, bytes):
+            elem.text = elem.text.decode('utf-8')
+        if self._depth == 1:
+            self.children.append(elem)
+        return elem
+
+
+def iterparse_xml_children(stream, chunk_size=64 * 1024):
+    """
+    Parse the XML document read from the file object stream incrementally
+
+    Yield (root, child) for each child element of the root as soon as it
+    is complete, the root having its attributes and the children read so
+    far.
+    Processed children can be removed from the root to free them while
+    the rest of the document is read.
+    """
+    builder = _XMLChildrenBuilder()
+    parser = xml.etree.ElementTree.XMLParser(target=builder)
+    while True:
+        chunk = stream.read(chunk_size)
+        if chunk:
+            parser.feed(chunk)
+        else:
+            parser.close()
+        for child in builder.children:
+            yield builder.root, child
+        del builder.children[:]
+        if not chunk:
+            break
+
+
 if sys.version_info >= (2, 7):
     def find_xpath_attr(node, xpath, key, val=None):
         """ Find the xpath xpath[@key=val] """
@@ -1977,6 +2041,8 @@ def get_element_by_attribute(attribute, value, html, escape_value=True):
 
 def get_elements_by_class(class_name, html):
     """Return the content of all tags with the specified class in the passed HTML document as a list"""
+    if class_name not in html:
+        return []
     return get_elements_by_attribute(
         'class', r'[^\'"]*\b%s\b[^\'"]*' % re.escape(class_name),
         html, escape_value=False)
@@ -1985,6 +2051,18 @@ def get_elements_by_class(class_name, html):
 def get_elements_by_attribute(attribute, value, html, escape_value=True):
     """Return the content of the tag with the specified attribute in the passed HTML document"""
 
+    if escape_value and value not in html:
+        return []
+
+    index = html_index(html)
+    if index is not None:
+        return list(index.memoize(
+            ('elements', attribute, value, escape_value),
+            lambda: _get_elements_by_attribute(attribute, value, html, escape_value)))
+    return _get_elements_by_attribute(attribute, value, html, escape_value)
+
+
+def _get_elements_by_attribute(attribute, value, html, escape_value):
     value = re.escape(value) if escape_value else value
 
     retlist = []
@@ -2007,6 +2085,74 @@ def get_elements_by_attribute(attribute, value, html, escape_value=True):
     return retlist
 
 
+class HTMLIndex(object):
+    """Index of the tags of a webpage that metadata helpers look for
+
+    The positions of the <meta>, <input> and <script> tags are found in a
+    single pass, so that patterns starting with one of these tags only have
+    to be tried where it occurs instead of searching the whole webpage.
+    Results of helpers that are repeatedly computed on the same webpage can
+    be memoized in the index.
+    """
+
+    _TAG_RE = re.compile(r'(?i)<(meta|input|script)')
+
+    def __init__(self, html):
+        self.html = html
+        self._positions = {}
+        for m in self._TAG_RE.finditer(html):
+            self._positions.setdefault(m.group(1).lower(), []).append(m.start())
+        self._memo = {}
+
+    def positions(self, tag):
+        return self._positions.get(tag, [])
+
+    def finditer(self, pattern, tag, flags=0):
+        """Like re.finditer, for a pattern that only matches at <tag"""
+        regex = re.compile(pattern, flags)
+        end = 0
+        for pos in self.positions(tag):
+            if pos < end:
+                continue
+            m = regex.match(self.html, pos)
+            if m:
+                end = max(m.end(), pos + 1)
+                yield m
+
+    def search(self, pattern, tag, flags=0):
+        """Like re.search, for a pattern that only matches at <tag"""
+        return next(self.finditer(pattern, tag, flags), None)
+
+    def memoize(self, key, func):
+        if key not in self._memo:
+            self._memo[key] = func()
+        return self._memo[key]
+
+
+# Webpages smaller than this are searched directly
+_HTML_INDEX_MIN_SIZE = 16 * 1024
+_HTML_INDEX_CACHE_SIZE = 4
+_html_indexes = []
+
+
+def html_index(html):
+    """Return the HTMLIndex of a webpage
+
+    Indexes of the last webpages are kept and found by identity, since
+    extractors pass the same webpage string to all the helpers.  None is
+    returned for small webpages.
+    """
+    if not isinstance(html, compat_str) or len(html) < _HTML_INDEX_MIN_SIZE:
+        return None
+    for index in _html_indexes:
+        if index.html is html:
+            return index
+    index = HTMLIndex(html)
+    _html_indexes.insert(0, index)
+    del _html_indexes[_HTML_INDEX_CACHE_SIZE:]
+    return index
+
+
 class HTMLAttributeParser(compat_HTMLParser):
     """Trivial HTML parser to gather the attributes for a single element"""
     def __init__(self):
@@ -2190,6 +2336,133 @@ def expand_path(s):
     return os.path.expandvars(compat_expanduser(s))
 
 
+class OutputTemplate(object):
+    """
+    An output template parsed once, to format many info dicts
+
+    Only the fields referenced by the template are looked up and sanitized.
+    The template variants needed for missing numeric fields and for the
+    padding of autonumber and playlist_index are built once each, and the
+    last results are reused when called again with the same field values.
+    """
+
+    _FIELD_RE = re.compile(r'%(?:%|\((?P<key>[^)]*)\))')
+    _FIELD_SIZE_COMPAT_RE = re.compile(r'(?<!%)%\((?P<field>autonumber|playlist_index)\)s')
+    # As of [1] format syntax is:
+    #  %[mapping_key][conversion_flags][minimum_width][.precision][length_modifier]type
+    # 1. https://docs.python.org/2/library/stdtypes.html#string-formatting
+    _NUMERIC_FORMAT_RE = r'''(?x)
+        (?<!%)
+        %
+        \({0}\)  # mapping key
+        (?:[#0\-+ ]+)?  # conversion flags (optional)
+        (?:\d+)?  # minimum field width (optional)
+        (?:\.\d+)?  # precision (optional)
+        [hlL]?  # length modifier (optional)
+        [diouxXeEfFgGcrs%]  # conversion type
+    '''
+    _CACHE_SIZE = 16
+
+    def __init__(self, outtmpl, numeric_fields=(), restricted=False,
+                 na_placeholder='NA', autonumber_size=5):
+        self.outtmpl = outtmpl
+        self.restricted = restricted
+        self.na_placeholder = na_placeholder
+        self.autonumber_size = autonumber_size
+        self.fields = frozenset(
+            m.group('key') for m in self._FIELD_RE.finditer(outtmpl)
+            if m.group('key') is not None)
+        mobj = self._FIELD_SIZE_COMPAT_RE.search(outtmpl)
+        self._size_compat_field = mobj.group('field') if mobj else None
+        keys = set(self.fields)
+        if self._size_compat_field == 'playlist_index':
+            keys.add('n_entries')
+        self._keys = tuple(sorted(keys))
+        self._numeric_fields = tuple(sorted(keys & frozenset(numeric_fields)))
+        self._templates = {}
+        self._results = {}
+
+    def _sanitize(self, key, value):
+        if isinstance(value, compat_numeric_types):
+            return value
+        return sanitize_filename(
+            compat_str(value), restricted=self.restricted,
+            is_id=(key == 'id' or key.endswith('_id')))
+
+    def _template(self, field_size, missing_numeric_fields):
+        cache_key = (field_size, missing_numeric_fields)
+        template = self._templates.get(cache_key)
+        if template is not None:
+            return template
+        outtmpl = self.outtmpl
+        # For fields playlist_index and autonumber convert all occurrences
+        # of %(field)s to %(field)0Nd for backward compatibility
+        if field_size is not None:
+            outtmpl = self._FIELD_SIZE_COMPAT_RE.sub(
+                r'%%(\1)0%dd' % field_size, outtmpl)
+        # Missing numeric fields used together with integer presentation types
+        # in format specification will break the argument substitution since
+        # string NA placeholder is returned for missing fields. We will patch
+        # output template for missing fields to meet string presentation type.
+        for numeric_field in missing_numeric_fields:
+            outtmpl = re.sub(
+                self._NUMERIC_FORMAT_RE.format(numeric_field),
+                r'%({0})s'.format(numeric_field), outtmpl)
+        # expand_path translates '%%' into '%' and '$$' into '$'
+        # correspondingly that is not what we want since we need to keep
+        # '%%' intact for template dict substitution step. Working around
+        # with boundary-alike separator hack.
+        sep = ''.join([random.choice(ascii_letters) for _ in range(32)])
+        outtmpl = outtmpl.replace('%%', '%{0}%'.format(sep)).replace('$$', '${0}$'.format(sep))
+        # outtmpl should be expand_path'ed before template dict substitution
+        # because meta fields may contain env variables we don't want to
+        # be expanded. For example, for outtmpl "%(title)s.%(ext)s" and
+        # title "Hello $PATH", we don't want `$PATH` to be expanded.
+        template = self._templates[cache_key] = expand_path(outtmpl).replace(sep, '')
+        return template
+
+    def format(self, info_dict, extra_fields={}):
+        """
+        Return the filename for info_dict, without sanitizing the path
+
+        Fields in extra_fields take precedence over those of info_dict.
+        """
+        values = tuple(
+            extra_fields[key] if key in extra_fields else info_dict.get(key)
+            for key in self._keys)
+        # Types are part of the key since e.g. 1, 1.0 and True are equal
+        cache_key = tuple((type(value), value) for value in values)
+        try:
+            result = self._results.get(cache_key)
+            cacheable = True
+        except TypeError:
+            # Unhashable field values are not cached
+            result, cacheable = None, False
+        if result is not None:
+            return result
+
+        template_dict = dict(
+            (key, self._sanitize(key, value))
+            for key, value in zip(self._keys, values)
+            if value is not None and not isinstance(value, (list, tuple, dict)))
+        field_size = None
+        if self._size_compat_field == 'autonumber':
+            field_size = self.autonumber_size
+        elif self._size_compat_field == 'playlist_index':
+            field_size = len(str(template_dict.get('n_entries', self.na_placeholder)))
+        missing_numeric_fields = tuple(
+            field for field in self._numeric_fields if field not in template_dict)
+        template = self._template(field_size, missing_numeric_fields)
+        result = template % collections.defaultdict(
+            lambda: self.na_placeholder, template_dict)
+
+        if cacheable:
+            if len(self._results) >= self._CACHE_SIZE:
+                self._results.clear()
+            self._results[cache_key] = result
+        return result
+
+
 def orderedSet(iterable):
     """ Remove all duplicates from the input iterable """
     res = []
@@ -2524,44 +2797,13 @@ def _create_http_connection(ydl_handler, http_class, is_https, *args, **kwargs):
     hc = http_class(*args, **compat_kwargs(kwargs))
     source_address = ydl_handler._params.get('source_address')
 
+    # Connect through the shared DNS cache, racing IPv6 and IPv4 addresses
+    # (see Connector), and only to addresses of the family of source_address
+    _create_connection = get_connector(ydl_handler._params).create_connection
+    if hasattr(hc, '_create_connection'):
+        hc._create_connection = _create_connection
+
     if source_address is not None:
-        # This is to workaround _create_connection() from socket where it will try all
-        # address data from getaddrinfo() including IPv6. This filters the result from
-        # getaddrinfo() based on the source_address value.
-        # This is based on the cpython socket.create_connection() function.
-        # https://github.com/python/cpython/blob/master/Lib/socket.py#L691
-        def _create_connection(address, timeout=socket._GLOBAL_DEFAULT_TIMEOUT, source_address=None):
-            host, port = address
-            err = None
-            addrs = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
-            af = socket.AF_INET if '.' in source_address[0] else socket.AF_INET6
-            ip_addrs = [addr for addr in addrs if addr[0] == af]
-            if addrs and not ip_addrs:
-                ip_version = 'v4' if af == socket.AF_INET else 'v6'
-                raise socket.error(
-                    "No remote IP%s addresses available for connect, can't use '%s' as source address"
-                    % (ip_version, source_address[0]))
-            for res in ip_addrs:
-                af, socktype, proto, canonname, sa = res
-                sock = None
-                try:
-                    sock = socket.socket(af, socktype, proto)
-                    if timeout is not socket._GLOBAL_DEFAULT_TIMEOUT:
-                        sock.settimeout(timeout)
-                    sock.bind(source_address)
-                    sock.connect(sa)
-                    err = None  # Explicitly break reference cycle
-                    return sock
-                except socket.error as _:
-                    err = _
-                    if sock is not None:
-                        sock.close()
-            if err is not None:
-                raise err
-            else:
-                raise socket.error('getaddrinfo returns an empty list')
-        if hasattr(hc, '_create_connection'):
-            hc._create_connection = _create_connection
         sa = (source_address, 0)
         if hasattr(hc, 'source_address'):  # Python 2.7+
             hc.source_address = sa
@@ -2848,11 +3090,18 @@ def make_socks_conn_class(base_class, socks_proxy):
 
     class SocksConnection(base_class):
         def connect(self):
-            self.sock = sockssocket()
-            self.sock.setproxy(*proxy_args)
-            if type(self.timeout) in (int, float):
-                self.sock.settimeout(self.timeout)
-            self.sock.connect((self.host, self.port))
+            if hasattr(self, '_create_connection'):
+                # Connect to the proxy as to any host (see _create_http_connection)
+                self.sock = sockssocket.from_socket(self._create_connection(
+                    (proxy_args[1], proxy_args[2]), self.timeout, self.source_address))
+                self.sock.setproxy(*proxy_args)
+                self.sock.negotiate((self.host, self.port))
+            else:  # Python 2.6
+                self.sock = sockssocket()
+                self.sock.setproxy(*proxy_args)
+                if type(self.timeout) in (int, float):
+                    self.sock.settimeout(self.timeout)
+                self.sock.connect((self.host, self.port))
 
             if isinstance(self, compat_http_client.HTTPSConnection):
                 if hasattr(self, '_context'):  # Python > 2.6
@@ -4097,6 +4346,141 @@ class LazyList(compat_collections_abc.Iterable):
         return repr(self.exhaust())
 
 
+class FragmentList(compat_collections_abc.Sequence):
+    """
+    Compact immutable list of the fragment dicts of a format
+
+    Long manifests list up to hundreds of thousands of fragments whose
+    locations only differ by a number or a time. Instead of a dict per
+    fragment, the columns that vary are kept in arrays and the dicts are
+    built when accessed, so changes made to them are lost.
+
+    Fragment i has the location locations[i] if locations is given, else
+    template % {'Number': start_number + i, 'Time': times[i], 'Bandwidth':
+    bandwidth}, as its url if it is absolute and as its path otherwise.
+    Its duration is durations[i], or duration if durations is not given
+    (no duration if None). The head fragments, e.g. an initialization
+    segment, come first as they are.
+    """
+
+    _ABSOLUTE_URL_RE = re.compile(r'^https?://')
+    try:
+        _INT_TYPECODE = array.array(str('q')).typecode
+    except ValueError:  # Python 2
+        _INT_TYPECODE = str('l')
+
+    def __init__(self, count, template=None, locations=None, start_number=1,
+                 times=None, bandwidth=None, durations=None, duration=None, head=()):
+        assert (template is None) != (locations is None)
+        self._count = count
+        self._template = template
+        self._locations = locations
+        self._start_number = start_number
+        self._times = self._compact(times)
+        self._bandwidth = bandwidth
+        self._durations = self._compact(durations)
+        self._duration = duration
+        self._head = tuple(head)
+        self._location_key = None if template is None else self._get_location_key(template)
+        if count:
+            # Surface template errors now rather than when downloading
+            self._fragment(0)
+            self._fragment(count - 1)
+
+    @classmethod
+    def _compact(cls, values):
+        """ Numbers of a single type in an array, anything else in a list """
+        if values is None or isinstance(values, array.array):
+            return values
+        values = list(values)
+        value_types = set(map(type, values))
+        try:
+            if value_types == set([float]):
+                return array.array(str('d'), values)
+            if value_types and value_types <= set(compat_integer_types):
+                return array.array(cls._INT_TYPECODE, values)
+        except OverflowError:
+            pass
+        return values
+
+    @classmethod
+    def _get_location_key(cls, location):
+        return 'url' if cls._ABSOLUTE_URL_RE.match(location) else 'path'
+
+    def _fragment(self, index):
+        if self._locations is not None:
+            location = self._locations[index]
+            fragment = {self._get_location_key(location): location}
+        else:
+            fields = {
+                'Number': self._start_number + index,
+                'Bandwidth': self._bandwidth,
+            }
+            if self._times is not None:
+                fields['Time'] = self._times[index]
+            fragment = {self._location_key: self._template % fields}
+        duration = self._duration if self._durations is None else self._durations[index]
+        if duration is not None:
+            fragment['duration'] = duration
+        return fragment
+
+    def __len__(self):
+        return len(self._head) + self._count
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError('fragment index out of range')
+        if idx < len(self._head):
+            return dict(self._head[idx])
+        return self._fragment(idx - len(self._head))
+
+    def __iter__(self):
+        # Same fragments as _fragment(), without the lookups per fragment
+        for fragment in self._head:
+            yield dict(fragment)
+        count = self._count
+        durations = (
+            itertools.repeat(self._duration, count) if self._durations is None
+            else self._durations)
+        if self._locations is not None:
+            for location, duration in compat_zip(itertools.islice(self._locations, count), durations):
+                fragment = {self._get_location_key(location): location}
+                if duration is not None:
+                    fragment['duration'] = duration
+                yield fragment
+            return
+        template, location_key = self._template, self._location_key
+        fields = {'Bandwidth': self._bandwidth}
+        times = itertools.repeat(None, count) if self._times is None else self._times
+        for number, time_, duration in compat_zip(
+                itertools.count(self._start_number), itertools.islice(times, count), durations):
+            fields['Number'] = number
+            if time_ is not None:
+                fields['Time'] = time_
+            fragment = {location_key: template % fields}
+            if duration is not None:
+                fragment['duration'] = duration
+            yield fragment
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, FragmentList)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
+
+
 class PagedList(object):
     def __len__(self):
         # This is only useful for tests
@@ -4491,33 +4875,61 @@ def strip_jsonp(code):
         r'\g<callback_data>', code)
 
 
+_JS_STRING_QUOTES = '\'"`'
+_JS_STRING_RE = '|'.join(r'{0}(?:\\.|[^\\{0}])*{0}'.format(q) for q in _JS_STRING_QUOTES)
+_JS_COMMENT_RE = r'/\*(?:(?!\*/).)*?\*/|//[^\n]*\n'
+_JS_SKIP_RE = r'\s*(?:{comment})?\s*'.format(comment=_JS_COMMENT_RE)
+_JS_INTEGER_TABLE = tuple((re.compile(regex.format(skip=_JS_SKIP_RE)), base) for regex, base in (
+    (r'(?s)^(0[xX][0-9a-fA-F]+){skip}:?$', 16),
+    (r'(?s)^(0+[0-7]+){skip}:?$', 8),
+    (r'(?s)^(\d+){skip}:?$', 10),
+))
+# Splits the JS code into the tokens that have to be rewritten, anything
+# else is copied to the output as is
+_JS_TOKEN_RE = re.compile(r'''(?sx)
+    {str_}|
+    {comment}|
+    ,(?={skip}[\]}}])|
+    void\s0|
+    !*(?:(?<!\d)[eE]|[a-df-zA-DF-Z_$])[.a-zA-Z_$0-9]*|
+    (?:\b|!+)0(?:[xX][\da-fA-F]+|[0-7]+)(?:{skip}:)?|
+    !+\d+(?:\.\d*)?(?:{skip}:)?|
+    [0-9]+(?:{skip}:)|
+    !+
+    '''.format(comment=_JS_COMMENT_RE, skip=_JS_SKIP_RE, str_=_JS_STRING_RE))
+_JS_ESCAPE_RE = re.compile(r'(?s)(")|\\(.)')
+_JS_TEMPLATE_RE = re.compile(r'(?s)\${([^}]+)}')
+_JS_NEGATION_RE = re.compile(r'^!+')
+# Constructs rewritten before tokenizing, with the text that has to be
+# present in the code for the rewrite to apply
+_JS_MAP_RE = ('new Map(', re.compile(r'new Map\((\[.*?\])?\)'))
+_JS_LENIENT_REWRITES = (
+    ('new Date(', re.compile(r'new Date\((".+")\)'), r'\g<1>'),
+    ('new ', re.compile(r'new \w+\((.*?)\)'), lambda m: json.dumps(m.group(0))),
+    ('parseInt(', re.compile(r'parseInt\([^\d]+(\d+)[^\d]+\)'), r'\1'),
+    ('(function(', re.compile(r'\(function\([^)]*\)\s*\{[^}]*\}\s*\)\s*\(\s*(["\'][^)]*["\'])\s*\)'), r'\1'),
+)
+_JS_JSON_PASSTHROUGH_ESCAPES = r'"\bfnrtu'
+
+
+def _js_process_escape(match):
+    escape = match.group(1) or match.group(2)
+
+    return ('\\' + escape if escape in _JS_JSON_PASSTHROUGH_ESCAPES
+            else '\\u00' if escape == 'x'
+            else '' if escape == '\n'
+            else escape)
+
+
 def js_to_json(code, *args, **kwargs):
 
     # vars is a dict of (var, val) pairs to substitute
     vars = args[0] if len(args) > 0 else kwargs.get('vars', {})
     strict = kwargs.get('strict', False)
 
-    STRING_QUOTES = '\'"`'
-    STRING_RE = '|'.join(r'{0}(?:\\.|[^\\{0}])*{0}'.format(q) for q in STRING_QUOTES)
-    COMMENT_RE = r'/\*(?:(?!\*/).)*?\*/|//[^\n]*\n'
-    SKIP_RE = r'\s*(?:{comment})?\s*'.format(comment=COMMENT_RE)
-    INTEGER_TABLE = (
-        (r'(?s)^(0[xX][0-9a-fA-F]+){skip}:?$'.format(skip=SKIP_RE), 16),
-        (r'(?s)^(0+[0-7]+){skip}:?$'.format(skip=SKIP_RE), 8),
-        (r'(?s)^(\d+){skip}:?$'.format(skip=SKIP_RE), 10),
-    )
     # compat candidate
     JSONDecodeError = json.JSONDecodeError if 'JSONDecodeError' in dir(json) else ValueError
 
-    def process_escape(match):
-        JSON_PASSTHROUGH_ESCAPES = r'"\bfnrtu'
-        escape = match.group(1) or match.group(2)
-
-        return ('\\' + escape if escape in JSON_PASSTHROUGH_ESCAPES
-                else '\\u00' if escape == 'x'
-                else '' if escape == '\n'
-                else escape)
-
     def template_substitute(match):
         evaluated = js_to_json(match.group(1), vars, strict=strict)
         if evaluated[0] == '"':
@@ -4526,34 +4938,39 @@ def js_to_json(code, *args, **kwargs):
 
     def fix_kv(m):
         v = m.group(0)
+        # Strings are the most common tokens
+        if v[0] in _JS_STRING_QUOTES:
+            v = _JS_TEMPLATE_RE.sub(template_substitute, v[1:-1]) if v[0] == '`' else v[1:-1]
+            if '"' in v or '\\' in v:
+                v = _JS_ESCAPE_RE.sub(_js_process_escape, v)
+            return '"' + v + '"'
+
         if v in ('true', 'false', 'null'):
             return v
         elif v in ('undefined', 'void 0'):
             return 'null'
-        elif v.startswith('/*') or v.startswith('//') or v == ',':
+        elif v[0] == '/' or v == ',':
+            # comment or trailing comma
             return ''
 
-        if v[0] in STRING_QUOTES:
-            v = re.sub(r'(?s)\${([^}]+)}', template_substitute, v[1:-1]) if v[0] == '`' else v[1:-1]
-            escaped = re.sub(r'(?s)(")|\\(.)', process_escape, v)
-            return '"{0}"'.format(escaped)
-
         inv = IDENTITY
-        im = re.split(r'^!+', v)
-        if len(im) > 1 and not im[-1].endswith(':'):
-            if (len(v) - len(im[1])) % 2 == 1:
-                inv = lambda x: 'true' if x == 0 else 'false'
-            else:
-                inv = lambda x: 'false' if x == 0 else 'true'
-        if not any(x for x in im):
-            return
-        v = im[-1]
-
-        for regex, base in INTEGER_TABLE:
-            im = re.match(regex, v)
-            if im:
-                i = int(im.group(1), base)
-                return ('"%s":' if v.endswith(':') else '%s') % inv(i)
+        if v[0] == '!':
+            im = _JS_NEGATION_RE.split(v)
+            if not im[-1].endswith(':'):
+                if (len(v) - len(im[1])) % 2 == 1:
+                    inv = lambda x: 'true' if x == 0 else 'false'
+                else:
+                    inv = lambda x: 'false' if x == 0 else 'true'
+            if not any(x for x in im):
+                return
+            v = im[-1]
+
+        if v[:1].isdigit():
+            for regex, base in _JS_INTEGER_TABLE:
+                im = regex.match(v)
+                if im:
+                    i = int(im.group(1), base)
+                    return ('"%s":' if v.endswith(':') else '%s') % inv(i)
 
         if v in vars:
             try:
@@ -4565,34 +4982,26 @@ def js_to_json(code, *args, **kwargs):
                 return inv(vars[v])
 
         if not strict:
-            v = try_call(inv, args=(v,), default=v)
-            if v in ('true', 'false'):
-                return v
-            return '"{0}"'.format(v)
+            if inv is not IDENTITY:
+                v = try_call(inv, args=(v,), default=v)
+                if v in ('true', 'false'):
+                    return v
+            return '"' + v + '"'
 
         raise ValueError('Unknown value: ' + v)
 
     def create_map(mobj):
         return json.dumps(dict(json.loads(js_to_json(mobj.group(1) or '[]', vars=vars))))
 
-    code = re.sub(r'new Map\((\[.*?\])?\)', create_map, code)
+    # Each rewrite is a pass over the whole code, only run those that apply
+    if _JS_MAP_RE[0] in code:
+        code = _JS_MAP_RE[1].sub(create_map, code)
     if not strict:
-        code = re.sub(r'new Date\((".+")\)', r'\g<1>', code)
-        code = re.sub(r'new \w+\((.*?)\)', lambda m: json.dumps(m.group(0)), code)
-        code = re.sub(r'parseInt\([^\d]+(\d+)[^\d]+\)', r'\1', code)
-        code = re.sub(r'\(function\([^)]*\)\s*\{[^}]*\}\s*\)\s*\(\s*(["\'][^)]*["\'])\s*\)', r'\1', code)
-
-    return re.sub(r'''(?sx)
-        {str_}|
-        {comment}|
-        ,(?={skip}[\]}}])|
-        void\s0|
-        !*(?:(?<!\d)[eE]|[a-df-zA-DF-Z_$])[.a-zA-Z_$0-9]*|
-        (?:\b|!+)0(?:[xX][\da-fA-F]+|[0-7]+)(?:{skip}:)?|
-        !+\d+(?:\.\d*)?(?:{skip}:)?|
-        [0-9]+(?:{skip}:)|
-        !+
-        '''.format(comment=COMMENT_RE, skip=SKIP_RE, str_=STRING_RE), fix_kv, code)
+        for marker, regex, repl in _JS_LENIENT_REWRITES:
+            if marker in code:
+                code = regex.sub(repl, code)
+
+    return _JS_TOKEN_RE.sub(fix_kv, code)
 
 
 def qualities(quality_ids):
@@ -4794,91 +5203,244 @@ def render_table(header_row, data):
     return '\n'.join(format_str % tuple(row) for row in table)
 
 
-def _match_one(filter_part, dct):
-    COMPARISON_OPERATORS = {
-        '<': operator.lt,
-        '<=': operator.le,
-        '>': operator.gt,
-        '>=': operator.ge,
-        '=': operator.eq,
-        '!=': operator.ne,
-    }
-    operator_rex = re.compile(r'''(?x)\s*
-        (?P<key>[a-z_]+)
-        \s*(?P<op>%s)(?P<none_inclusive>\s*\?)?\s*
-        (?:
-            (?P<intval>[0-9.]+(?:[kKmMgGtTpPeEzZyY]i?[Bb]?)?)|
-            (?P<quote>["\'])(?P<quotedstrval>(?:\\.|(?!(?P=quote)|\\).)+?)(?P=quote)|
-            (?P<strval>(?![0-9.])[a-z0-9A-Z]*)
-        )
-        \s*$
-        ''' % '|'.join(map(re.escape, COMPARISON_OPERATORS.keys())))
-    m = operator_rex.search(filter_part)
+_MATCH_COMPARISON_OPERATORS = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '=': operator.eq,
+    '!=': operator.ne,
+}
+
+_MATCH_COMPARISON_RE = re.compile(r'''(?x)\s*
+    (?P<key>[a-z_]+)
+    \s*(?P<op>%s)(?P<none_inclusive>\s*\?)?\s*
+    (?:
+        (?P<intval>[0-9.]+(?:[kKmMgGtTpPeEzZyY]i?[Bb]?)?)|
+        (?P<quote>["\'])(?P<quotedstrval>(?:\\.|(?!(?P=quote)|\\).)+?)(?P=quote)|
+        (?P<strval>(?![0-9.])[a-z0-9A-Z]*)
+    )
+    \s*$
+    ''' % '|'.join(map(re.escape, _MATCH_COMPARISON_OPERATORS.keys())))
+
+_MATCH_UNARY_OPERATORS = {
+    '': lambda v: (v is True) if isinstance(v, bool) else (v is not None),
+    '!': lambda v: (v is False) if isinstance(v, bool) else (v is None),
+}
+
+_MATCH_UNARY_RE = re.compile(r'''(?x)\s*
+    (?P<op>%s)\s*(?P<key>[a-z_]+)
+    \s*$
+    ''' % '|'.join(map(re.escape, _MATCH_UNARY_OPERATORS.keys())))
+
+# Quoted strings are skipped as a whole so that operators inside them
+# are not taken for the ones combining clauses
+_MATCH_FILTER_TOKEN_RE = re.compile(r'''"(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*'|[&|()]''')
+
+
+def _compile_match_one(filter_part):
+    """
+    Compile a single filter clause into a predicate(dct, incomplete=False)
+
+    With incomplete=True the predicate returns None if the key is not known,
+    since the full info dict may still provide it.
+    """
+    m = _MATCH_COMPARISON_RE.search(filter_part)
     if m:
-        op = COMPARISON_OPERATORS[m.group('op')]
-        actual_value = dct.get(m.group('key'))
-        if (m.group('quotedstrval') is not None
-            or m.group('strval') is not None
+        key = m.group('key')
+        op_str = m.group('op')
+        op = _MATCH_COMPARISON_OPERATORS[op_str]
+        none_inclusive = m.group('none_inclusive') is not None
+        intval = m.group('intval')
+        if intval is None and op_str not in ('=', '!='):
+            raise ValueError(
+                'Operator %s does not support string values!' % op_str)
+        str_value = m.group('quotedstrval') or m.group('strval') or intval
+        quote = m.group('quote')
+        if quote is not None:
+            str_value = str_value.replace(r'\%s' % quote, quote)
+        int_value = None
+        if intval is not None:
+            try:
+                int_value = int(intval)
+            except ValueError:
+                int_value = parse_filesize(intval)
+                if int_value is None:
+                    int_value = parse_filesize(intval + 'B')
+
+        def compare(dct, incomplete=False):
+            actual_value = dct.get(key)
+            if actual_value is None and incomplete:
+                return None
             # If the original field is a string and matching comparisonvalue is
             # a number we should respect the origin of the original field
             # and process comparison value as a string (see
             # https://github.com/ytdl-org/youtube-dl/issues/11082).
-            or actual_value is not None and m.group('intval') is not None
-                and isinstance(actual_value, compat_str)):
-            if m.group('op') not in ('=', '!='):
-                raise ValueError(
-                    'Operator %s does not support string values!' % m.group('op'))
-            comparison_value = m.group('quotedstrval') or m.group('strval') or m.group('intval')
-            quote = m.group('quote')
-            if quote is not None:
-                comparison_value = comparison_value.replace(r'\%s' % quote, quote)
-        else:
-            try:
-                comparison_value = int(m.group('intval'))
-            except ValueError:
-                comparison_value = parse_filesize(m.group('intval'))
-                if comparison_value is None:
-                    comparison_value = parse_filesize(m.group('intval') + 'B')
-                if comparison_value is None:
+            if intval is None or isinstance(actual_value, compat_str):
+                if op_str not in ('=', '!='):
+                    raise ValueError(
+                        'Operator %s does not support string values!' % op_str)
+                comparison_value = str_value
+            else:
+                if int_value is None:
                     raise ValueError(
                         'Invalid integer value %r in filter part %r' % (
-                            m.group('intval'), filter_part))
-        if actual_value is None:
-            return m.group('none_inclusive')
-        return op(actual_value, comparison_value)
-
-    UNARY_OPERATORS = {
-        '': lambda v: (v is True) if isinstance(v, bool) else (v is not None),
-        '!': lambda v: (v is False) if isinstance(v, bool) else (v is None),
-    }
-    operator_rex = re.compile(r'''(?x)\s*
-        (?P<op>%s)\s*(?P<key>[a-z_]+)
-        \s*$
-        ''' % '|'.join(map(re.escape, UNARY_OPERATORS.keys())))
-    m = operator_rex.search(filter_part)
+                            intval, filter_part))
+                comparison_value = int_value
+            if actual_value is None:
+                return none_inclusive
+            return op(actual_value, comparison_value)
+        return compare
+
+    m = _MATCH_UNARY_RE.search(filter_part)
     if m:
-        op = UNARY_OPERATORS[m.group('op')]
-        actual_value = dct.get(m.group('key'))
-        return op(actual_value)
+        key = m.group('key')
+        op = _MATCH_UNARY_OPERATORS[m.group('op')]
+
+        def check(dct, incomplete=False):
+            actual_value = dct.get(key)
+            if actual_value is None and incomplete:
+                return None
+            return op(actual_value)
+        return check
 
     raise ValueError('Invalid filter part %r' % filter_part)
 
 
+def _match_all(predicates):
+    def match(dct, incomplete=False):
+        result = True
+        for predicate in predicates:
+            ret = predicate(dct, incomplete)
+            if ret is None:
+                result = None
+            elif not ret:
+                return False
+        return result
+    return match
+
+
+def _match_any(predicates):
+    def match(dct, incomplete=False):
+        result = False
+        for predicate in predicates:
+            ret = predicate(dct, incomplete)
+            if ret is None:
+                result = None
+            elif ret:
+                return True
+        return result
+    return match
+
+
+def compile_match_filter(filter_str):
+    """
+    Compile a filter string into a predicate(dct, incomplete=False)
+
+    Clauses are combined with & (binds tighter) and |, and may be grouped
+    with parentheses. The predicate returns whether dct passes the filter;
+    with incomplete=True it returns None when that cannot be decided yet
+    from the keys dct has.
+    """
+    # Operators are kept as 1-tuples to tell them from clauses
+    tokens = []
+    part_start = 0
+    for m in _MATCH_FILTER_TOKEN_RE.finditer(filter_str):
+        if len(m.group(0)) > 1:
+            continue
+        tokens.extend((filter_str[part_start:m.start()], (m.group(0),)))
+        part_start = m.end()
+    tokens.append(filter_str[part_start:])
+    tokens = [t for t in tokens if isinstance(t, tuple) or t.strip()]
+    pos = [0]
+
+    def next_token():
+        token = tokens[pos[0]] if pos[0] < len(tokens) else None
+        return token[0] if isinstance(token, tuple) else token
+
+    def parse_atom():
+        token = next_token()
+        if token in (None, '&', '|', ')'):
+            raise ValueError('Invalid filter part %r in filter %r' % (token or '', filter_str))
+        pos[0] += 1
+        if token == '(':
+            predicate = parse_any()
+            if next_token() != ')':
+                raise ValueError('Unbalanced parentheses in filter %r' % filter_str)
+            pos[0] += 1
+            return predicate
+        return _compile_match_one(token)
+
+    def parse_all():
+        predicates = [parse_atom()]
+        while next_token() == '&':
+            pos[0] += 1
+            predicates.append(parse_atom())
+        return predicates[0] if len(predicates) == 1 else _match_all(predicates)
+
+    def parse_any():
+        predicates = [parse_all()]
+        while next_token() == '|':
+            pos[0] += 1
+            predicates.append(parse_all())
+        return predicates[0] if len(predicates) == 1 else _match_any(predicates)
+
+    predicate = parse_any()
+    if pos[0] != len(tokens):
+        raise ValueError('Invalid filter %r' % filter_str)
+    return predicate
+
+
+_match_filter_cache = {}
+
+
+def _match_one(filter_part, dct):
+    return _compile_match_one(filter_part)(dct)
+
+
 def match_str(filter_str, dct):
     """ Filter a dictionary with a simple string syntax. Returns True (=passes filter) or false """
 
-    return all(
-        _match_one(filter_part, dct) for filter_part in filter_str.split('&'))
+    predicate = _match_filter_cache.get(filter_str)
+    if predicate is None:
+        if len(_match_filter_cache) >= 64:
+            _match_filter_cache.clear()
+        predicate = _match_filter_cache[filter_str] = compile_match_filter(filter_str)
+    return bool(predicate(dct))
 
 
-def match_filter_func(filter_str):
-    def _match_func(info_dict):
-        if match_str(filter_str, info_dict):
+class MatchFilter(object):
+    """ A match_filter for YoutubeDL compiled from a filter string """
+
+    def __init__(self, filter_str):
+        self.filter_str = filter_str
+        self._predicate = compile_match_filter(filter_str)
+
+    def _reject(self, info_dict):
+        video_title = info_dict.get('title', info_dict.get('id', 'video'))
+        return '%s does not pass filter %s, skipping ..' % (video_title, self.filter_str)
+
+    def __call__(self, info_dict):
+        if self._predicate(info_dict):
             return None
-        else:
-            video_title = info_dict.get('title', info_dict.get('id', 'video'))
-            return '%s does not pass filter %s, skipping ..' % (video_title, filter_str)
-    return _match_func
+        return self._reject(info_dict)
+
+    def match_incomplete(self, info_dict):
+        """
+        Like calling the filter, but only rejects info_dict if it fails
+        the filter whatever values its missing fields will get
+        """
+        try:
+            if self._predicate(info_dict, incomplete=True) is not False:
+                return None
+        except (TypeError, ValueError):
+            # Let the check of the complete info dict report it
+            return None
+        return self._reject(info_dict)
+
+
+def match_filter_func(filter_str):
+    return MatchFilter(filter_str)
 
 
 def parse_dfxp_time_expr(time_expr):